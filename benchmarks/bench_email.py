@@ -0,0 +1,163 @@
+"""
+Bes2 Marketer - Email Throughput Benchmark
+로컬 SMTP 싱크(smtp_sink.py)로 EmailSender의 발송 지연/처리량 측정
+
+모드
+- single     : 메일마다 새로 연결 + 로그인 (연결 풀 없음, 기존 방식)
+- pooled     : 로그인된 연결 하나를 재사용하며 순차 발송 (send_email)
+- concurrent : 연결 풀 --workers개로 동시 발송 (send_concurrent)
+
+사용법:
+    python benchmarks/bench_email.py                      # 메시지 200통, 지연 없음
+    python benchmarks/bench_email.py -n 500 --latency 0.02 --workers 4
+    python benchmarks/bench_email.py --mode pooled --mode concurrent --json email_bench.json
+
+    # 이미 떠 있는 SMTP 서버로 측정 (예: 다른 머신의 smtp_sink.py)
+    python benchmarks/bench_email.py --host 10.0.0.5 --port 8025
+
+--latency는 싱크가 SMTP 응답마다 추가하는 지연(초)입니다. 실제 Gmail까지의 왕복 시간
+(수십 ms)을 흉내 내야 연결 재사용/동시 발송의 효과가 제대로 드러납니다.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from config import config  # noqa: E402
+from email_service import EmailSender  # noqa: E402
+from smtp_sink import SMTPSink  # noqa: E402
+
+MODES = ["single", "pooled", "concurrent"]
+
+
+def make_messages(count: int, body_size: int) -> list[dict]:
+    body = ("안녕하세요, Bes2 팀입니다. " * (body_size // 20 + 1))[:body_size]
+    return [
+        {"to": f"creator{i}@example.com", "subject": f"[Bench] 협업 제안 {i}", "body": body}
+        for i in range(count)
+    ]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def instrument(sender: EmailSender) -> list[float]:
+    """send_many 호출(= 메시지 1통) 소요 시간을 기록하도록 감싸기"""
+    latencies: list[float] = []
+    original = sender.send_many
+
+    def timed(messages):
+        started = time.perf_counter()
+        try:
+            return original(messages)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    sender.send_many = timed
+    return latencies
+
+
+def run_mode(mode: str, messages: list[dict], host: str, port: int, workers: int) -> dict:
+    pool_size = 0 if mode == "single" else (workers if mode == "concurrent" else 1)
+    sender = EmailSender(host=host, port=port, security="none", pool_size=pool_size)
+    latencies = instrument(sender)
+
+    # EmailSender의 메시지별 print 출력은 측정에서 제외
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        if mode == "concurrent":
+            results = sender.send_concurrent(messages, workers=workers)
+        else:
+            results = [{"ok": sender.send_email(m["to"], m["subject"], m["body"])} for m in messages]
+        elapsed = time.perf_counter() - started
+        sender.pool.close_all()
+
+    sent = sum(1 for r in results if r["ok"])
+    return {
+        "mode": mode,
+        "messages": len(messages),
+        "sent": sent,
+        "failed": len(messages) - sent,
+        "workers": workers if mode == "concurrent" else 1,
+        "elapsed_s": elapsed,
+        "per_minute": sent / elapsed * 60 if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def print_report(results: list[dict]) -> None:
+    header = f"{'mode':<11} {'sent':>6} {'fail':>5} {'workers':>7} {'elapsed s':>10} {'msg/min':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    print(header)
+    print("-" * len(header))
+    baseline = results[0]["per_minute"] if results else 0
+    for r in results:
+        line = (
+            f"{r['mode']:<11} {r['sent']:>6} {r['failed']:>5} {r['workers']:>7} {r['elapsed_s']:>10.2f} "
+            f"{r['per_minute']:>9.0f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}"
+        )
+        if baseline and r is not results[0]:
+            line += f"  {r['per_minute'] / baseline:.1f}x"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EmailSender throughput benchmark against a local SMTP sink")
+    parser.add_argument("-n", "--messages", type=int, default=200)
+    parser.add_argument("--mode", action="append", choices=MODES, help="측정할 모드 (여러 번 지정 가능, 기본: 전체)")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent 모드의 동시 연결 수")
+    parser.add_argument("--latency", type=float, default=0.0, help="싱크의 SMTP 응답 지연 (초)")
+    parser.add_argument("--body-size", type=int, default=2000, help="본문 길이 (문자)")
+    parser.add_argument("--host", help="외부 SMTP 서버 (지정하면 내장 싱크를 띄우지 않음)")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--json", help="결과 저장 경로")
+    args = parser.parse_args()
+
+    # 싱크는 인증을 확인하지 않지만 EmailSender는 계정 설정이 있어야 발송함
+    config.SENDER_EMAIL = config.SENDER_EMAIL or "bench@localhost"
+    config.SENDER_PASSWORD = config.SENDER_PASSWORD or "bench"
+
+    sink = None
+    host, port = args.host, args.port
+    if not host:
+        sink = SMTPSink("127.0.0.1", 0, latency=args.latency, keep_messages=False).start()
+        host, port = "127.0.0.1", sink.port
+        print(f"📭 SMTP sink on {host}:{port} (latency {args.latency * 1000:.0f}ms/reply)")
+
+    messages = make_messages(args.messages, args.body_size)
+    results = []
+    try:
+        for mode in args.mode or MODES:
+            print(f"⏱️  {mode} ...", flush=True)
+            results.append(run_mode(mode, messages, host, port, args.workers))
+    finally:
+        if sink:
+            print(f"📨 Sink received {sink.count} message(s)")
+            sink.stop()
+
+    print()
+    print_report(results)
+
+    if args.json:
+        output = {"messages": args.messages, "latency": args.latency, "workers": args.workers, "results": results}
+        Path(args.json).write_text(json.dumps(output, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n💾 Saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
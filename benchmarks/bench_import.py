@@ -0,0 +1,148 @@
+"""
+Bes2 Marketer - Import Time Benchmark
+모듈별 콜드 import 시간 측정 (매번 새 파이썬 프로세스, python -X importtime)
+
+사용법:
+    python benchmarks/bench_import.py                         # 기본 모듈 전체
+    python benchmarks/bench_import.py --module logic --repeat 10
+    python benchmarks/bench_import.py --first-use             # 클라이언트 첫 사용(지연 생성) 비용도 측정
+    python benchmarks/bench_import.py --json after.json --baseline before.json
+
+보고 항목
+- import ms : 해당 모듈의 누적 import 시간 (-X importtime cumulative, 중앙값)
+- wall ms   : import 문(+ --first-use 코드) 실행 시간 (perf_counter, 중앙값)
+- top       : 가장 무거운 직접 import 3개
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_MODULES = ["config", "database", "logic", "email_service", "pending_queue", "outbox_worker", "retention"]
+
+# --first-use: import 후 지연 생성되는 클라이언트를 실제로 만들어 보는 코드 (네트워크 요청 없음)
+FIRST_USE = {
+    "database": "database.db.client",
+    "logic": "logic.hunter.youtube; logic.copywriter.model",
+}
+
+TIMER = (
+    "import time as _t; _s = _t.perf_counter(); {statement}; "
+    "print('__ELAPSED__', (_t.perf_counter() - _s) * 1000)"
+)
+
+
+def parse_importtime(stderr: str, module: str) -> tuple[float, list[tuple[str, float]]]:
+    """-X importtime 출력 -> (대상 모듈 누적 ms, [(직접 import 이름, 누적 ms)])"""
+    total = 0.0
+    children: list[tuple[str, float]] = []
+    pending: list[tuple[str, float]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        cumulative_ms = int(parts[1]) / 1000
+        raw_name = parts[2].rstrip()
+        name = raw_name.strip()
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        # -X importtime은 자식을 부모보다 먼저 출력하므로 대상 모듈 직전의 depth 1 항목이 직접 import
+        if depth == 1:
+            pending.append((name, cumulative_ms))
+        elif depth == 0:
+            if name == module:
+                total, children = cumulative_ms, pending
+            pending = []
+    return total, sorted(children, key=lambda c: c[1], reverse=True)
+
+
+def measure(module: str, repeat: int, first_use: bool) -> dict:
+    imports, walls, uses = [], [], []
+    top: list[tuple[str, float]] = []
+    for _ in range(repeat):
+        statement = f"import {module}"
+        if first_use and module in FIRST_USE:
+            statement += "; " + TIMER.format(statement=FIRST_USE[module])
+        code = "import time as _w; _ws = _w.perf_counter(); " + statement + "; print('__WALL__', (_w.perf_counter() - _ws) * 1000)"
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            return {"module": module, "error": proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"}
+        total, children = parse_importtime(proc.stderr, module)
+        imports.append(total)
+        top = children[:3]
+        for line in proc.stdout.splitlines():
+            if line.startswith("__WALL__"):
+                walls.append(float(line.split()[1]))
+            elif line.startswith("__ELAPSED__"):
+                uses.append(float(line.split()[1]))
+
+    return {
+        "module": module,
+        "import_ms": statistics.median(imports),
+        "wall_ms": statistics.median(walls) if walls else None,
+        "first_use_ms": statistics.median(uses) if uses else None,
+        "top": top,
+    }
+
+
+def print_report(results: list[dict], baseline: dict = None) -> None:
+    header = f"{'module':<16} {'import ms':>10} {'wall ms':>9} {'first use':>10}"
+    if baseline:
+        header += f" {'before':>9} {'speedup':>8}"
+    print(header + "  top imports")
+    print("-" * (len(header) + 40))
+    for r in results:
+        if "error" in r:
+            print(f"{r['module']:<16} ERROR {r['error']}")
+            continue
+        first_use = f"{r['first_use_ms']:.1f}" if r["first_use_ms"] is not None else "-"
+        line = f"{r['module']:<16} {r['import_ms']:>10.1f} {r['wall_ms'] or 0:>9.1f} {first_use:>10}"
+        if baseline:
+            before = baseline.get(r["module"], {}).get("import_ms")
+            if before:
+                line += f" {before:>9.1f} {before / max(r['import_ms'], 1e-6):>7.1f}x"
+            else:
+                line += f" {'-':>9} {'-':>8}"
+        top = ", ".join(f"{name} {ms:.0f}" for name, ms in r["top"])
+        print(f"{line}  {top}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import time benchmark")
+    parser.add_argument("--module", action="append", help="측정할 모듈 (여러 번 지정 가능, 기본: 주요 모듈 전체)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--first-use", action="store_true", help="지연 생성 클라이언트의 첫 사용 시간도 측정")
+    parser.add_argument("--json", help="결과 저장 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과(JSON)")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        data = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        baseline = {r["module"]: r for r in data["results"]}
+
+    results = []
+    for module in args.module or DEFAULT_MODULES:
+        print(f"⏱️  {module} ...", flush=True)
+        results.append(measure(module, args.repeat, args.first_use))
+
+    print()
+    print_report(results, baseline)
+
+    if args.json:
+        output = {"python": sys.version.split()[0], "repeat": args.repeat, "results": results}
+        Path(args.json).write_text(json.dumps(output, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n💾 Saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+Bes2 Marketer - Pipeline Benchmark
+검색 -> DB 동기화 -> AI 분석 -> 발송 전체 흐름을 녹화된 응답(fixture)으로 오프라인 실행하고
+단계별 처리량/지연 시간을 측정
+
+실제 YouTubeHunter / AICopywriter / Database / Pipeline / OutboxWorker / EmailSender 코드를 그대로 실행하고,
+외부 서비스만 바꿔 끼웁니다 (pipeline_fixtures.py).
+- YouTube API / 자막 / Gemini: fixture 응답 + 녹화된 지연 시간 분포 x --latency-scale
+- DB: SQLite (기본 메모리) + 녹화된 Supabase 왕복 지연 x --latency-scale
+- SMTP: 로컬 싱크(smtp_sink.py), 응답마다 --smtp-latency 지연
+단계별 호출 시간은 실행 추적(tracing.py) 구간에서 집계합니다.
+
+사용법:
+    python benchmarks/bench_pipeline.py                          # fixture가 없으면 합성 fixture 생성 후 재생
+    python benchmarks/bench_pipeline.py --workers 4 --latency-scale 0.2
+    python benchmarks/bench_pipeline.py --json after.json --baseline before.json
+
+    # 실제 서비스 응답 녹화 (YOUTUBE_API_KEY / GEMINI_API_KEY 필요, Supabase는 읽기 쿼리로 지연만 측정)
+    python benchmarks/bench_pipeline.py --record --keyword "갤러리 정리" --videos 10
+
+보고 항목
+- items/s    : 단계 처리량 (scan/sync/analyze: 영상, send: 발송 성공 메일)
+- item p50/95: 항목 하나의 소요 시간 (scan: 키워드, analyze: 영상, send: 메일)
+- 호출별     : YouTube / 자막 / Gemini / DB / SMTP 호출 수와 지연 시간 (p50/p95/합계)
+
+⚠️ fixture에는 실제 채널 설명/이메일/자막이 들어갈 수 있으므로 benchmarks/fixtures/는 커밋하지 않습니다.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from config import config  # noqa: E402
+from database import Database  # noqa: E402
+from email_service import EmailSender  # noqa: E402
+from logic import AICopywriter, YouTubeHunter  # noqa: E402
+from outbox_worker import OutboxWorker  # noqa: E402
+from pipeline import Pipeline  # noqa: E402
+from smtp_sink import SMTPSink  # noqa: E402
+from sqlite_backend import SQLiteClient  # noqa: E402
+from tracing import CALL_KINDS, span_kind, tracer  # noqa: E402
+
+import pipeline_fixtures as fx  # noqa: E402
+
+DEFAULT_FIXTURE = Path(__file__).resolve().parent / "fixtures" / "pipeline.json"
+DEFAULT_KEYWORDS = ["사진 정리", "갤러리 정리"]
+
+STAGES = ["scan", "sync", "analyze", "send"]
+
+# 단계별 "항목 하나"에 해당하는 구간 (item p50/p95)
+ITEM_SPANS = {
+    "scan": "pipeline.search_keyword",
+    "analyze": "pipeline.analyze_video",
+    "send": "smtp.send_message",
+}
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+# =========================================
+# 준비
+# =========================================
+
+def build_clients(args, fixture: dict, misses: dict):
+    """(database, hunter, copywriter, recorder) - 녹화 모드면 실제 클라이언트를 녹화기로 감쌈"""
+    latency = fx.Latency(fixture, scale=0 if args.record else args.latency_scale, seed=args.seed)
+    database = Database(fx.LatencyClient(SQLiteClient(args.sqlite), latency))
+
+    if args.record:
+        recorder = fx.Recorder(fixture)
+        live = YouTubeHunter()
+        if live.youtube is None:
+            raise SystemExit("YOUTUBE_API_KEY가 없거나 YouTube 클라이언트를 만들 수 없습니다.")
+        model = AICopywriter().model
+        if model is None:
+            raise SystemExit("GEMINI_API_KEY가 없거나 Gemini 모델을 만들 수 없습니다.")
+        hunter = YouTubeHunter(
+            youtube=fx.RecordingYouTube(live.youtube, recorder),
+            transcript_api=fx.RecordingTranscriptApi(live.transcript_api, recorder),
+            database=database,
+            page_delay=(0, 0)
+        )
+        return database, hunter, AICopywriter(model=fx.RecordingModel(model, recorder)), recorder
+
+    hunter = YouTubeHunter(
+        youtube=fx.ReplayYouTube(fixture, latency, misses),
+        transcript_api=fx.ReplayTranscriptApi(fixture, latency, misses),
+        database=database,
+        page_delay=(0, 0)  # 페이지 사이 랜덤 대기는 요청 간격 조절용이라 측정에서 제외
+    )
+    return database, hunter, AICopywriter(model=fx.ReplayModel(fixture, latency, misses)), None
+
+
+# =========================================
+# 단계 실행 + 집계
+# =========================================
+
+def run_stage(name: str, verbose: bool, fn) -> tuple[dict, dict]:
+    """단계 하나를 실행 추적(run) 안에서 실행, (결과, 실행 dict) 반환"""
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with output, tracer.run(f"bench.{name}"):
+        result = fn()
+    return result, tracer.recent(1)[0]
+
+
+def stage_report(name: str, items: int, trace: dict) -> dict:
+    elapsed = trace["duration_ms"] / 1000
+    item_ms = [
+        (s["end_ns"] - s["start_ns"]) / 1e6
+        for s in trace["spans"] if s["name"] == ITEM_SPANS.get(name)
+    ]
+    calls = {}
+    for kind in CALL_KINDS:
+        durations = [(s["end_ns"] - s["start_ns"]) / 1e6 for s in trace["spans"] if span_kind(s["name"]) == kind]
+        if durations:
+            calls[kind] = {
+                "count": len(durations),
+                "p50_ms": percentile(durations, 50),
+                "p95_ms": percentile(durations, 95),
+                "total_ms": sum(durations),
+                "errors": sum(1 for s in trace["spans"] if span_kind(s["name"]) == kind and s["error"]),
+            }
+    return {
+        "stage": name,
+        "items": items,
+        "elapsed_s": elapsed,
+        "items_per_s": items / elapsed if elapsed else 0.0,
+        "item_p50_ms": percentile(item_ms, 50),
+        "item_p95_ms": percentile(item_ms, 95),
+        "calls": calls,
+    }
+
+
+def run_pipeline(args, fixture: dict, misses: dict) -> tuple[list[dict], dict]:
+    database, hunter, copywriter, recorder = build_clients(args, fixture, misses)
+    pipeline = Pipeline(database, hunter=hunter, copywriter=copywriter)
+    keywords = args.keyword or fixture.get("keywords") or DEFAULT_KEYWORDS
+    reports, details = [], {}
+
+    print(f"🔍 scan: {', '.join(keywords)}", flush=True)
+    scan, trace = run_stage("scan", args.verbose, lambda: pipeline.search(
+        keywords, max_results=args.videos, published_after_days=args.days
+    ))
+    videos = scan["videos"]
+    reports.append(stage_report("scan", len(videos), trace))
+
+    print(f"💾 sync: {len(videos)} video(s)", flush=True)
+    sync, trace = run_stage("sync", args.verbose, lambda: pipeline.sync(videos))
+    reports.append(stage_report("sync", len(videos), trace))
+    details["sync"] = sync["videos"]
+
+    print(f"🤖 analyze: {len(videos)} video(s), concurrency {args.workers}", flush=True)
+    analysis, trace = run_stage("analyze", args.verbose, lambda: pipeline.analyze(videos, concurrency=args.workers))
+    reports.append(stage_report("analyze", len(videos), trace))
+    details["analyze"] = {
+        "analyzed": analysis["analyzed"],
+        "skipped": len(analysis["skipped"]),
+        "errors": len(analysis["errors"]),
+    }
+
+    if recorder:
+        if config.DB_BACKEND == "supabase" and config.SUPABASE_URL:
+            print("📡 Supabase round-trip probe (read only)", flush=True)
+            fx.probe_database(Database(), recorder, repeat=args.probe_repeat)
+        else:
+            print("⚠️ DB_BACKEND가 supabase가 아니므로 DB 지연은 녹화하지 않습니다.")
+
+    if args.no_send:
+        return reports, details
+
+    draft_ids = [d["db_id"] for d in analysis["drafts"].values() if d.get("db_id")]
+    print(f"📤 send: {len(draft_ids)} draft(s), {args.smtp_workers} SMTP connection(s)", flush=True)
+    sink = SMTPSink("127.0.0.1", 0, latency=args.smtp_latency, keep_messages=False).start()
+    sender = EmailSender(host="127.0.0.1", port=sink.port, security="none", pool_size=args.smtp_workers)
+    worker = OutboxWorker(database, sender=sender)
+
+    def send() -> dict:
+        totals = {"queued": 0, "sent": 0, "retry": 0, "failed": 0}
+        totals["queued"] = len(worker.enqueue_drafts(draft_ids, schedule=False)["queued"])
+        while True:
+            batch = worker.run_once(concurrency=args.smtp_workers)
+            for key in ("sent", "retry", "failed"):
+                totals[key] += batch[key]
+            if not batch["claimed"] or batch["error"]:
+                return totals
+
+    try:
+        sent, trace = run_stage("send", args.verbose, send)
+    finally:
+        sender.pool.close_all()
+        sink.stop()
+    reports.append(stage_report("send", sent["sent"], trace))
+    details["send"] = sent
+    return reports, details
+
+
+# =========================================
+# 보고
+# =========================================
+
+def print_report(reports: list[dict], baseline: dict = None) -> None:
+    header = f"{'stage':<8} {'items':>6} {'elapsed s':>10} {'items/s':>9} {'item p50':>9} {'item p95':>9}"
+    if baseline:
+        header += f" {'before':>9} {'speedup':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in reports:
+        line = (
+            f"{r['stage']:<8} {r['items']:>6} {r['elapsed_s']:>10.2f} {r['items_per_s']:>9.2f} "
+            f"{r['item_p50_ms']:>9.1f} {r['item_p95_ms']:>9.1f}"
+        )
+        if baseline:
+            before = baseline.get(r["stage"], {}).get("items_per_s")
+            if before:
+                line += f" {before:>9.2f} {r['items_per_s'] / before:>7.2f}x"
+            else:
+                line += f" {'-':>9} {'-':>8}"
+        print(line)
+
+    print()
+    header = f"{'stage':<8} {'call':<11} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'total s':>9} {'errors':>7}"
+    print(header)
+    print("-" * len(header))
+    for r in reports:
+        for kind, c in r["calls"].items():
+            print(
+                f"{r['stage']:<8} {kind:<11} {c['count']:>6} {c['p50_ms']:>9.1f} {c['p95_ms']:>9.1f} "
+                f"{c['total_ms'] / 1000:>9.2f} {c['errors']:>7}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scan -> analyze -> send benchmark with recorded fixtures")
+    parser.add_argument("--fixture", type=Path, default=DEFAULT_FIXTURE, help="fixture 경로 (JSON)")
+    parser.add_argument("--record", action="store_true", help="실제 서비스로 실행하며 fixture 녹화")
+    parser.add_argument("--synthetic", action="store_true", help="합성 fixture를 새로 만들어서 사용")
+    parser.add_argument("--keyword", action="append", help="검색 키워드 (여러 번 지정 가능, 기본: fixture의 키워드)")
+    parser.add_argument("--videos", type=int, default=10, help="키워드별 최대 영상 수 (합성 fixture의 영상 수)")
+    parser.add_argument("--days", type=int, default=30, help="최근 N일 영상 검색")
+    parser.add_argument("--workers", type=int, default=config.ANALYZE_CONCURRENCY, help="동시에 분석할 영상 수")
+    parser.add_argument("--smtp-workers", type=int, default=2, help="동시 SMTP 연결 수")
+    parser.add_argument("--latency-scale", type=float, default=0.1, help="녹화된 지연 시간 배수 (1 = 실제 속도, 0 = 지연 없음)")
+    parser.add_argument("--smtp-latency", type=float, default=0.02, help="SMTP 싱크 응답 지연 (초)")
+    parser.add_argument("--sqlite", default=":memory:", help="벤치마크용 SQLite 경로")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--probe-repeat", type=int, default=5, help="녹화 시 테이블별 Supabase 왕복 측정 횟수")
+    parser.add_argument("--no-send", action="store_true", help="발송 단계 생략")
+    parser.add_argument("--verbose", action="store_true", help="파이프라인 출력 표시")
+    parser.add_argument("--json", help="결과 저장 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과(JSON)")
+    args = parser.parse_args()
+
+    # 벤치마크 실행은 실행 추적 파일에 남기지 않고, 구간은 모두 집계
+    tracer.exporters = []
+    config.TRACE_MAX_SPANS = 1_000_000
+    # 싱크는 인증을 확인하지 않지만 EmailSender는 계정 설정이 있어야 발송함 / 메일 간격, 일일 한도 없음
+    config.SENDER_EMAIL = config.SENDER_EMAIL or "bench@localhost"
+    config.SENDER_PASSWORD = config.SENDER_PASSWORD or "bench"
+    config.EMAIL_MIN_INTERVAL_SECONDS = 0
+    config.EMAIL_DAILY_CAP = max(config.EMAIL_DAILY_CAP, 1_000_000)
+
+    keywords = args.keyword or DEFAULT_KEYWORDS
+    if args.record:
+        fixture = fx.empty_fixture("recorded", keywords)
+    elif args.synthetic or not args.fixture.exists():
+        fixture = fx.synthesize(keywords, args.videos, seed=args.seed)
+        fx.save_fixture(fixture, args.fixture)
+        print(f"🧪 Synthetic fixture saved to {args.fixture}")
+    else:
+        fixture = fx.load_fixture(args.fixture)
+    print(f"📼 Fixture: {fixture['source']} ({fixture['created_at']}), latency x{0 if args.record else args.latency_scale}")
+
+    misses = {"youtube": 0, "transcript": 0, "gemini": 0}
+    started = time.perf_counter()
+    reports, details = run_pipeline(args, fixture, misses)
+    total = time.perf_counter() - started
+
+    if args.record:
+        fx.save_fixture(fixture, args.fixture)
+        print(f"💾 Recorded fixture saved to {args.fixture}")
+
+    baseline = None
+    if args.baseline:
+        data = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        baseline = {r["stage"]: r for r in data["results"]}
+
+    print()
+    print_report(reports, baseline)
+    print(f"\n⏱️  total {total:.2f}s | " + " | ".join(f"{k} {v}" for k, v in details.items()))
+    if any(misses.values()):
+        print(f"⚠️ fixture에 없는 호출: {misses} (다른 키워드/옵션으로 녹화된 fixture일 수 있음)")
+
+    if args.json:
+        output = {
+            "fixture": str(args.fixture),
+            "source": fixture["source"],
+            "latency_scale": args.latency_scale,
+            "workers": args.workers,
+            "smtp_workers": args.smtp_workers,
+            "misses": misses,
+            "details": details,
+            "results": reports,
+        }
+        Path(args.json).write_text(json.dumps(output, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n💾 Saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
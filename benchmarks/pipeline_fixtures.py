@@ -0,0 +1,532 @@
+"""
+Bes2 Marketer - Pipeline Benchmark Fixtures
+bench_pipeline.py용 외부 서비스 녹화(record) / 재생(replay)
+
+YouTubeHunter / AICopywriter / Database에 주입할 클라이언트를 만듭니다.
+- 녹화: 실제 YouTube API / youtube_transcript_api / Gemini 응답과 호출별 지연 시간을 fixture(JSON)에 저장
+        Supabase는 쓰기 없이 읽기 쿼리로 왕복 지연만 측정 (파이프라인 자체는 SQLite에 씀)
+- 재생: fixture 응답을 돌려주고 녹화된 지연 시간 분포에서 뽑은 값 x scale만큼 대기
+        DB는 SQLiteClient에 녹화된 Supabase 왕복 지연을 더해서 흉내
+- 합성: 키를 쓰지 않고도 돌려볼 수 있도록 그럴듯한 응답/지연 분포를 생성 (synthesize)
+
+fixture 형식 (JSON)
+{
+  "version", "source": "recorded" | "synthetic", "created_at", "keywords",
+  "youtube": {"search": {"키워드|pageToken": 응답}, "videos": {video_id: item}, "channels": {channel_id: item}},
+  "transcripts": {video_id: {"disabled", "manual": [문장...] | null, "generated": [...] | null}},
+  "gemini": {"responses": {프롬프트 해시: 텍스트}, "fallback": [텍스트...]},
+  "latency": {"youtube.search.list": [초...], "transcript.list": [...], "gemini": [...], "db": {"select leads": [...], "default": [...]}}
+}
+"""
+
+import copy
+import hashlib
+import json
+import random
+import threading
+import time
+import types
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+FIXTURE_VERSION = 1
+
+# Supabase 왕복 지연 측정에 쓰는 테이블 (id 한 행 SELECT, 쓰기 없음)
+PROBE_TABLES = ["leads", "videos", "drafts", "email_outbox", "jobs"]
+
+
+def empty_fixture(source: str, keywords: list[str]) -> dict:
+    return {
+        "version": FIXTURE_VERSION,
+        "source": source,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "keywords": keywords,
+        "youtube": {"search": {}, "videos": {}, "channels": {}},
+        "transcripts": {},
+        "gemini": {"responses": {}, "fallback": []},
+        "latency": {"db": {}},
+    }
+
+
+def load_fixture(path: Path) -> dict:
+    fixture = json.loads(Path(path).read_text(encoding="utf-8"))
+    if fixture.get("version") != FIXTURE_VERSION:
+        raise ValueError(f"Unsupported fixture version {fixture.get('version')} (expected {FIXTURE_VERSION})")
+    return fixture
+
+
+def save_fixture(fixture: dict, path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(fixture, ensure_ascii=False), encoding="utf-8")
+
+
+def search_key(keyword: str, page_token: Optional[str]) -> str:
+    return f"{keyword}|{page_token or ''}"
+
+
+def prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+# =========================================
+# 지연 시간
+# =========================================
+
+class Latency:
+    """녹화된 지연 시간(초) 분포에서 뽑아서 대기 (scale=0이면 대기 없음, seed로 재현 가능)"""
+
+    def __init__(self, fixture: dict, scale: float = 1.0, seed: int = 0):
+        self.samples = fixture.get("latency", {})
+        self.scale = scale
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sleep(self, key: str) -> None:
+        self.sleep_from(self.samples.get(key))
+
+    def sleep_from(self, samples: Optional[list[float]]) -> None:
+        if self.scale <= 0 or not samples:
+            return
+        with self._lock:
+            delay = self._rng.choice(samples)
+        time.sleep(delay * self.scale)
+
+
+class Recorder:
+    """녹화 중인 fixture + 호출별 지연 시간 기록 (여러 스레드에서 호출)"""
+
+    def __init__(self, fixture: dict):
+        self.fixture = fixture
+        self.lock = threading.Lock()
+
+    def latency(self, key: str, started: float) -> None:
+        with self.lock:
+            self.fixture["latency"].setdefault(key, []).append(round(time.perf_counter() - started, 4))
+
+
+# =========================================
+# YouTube Data API
+# =========================================
+
+class _Request:
+    """googleapiclient HttpRequest 흉내 (execute()만 사용)"""
+
+    def __init__(self, execute):
+        self.execute = execute
+
+
+class _Resource:
+    def __init__(self, list_fn):
+        self._list = list_fn
+
+    def list(self, **kwargs) -> _Request:
+        return self._list(**kwargs)
+
+
+class ReplayYouTube:
+    """YouTubeHunter(youtube=...)에 넣는 재생용 클라이언트 (search / videos / channels .list().execute())"""
+
+    def __init__(self, fixture: dict, latency: Latency, misses: dict):
+        self.data = fixture["youtube"]
+        self.latency = latency
+        self.misses = misses
+
+    def _request(self, endpoint: str, respond) -> _Request:
+        def execute():
+            self.latency.sleep(f"youtube.{endpoint}")
+            return respond()
+        return _Request(execute)
+
+    def _items(self, kind: str, ids: str) -> dict:
+        wanted = ids.split(",")
+        items = [copy.deepcopy(self.data[kind][i]) for i in wanted if i in self.data[kind]]
+        self.misses["youtube"] += len(wanted) - len(items)
+        return {"items": items}
+
+    def _search(self, **kwargs) -> dict:
+        response = self.data["search"].get(search_key(kwargs.get("q", ""), kwargs.get("pageToken")))
+        if response is None:
+            self.misses["youtube"] += 1
+            return {"items": [], "pageInfo": {"totalResults": 0}}
+        return copy.deepcopy(response)
+
+    def search(self) -> _Resource:
+        return _Resource(lambda **kw: self._request("search.list", lambda: self._search(**kw)))
+
+    def videos(self) -> _Resource:
+        return _Resource(lambda **kw: self._request("videos.list", lambda: self._items("videos", kw["id"])))
+
+    def channels(self) -> _Resource:
+        return _Resource(lambda **kw: self._request("channels.list", lambda: self._items("channels", kw["id"])))
+
+
+class RecordingYouTube:
+    """실제 YouTube 클라이언트를 감싸서 응답을 항목(영상/채널) 단위로 fixture에 저장"""
+
+    def __init__(self, youtube, recorder: Recorder):
+        self.youtube = youtube
+        self.recorder = recorder
+
+    def _request(self, endpoint: str, request, store) -> _Request:
+        def execute():
+            started = time.perf_counter()
+            response = request.execute()
+            self.recorder.latency(f"youtube.{endpoint}", started)
+            with self.recorder.lock:
+                store(response)
+            return response
+        return _Request(execute)
+
+    def _store_items(self, kind: str):
+        def store(response: dict) -> None:
+            for item in response.get("items", []):
+                self.recorder.fixture["youtube"][kind][item["id"]] = item
+        return store
+
+    def search(self) -> _Resource:
+        def list_fn(**kw):
+            key = search_key(kw.get("q", ""), kw.get("pageToken"))
+            return self._request(
+                "search.list",
+                self.youtube.search().list(**kw),
+                lambda response: self.recorder.fixture["youtube"]["search"].__setitem__(key, response)
+            )
+        return _Resource(list_fn)
+
+    def videos(self) -> _Resource:
+        return _Resource(lambda **kw: self._request("videos.list", self.youtube.videos().list(**kw), self._store_items("videos")))
+
+    def channels(self) -> _Resource:
+        return _Resource(lambda **kw: self._request("channels.list", self.youtube.channels().list(**kw), self._store_items("channels")))
+
+
+# =========================================
+# youtube_transcript_api
+# =========================================
+
+class _ReplayTranscript:
+    def __init__(self, texts: list[str], latency: Latency):
+        self.texts = texts
+        self.latency = latency
+
+    def fetch(self) -> list[dict]:
+        self.latency.sleep("transcript.fetch")
+        return [{"text": text, "start": 0.0, "duration": 0.0} for text in self.texts]
+
+
+class _ReplayTranscriptList:
+    def __init__(self, video_id: str, entry: dict, latency: Latency):
+        self.video_id = video_id
+        self.entry = entry
+        self.latency = latency
+
+    def _find(self, kind: str, languages: list[str]) -> _ReplayTranscript:
+        from youtube_transcript_api._errors import NoTranscriptFound
+        if not self.entry.get(kind):
+            raise NoTranscriptFound(self.video_id, languages, None)
+        return _ReplayTranscript(self.entry[kind], self.latency)
+
+    def find_manually_created_transcript(self, languages: list[str]) -> _ReplayTranscript:
+        return self._find("manual", languages)
+
+    def find_generated_transcript(self, languages: list[str]) -> _ReplayTranscript:
+        return self._find("generated", languages)
+
+
+class ReplayTranscriptApi:
+    """YouTubeHunter(transcript_api=...)에 넣는 재생용 YouTubeTranscriptApi (예외는 실제 라이브러리 것을 사용)"""
+
+    def __init__(self, fixture: dict, latency: Latency, misses: dict):
+        self.transcripts = fixture["transcripts"]
+        self.latency = latency
+        self.misses = misses
+
+    def list_transcripts(self, video_id: str, cookies: Optional[str] = None) -> _ReplayTranscriptList:
+        from youtube_transcript_api._errors import TranscriptsDisabled
+        self.latency.sleep("transcript.list")
+        entry = self.transcripts.get(video_id)
+        if entry is None:
+            self.misses["transcript"] += 1
+            raise TranscriptsDisabled(video_id)
+        if entry.get("disabled"):
+            raise TranscriptsDisabled(video_id)
+        return _ReplayTranscriptList(video_id, entry, self.latency)
+
+
+class _RecordingTranscript:
+    def __init__(self, transcript, entry: dict, kind: str, recorder: Recorder):
+        self.transcript = transcript
+        self.entry = entry
+        self.kind = kind
+        self.recorder = recorder
+
+    def fetch(self):
+        started = time.perf_counter()
+        script = self.transcript.fetch()
+        self.recorder.latency("transcript.fetch", started)
+        self.entry[self.kind] = [entry["text"] for entry in script]
+        return script
+
+
+class _RecordingTranscriptList:
+    def __init__(self, listing, entry: dict, recorder: Recorder):
+        self.listing = listing
+        self.entry = entry
+        self.recorder = recorder
+
+    def _find(self, kind: str, find, languages: list[str]) -> _RecordingTranscript:
+        from youtube_transcript_api._errors import NoTranscriptFound
+        try:
+            transcript = find(languages)
+        except NoTranscriptFound:
+            self.entry[kind] = None
+            raise
+        return _RecordingTranscript(transcript, self.entry, kind, self.recorder)
+
+    def find_manually_created_transcript(self, languages: list[str]) -> _RecordingTranscript:
+        return self._find("manual", self.listing.find_manually_created_transcript, languages)
+
+    def find_generated_transcript(self, languages: list[str]) -> _RecordingTranscript:
+        return self._find("generated", self.listing.find_generated_transcript, languages)
+
+
+class RecordingTranscriptApi:
+    """실제 YouTubeTranscriptApi를 감싸서 영상별 자막(문장 텍스트)과 지연 시간을 저장"""
+
+    def __init__(self, api, recorder: Recorder):
+        self.api = api
+        self.recorder = recorder
+
+    def list_transcripts(self, video_id: str, cookies: Optional[str] = None) -> _RecordingTranscriptList:
+        from youtube_transcript_api._errors import TranscriptsDisabled
+        with self.recorder.lock:
+            entry = self.recorder.fixture["transcripts"].setdefault(video_id, {"disabled": False})
+        started = time.perf_counter()
+        try:
+            listing = self.api.list_transcripts(video_id, cookies=cookies) if cookies else self.api.list_transcripts(video_id)
+        except TranscriptsDisabled:
+            entry["disabled"] = True
+            raise
+        finally:
+            self.recorder.latency("transcript.list", started)
+        return _RecordingTranscriptList(listing, entry, self.recorder)
+
+
+# =========================================
+# Gemini
+# =========================================
+
+class ReplayModel:
+    """AICopywriter(model=...)에 넣는 재생용 모델 (프롬프트 해시로 응답 조회, 없으면 fallback 응답)"""
+
+    def __init__(self, fixture: dict, latency: Latency, misses: dict):
+        self.responses = fixture["gemini"]["responses"]
+        self.fallback = fixture["gemini"].get("fallback") or []
+        self.latency = latency
+        self.misses = misses
+
+    def generate_content(self, prompt: str):
+        self.latency.sleep("gemini")
+        key = prompt_key(prompt)
+        text = self.responses.get(key)
+        if text is None:
+            if not self.fallback:
+                self.misses["gemini"] += 1
+                raise RuntimeError(f"No recorded Gemini response for prompt {key}")
+            text = self.fallback[int(key, 16) % len(self.fallback)]
+        return types.SimpleNamespace(text=text)
+
+
+class RecordingModel:
+    """실제 Gemini 모델을 감싸서 프롬프트 해시별 응답 텍스트와 지연 시간을 저장"""
+
+    def __init__(self, model, recorder: Recorder):
+        self.model = model
+        self.recorder = recorder
+
+    def generate_content(self, prompt: str):
+        started = time.perf_counter()
+        response = self.model.generate_content(prompt)
+        self.recorder.latency("gemini", started)
+        with self.recorder.lock:
+            self.recorder.fixture["gemini"]["responses"][prompt_key(prompt)] = response.text
+        return response
+
+
+# =========================================
+# Database (SQLite + 녹화된 Supabase 왕복 지연)
+# =========================================
+
+DB_OPERATIONS = ("select", "insert", "upsert", "update", "delete")
+
+
+class _LatencyQuery:
+    """쿼리 빌더 프록시 - execute() 전에 녹화된 왕복 지연만큼 대기"""
+
+    def __init__(self, builder, key_table: str, operation: str, latency: Latency):
+        self._builder = builder
+        self._table = key_table
+        self._operation = operation
+        self._latency = latency
+
+    def __getattr__(self, attr: str):
+        value = getattr(self._builder, attr)
+        if hasattr(value, "execute"):
+            return _LatencyQuery(value, self._table, self._operation, self._latency)
+        if not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            result = value(*args, **kwargs)
+            if hasattr(result, "execute"):
+                operation = attr if attr in DB_OPERATIONS else self._operation
+                return _LatencyQuery(result, self._table, operation, self._latency)
+            return result
+        return call
+
+    def execute(self):
+        samples = self._latency.samples.get("db", {})
+        self._latency.sleep_from(samples.get(f"{self._operation} {self._table}") or samples.get("default"))
+        return self._builder.execute()
+
+
+class LatencyClient:
+    """Database(client=...)에 넣는 DB 클라이언트 (SQLiteClient 등 + Supabase 왕복 지연)"""
+
+    def __init__(self, client, latency: Latency):
+        self._client = client
+        self._latency = latency
+
+    def table(self, name: str) -> _LatencyQuery:
+        return _LatencyQuery(self._client.table(name), name, "select", self._latency)
+
+    def rpc(self, fn: str, *args, **kwargs) -> _LatencyQuery:
+        return _LatencyQuery(self._client.rpc(fn, *args, **kwargs), fn, "rpc", self._latency)
+
+    def __getattr__(self, attr: str):
+        return getattr(self._client, attr)
+
+
+def probe_database(database, recorder: Recorder, repeat: int = 5) -> None:
+    """실제 DB(Supabase)의 읽기 왕복 지연 측정 (id 한 행 SELECT, 쓰기 없음) -> latency.db"""
+    samples = recorder.fixture["latency"]["db"]
+    for table in PROBE_TABLES:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            try:
+                database.client.table(table).select("id").limit(1).execute()
+            except Exception as e:
+                print(f"⚠️ DB probe failed ({table}): {e}")
+                break
+            elapsed = round(time.perf_counter() - started, 4)
+            samples.setdefault(f"select {table}", []).append(elapsed)
+            # 쓰기/RPC도 같은 왕복 지연으로 가정 (운영 DB에 쓰지 않기 위해)
+            samples.setdefault("default", []).append(elapsed)
+
+
+# =========================================
+# 합성 fixture
+# =========================================
+
+# 호출 종류별 지연 시간 (중앙값 초, 로그정규 분포 sigma)
+SYNTHETIC_LATENCY = {
+    "youtube.search.list": (0.25, 0.3),
+    "youtube.videos.list": (0.12, 0.3),
+    "youtube.channels.list": (0.12, 0.3),
+    "transcript.list": (0.35, 0.4),
+    "transcript.fetch": (0.25, 0.4),
+    "gemini": (2.0, 0.35),
+}
+SYNTHETIC_DB_LATENCY = (0.045, 0.3)
+
+SYNTHETIC_SENTENCES = [
+    "요즘 사진이 너무 많아서 핸드폰 용량이 항상 부족해요.",
+    "클라우드 요금이 매달 나가는 게 부담스러워서 정리하는 방법을 찾아봤습니다.",
+    "비슷한 사진과 흔들린 사진만 지워도 저장공간이 꽤 많이 확보됩니다.",
+    "갤러리 앱에서 앨범별로 나눠서 정리하면 나중에 찾기도 쉬워요.",
+    "백업하기 전에 필요 없는 사진부터 지우는 게 순서입니다.",
+]
+
+SYNTHETIC_RESPONSES = [
+    "제목: 영상 잘 봤습니다 - 사진 용량 문제에 대한 새로운 대안을 제안드립니다\n\n안녕하세요, Bes2Gallery 팀입니다. "
+    + "영상에서 말씀하신 사진 정리 고민에 깊이 공감했습니다. " * 12,
+    "1. 😊 저도 사진 정리 때문에 고민이었는데 무료 앱으로 해결했어요!\n"
+    "2. 📱 구글포토 결제 전에 갤러리 정리부터 해보세요.\n"
+    "3. 👍 폰 안에서만 정리돼서 안심이네요.",
+    "1. 사진이 많아 저장공간이 부족한 문제\n2. 비슷한 사진/흔들린 사진 정리\n3. 백업 전 정리 순서",
+]
+
+
+def _samples(rng: random.Random, median: float, sigma: float, count: int = 200) -> list[float]:
+    return [round(rng.lognormvariate(0, sigma) * median, 4) for _ in range(count)]
+
+
+def synthesize(keywords: list[str], videos_per_keyword: int = 10, seed: int = 7) -> dict:
+    """
+    키 없이 돌려볼 수 있는 합성 fixture
+    - 키워드마다 videos_per_keyword개 영상 (영상마다 채널 하나, 설명에 연락처 이메일)
+    - 자막: 85% 수동 / 10% 자동 생성만 / 5% 비활성
+    """
+    rng = random.Random(seed)
+    fixture = empty_fixture("synthetic", keywords)
+    youtube = fixture["youtube"]
+    published = datetime.now(timezone.utc) - timedelta(days=3)
+
+    for k, keyword in enumerate(keywords):
+        items = []
+        for i in range(videos_per_keyword):
+            video_id = f"bench{k:02d}{i:05d}"
+            channel_id = f"UCbench{k:02d}{i:05d}"
+            items.append({
+                "id": {"videoId": video_id},
+                "snippet": {
+                    "title": f"{keyword} 꿀팁 모음 #{i + 1}",
+                    "description": f"{keyword} 방법을 정리했습니다. 문의: creator{k}x{i}@example.com",
+                    "thumbnails": {"high": {"url": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"}},
+                    "publishedAt": (published - timedelta(minutes=i)).isoformat().replace("+00:00", "Z"),
+                    "channelId": channel_id,
+                    "channelTitle": f"벤치 채널 {k}-{i}",
+                },
+            })
+            youtube["videos"][video_id] = {
+                "id": video_id,
+                "statistics": {"viewCount": str(rng.randint(100, 200000)), "likeCount": "10", "commentCount": "3"},
+            }
+            youtube["channels"][channel_id] = {
+                "id": channel_id,
+                "snippet": {
+                    "title": f"벤치 채널 {k}-{i}",
+                    "description": f"사진/폰 정리 채널입니다. 비즈니스 문의 creator{k}x{i}@example.com",
+                    "thumbnails": {"high": {"url": f"https://yt3.ggpht.com/{channel_id}"}},
+                },
+                "statistics": {
+                    "subscriberCount": str(rng.randint(1000, 500000)),
+                    "videoCount": str(rng.randint(10, 500)),
+                    "viewCount": str(rng.randint(10000, 9000000)),
+                },
+            }
+
+            roll = rng.random()
+            text = [rng.choice(SYNTHETIC_SENTENCES) for _ in range(rng.randint(40, 120))]
+            if roll < 0.05:
+                fixture["transcripts"][video_id] = {"disabled": True}
+            elif roll < 0.15:
+                fixture["transcripts"][video_id] = {"disabled": False, "manual": None, "generated": text}
+            else:
+                fixture["transcripts"][video_id] = {"disabled": False, "manual": text, "generated": None}
+
+        # YouTube와 같이 50개씩 페이지로 (마지막 페이지에는 nextPageToken 없음)
+        pages = [items[i:i + 50] for i in range(0, len(items), 50)] or [[]]
+        for p, page in enumerate(pages):
+            response = {"pageInfo": {"totalResults": len(items), "resultsPerPage": 50}, "items": page}
+            if p + 1 < len(pages):
+                response["nextPageToken"] = f"page{p + 1}"
+            youtube["search"][search_key(keyword, f"page{p}" if p else None)] = response
+
+    fixture["gemini"]["fallback"] = list(SYNTHETIC_RESPONSES)
+    for key, (median, sigma) in SYNTHETIC_LATENCY.items():
+        fixture["latency"][key] = _samples(rng, median, sigma)
+    fixture["latency"]["db"] = {"default": _samples(rng, *SYNTHETIC_DB_LATENCY)}
+    return fixture
@@ -0,0 +1,11 @@
+"""
+Bes2 Marketer - 헤드리스 실행 (브라우저 없이 검색 -> 분석 -> 발송)
+
+    python -m bes2 scan       # 키워드 검색 + DB 동기화
+    python -m bes2 analyze    # 마지막 검색 결과 AI 분석 (초안 생성)
+    python -m bes2 send       # 마지막 분석 초안을 발송 대기열에 넣고 발송
+    python -m bes2 run        # scan -> analyze (-> send) 한 번
+    python -m bes2 daemon     # RUN_SCHEDULE(cron 형식)마다 run, 그 사이에는 발송 대기열 처리
+
+저장소 루트에서 실행합니다. (루트의 config / database / logic 모듈을 그대로 사용)
+"""
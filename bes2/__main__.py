@@ -0,0 +1,5 @@
+import sys
+
+from bes2.cli import main
+
+sys.exit(main())
@@ -0,0 +1,372 @@
+"""
+Bes2 Marketer - Headless CLI
+YouTubeHunter / AICopywriter / Database / EmailSender를 브라우저 없이 실행 (cron, 서버 daemon)
+
+- 검색/분석은 job_manager의 작업으로 실행되어 jobs 테이블에 남음
+  (Streamlit 화면을 열면 밤사이 검색 결과가 그대로 복원되고, 생성된 초안은 탭 2에 표시됨)
+- 모든 실행은 RUN_LOCK_PATH 잠금 파일로 겹치지 않게 하고, 끝나면 실행 요약을 출력 + RUN_LOG_PATH에 기록
+- 발송은 RUN_AUTO_SEND=true(또는 --send)일 때만 자동. 아니면 초안만 만들고 사람이 탭 2에서 승인
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+from config import config
+from bes2.cron import CronSchedule, RunLock, RunLocked
+
+
+# main.py의 "키워드 저장" 버튼이 쓰는 파일
+KEYWORDS_FILE = "saved_keywords.json"
+
+# 작업 진행 메시지 출력 간격 (초)
+POLL_SECONDS = 1.0
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def load_keywords(spec: Optional[str] = None) -> list[str]:
+    """--keywords > 화면에서 저장한 키워드 > config.SEARCH_KEYWORDS"""
+    if not spec and Path(KEYWORDS_FILE).exists():
+        try:
+            spec = json.loads(Path(KEYWORDS_FILE).read_text(encoding="utf-8")).get("keywords")
+        except (OSError, ValueError):
+            spec = None
+    if spec:
+        return [k.strip() for k in spec.split(",") if k.strip()]
+    return list(config.SEARCH_KEYWORDS)
+
+
+class Runner:
+    """단계별 실행 + 실행 요약"""
+
+    def __init__(self):
+        # 클라이언트는 실제로 실행할 때 생성 (--help 등은 빠르게)
+        from database import db
+        from job_manager import JobManager
+        self.db = db
+        self.jobs = JobManager(db, max_workers=1)
+
+    # =========================================
+    # 작업 실행 (진행 메시지 출력)
+    # =========================================
+
+    def _run_job(self, kind: str, params: dict) -> dict:
+        """작업 제출 후 끝날 때까지 진행 메시지 출력, 실패/취소면 RuntimeError"""
+        from job_manager import FINISHED_STATUSES
+        job_id = self.jobs.submit(kind, params)
+        last_message = None
+        try:
+            while True:
+                job = self.jobs.statuses([job_id]).get(job_id) or {}
+                message = job.get("message")
+                if message and message != last_message:
+                    total = job.get("total") or 0
+                    prefix = f"[{job.get('progress', 0)}/{total}] " if total else ""
+                    print(f"  {prefix}{message}", flush=True)
+                    last_message = message
+                if job.get("status") in FINISHED_STATUSES:
+                    break
+                time.sleep(POLL_SECONDS)
+        except KeyboardInterrupt:
+            print("  ⛔ Cancelling...", flush=True)
+            self.jobs.cancel(job_id)
+            self.jobs.wait(job_id)
+            raise
+
+        job = self.jobs.get(job_id)
+        if job["status"] != "succeeded":
+            raise RuntimeError(f"{kind} job {job['status']}: {job.get('error') or job.get('message')}")
+        return job
+
+    # =========================================
+    # 단계
+    # =========================================
+
+    def scan(self, keywords: list[str], days: int, max_results: int, min_views: int, require_email: bool) -> dict:
+        print(f"🔍 Scan: {', '.join(keywords)} (last {days} day(s))", flush=True)
+        job = self._run_job("search", {
+            "keywords": keywords,
+            "max_results": max_results,
+            "published_after_days": days,
+            "min_view_count": min_views,
+            "require_email": require_email
+        })
+        result = job["result"]
+        summary = {
+            "job_id": job["id"],
+            "keywords": len(keywords),
+            "videos": len(result["videos"]),
+            "found": sum((result.get("found") or {}).values()),
+            "sync_error": result.get("sync_error"),
+        }
+        if result.get("sync"):
+            summary["synced"] = result["sync"]["videos"]
+        return summary
+
+    def analyze(
+        self,
+        search_job_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        workers: Optional[int] = None,
+        include_no_email: bool = False
+    ) -> dict:
+        source = self.jobs.get(search_job_id) if search_job_id else self.jobs.latest_result("search")
+        if not source or source.get("kind") != "search" or source.get("status") != "succeeded":
+            raise RuntimeError("No finished search job to analyze (run `scan` first)")
+
+        videos = (source.get("result") or {}).get("videos") or []
+        # 발송할 수 없는 채널(이메일 없음)은 AI 비용을 쓰지 않음
+        if not include_no_email:
+            videos = [v for v in videos if (v.get("channel_info") or {}).get("email")]
+        limit = config.RUN_ANALYZE_LIMIT if limit is None else limit
+        if limit:
+            videos = videos[:limit]
+
+        print(f"🤖 Analyze: {len(videos)} video(s) from search job {source['id']}", flush=True)
+        if not videos:
+            return {"job_id": None, "search_job_id": source["id"], "videos": 0, "drafts": 0}
+
+        job = self._run_job("analysis", {"videos": videos, "concurrency": workers or config.ANALYZE_CONCURRENCY})
+        result = job["result"]
+        return {
+            "job_id": job["id"],
+            "search_job_id": source["id"],
+            "videos": len(videos),
+            "drafts": len(result["drafts"]),
+            "cached": result["cached"],
+            "analyzed": result["analyzed"],
+            "skipped": len(result["skipped"]),
+            "errors": len(result["errors"]),
+        }
+
+    def send(
+        self,
+        analysis_job_id: Optional[str] = None,
+        all_pending: bool = False,
+        deliver: bool = True,
+        limit: int = 500
+    ) -> dict:
+        from outbox_worker import OutboxWorker
+
+        if all_pending:
+            draft_ids = [d["id"] for d in self.db.get_all_drafts(draft_type="email", status="pending", limit=limit)]
+            source = "pending drafts"
+        else:
+            job = self.jobs.get(analysis_job_id) if analysis_job_id else self.jobs.latest_result("analysis")
+            if not job or job.get("kind") != "analysis" or job.get("status") != "succeeded":
+                raise RuntimeError("No finished analysis job to send (run `analyze` first or use --all-pending)")
+            drafts = (job.get("result") or {}).get("drafts") or {}
+            draft_ids = [d["db_id"] for d in drafts.values() if d.get("db_id")]
+            source = f"analysis job {job['id']}"
+
+        print(f"📤 Send: {len(draft_ids)} draft(s) from {source}", flush=True)
+        worker = OutboxWorker(self.db)
+        enqueued = worker.enqueue_drafts(draft_ids)
+        summary = {
+            "drafts": len(draft_ids),
+            "queued": len(enqueued["queued"]),
+            "skipped": len(enqueued["skipped"]),
+            "sent": 0, "retry": 0, "failed": 0, "error": None,
+        }
+        if enqueued["skipped"]:
+            reasons = {}
+            for reason in enqueued["skipped"].values():
+                reasons[reason] = reasons.get(reason, 0) + 1
+            summary["skip_reasons"] = reasons
+
+        # 발송 일정(SEND_WINDOWS)상 지금 보낼 차례인 것만 발송, 나머지는 daemon/outbox_worker가 그 시각에 발송
+        # 무인 발송이므로 동시 발송 없이 메일 사이 EMAIL_MIN_INTERVAL_SECONDS 간격을 지킴
+        while deliver:
+            batch = worker.run_once()
+            for key in ("sent", "retry", "failed"):
+                summary[key] += batch[key]
+            summary["remaining_capacity"] = batch["remaining_capacity"]
+            summary["error"] = batch["error"]
+            if batch["sent"] or batch["failed"] or batch["retry"]:
+                print(f"  sent {summary['sent']} / retry {summary['retry']} / failed {summary['failed']}", flush=True)
+            if not batch["claimed"] or batch["error"]:
+                break
+        return summary
+
+    # =========================================
+    # 실행 + 요약
+    # =========================================
+
+    def execute(self, command: str, stages: list[tuple[str, Callable[[dict], dict]]]) -> dict:
+        """
+        잠금을 잡고 단계를 순서대로 실행 (앞 단계 결과를 다음 단계에 넘김)
+        반환: 실행 요약 {"command", "status", "started_at", "seconds", "stages": {...}, "error"}
+        """
+        run = {"command": command, "status": "ok", "started_at": _now().isoformat(timespec="seconds"), "stages": {}, "error": None}
+        started = time.perf_counter()
+        try:
+            with RunLock(config.RUN_LOCK_PATH, config.RUN_LOCK_STALE_SECONDS, label=command):
+                previous: dict = {}
+                for name, stage in stages:
+                    stage_started = time.perf_counter()
+                    previous = stage(previous)
+                    previous["seconds"] = round(time.perf_counter() - stage_started, 2)
+                    run["stages"][name] = previous
+        except RunLocked as e:
+            run["status"], run["error"] = "skipped", str(e)
+        except KeyboardInterrupt:
+            run["status"], run["error"] = "cancelled", "interrupted"
+        except Exception as e:
+            run["status"], run["error"] = "failed", str(e)
+        run["seconds"] = round(time.perf_counter() - started, 2)
+        print_summary(run)
+        log_summary(run)
+        return run
+
+
+def print_summary(run: dict) -> None:
+    icon = {"ok": "✅", "skipped": "⏭️", "cancelled": "⛔"}.get(run["status"], "❌")
+    print(f"\n{icon} {run['command']} {run['status']} in {run['seconds']:.1f}s")
+    for name, stage in run["stages"].items():
+        details = ", ".join(f"{k}={v}" for k, v in stage.items() if k not in ("seconds", "job_id", "search_job_id") and v is not None)
+        print(f"  - {name:<8} {stage['seconds']:>7.1f}s  {details}")
+    if run["error"]:
+        print(f"  error: {run['error']}")
+
+
+def log_summary(run: dict) -> None:
+    """실행 요약을 RUN_LOG_PATH에 한 줄(JSON)로 추가"""
+    if not config.RUN_LOG_PATH:
+        return
+    try:
+        with open(config.RUN_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run, ensure_ascii=False, default=str) + "\n")
+    except OSError as e:
+        print(f"Error writing run log: {e}")
+
+
+# =========================================
+# CLI
+# =========================================
+
+def _add_scan_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--keywords", help="쉼표 구분 키워드 (기본: 화면에서 저장한 키워드)")
+    parser.add_argument("--days", type=int, default=config.RUN_DAYS, help="최근 N일 영상")
+    parser.add_argument("--max-results", type=int, default=config.RUN_MAX_RESULTS, help="키워드별 최대 수집량")
+    parser.add_argument("--min-views", type=int, default=config.RUN_MIN_VIEWS)
+    parser.add_argument("--require-email", action="store_true", help="이메일 있는 채널의 영상만 수집")
+
+
+def _add_analyze_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--limit", type=int, help=f"AI 분석할 최대 영상 수 (기본 {config.RUN_ANALYZE_LIMIT}, 0=제한 없음)")
+    parser.add_argument("--workers", type=int, help=f"동시에 분석할 영상 수 (기본 {config.ANALYZE_CONCURRENCY})")
+    parser.add_argument("--include-no-email", action="store_true", help="이메일 없는 채널의 영상도 분석")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m bes2", description="Bes2 Marketer 헤드리스 실행")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser("scan", help="키워드 검색 + DB 동기화")
+    _add_scan_args(scan)
+
+    analyze = commands.add_parser("analyze", help="검색 결과 AI 분석 (초안 생성)")
+    analyze.add_argument("--from-job", help="분석할 검색 작업 ID (기본: 마지막 검색)")
+    _add_analyze_args(analyze)
+
+    send = commands.add_parser("send", help="분석 초안을 발송 대기열에 넣고 발송")
+    send.add_argument("--from-job", help="발송할 분석 작업 ID (기본: 마지막 분석)")
+    send.add_argument("--all-pending", action="store_true", help="대기 중인 이메일 초안 전체")
+    send.add_argument("--no-deliver", action="store_true", help="대기열에 넣기만 하고 발송은 워커에 맡김")
+
+    for name, help_text in (("run", "scan -> analyze (-> send) 한 번 실행"), ("daemon", "RUN_SCHEDULE마다 run 반복")):
+        command = commands.add_parser(name, help=help_text)
+        _add_scan_args(command)
+        _add_analyze_args(command)
+        command.add_argument("--send", action="store_true", default=config.RUN_AUTO_SEND, help="분석 후 자동 발송 (기본: RUN_AUTO_SEND)")
+
+    daemon = commands.choices["daemon"]
+    daemon.add_argument("--schedule", default=config.RUN_SCHEDULE, help=f"cron 형식 (기본 '{config.RUN_SCHEDULE}')")
+    daemon.add_argument("--timezone", default=config.RUN_TIMEZONE)
+    daemon.add_argument("--run-now", action="store_true", help="시작하자마자 한 번 실행")
+    daemon.add_argument("--no-outbox", action="store_true", help="실행 사이에 발송 대기열을 처리하지 않음 (outbox_worker.py를 따로 돌릴 때)")
+    return parser
+
+
+def full_run_stages(runner: Runner, args) -> list[tuple[str, Callable[[dict], dict]]]:
+    stages = [
+        ("scan", lambda _: runner.scan(load_keywords(args.keywords), args.days, args.max_results, args.min_views, args.require_email)),
+        ("analyze", lambda scan: runner.analyze(scan["job_id"], args.limit, args.workers, args.include_no_email)),
+    ]
+    if args.send:
+        stages.append(("send", lambda analysis: runner.send(analysis["job_id"]) if analysis["job_id"] else {"drafts": 0}))
+    return stages
+
+
+def run_daemon(runner: Runner, args) -> None:
+    from outbox_worker import OutboxWorker
+
+    schedule = CronSchedule(args.schedule, args.timezone)
+    worker = None if args.no_outbox else OutboxWorker(runner.db)
+    print(f"🌙 Daemon started: '{args.schedule}' ({args.timezone}), auto send {'on' if args.send else 'off'}")
+    if args.run_now:
+        runner.execute("run", full_run_stages(runner, args))
+
+    while True:
+        next_run = schedule.next_after()
+        print(f"⏰ Next run at {next_run.isoformat(timespec='minutes')}", flush=True)
+        # 다음 실행까지 발송 대기열 처리 (SEND_WINDOWS에 배정된 시각이 된 메일)
+        while _now() < next_run:
+            if worker:
+                try:
+                    batch = worker.run_once()  # 간격 제한(EMAIL_MIN_INTERVAL_SECONDS)을 지키는 순차 발송
+                    if batch["claimed"] or batch["enqueued"]:
+                        print(f"📤 {batch}", flush=True)
+                except Exception as e:
+                    print(f"Outbox worker error: {e}")
+            remaining = (next_run - _now()).total_seconds()
+            time.sleep(max(min(config.OUTBOX_POLL_SECONDS if worker else remaining, remaining), 0))
+        runner.execute("run", full_run_stages(runner, args))
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    is_valid, missing = config.validate()
+    if not is_valid and args.command != "send":
+        print(f"❌ 환경 변수 누락: {', '.join(missing)}")
+        return 2
+
+    runner = Runner()
+    try:
+        if args.command == "scan":
+            run = runner.execute("scan", [(
+                "scan",
+                lambda _: runner.scan(load_keywords(args.keywords), args.days, args.max_results, args.min_views, args.require_email)
+            )])
+        elif args.command == "analyze":
+            run = runner.execute("analyze", [(
+                "analyze",
+                lambda _: runner.analyze(args.from_job, args.limit, args.workers, args.include_no_email)
+            )])
+        elif args.command == "send":
+            run = runner.execute("send", [(
+                "send",
+                lambda _: runner.send(args.from_job, args.all_pending, deliver=not args.no_deliver)
+            )])
+        elif args.command == "run":
+            run = runner.execute("run", full_run_stages(runner, args))
+        else:
+            run_daemon(runner, args)
+            return 0
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        runner.jobs.shutdown(wait=False)
+    return {"ok": 0, "skipped": 3}.get(run["status"], 1)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Bes2 Marketer - Cron Schedule / Run Lock
+daemon 실행 시각 계산 (cron 형식) + 중복 실행 방지 잠금 파일
+"""
+
+import json
+import os
+import socket
+import time
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+
+# 다음 실행 시각을 찾을 최대 기간 (2월 30일처럼 오지 않는 날짜 방지)
+MAX_SEARCH_DAYS = 366 * 5
+
+
+# =========================================
+# Cron 형식 (분 시 일 월 요일)
+# =========================================
+
+def _parse_field(spec: str, low: int, high: int) -> set[int]:
+    """"*/15", "1-5", "0,30", "9-18/3" -> 값 집합"""
+    values = set()
+    for part in spec.split(","):
+        part = part.strip()
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step <= 0:
+                raise ValueError(f"Invalid cron step: {spec}")
+        if part in ("*", ""):
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(x) for x in part.split("-", 1))
+        else:
+            start = end = int(part)
+            if step != 1:
+                end = high  # "5/10" = 5부터 10 간격
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field out of range ({low}-{high}): {spec}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """
+    5필드 cron 식 ("0 0 * * *" = 매일 0시)
+    - 요일: 0=일 ... 6=토 (7도 일요일)
+    - 일/요일이 둘 다 지정되면 둘 중 하나만 맞아도 실행 (cron과 같은 규칙)
+    """
+
+    def __init__(self, expression: str, tz: str = "UTC"):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields (min hour day month weekday): {expression}")
+        self.expression = expression
+        self.tz = ZoneInfo(tz)
+        self.minutes = sorted(_parse_field(fields[0], 0, 59))
+        self.hours = sorted(_parse_field(fields[1], 0, 23))
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12)
+        self.weekdays = {d % 7 for d in _parse_field(fields[4], 0, 7)}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, day: date) -> bool:
+        if day.month not in self.months:
+            return False
+        day_ok = day.day in self.days
+        weekday_ok = (day.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, after: Optional[datetime] = None) -> datetime:
+        """after 이후 첫 실행 시각 (분 단위, self.tz 기준 aware datetime)"""
+        after = after or datetime.now(timezone.utc)
+        local = after.astimezone(self.tz).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = local.date()
+        for _ in range(MAX_SEARCH_DAYS):
+            if self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = datetime.combine(day, dtime(hour, minute), tzinfo=self.tz)
+                        if candidate >= local:
+                            return candidate
+            day += timedelta(days=1)
+        raise ValueError(f"Cron expression never matches: {self.expression}")
+
+
+# =========================================
+# 중복 실행 방지 잠금 파일
+# =========================================
+
+class RunLocked(Exception):
+    """다른 실행이 잠금을 가지고 있음"""
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        return True  # Windows에서 os.kill(pid, 0)은 프로세스를 종료시키므로 나이로만 판단
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class RunLock:
+    """
+    O_EXCL로 만드는 잠금 파일 (내용: pid / host / 시작 시각 / 명령)
+    - 같은 호스트에서 pid가 죽었거나 stale_seconds보다 오래된 잠금은 가져옴 (비정상 종료 대비)
+    """
+
+    def __init__(self, path: str, stale_seconds: float, label: str = ""):
+        self.path = Path(path)
+        self.stale_seconds = stale_seconds
+        self.label = label
+        self._held = False
+
+    def holder(self) -> Optional[dict]:
+        """현재 잠금 내용 (없으면 None)"""
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            return {}
+
+    def _is_stale(self) -> bool:
+        try:
+            age = time.time() - self.path.stat().st_mtime
+        except FileNotFoundError:
+            return True
+        if age > self.stale_seconds:
+            return True
+        info = self.holder() or {}
+        if info.get("host") == socket.gethostname() and info.get("pid"):
+            return not _pid_alive(int(info["pid"]))
+        return False
+
+    def acquire(self) -> bool:
+        for _ in range(2):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._is_stale():
+                    return False
+                print(f"⚠️ Removing stale run lock: {self.holder()}")
+                self.path.unlink(missing_ok=True)
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({
+                    "pid": os.getpid(),
+                    "host": socket.gethostname(),
+                    "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "command": self.label
+                }, f)
+            self._held = True
+            return True
+        return False
+
+    def release(self) -> None:
+        if self._held:
+            self.path.unlink(missing_ok=True)
+            self._held = False
+
+    def __enter__(self) -> "RunLock":
+        if not self.acquire():
+            raise RunLocked(f"Another run is in progress: {self.holder()}")
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
@@ -34,6 +34,40 @@ def get_secret(key: str, default: str = "") -> str:
 class Config:
     """앱 설정 클래스"""
     
+    # 데이터베이스 백엔드 ("supabase" | "sqlite")
+    # sqlite: 로컬 파일 DB 사용 (오프라인 개발, 로컬 캐시, 테스트/벤치마크용)
+    DB_BACKEND: str = get_secret("DB_BACKEND", "supabase").lower()
+    SQLITE_PATH: str = get_secret("SQLITE_PATH", "bes2_local.db")
+    
+    # 비동기 DB 클라이언트 (database_async.py) 커넥션 풀 / 동시성 설정
+    DB_MAX_CONNECTIONS: int = int(get_secret("DB_MAX_CONNECTIONS", "20"))
+    DB_MAX_KEEPALIVE: int = int(get_secret("DB_MAX_KEEPALIVE", "10"))
+    DB_MAX_CONCURRENCY: int = int(get_secret("DB_MAX_CONCURRENCY", "8"))
+    DB_TIMEOUT: float = float(get_secret("DB_TIMEOUT", "30"))
+    
+    # 데이터 보존 정책 (retention.py)
+    # 기준 일수가 지난 행을 청크 단위로 삭제/보관 (보관 파일은 gzip JSONL)
+    RETENTION_PENDING_DRAFT_DAYS: int = int(get_secret("RETENTION_PENDING_DRAFT_DAYS", "7"))
+    RETENTION_REJECTED_DRAFT_DAYS: int = int(get_secret("RETENTION_REJECTED_DRAFT_DAYS", "30"))
+    RETENTION_TRANSCRIPT_DAYS: int = int(get_secret("RETENTION_TRANSCRIPT_DAYS", "90"))
+    RETENTION_VIDEO_DAYS: int = int(get_secret("RETENTION_VIDEO_DAYS", "180"))
+    RETENTION_JOB_DAYS: int = int(get_secret("RETENTION_JOB_DAYS", "14"))  # 끝난 백그라운드 작업 (검색 결과 포함)
+    RETENTION_CHUNK_SIZE: int = int(get_secret("RETENTION_CHUNK_SIZE", "500"))
+    RETENTION_PAUSE_SECONDS: float = float(get_secret("RETENTION_PAUSE_SECONDS", "0.2"))
+    RETENTION_ARCHIVE_DIR: str = get_secret("RETENTION_ARCHIVE_DIR", "archive")
+    
+    # 이메일 발송 대기열 (pending_queue.py)
+    # Supabase Realtime으로 drafts 변경을 구독하고, 불가능하면 폴링으로 대체
+    PENDING_REALTIME: bool = get_secret("PENDING_REALTIME", "true").lower() == "true"
+    PENDING_POLL_SECONDS: float = float(get_secret("PENDING_POLL_SECONDS", "15"))
+    PENDING_PAGE_SIZE: int = int(get_secret("PENDING_PAGE_SIZE", "50"))  # 탭 2 대기 목록 한 페이지 건수
+    
+    # Streamlit 캐시 (조회 결과 TTL, 배포 버전이 바뀌면 전체 무효화)
+    CACHE_TTL_SECONDS: int = int(get_secret("CACHE_TTL_SECONDS", "60"))
+    APP_VERSION: str = get_secret("APP_VERSION")  # 비우면 소스 파일 수정 시각으로 계산
+    STATS_REFRESH_SECONDS: float = float(get_secret("STATS_REFRESH_SECONDS", "30"))  # 사이드바 DB 현황 갱신 간격
+    EDIT_FLUSH_SECONDS: float = float(get_secret("EDIT_FLUSH_SECONDS", "3"))  # 탭 1 이메일 수정을 모아서 저장하는 간격
+    
     # Supabase
     SUPABASE_URL: str = get_secret("SUPABASE_URL")
     SUPABASE_KEY: str = get_secret("SUPABASE_KEY")
@@ -48,6 +82,59 @@ class Config:
     SENDER_EMAIL: str = get_secret("SENDER_EMAIL")
     SENDER_PASSWORD: str = get_secret("SENDER_PASSWORD")
     
+    # SMTP 서버 (기본: Gmail SSL, 로컬 테스트: smtp_sink.py + SMTP_SECURITY=none)
+    SMTP_HOST: str = get_secret("SMTP_HOST", "smtp.gmail.com")
+    SMTP_PORT: int = int(get_secret("SMTP_PORT", "465"))
+    SMTP_SECURITY: str = get_secret("SMTP_SECURITY", "ssl").lower()  # ssl | starttls | none
+    
+    # SMTP 연결 풀 (로그인된 연결 재사용)
+    SMTP_POOL_SIZE: int = int(get_secret("SMTP_POOL_SIZE", "2"))
+    SMTP_IDLE_TIMEOUT: float = float(get_secret("SMTP_IDLE_TIMEOUT", "240"))  # 초, 이보다 오래 쉰 연결은 새로 연결
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = int(get_secret("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+    SMTP_TIMEOUT: float = float(get_secret("SMTP_TIMEOUT", "30"))
+    
+    # 발송 대기열 워커 (outbox_worker.py)
+    EMAIL_DAILY_CAP: int = int(get_secret("EMAIL_DAILY_CAP", "450"))  # 최근 24시간 발송 한도 (Gmail 약 500통/일)
+    EMAIL_MIN_INTERVAL_SECONDS: float = float(get_secret("EMAIL_MIN_INTERVAL_SECONDS", "3"))  # 메일 사이 최소 간격
+    OUTBOX_BATCH_SIZE: int = int(get_secret("OUTBOX_BATCH_SIZE", "20"))
+    OUTBOX_MAX_ATTEMPTS: int = int(get_secret("OUTBOX_MAX_ATTEMPTS", "5"))
+    OUTBOX_BACKOFF_SECONDS: float = float(get_secret("OUTBOX_BACKOFF_SECONDS", "60"))  # 재시도 간격 (시도마다 2배)
+    OUTBOX_POLL_SECONDS: float = float(get_secret("OUTBOX_POLL_SECONDS", "30"))
+    OUTBOX_LOCK_TIMEOUT_SECONDS: int = int(get_secret("OUTBOX_LOCK_TIMEOUT_SECONDS", "600"))
+    
+    # 발송 일정 (send_scheduler.py) - SEND_WINDOWS=off 이면 대기열에 넣는 즉시 발송
+    SEND_WINDOWS: str = get_secret("SEND_WINDOWS", "10:00-12:00,14:00-18:00")  # 수신자 기준 발송 시간대 (HH:MM-HH:MM, 쉼표 구분)
+    SEND_WEEKDAYS: str = get_secret("SEND_WEEKDAYS", "0,1,2,3,4")  # 발송 요일 (0=월 ... 6=일)
+    SEND_TIMEZONE: str = get_secret("SEND_TIMEZONE", "Asia/Seoul")
+    SEND_DAILY_QUOTA: int = int(get_secret("SEND_DAILY_QUOTA", "200"))  # 하루(SEND_TIMEZONE 기준)에 배정할 최대 건수
+    SEND_SLOT_SECONDS: float = float(get_secret("SEND_SLOT_SECONDS", "60"))  # 배정된 발송 시각 사이 최소 간격
+    SEND_DOMAIN_SPACING_SECONDS: float = float(get_secret("SEND_DOMAIN_SPACING_SECONDS", "300"))  # 같은 수신 도메인 사이 최소 간격
+    
+    # 백그라운드 작업 (job_manager.py) - 검색/동기화/분석을 화면과 분리해서 실행
+    JOB_WORKERS: int = int(get_secret("JOB_WORKERS", "2"))  # 동시에 실행할 작업 수 (같은 종류는 하나씩)
+    JOB_POLL_SECONDS: float = float(get_secret("JOB_POLL_SECONDS", "2"))  # 화면의 진행률 갱신 간격
+    JOB_STALE_SECONDS: int = int(get_secret("JOB_STALE_SECONDS", "900"))  # 이 시간 동안 갱신이 없으면 멈춘 작업으로 보고 failed 처리
+    ANALYZE_CONCURRENCY: int = int(get_secret("ANALYZE_CONCURRENCY", "1"))  # 동시에 분석할 영상 수 (Gemini 분당 요청 한도 주의)
+    
+    # 헤드리스 실행 (python -m bes2) - 야간 자동 검색/분석/발송
+    RUN_SCHEDULE: str = get_secret("RUN_SCHEDULE", "0 0 * * *")  # daemon 실행 시각 (cron 형식: 분 시 일 월 요일)
+    RUN_TIMEZONE: str = get_secret("RUN_TIMEZONE", "Asia/Seoul")
+    RUN_DAYS: int = int(get_secret("RUN_DAYS", "1"))  # 최근 N일 영상 검색
+    RUN_MAX_RESULTS: int = int(get_secret("RUN_MAX_RESULTS", "100"))  # 키워드별 최대 수집량
+    RUN_MIN_VIEWS: int = int(get_secret("RUN_MIN_VIEWS", "100"))
+    RUN_ANALYZE_LIMIT: int = int(get_secret("RUN_ANALYZE_LIMIT", "50"))  # 한 번에 AI 분석할 최대 영상 수 (비용 상한)
+    RUN_AUTO_SEND: bool = get_secret("RUN_AUTO_SEND", "false").lower() == "true"  # false면 초안만 만들고 발송은 사람이 승인
+    RUN_LOCK_PATH: str = get_secret("RUN_LOCK_PATH", "bes2_run.lock")  # 중복 실행 방지 잠금 파일
+    RUN_LOCK_STALE_SECONDS: int = int(get_secret("RUN_LOCK_STALE_SECONDS", "21600"))  # 이보다 오래된 잠금은 무시
+    RUN_LOG_PATH: str = get_secret("RUN_LOG_PATH", "bes2_runs.jsonl")  # 실행 요약 기록 (JSON Lines)
+    
+    # 실행 추적 (tracing.py) - 작업/발송 배치의 구간별 시간 (탭 4 워터폴)
+    TRACE_EXPORTERS: str = get_secret("TRACE_EXPORTERS", "file")  # console, file (쉼표 구분, 비우면 메모리에만 보관)
+    TRACE_FILE: str = get_secret("TRACE_FILE", "bes2_traces.jsonl")  # OTLP JSON Lines (실행 하나당 한 줄)
+    TRACE_KEEP: int = int(get_secret("TRACE_KEEP", "20"))  # 메모리에 보관할 최근 실행 수
+    TRACE_MAX_SPANS: int = int(get_secret("TRACE_MAX_SPANS", "5000"))  # 실행 하나에 기록할 최대 구간 수
+    TRACE_WATERFALL_ROWS: int = int(get_secret("TRACE_WATERFALL_ROWS", "300"))  # 탭 4 워터폴에 그릴 최대 구간 수
+    
     # 🧪 테스트 모드 설정 (True일 경우 실 발송 대신 TEST_EMAIL로 발송)
     TEST_MODE: bool = True
     TEST_EMAIL: str = "chiu3@naver.com"
@@ -67,10 +154,11 @@ class Config:
         """필수 환경 변수 검증"""
         missing = []
         
-        if not cls.SUPABASE_URL:
-            missing.append("SUPABASE_URL")
-        if not cls.SUPABASE_KEY:
-            missing.append("SUPABASE_KEY")
+        if cls.DB_BACKEND == "supabase":
+            if not cls.SUPABASE_URL:
+                missing.append("SUPABASE_URL")
+            if not cls.SUPABASE_KEY:
+                missing.append("SUPABASE_KEY")
         if not cls.GEMINI_API_KEY:
             missing.append("GEMINI_API_KEY")
         if not cls.YOUTUBE_API_KEY:
@@ -1,22 +1,188 @@
 """
 Bes2 Marketer - Database Module
 Supabase 연결 및 CRUD 함수
+
+config.DB_BACKEND로 저장소를 선택합니다.
+- supabase: Supabase(PostgREST) 클라이언트
+- sqlite: 같은 쿼리 빌더 인터페이스의 로컬 SQLite 클라이언트 (sqlite_backend.py)
 """
 
+import hashlib
+import json
 from datetime import datetime
-from typing import Optional
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Optional, Union
 from config import config
+from tracing import TracedClient
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+# 영상 조회용 컬럼 (자막/요약은 video_transcripts에 있으며 get_video_content()로 필요할 때만 로드)
+VIDEO_COLUMNS = (
+    "id, lead_id, video_id, title, upload_date, view_count, like_count, comment_count, "
+    "video_url, thumbnail_url, relevance_score, search_keyword, created_at, updated_at"
+)
+
+# 작업 목록 조회용 컬럼 (params/result는 클 수 있어서 get_job()으로 필요할 때만 로드)
+JOB_LIST_COLUMNS = (
+    "id, kind, status, progress, total, message, error, worker, "
+    "started_at, finished_at, created_at, updated_at"
+)
+
+# 탭 2 대기 목록용 컬럼 (본문 제외, 본문은 선택한 초안만 get_pending_email_drafts_detailed()로 로드)
+PENDING_LIST_COLUMNS = "id, lead_id, is_junk, created_at"
+
+# in_ 필터 한 번에 넣을 최대 ID 수 (PostgREST는 필터를 URL 쿼리스트링으로 전달)
+IN_FILTER_CHUNK = 200
+
+# 한 번의 Upsert 요청에 담을 최대 행 수
+UPSERT_CHUNK = 500
+
+# 한 번의 SELECT로 가져올 최대 행 수 (Supabase PostgREST 기본 max-rows)
+SELECT_PAGE_SIZE = 1000
+
+# content_hash 계산에 쓰는 "재스캔 시 바뀔 수 있는" 필드
+LEAD_HASH_FIELDS = ("channel_name", "subscriber_count", "email")
+VIDEO_HASH_FIELDS = (
+    "title", "lead_id", "upload_date", "view_count",
+    "video_url", "thumbnail_url", "search_keyword"
+)
+
+
+# =========================================
+# 변경 감지 (재스캔 시 바뀐 행만 쓰기)
+# =========================================
+
+def content_hash(row: dict, fields: tuple) -> str:
+    """변경 가능한 필드 값으로 만든 16자리 해시 (행에 content_hash로 저장)"""
+    payload = json.dumps([row.get(f) for f in fields], ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _parse_view_count(value) -> int:
+    if isinstance(value, str):
+        digits = value.replace(",", "")
+        return int(digits) if digits.isdigit() else 0
+    return value or 0
+
+
+def plan_lead_writes(videos: list[dict], existing: dict[str, dict]) -> tuple[list[dict], list[dict], int]:
+    """
+    스캔 결과의 채널 정보를 기존 리드(channel_id -> lead)와 비교
+    반환: (새로 만들 행, 바뀐 행, 변경 없는 리드 수)
+    - 이메일은 기존 값이 없을 때만 채우고, 구독자 수는 새 값이 있을 때만 갱신
+    """
+    inserts, updates, skipped = [], [], 0
+    seen = set()
+    for v in videos:
+        channel_id = v["channel_id"]
+        if channel_id in seen:
+            continue
+        seen.add(channel_id)
+        info = v.get("channel_info") or {}
+        lead = existing.get(channel_id)
+
+        if not lead:
+            row = {
+                "channel_id": channel_id,
+                "channel_name": v["channel_name"],
+                "subscriber_count": info.get("subscriber_count", 0),
+                "email": info.get("email"),
+                "thumbnail_url": v.get("thumbnail_url"),  # 채널 썸네일 대신 영상 썸네일이라도 일단 활용
+                "keywords": [],
+                "status": "new"
+            }
+            row["content_hash"] = content_hash(row, LEAD_HASH_FIELDS)
+            inserts.append(row)
+            continue
+
+        row = {
+            "channel_id": channel_id,
+            "channel_name": v["channel_name"] or lead.get("channel_name"),
+            "subscriber_count": info.get("subscriber_count") or lead.get("subscriber_count"),
+            "email": lead.get("email") or info.get("email")
+        }
+        row["content_hash"] = content_hash(row, LEAD_HASH_FIELDS)
+        # content_hash가 없는 기존 행(마이그레이션 이전)은 한 번 갱신되면서 해시가 채워짐
+        if row["content_hash"] == lead.get("content_hash"):
+            skipped += 1
+        else:
+            updates.append(row)
+    return inserts, updates, skipped
+
+
+def plan_video_writes(
+    videos: list[dict],
+    leads: dict[str, dict],
+    existing: dict[str, dict]
+) -> tuple[list[dict], list[dict], int]:
+    """
+    스캔 결과 영상을 기존 영상(video_id -> {content_hash})과 비교
+    반환: (새로 만들 행, 바뀐 행, 변경 없는 영상 수) - 리드를 못 찾은 영상은 제외
+    """
+    inserts, updates, skipped = [], [], 0
+    seen = set()
+    for v in videos:
+        lead = leads.get(v["channel_id"])
+        if not lead or v["video_id"] in seen:
+            continue
+        seen.add(v["video_id"])
+        row = {
+            "video_id": v["video_id"],
+            "title": v["title"],
+            "lead_id": lead["id"],
+            "upload_date": v["published_at"][:10],
+            "view_count": _parse_view_count(v.get("view_count", 0)),
+            "video_url": v["video_url"],
+            "thumbnail_url": v["thumbnail_url"],
+            "search_keyword": v.get("search_keyword")
+        }
+        row["content_hash"] = content_hash(row, VIDEO_HASH_FIELDS)
+
+        current = existing.get(v["video_id"])
+        if current is None:
+            inserts.append(row)
+        elif current.get("content_hash") == row["content_hash"]:
+            skipped += 1
+        else:
+            updates.append(row)
+    return inserts, updates, skipped
+
+
+def create_backend_client():
+    """설정된 백엔드(supabase / sqlite)에 맞는 DB 클라이언트 생성"""
+    if config.DB_BACKEND == "sqlite":
+        from sqlite_backend import SQLiteClient
+        return SQLiteClient(config.SQLITE_PATH)
+    
+    if config.DB_BACKEND != "supabase":
+        raise ValueError(f"Unknown DB_BACKEND: {config.DB_BACKEND} (supabase | sqlite)")
+    
+    # supabase 패키지(httpx, postgrest, realtime 등)는 import 비용이 커서 필요할 때만 로드
+    from supabase import create_client
+    return create_client(
+        config.SUPABASE_URL,
+        config.SUPABASE_KEY
+    )
 
 
 class Database:
     """Supabase 데이터베이스 클라이언트"""
     
-    def __init__(self):
-        self.client: Client = create_client(
-            config.SUPABASE_URL,
-            config.SUPABASE_KEY
-        )
+    def __init__(self, client=None):
+        """
+        client를 직접 넘기면 그대로 사용 (테스트/벤치마크용),
+        없으면 처음 쿼리할 때 config.DB_BACKEND에 맞는 클라이언트 생성
+        쿼리는 TracedClient를 거쳐 실행 추적(tracing.py)에 db 구간으로 기록됨
+        """
+        self._client = TracedClient(client) if client is not None else None
+    
+    @property
+    def client(self) -> "Client":
+        if self._client is None:
+            self._client = TracedClient(create_backend_client())
+        return self._client
     
     # =========================================
     # LEADS (유튜버 정보) CRUD
@@ -59,6 +225,28 @@ class Database:
         response = self.client.table("leads").select("*").eq("channel_id", channel_id).execute()
         return response.data[0] if response.data else None
     
+    def get_leads_by_channel_ids(self, channel_ids: list[str], columns: str = "*") -> dict[str, dict]:
+        """여러 채널 ID의 리드를 한 번에 조회 (channel_id -> lead)"""
+        unique_ids = list(dict.fromkeys(channel_ids))
+        found = {}
+        for start in range(0, len(unique_ids), IN_FILTER_CHUNK):
+            chunk = unique_ids[start:start + IN_FILTER_CHUNK]
+            response = self.client.table("leads").select(columns).in_("channel_id", chunk).execute()
+            for lead in response.data or []:
+                found[lead["channel_id"]] = lead
+        return found
+    
+    def get_leads_by_ids(self, ids: list[str], columns: str = "*") -> dict[str, dict]:
+        """여러 리드를 UUID로 한 번에 조회 (id -> lead)"""
+        unique_ids = [i for i in dict.fromkeys(ids) if i]
+        found = {}
+        for start in range(0, len(unique_ids), IN_FILTER_CHUNK):
+            chunk = unique_ids[start:start + IN_FILTER_CHUNK]
+            response = self.client.table("leads").select(columns).in_("id", chunk).execute()
+            for lead in response.data or []:
+                found[lead["id"]] = lead
+        return found
+    
     def get_all_leads(
         self,
         status: Optional[str] = None,
@@ -80,6 +268,32 @@ class Database:
         response = self.client.table("leads").update(kwargs).eq("id", lead_id).execute()
         return response.data[0] if response.data else None
     
+    def update_lead_emails(self, emails: dict[str, Optional[str]]) -> dict:
+        """
+        여러 채널의 이메일을 한 번에 변경 (channel_id -> 이메일, 탭 1 이메일 수정 모음 저장)
+        - 리드는 한 번에 조회하고, 값이 바뀐 행만 channel_id 기준으로 묶어서 Upsert
+        반환: {"updated": [channel_id...], "unchanged": [...], "missing": [...]} (missing: 리드가 없는 채널)
+        """
+        result = {"updated": [], "unchanged": [], "missing": []}
+        if not emails:
+            return result
+        
+        leads = self.get_leads_by_channel_ids(list(emails), columns="id, channel_id, channel_name, email")
+        rows = []
+        for channel_id, email in emails.items():
+            lead = leads.get(channel_id)
+            if not lead:
+                result["missing"].append(channel_id)
+            elif lead.get("email") == email:
+                result["unchanged"].append(channel_id)
+            else:
+                # channel_name은 NOT NULL이라 Upsert의 INSERT 부분을 위해 함께 전달
+                rows.append({"channel_id": channel_id, "channel_name": lead["channel_name"], "email": email})
+        
+        for row in self._upsert_rows("leads", rows, "channel_id"):
+            result["updated"].append(row["channel_id"])
+        return result
+    
     def update_lead_status(self, lead_id: str, status: str) -> Optional[dict]:
         """리드 상태 업데이트"""
         return self.update_lead(lead_id, status=status)
@@ -90,7 +304,7 @@ class Database:
         return len(response.data) > 0 if response.data else False
     
     def search_leads(self, keyword: str) -> list[dict]:
-        """채널명으로 리드 검색"""
+        """채널명으로 리드 검색 (pg_trgm 인덱스로 ILIKE 가속)"""
         response = self.client.table("leads").select("*").ilike("channel_name", f"%{keyword}%").execute()
         return response.data or []
     
@@ -114,7 +328,7 @@ class Database:
         relevance_score: float = 0.0,
         search_keyword: Optional[str] = None
     ) -> dict:
-        """새 영상 정보 생성"""
+        """새 영상 정보 생성 (자막/요약은 video_transcripts에 별도 저장)"""
         data = {
             "video_id": video_id,
             "title": title,
@@ -125,8 +339,6 @@ class Database:
             "comment_count": comment_count,
             "video_url": video_url,
             "thumbnail_url": thumbnail_url,
-            "transcript_text": transcript_text,
-            "summary": summary,
             "relevance_score": relevance_score,
             "search_keyword": search_keyword
         }
@@ -135,77 +347,129 @@ class Database:
         data = {k: v for k, v in data.items() if v is not None}
         
         response = self.client.table("videos").insert(data).execute()
-        return response.data[0] if response.data else {}
+        video = response.data[0] if response.data else {}
+        
+        if video and (transcript_text or summary):
+            self.update_video_transcript(video["id"], transcript_text, summary)
+        
+        return video
     
     def get_video_by_id(self, id: str) -> Optional[dict]:
         """UUID로 영상 조회"""
-        response = self.client.table("videos").select("*").eq("id", id).execute()
+        response = self.client.table("videos").select(VIDEO_COLUMNS).eq("id", id).execute()
         return response.data[0] if response.data else None
     
-    def upsert_scanned_videos(self, videos: list[dict]) -> int:
-        """수집된 영상과 채널 정보를 한꺼번에 저장/업데이트 (Upsert)"""
-        count = 0
-        for v in videos:
-            try:
-                # 1. 리드(채널)Upsert
-                # 채널 ID로 기존 리드 확인
-                lead = self.get_lead_by_channel_id(v["channel_id"])
-                
-                if not lead:
-                    # 없으면 새로 생성
-                    lead = self.create_lead(
-                        channel_name=v["channel_name"],
-                        channel_id=v["channel_id"],
-                        subscriber_count=v.get("channel_info", {}).get("subscriber_count", 0),
-                        thumbnail_url=v.get("thumbnail_url"), # 채널 썸네일 대신 영상 썸네일이라도 일단 활용
-                        email=v.get("channel_info", {}).get("email")
-                    )
-                else:
-                    # 있으면 정보 업데이트 (이메일 등 최신화)
-                    update_data = {}
-                    if not lead.get("email") and v.get("channel_info", {}).get("email"):
-                        update_data["email"] = v["channel_info"]["email"]
-                    if v.get("channel_info", {}).get("subscriber_count"):
-                        update_data["subscriber_count"] = v["channel_info"]["subscriber_count"]
-                    
-                    if update_data:
-                        self.update_lead(lead["id"], **update_data)
-                
-                # 2. 영상 Upsert
-                # 조회수 숫자 변환
-                vc = v.get("view_count", 0)
-                if isinstance(vc, str):
-                    vc = int(vc.replace(',', '')) if vc.replace(',', '').isdigit() else 0
-                
-                v_data = {
-                    "video_id": v["video_id"],
-                    "title": v["title"],
-                    "lead_id": lead["id"],
-                    "upload_date": v["published_at"][:10],
-                    "view_count": vc,
-                    "video_url": v["video_url"],
-                    "thumbnail_url": v["thumbnail_url"],
-                    "search_keyword": v.get("search_keyword")
-                }
-                
-                # Supabase upsert (video_id 기준으로 중복 체크)
-                self.client.table("videos").upsert(v_data, on_conflict="video_id").execute()
-                count += 1
-                
-            except Exception as e:
-                print(f"Error upserting video {v['video_id']}: {e}")
-                
-        return count
+    def get_videos_by_ids(self, ids: list[str], columns: str = VIDEO_COLUMNS) -> dict[str, dict]:
+        """여러 영상을 UUID로 한 번에 조회 (id -> video)"""
+        unique_ids = [i for i in dict.fromkeys(ids) if i]
+        found = {}
+        for start in range(0, len(unique_ids), IN_FILTER_CHUNK):
+            chunk = unique_ids[start:start + IN_FILTER_CHUNK]
+            response = self.client.table("videos").select(columns).in_("id", chunk).execute()
+            for video in response.data or []:
+                found[video["id"]] = video
+        return found
+    
+    def upsert_scanned_videos(self, videos: list[dict]) -> dict:
+        """
+        수집된 영상과 채널 정보를 한꺼번에 저장/업데이트 (Upsert)
+        - 기존 행은 content_hash로 비교해서 바뀐 행만 쓰기 (updated_at 트리거/쓰기 부하 절감)
+        - 새 행과 바뀐 행은 테이블별로 묶어서 요청
+        반환: {"leads": {"inserted", "updated", "skipped"}, "videos": {...}}
+        """
+        summary = {
+            "leads": {"inserted": 0, "updated": 0, "skipped": 0},
+            "videos": {"inserted": 0, "updated": 0, "skipped": 0}
+        }
+        if not videos:
+            return summary
+        
+        # 1. 리드(채널) Upsert
+        try:
+            leads = self.get_leads_by_channel_ids(
+                [v["channel_id"] for v in videos],
+                columns="id, channel_id, channel_name, subscriber_count, email, content_hash"
+            )
+            inserts, updates, skipped = plan_lead_writes(videos, leads)
+            for row in self._upsert_rows("leads", inserts, "channel_id") + self._upsert_rows("leads", updates, "channel_id"):
+                leads[row["channel_id"]] = row
+            summary["leads"] = {"inserted": len(inserts), "updated": len(updates), "skipped": skipped}
+        except Exception as e:
+            print(f"Error upserting leads: {e}")
+            return summary
+        
+        # 2. 영상 Upsert (video_id 기준으로 중복 체크)
+        try:
+            existing = self.get_videos_by_video_ids(
+                [v["video_id"] for v in videos], columns="video_id, content_hash"
+            )
+            inserts, updates, skipped = plan_video_writes(videos, leads, existing)
+            self._upsert_rows("videos", inserts + updates, "video_id")
+            summary["videos"] = {"inserted": len(inserts), "updated": len(updates), "skipped": skipped}
+        except Exception as e:
+            print(f"Error upserting videos: {e}")
+        
+        return summary
+    
+    def _upsert_rows(self, table: str, rows: list[dict], on_conflict: str) -> list[dict]:
+        """같은 키 구성의 행들을 UPSERT_CHUNK 단위로 일괄 Upsert"""
+        saved = []
+        for start in range(0, len(rows), UPSERT_CHUNK):
+            chunk = rows[start:start + UPSERT_CHUNK]
+            response = self.client.table(table).upsert(chunk, on_conflict=on_conflict).execute()
+            saved.extend(response.data or [])
+        return saved
 
     def get_video_by_video_id(self, video_id: str) -> Optional[dict]:
         """YouTube 영상 ID로 조회"""
         try:
-            response = self.client.table("videos").select("*").eq("video_id", video_id).execute()
+            response = self.client.table("videos").select(VIDEO_COLUMNS).eq("video_id", video_id).execute()
             return response.data[0] if response.data else None
         except Exception as e:
             print(f"Error fetching video: {e}")
             return None
 
+    def get_videos_by_video_ids(
+        self,
+        video_ids: list[str],
+        with_drafts: bool = False,
+        columns: str = VIDEO_COLUMNS
+    ) -> dict[str, dict]:
+        """
+        여러 YouTube 영상 ID를 한 번에 조회 (video_id -> video)
+        with_drafts=True면 각 영상의 초안을 "drafts" 키로 함께 가져옴 (최신순)
+        """
+        if with_drafts:
+            columns = f"{columns}, drafts(id, draft_type, content, status, created_at)"
+        unique_ids = list(dict.fromkeys(video_ids))
+        found = {}
+        try:
+            # in 필터는 URL에 들어가므로 나눠서 조회
+            for start in range(0, len(unique_ids), IN_FILTER_CHUNK):
+                chunk = unique_ids[start:start + IN_FILTER_CHUNK]
+                response = self.client.table("videos").select(columns).in_("video_id", chunk).execute()
+                for v in response.data or []:
+                    if with_drafts:
+                        v["drafts"] = sorted(v.get("drafts") or [], key=lambda d: d.get("created_at") or "", reverse=True)
+                    found[v["video_id"]] = v
+        except Exception as e:
+            print(f"Error fetching videos: {e}")
+        return found
+
+    def get_video_summaries(self, ids: list[str]) -> dict[str, str]:
+        """여러 영상의 AI 요약만 한 번에 조회 (videos.id -> summary, 자막 본문은 제외)"""
+        unique_ids = list(dict.fromkeys(ids))
+        summaries = {}
+        try:
+            for start in range(0, len(unique_ids), IN_FILTER_CHUNK):
+                chunk = unique_ids[start:start + IN_FILTER_CHUNK]
+                response = self.client.table("video_transcripts").select("video_id, summary").in_("video_id", chunk).execute()
+                for row in response.data or []:
+                    summaries[row["video_id"]] = row.get("summary") or ""
+        except Exception as e:
+            print(f"Error fetching video summaries: {e}")
+        return summaries
+
     def get_known_video_ids(self) -> set:
         """DB에 저장된 모든 Video ID 조회 (중복 검색 방지용)"""
         try:
@@ -219,7 +483,7 @@ class Database:
     
     def get_videos_by_lead(self, lead_id: str) -> list[dict]:
         """특정 리드의 모든 영상 조회"""
-        response = self.client.table("videos").select("*").eq("lead_id", lead_id).order("upload_date", desc=True).execute()
+        response = self.client.table("videos").select(VIDEO_COLUMNS).eq("lead_id", lead_id).order("upload_date", desc=True).execute()
         return response.data or []
     
     def get_all_videos(
@@ -230,7 +494,7 @@ class Database:
         offset: int = 0
     ) -> list[dict]:
         """모든 영상 조회 (필터 및 페이지네이션 지원)"""
-        query = self.client.table("videos").select("*")
+        query = self.client.table("videos").select(VIDEO_COLUMNS)
         
         if min_relevance is not None:
             query = query.gte("relevance_score", min_relevance)
@@ -247,12 +511,28 @@ class Database:
         response = self.client.table("videos").update(kwargs).eq("id", id).execute()
         return response.data[0] if response.data else None
     
-    def update_video_transcript(self, id: str, transcript_text: str, summary: Optional[str] = None) -> Optional[dict]:
-        """영상 자막 및 요약 업데이트"""
-        data = {"transcript_text": transcript_text}
+    def get_video_content(self, id: str) -> dict:
+        """영상 자막/요약 로드 (목록 조회에는 포함되지 않는 무거운 텍스트)"""
+        try:
+            response = self.client.table("video_transcripts").select("transcript_text, summary").eq("video_id", id).execute()
+            row = response.data[0] if response.data else {}
+        except Exception as e:
+            print(f"Error fetching video content: {e}")
+            row = {}
+        return {
+            "transcript_text": row.get("transcript_text") or "",
+            "summary": row.get("summary") or ""
+        }
+    
+    def update_video_transcript(self, id: str, transcript_text: Optional[str], summary: Optional[str] = None) -> Optional[dict]:
+        """영상 자막 및 요약 저장/업데이트 (video_transcripts Upsert)"""
+        data = {"video_id": id}
+        if transcript_text is not None:
+            data["transcript_text"] = transcript_text
         if summary:
             data["summary"] = summary
-        return self.update_video(id, **data)
+        response = self.client.table("video_transcripts").upsert(data, on_conflict="video_id").execute()
+        return response.data[0] if response.data else None
     
     def delete_video(self, id: str) -> bool:
         """영상 삭제"""
@@ -336,17 +616,129 @@ class Database:
         """대기 중인 초안 조회"""
         return self.get_all_drafts(draft_type=draft_type, status="pending")
     
-    def get_pending_email_drafts_detailed(self) -> list[dict]:
-        """대기 중인 이메일 초안 상세 조회 (영상, 리드 정보 포함)"""
+    def get_pending_email_drafts_detailed(self, draft_ids: Optional[list[str]] = None) -> list[dict]:
+        """
+        대기 중인 이메일 초안 상세 조회 (영상, 리드 정보 포함)
+        draft_ids를 주면 해당 초안만 조회 (대기열 증분 갱신용)
+        """
         try:
-            response = self.client.table("drafts").select(
+            query = self.client.table("drafts").select(
                 "*, videos(title, video_id), leads(channel_name, email, subscriber_count)"
-            ).eq("draft_type", "email").eq("status", "pending").order("created_at", desc=True).execute()
+            ).eq("draft_type", "email").eq("status", "pending")
+            if draft_ids is not None:
+                if not draft_ids:
+                    return []
+                query = query.in_("id", draft_ids)
+            response = query.order("created_at", desc=True).execute()
             return response.data or []
         except Exception as e:
             print(f"Error fetching detailed drafts: {e}")
             return []
     
+    def _pending_email_query(
+        self,
+        columns: str,
+        lead_columns: str,
+        channel: Optional[str] = None,
+        has_email: Optional[bool] = None,
+        junk: Optional[bool] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+        count: Optional[str] = None
+    ):
+        """대기 중인 이메일 초안 필터 쿼리 (리드 조건이 있으면 leads!inner로 조인해서 서버에서 거름)"""
+        lead_filter = bool(channel) or has_email is not None
+        query = self.client.table("drafts").select(
+            f"{columns}, leads{'!inner' if lead_filter else ''}({lead_columns})", count=count
+        ).eq("draft_type", "email").eq("status", "pending")
+        
+        if channel:
+            query = query.ilike("leads.channel_name", f"%{channel}%")
+        if has_email is True:
+            query = query.not_.is_("leads.email", "null")
+        elif has_email is False:
+            query = query.is_("leads.email", "null")
+        if junk is not None:
+            query = query.eq("is_junk", junk)
+        if created_after:
+            query = query.gte("created_at", created_after)
+        if created_before:
+            query = query.lt("created_at", created_before)
+        
+        # 같은 시각에 만들어진 초안도 페이지 경계에서 빠지거나 겹치지 않도록 id로 한 번 더 정렬
+        return query.order("created_at", desc=True).order("id")
+    
+    def get_pending_email_draft_page(
+        self,
+        offset: int = 0,
+        limit: int = 50,
+        channel: Optional[str] = None,
+        has_email: Optional[bool] = None,
+        junk: Optional[bool] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None
+    ) -> tuple[list[dict], int]:
+        """
+        대기 중인 이메일 초안 목록 한 페이지 (최신순, 본문 제외)
+        - channel: 채널명 부분 일치 / has_email: 리드 이메일 유무 / junk: 오류 초안 여부 (drafts.is_junk)
+        - created_after / created_before: 작성 시각 범위 (ISO)
+        반환: ([{"id", "lead_id", "is_junk", "created_at", "leads": {"channel_name", "email"}}], 필터 전체 건수)
+        """
+        try:
+            response = self._pending_email_query(
+                PENDING_LIST_COLUMNS, "channel_name, email",
+                channel, has_email, junk, created_after, created_before, count="exact"
+            ).range(offset, offset + limit - 1).execute()
+            return response.data or [], response.count or 0
+        except Exception as e:
+            print(f"Error fetching pending draft page: {e}")
+            return [], 0
+    
+    def get_pending_email_send_targets(
+        self,
+        channel: Optional[str] = None,
+        has_email: Optional[bool] = None,
+        junk: Optional[bool] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None
+    ) -> list[dict]:
+        """
+        필터에 맞는 대기 이메일 초안 전체의 발송 판단용 컬럼 (최신순, 일괄 발송 미리보기)
+        반환: [{"id", "lead_id", "is_junk", "leads": {"email"}}]
+        """
+        rows = []
+        try:
+            while True:
+                response = self._pending_email_query(
+                    "id, lead_id, is_junk", "email",
+                    channel, has_email, junk, created_after, created_before
+                ).range(len(rows), len(rows) + SELECT_PAGE_SIZE - 1).execute()
+                batch = response.data or []
+                rows.extend(batch)
+                if len(batch) < SELECT_PAGE_SIZE:
+                    return rows
+        except Exception as e:
+            print(f"Error fetching pending send targets: {e}")
+            return []
+    
+    def get_pending_email_draft_versions(self) -> dict[str, str]:
+        """
+        대기 중인 이메일 초안 전체의 id -> updated_at (조인 없이 변경 여부만 비교할 때 사용)
+        max-rows에 잘리지 않도록 SELECT_PAGE_SIZE씩 id 순으로 나눠 조회
+        (offset 대신 마지막 id 다음부터 읽어서, 조회 중에 초안이 빠져도 페이지 경계에서 누락되지 않음)
+        """
+        versions = {}
+        last_id = None
+        while True:
+            query = self.client.table("drafts").select("id, updated_at").eq("draft_type", "email").eq("status", "pending")
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            batch = query.order("id").limit(SELECT_PAGE_SIZE).execute().data or []
+            versions.update((d["id"], d["updated_at"]) for d in batch)
+            if len(batch) < SELECT_PAGE_SIZE:
+                return versions
+            last_id = batch[-1]["id"]
+    
     def update_draft(self, draft_id: str, **kwargs) -> Optional[dict]:
         """초안 업데이트"""
         response = self.client.table("drafts").update(kwargs).eq("id", draft_id).execute()
@@ -358,6 +750,31 @@ class Database:
             raise ValueError("Invalid status. Must be: pending, approved, sent, rejected")
         return self.update_draft(draft_id, status=status)
     
+    def mark_drafts_sent(self, draft_ids: Union[str, list[str]]) -> list[dict]:
+        """
+        초안 발송 처리 (mark_drafts_sent RPC, 한 번의 요청/트랜잭션)
+        - 초안 status -> sent, sent_at 기록 (이미 sent인 초안은 제외)
+        - 연결된 리드 status new -> contacted
+        반환: 실제로 처리된 초안 목록 [{"id", "lead_id", "sent_at"}]
+        """
+        if isinstance(draft_ids, str):
+            draft_ids = [draft_ids]
+        if not draft_ids:
+            return []
+        response = self.client.rpc("mark_drafts_sent", {"draft_ids": list(draft_ids)}).execute()
+        return response.data or []
+    
+    def approve_drafts(self, draft_ids: list[str]) -> int:
+        """대기(pending) 초안들을 approved로 변경 (발송 대기열에 넣을 때)"""
+        if not draft_ids:
+            return 0
+        updated = 0
+        for i in range(0, len(draft_ids), IN_FILTER_CHUNK):
+            chunk = list(draft_ids[i:i + IN_FILTER_CHUNK])
+            response = self.client.table("drafts").update({"status": "approved"}).in_("id", chunk).eq("status", "pending").execute()
+            updated += len(response.data or [])
+        return updated
+    
     def update_draft_content(self, draft_id: str, content: str) -> Optional[dict]:
         """초안 내용 업데이트"""
         return self.update_draft(draft_id, content=content)
@@ -367,6 +784,251 @@ class Database:
         response = self.client.table("drafts").delete().eq("id", draft_id).execute()
         return len(response.data) > 0 if response.data else False
     
+    # =========================================
+    # EMAIL OUTBOX (이메일 발송 대기열)
+    # =========================================
+    
+    def get_drafts_for_outbox(self, draft_ids: list[str]) -> list[dict]:
+        """발송 대기열에 넣을 초안 조회 (수신 이메일 포함)"""
+        unique_ids = list(dict.fromkeys(draft_ids))
+        drafts = []
+        for start in range(0, len(unique_ids), IN_FILTER_CHUNK):
+            chunk = unique_ids[start:start + IN_FILTER_CHUNK]
+            response = self.client.table("drafts").select(
+                "id, lead_id, draft_type, status, content, leads(email)"
+            ).in_("id", chunk).execute()
+            drafts.extend(response.data or [])
+        return drafts
+    
+    def get_outbox_status_by_drafts(self, draft_ids: list[str]) -> dict[str, str]:
+        """초안별 발송 대기열 상태 (draft_id -> status, 대기열에 없으면 키 없음)"""
+        unique_ids = list(dict.fromkeys(draft_ids))
+        found = {}
+        for start in range(0, len(unique_ids), IN_FILTER_CHUNK):
+            chunk = unique_ids[start:start + IN_FILTER_CHUNK]
+            response = self.client.table("email_outbox").select("draft_id, status").in_("draft_id", chunk).execute()
+            found.update((row["draft_id"], row["status"]) for row in response.data or [])
+        return found
+    
+    def get_active_outbox_emails(self, emails: list[str]) -> set[str]:
+        """아직 발송 전(queued/sending)인 메일이 있는 수신 주소 (같은 채널 중복 발송 방지)"""
+        unique_emails = list(dict.fromkeys(emails))
+        active = set()
+        for start in range(0, len(unique_emails), IN_FILTER_CHUNK):
+            chunk = unique_emails[start:start + IN_FILTER_CHUNK]
+            response = self.client.table("email_outbox").select("to_email").in_("to_email", chunk).in_("status", ["queued", "sending"]).execute()
+            active.update(row["to_email"] for row in response.data or [])
+        return active
+    
+    def enqueue_emails(self, rows: list[dict]) -> list[dict]:
+        """발송 대기열에 추가 (draft_id 기준 Upsert, 실패/취소된 행은 다시 queued로)"""
+        return self._upsert_rows("email_outbox", rows, "draft_id")
+    
+    def get_unqueued_approved_drafts(self, limit: int = 100) -> list[str]:
+        """
+        승인(approved)됐지만 아직 발송 대기열에 없는 이메일 초안 ID (오래된 순, 최대 limit개)
+        대기열 행이 있는 초안(취소/실패 등)은 건너뛰고 다음 페이지까지 찾음
+        """
+        draft_ids, offset = [], 0
+        while len(draft_ids) < limit:
+            response = self.client.table("drafts").select("id").eq("draft_type", "email").eq("status", "approved").order("created_at").order("id").range(offset, offset + IN_FILTER_CHUNK - 1).execute()
+            page = [d["id"] for d in response.data or []]
+            if not page:
+                break
+            queued = self.client.table("email_outbox").select("draft_id").in_("draft_id", page).execute()
+            queued_ids = {row["draft_id"] for row in queued.data or []}
+            draft_ids.extend(draft_id for draft_id in page if draft_id not in queued_ids)
+            if len(page) < IN_FILTER_CHUNK:
+                break
+            offset += len(page)
+        return draft_ids[:limit]
+    
+    def unapprove_drafts(self, draft_ids: list[str]) -> int:
+        """approved 초안을 pending으로 되돌림 (대기열에 넣을 수 없는 초안, 탭 2에서 다시 확인)"""
+        if not draft_ids:
+            return 0
+        updated = 0
+        for i in range(0, len(draft_ids), IN_FILTER_CHUNK):
+            chunk = list(draft_ids[i:i + IN_FILTER_CHUNK])
+            response = self.client.table("drafts").update({"status": "pending"}).in_("id", chunk).eq("status", "approved").execute()
+            updated += len(response.data or [])
+        return updated
+    
+    def claim_outbox(self, batch_size: int, worker: str, lock_timeout_seconds: int = 600) -> list[dict]:
+        """발송할 차례인 행을 가져가면서 잠금 (claim_outbox RPC)"""
+        response = self.client.rpc("claim_outbox", {
+            "batch_size": batch_size,
+            "worker": worker,
+            "lock_timeout_seconds": lock_timeout_seconds
+        }).execute()
+        return response.data or []
+    
+    def complete_outbox(self, outbox_ids: list[str]) -> int:
+        """발송 완료 처리 + 초안 sent / 리드 contacted (complete_outbox RPC, 한 트랜잭션)"""
+        if not outbox_ids:
+            return 0
+        response = self.client.rpc("complete_outbox", {"outbox_ids": list(outbox_ids)}).execute()
+        return response.data or 0
+    
+    def fail_outbox(self, outbox_id: str, error: str, retry_at: Optional[str] = None) -> Optional[dict]:
+        """발송 실패 기록 (retry_at이 있으면 그때 다시 시도, 없으면 failed로 종료)"""
+        data = {
+            "status": "queued" if retry_at else "failed",
+            "last_error": error[:1000],
+            "locked_by": None,
+            "locked_at": None
+        }
+        if retry_at:
+            data["next_attempt_at"] = retry_at
+        response = self.client.table("email_outbox").update(data).eq("id", outbox_id).execute()
+        return response.data[0] if response.data else None
+    
+    def cancel_outbox(self, outbox_ids: list[str]) -> int:
+        """아직 발송되지 않은 대기열 항목 취소"""
+        if not outbox_ids:
+            return 0
+        cancelled = 0
+        for i in range(0, len(outbox_ids), IN_FILTER_CHUNK):
+            chunk = list(outbox_ids[i:i + IN_FILTER_CHUNK])
+            response = self.client.table("email_outbox").update({"status": "cancelled"}).in_("id", chunk).in_("status", ["queued", "failed"]).execute()
+            cancelled += len(response.data or [])
+        return cancelled
+    
+    def count_outbox_sent_since(self, since: str) -> int:
+        """since(ISO 시각) 이후 발송 완료 건수 (일일 한도 계산용)"""
+        response = self.client.table("email_outbox").select("id", count="exact").eq("status", "sent").gte("sent_at", since).limit(1).execute()
+        return response.count or 0
+    
+    def get_outbox_schedule(self, since: str) -> list[dict]:
+        """since 이후로 발송 일정이 배정된 queued 행 (일정 계산용)"""
+        response = self.client.table("email_outbox").select("id, to_email, scheduled_at").eq("status", "queued").gte("scheduled_at", since).order("scheduled_at").execute()
+        return response.data or []
+    
+    def get_queued_outbox(self, unscheduled_only: bool = True, limit: int = 1000) -> list[dict]:
+        """일정을 배정할 queued 행 (기본: 아직 일정이 없는 행만, 먼저 들어온 순)"""
+        query = self.client.table("email_outbox").select("id, to_email, scheduled_at, created_at").eq("status", "queued")
+        if unscheduled_only:
+            query = query.is_("scheduled_at", "null")
+        response = query.order("created_at").limit(limit).execute()
+        return response.data or []
+    
+    def schedule_outbox(self, assignments: dict[str, str]) -> int:
+        """
+        발송 일정 저장 (outbox id -> ISO 시각), 워커가 그 시각부터 가져가도록 next_attempt_at도 같은 값으로
+        schedule_outbox RPC 한 번으로 모든 행을 갱신 (queued 행만)
+        """
+        if not assignments:
+            return 0
+        response = self.client.rpc("schedule_outbox", {
+            "outbox_ids": list(assignments),
+            "slots": list(assignments.values())
+        }).execute()
+        return response.data or 0
+    
+    def get_outbox_stats(self) -> dict:
+        """발송 대기열 상태별 건수 (상태마다 count="exact" 조회, 행은 내려받지 않음)"""
+        stats = {}
+        for status in ("queued", "sending", "failed", "cancelled"):
+            response = self.client.table("email_outbox").select("id", count="exact").eq("status", status).limit(1).execute()
+            stats[status] = response.count or 0
+        return stats
+    
+    def get_outbox_items(self, status: Optional[str] = None, limit: int = 50) -> list[dict]:
+        """발송 대기열 목록 (본문 제외)"""
+        query = self.client.table("email_outbox").select(
+            "id, draft_id, to_email, subject, status, attempts, scheduled_at, next_attempt_at, last_error, sent_at, created_at"
+        )
+        if status:
+            query = query.eq("status", status)
+        response = query.order("next_attempt_at", desc=False).limit(limit).execute()
+        return response.data or []
+    
+    # =========================================
+    # JOBS (백그라운드 작업)
+    # =========================================
+    
+    def create_job(self, kind: str, params: Optional[dict] = None, worker: Optional[str] = None) -> Optional[dict]:
+        """작업 생성 (queued)"""
+        response = self.client.table("jobs").insert({
+            "kind": kind,
+            "status": "queued",
+            "params": params or {},
+            "worker": worker
+        }).execute()
+        return response.data[0] if response.data else None
+    
+    def update_job(self, job_id: str, **kwargs) -> Optional[dict]:
+        """작업 상태/진행률/결과 갱신"""
+        response = self.client.table("jobs").update(kwargs).eq("id", job_id).execute()
+        return response.data[0] if response.data else None
+    
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """작업 조회 (params/result 포함)"""
+        response = self.client.table("jobs").select("*").eq("id", job_id).execute()
+        return response.data[0] if response.data else None
+    
+    def get_jobs(
+        self,
+        statuses: Optional[list[str]] = None,
+        kinds: Optional[list[str]] = None,
+        ids: Optional[list[str]] = None,
+        limit: int = 20,
+        with_result: bool = False
+    ) -> list[dict]:
+        """작업 목록 (최신순, 기본: params/result 제외)"""
+        query = self.client.table("jobs").select("*" if with_result else JOB_LIST_COLUMNS)
+        if statuses:
+            query = query.in_("status", statuses)
+        if kinds:
+            query = query.in_("kind", kinds)
+        if ids:
+            query = query.in_("id", list(dict.fromkeys(ids)))
+        response = query.order("created_at", desc=True).limit(limit).execute()
+        return response.data or []
+    
+    def fail_stale_jobs(self, before: str, now: str) -> int:
+        """before(ISO 시각) 이후로 갱신이 없는 queued/running 작업을 failed로 (서버 재시작 등으로 멈춘 작업)"""
+        response = self.client.table("jobs").update({
+            "status": "failed",
+            "error": "interrupted (no progress update)",
+            "finished_at": now
+        }).in_("status", ["queued", "running"]).lt("updated_at", before).execute()
+        return len(response.data or [])
+    
+    # =========================================
+    # 통합 검색 (Full-text + Trigram)
+    # =========================================
+    
+    def search(
+        self,
+        query: str,
+        kinds: Optional[list[str]] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> tuple[list[dict], int]:
+        """
+        채널명 / 영상 제목 / 요약 / 자막 통합 검색 (schema.sql의 search_content RPC)
+        - kinds: ["lead", "video"] 중 선택 (기본: 전체)
+        - 반환: (랭킹순 결과 목록, 전체 결과 수)
+          각 결과: kind, id, lead_id, video_id, title, snippet, rank
+        """
+        if not query or not query.strip():
+            return [], 0
+        
+        try:
+            response = self.client.rpc("search_content", {
+                "search_query": query.strip(),
+                "search_kinds": kinds or ["lead", "video"],
+                "result_limit": limit,
+                "result_offset": offset
+            }).execute()
+            rows = response.data or []
+            total = rows[0]["total_count"] if rows else 0
+            return rows, total
+        except Exception as e:
+            print(f"Error searching '{query}': {e}")
+            return [], 0
+    
     # =========================================
     # 통계 및 집계 함수
     # =========================================
@@ -426,17 +1088,17 @@ class Database:
     
     def get_video_with_lead(self, video_id: str) -> Optional[dict]:
         """영상과 연결된 리드 정보 함께 조회"""
-        response = self.client.table("videos").select("*, leads(*)").eq("id", video_id).execute()
+        response = self.client.table("videos").select(f"{VIDEO_COLUMNS}, leads(*)").eq("id", video_id).execute()
         return response.data[0] if response.data else None
     
     def get_draft_with_details(self, draft_id: str) -> Optional[dict]:
         """초안과 연결된 영상, 리드 정보 함께 조회"""
-        response = self.client.table("drafts").select("*, videos(*), leads(*)").eq("id", draft_id).execute()
+        response = self.client.table("drafts").select(f"*, videos({VIDEO_COLUMNS}), leads(*)").eq("id", draft_id).execute()
         return response.data[0] if response.data else None
     
     def get_lead_with_videos_and_drafts(self, lead_id: str) -> Optional[dict]:
         """리드와 연결된 모든 영상, 초안 정보 조회"""
-        response = self.client.table("leads").select("*, videos(*), drafts(*)").eq("id", lead_id).execute()
+        response = self.client.table("leads").select(f"*, videos({VIDEO_COLUMNS}), drafts(*)").eq("id", lead_id).execute()
         return response.data[0] if response.data else None
 
 
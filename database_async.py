@@ -0,0 +1,343 @@
+"""
+Bes2 Marketer - Async Database Module
+비동기 PostgREST 클라이언트 + 공유 커넥션 풀 기반 데이터 계층
+
+동기 Database와 같은 쿼리를 async 메서드로 제공하여, 파이프라인에서
+YouTube/Gemini 호출과 DB 쓰기를 asyncio.gather로 겹쳐 실행할 수 있게 합니다.
+
+- 하나의 keep-alive httpx 커넥션 풀을 모든 요청이 공유
+- asyncio.Semaphore로 동시 요청 수 제한 (config.DB_MAX_CONCURRENCY)
+- in_ 필터는 동기 Database처럼 IN_FILTER_CHUNK씩 나눠서 (청크는 동시에) 조회
+- 쿼리는 TracedClient를 거쳐 실행 추적(tracing.py)에 db 구간으로 기록
+- DB_BACKEND=sqlite 에서는 동기 SQLiteClient를 스레드에서 실행
+
+⚠️ httpx 커넥션은 생성된 이벤트 루프에 묶이므로, 하나의 장기 실행 루프
+(CLI, 워커 등)에서 get_async_db()로 얻은 인스턴스를 재사용하고 끝날 때 aclose()를 호출하세요.
+"""
+
+import asyncio
+from typing import Any, Optional
+
+from config import config
+from database import IN_FILTER_CHUNK, UPSERT_CHUNK, VIDEO_COLUMNS, plan_lead_writes, plan_video_writes
+from sqlite_backend import SQLiteClient
+from tracing import TracedClient
+
+
+def _pool_limits():
+    """공유 커넥션 풀 설정"""
+    import httpx
+    return httpx.Limits(
+        max_connections=config.DB_MAX_CONNECTIONS,
+        max_keepalive_connections=config.DB_MAX_KEEPALIVE,
+        keepalive_expiry=30.0,
+    )
+
+
+def create_async_backend_client():
+    """설정된 백엔드에 맞는 비동기 DB 클라이언트 생성"""
+    if config.DB_BACKEND == "sqlite":
+        return SQLiteClient(config.SQLITE_PATH)
+
+    import httpx
+    from postgrest import AsyncPostgrestClient
+    from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+
+    class PooledPostgrestClient(AsyncPostgrestClient):
+        """keep-alive 커넥션 풀 크기를 설정할 수 있는 PostgREST 클라이언트"""
+
+        def create_session(self, base_url, headers, timeout, verify=True, proxy=None):
+            return httpx.AsyncClient(
+                base_url=base_url,
+                headers=headers,
+                timeout=timeout,
+                verify=verify,
+                proxy=proxy,
+                follow_redirects=True,
+                http2=True,
+                limits=_pool_limits(),
+            )
+
+    headers = {
+        **DEFAULT_POSTGREST_CLIENT_HEADERS,
+        "apikey": config.SUPABASE_KEY,
+        "Authorization": f"Bearer {config.SUPABASE_KEY}",
+    }
+    return PooledPostgrestClient(
+        f"{config.SUPABASE_URL}/rest/v1",
+        headers=headers,
+        timeout=config.DB_TIMEOUT,
+    )
+
+
+class AsyncDatabase:
+    """비동기 Supabase 데이터베이스 클라이언트"""
+
+    def __init__(self, client=None, max_concurrency: Optional[int] = None):
+        client = client or create_async_backend_client()
+        # SQLiteClient는 동기 클라이언트 -> 스레드에서 실행
+        self._is_async = not isinstance(client, SQLiteClient)
+        self.client = TracedClient(client)
+        self._semaphore = asyncio.Semaphore(max_concurrency or config.DB_MAX_CONCURRENCY)
+
+    async def _execute(self, query) -> Any:
+        """동시 요청 수 제한 안에서 쿼리 실행"""
+        async with self._semaphore:
+            if self._is_async:
+                return await query.execute()
+            # to_thread는 contextvars를 복사하므로 db 구간이 현재 실행에 묶임
+            return await asyncio.to_thread(query.execute)
+
+    async def _select_in(self, table: str, columns: str, column: str, values: list) -> list[dict]:
+        """in_ 필터 조회를 IN_FILTER_CHUNK씩 나눠 동시에 실행 (PostgREST는 필터를 URL로 전달)"""
+        unique = [v for v in dict.fromkeys(values) if v]
+        responses = await asyncio.gather(*[
+            self._execute(self.client.table(table).select(columns).in_(column, unique[i:i + IN_FILTER_CHUNK]))
+            for i in range(0, len(unique), IN_FILTER_CHUNK)
+        ])
+        return [row for r in responses for row in r.data or []]
+
+    async def aclose(self) -> None:
+        """커넥션 풀 정리"""
+        if self._is_async:
+            await self.client.aclose()
+        else:
+            self.client.close()
+
+    # =========================================
+    # LEADS (유튜버 정보)
+    # =========================================
+
+    async def create_lead(
+        self,
+        channel_name: str,
+        channel_id: str,
+        subscriber_count: int = 0,
+        email: Optional[str] = None,
+        keywords: Optional[list[str]] = None,
+        thumbnail_url: Optional[str] = None
+    ) -> dict:
+        """새 유튜버(리드) 생성"""
+        data = {
+            "channel_name": channel_name,
+            "channel_id": channel_id,
+            "subscriber_count": subscriber_count,
+            "email": email,
+            "keywords": keywords or [],
+            "thumbnail_url": thumbnail_url,
+            "status": "new"
+        }
+        response = await self._execute(self.client.table("leads").insert(data))
+        return response.data[0] if response.data else {}
+
+    async def get_lead_by_channel_id(self, channel_id: str) -> Optional[dict]:
+        """채널 ID로 리드 조회"""
+        response = await self._execute(self.client.table("leads").select("*").eq("channel_id", channel_id))
+        return response.data[0] if response.data else None
+
+    async def get_leads_by_channel_ids(self, channel_ids: list[str], columns: str = "*") -> dict[str, dict]:
+        """여러 채널 ID의 리드를 한 번에 조회 (channel_id -> lead)"""
+        rows = await self._select_in("leads", columns, "channel_id", channel_ids)
+        return {lead["channel_id"]: lead for lead in rows}
+
+    async def update_lead(self, lead_id: str, **kwargs) -> Optional[dict]:
+        """리드 정보 업데이트"""
+        response = await self._execute(self.client.table("leads").update(kwargs).eq("id", lead_id))
+        return response.data[0] if response.data else None
+
+    # =========================================
+    # VIDEOS (영상 정보)
+    # =========================================
+
+    async def get_video_by_video_id(self, video_id: str) -> Optional[dict]:
+        """YouTube 영상 ID로 조회"""
+        response = await self._execute(self.client.table("videos").select(VIDEO_COLUMNS).eq("video_id", video_id))
+        return response.data[0] if response.data else None
+
+    async def get_videos_by_video_ids(self, video_ids: list[str], columns: str = VIDEO_COLUMNS) -> dict[str, dict]:
+        """여러 YouTube 영상 ID를 한 번에 조회 (video_id -> video)"""
+        rows = await self._select_in("videos", columns, "video_id", video_ids)
+        return {v["video_id"]: v for v in rows}
+
+    async def get_known_video_ids(self) -> set:
+        """DB에 저장된 모든 Video ID 조회 (중복 검색 방지용)"""
+        try:
+            response = await self._execute(self.client.table("videos").select("video_id"))
+            return {item["video_id"] for item in response.data} if response.data else set()
+        except Exception as e:
+            print(f"Error fetching known video IDs: {e}")
+            return set()
+
+    async def create_video(self, **data) -> dict:
+        """새 영상 정보 생성 (Database.create_video와 같은 필드, 자막/요약은 video_transcripts에 저장)"""
+        transcript_text = data.pop("transcript_text", None)
+        summary = data.pop("summary", None)
+        data = {k: v for k, v in data.items() if v is not None}
+        response = await self._execute(self.client.table("videos").insert(data))
+        video = response.data[0] if response.data else {}
+        if video and (transcript_text or summary):
+            await self.update_video_transcript(video["id"], transcript_text, summary)
+        return video
+
+    async def update_video_transcript(self, id: str, transcript_text: Optional[str], summary: Optional[str] = None) -> Optional[dict]:
+        """영상 자막 및 요약 저장/업데이트 (video_transcripts Upsert)"""
+        data = {"video_id": id}
+        if transcript_text is not None:
+            data["transcript_text"] = transcript_text
+        if summary:
+            data["summary"] = summary
+        response = await self._execute(
+            self.client.table("video_transcripts").upsert(data, on_conflict="video_id")
+        )
+        return response.data[0] if response.data else None
+
+    async def update_video(self, id: str, **kwargs) -> Optional[dict]:
+        """영상 정보 업데이트"""
+        response = await self._execute(self.client.table("videos").update(kwargs).eq("id", id))
+        return response.data[0] if response.data else None
+
+    async def upsert_videos(self, videos: list[dict], chunk_size: int = UPSERT_CHUNK) -> int:
+        """영상 행을 video_id 기준으로 일괄 Upsert (청크는 동시에 전송)"""
+        chunks = [videos[i:i + chunk_size] for i in range(0, len(videos), chunk_size)]
+        responses = await asyncio.gather(*[
+            self._execute(self.client.table("videos").upsert(chunk, on_conflict="video_id"))
+            for chunk in chunks
+        ])
+        return sum(len(r.data or []) for r in responses)
+
+    async def upsert_scanned_videos(self, videos: list[dict]) -> dict:
+        """
+        수집된 영상과 채널 정보를 한꺼번에 저장/업데이트 (Database.upsert_scanned_videos의 비동기판)
+        - content_hash가 같은 리드/영상은 건너뛰고, 나머지는 청크 단위로 동시에 Upsert
+        반환: {"leads": {"inserted", "updated", "skipped"}, "videos": {...}}
+        """
+        summary = {
+            "leads": {"inserted": 0, "updated": 0, "skipped": 0},
+            "videos": {"inserted": 0, "updated": 0, "skipped": 0}
+        }
+        if not videos:
+            return summary
+
+        # 1. 리드 Upsert (새 리드 / 바뀐 리드는 키 구성이 달라서 따로 전송)
+        try:
+            leads = await self.get_leads_by_channel_ids(
+                [v["channel_id"] for v in videos],
+                columns="id, channel_id, channel_name, subscriber_count, email, content_hash"
+            )
+            inserts, updates, skipped = plan_lead_writes(videos, leads)
+            for rows in await asyncio.gather(
+                self._upsert_rows("leads", inserts, "channel_id"),
+                self._upsert_rows("leads", updates, "channel_id")
+            ):
+                for row in rows:
+                    leads[row["channel_id"]] = row
+            summary["leads"] = {"inserted": len(inserts), "updated": len(updates), "skipped": skipped}
+        except Exception as e:
+            print(f"Error upserting leads: {e}")
+            return summary
+
+        # 2. 영상 Upsert
+        try:
+            existing = await self.get_videos_by_video_ids(
+                [v["video_id"] for v in videos], columns="video_id, content_hash"
+            )
+            inserts, updates, skipped = plan_video_writes(videos, leads, existing)
+            await self._upsert_rows("videos", inserts + updates, "video_id")
+            summary["videos"] = {"inserted": len(inserts), "updated": len(updates), "skipped": skipped}
+        except Exception as e:
+            print(f"Error upserting videos: {e}")
+
+        return summary
+
+    async def _upsert_rows(self, table: str, rows: list[dict], on_conflict: str) -> list[dict]:
+        """행들을 UPSERT_CHUNK 단위로 나눠 동시에 Upsert"""
+        chunks = [rows[i:i + UPSERT_CHUNK] for i in range(0, len(rows), UPSERT_CHUNK)]
+        responses = await asyncio.gather(*[
+            self._execute(self.client.table(table).upsert(chunk, on_conflict=on_conflict))
+            for chunk in chunks
+        ])
+        return [row for r in responses for row in r.data or []]
+
+    # =========================================
+    # DRAFTS (마케팅 초안)
+    # =========================================
+
+    async def create_draft(
+        self,
+        draft_type: str,
+        content: str,
+        video_id: Optional[str] = None,
+        lead_id: Optional[str] = None,
+        tone: Optional[str] = None,
+        language: str = "ko"
+    ) -> dict:
+        """새 마케팅 초안 생성"""
+        if draft_type not in ["email", "comment"]:
+            raise ValueError("draft_type must be 'email' or 'comment'")
+        data = {
+            "draft_type": draft_type,
+            "content": content,
+            "video_id": video_id,
+            "lead_id": lead_id,
+            "tone": tone,
+            "language": language,
+            "status": "pending"
+        }
+        data = {k: v for k, v in data.items() if v is not None}
+        response = await self._execute(self.client.table("drafts").insert(data))
+        return response.data[0] if response.data else {}
+
+    async def create_drafts(self, drafts: list[dict]) -> list[dict]:
+        """여러 초안을 UPSERT_CHUNK개씩 묶어 생성 (각 dict는 create_draft와 같은 필드, 청크는 동시에 전송)"""
+        rows = [{"status": "pending", "language": "ko", **d} for d in drafts]
+        responses = await asyncio.gather(*[
+            self._execute(self.client.table("drafts").insert(rows[i:i + UPSERT_CHUNK]))
+            for i in range(0, len(rows), UPSERT_CHUNK)
+        ])
+        return [row for r in responses for row in r.data or []]
+
+    async def get_drafts_by_video(self, video_id: str) -> list[dict]:
+        """특정 영상의 모든 초안 조회"""
+        response = await self._execute(
+            self.client.table("drafts").select("*").eq("video_id", video_id).order("created_at", desc=True)
+        )
+        return response.data or []
+
+    async def update_draft_status(self, draft_id: str, status: str) -> Optional[dict]:
+        """초안 상태 업데이트"""
+        if status not in ["pending", "approved", "sent", "rejected"]:
+            raise ValueError("Invalid status. Must be: pending, approved, sent, rejected")
+        response = await self._execute(
+            self.client.table("drafts").update({"status": status}).eq("id", draft_id)
+        )
+        return response.data[0] if response.data else None
+
+    async def mark_drafts_sent(self, draft_ids: list[str]) -> list[dict]:
+        """초안 발송 처리 + 리드 new -> contacted (Database.mark_drafts_sent와 동일한 RPC)"""
+        if not draft_ids:
+            return []
+        response = await self._execute(self.client.rpc("mark_drafts_sent", {"draft_ids": list(draft_ids)}))
+        return response.data or []
+
+
+# =========================================
+# 공유 인스턴스 (이벤트 루프당 하나)
+# =========================================
+
+_async_db: Optional[AsyncDatabase] = None
+
+
+def get_async_db() -> AsyncDatabase:
+    """공유 커넥션 풀을 쓰는 AsyncDatabase 인스턴스 반환 (첫 호출 시 생성)"""
+    global _async_db
+    if _async_db is None:
+        _async_db = AsyncDatabase()
+    return _async_db
+
+
+async def close_async_db() -> None:
+    """공유 인스턴스의 커넥션 풀 정리"""
+    global _async_db
+    if _async_db is not None:
+        await _async_db.aclose()
+        _async_db = None
@@ -0,0 +1,80 @@
+"""
+Bes2 Marketer - Email Edit Buffer
+탭 1 영상 표의 '이메일' 셀 수정을 모아 두었다가 한 번에 저장
+
+st.data_editor의 edited_rows는 다시 실행될 때마다 같은 수정 내용을 다시 넘겨주므로
+셀마다 바로 DB에 쓰면 같은 값이 반복해서 저장됩니다.
+- 같은 채널의 수정은 마지막 값 하나로 합침 (한 채널의 영상이 여러 개여도 리드는 하나)
+- 이미 저장했거나 대기 중인 값과 같으면 무시
+- 마지막 수정 후 EDIT_FLUSH_SECONDS가 지나면 Database.update_lead_emails()로 일괄 저장
+"""
+
+import time
+from typing import Optional
+
+from config import config
+from database import Database, db
+
+
+class EmailEditBuffer:
+    """채널별 이메일 수정 대기열 (channel_id -> 저장할 이메일)"""
+
+    def __init__(self, database: Optional[Database] = None, flush_seconds: Optional[float] = None):
+        self.db = database or db
+        self.flush_seconds = config.EDIT_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self.pending: dict[str, Optional[str]] = {}
+        self.persisted: dict[str, Optional[str]] = {}  # 이 세션에서 저장을 마친 값
+        self.channel_names: dict[str, str] = {}
+        self._last_stage = 0.0
+
+    @staticmethod
+    def _normalize(email: Optional[str]) -> Optional[str]:
+        return (email or "").strip() or None
+
+    def stage(self, channel_id: str, email: Optional[str], channel_name: str = "") -> bool:
+        """수정 추가 (새로 대기열에 들어갔으면 True, 이미 저장/대기 중인 값이면 False)"""
+        email = self._normalize(email)
+        if channel_id in self.pending:
+            if self.pending[channel_id] == email:
+                return False
+        elif channel_id in self.persisted and self.persisted[channel_id] == email:
+            return False
+        self.pending[channel_id] = email
+        if channel_name:
+            self.channel_names[channel_id] = channel_name
+        self._last_stage = time.monotonic()
+        return True
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def due(self) -> bool:
+        """마지막 수정 후 flush_seconds가 지났는지 (연달아 수정하는 동안은 모아 둠)"""
+        return bool(self.pending) and time.monotonic() - self._last_stage >= self.flush_seconds
+
+    def flush(self) -> dict:
+        """
+        대기 중인 수정을 한 번에 저장
+        반환: {"saved": [channel_id...], "missing": [...], "error": 오류 메시지 또는 None}
+        실패하면 대기열을 그대로 두고 다음 flush에서 다시 시도
+        """
+        summary = {"saved": [], "missing": [], "error": None}
+        if not self.pending:
+            return summary
+        batch = dict(self.pending)
+        try:
+            result = self.db.update_lead_emails(batch)
+        except Exception as e:
+            print(f"Error saving email edits: {e}")
+            summary["error"] = str(e)
+            return summary
+
+        for channel_id, email in batch.items():
+            # 저장하는 동안 같은 채널이 다시 수정되었으면 새 값은 남겨 둠
+            if self.pending.get(channel_id) == email:
+                del self.pending[channel_id]
+            if channel_id not in result["missing"]:
+                self.persisted[channel_id] = email
+        summary["saved"] = result["updated"] + result["unchanged"]
+        summary["missing"] = result["missing"]
+        return summary
@@ -1,62 +1,279 @@
 
+import contextvars
 import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from typing import Callable, Optional
 from config import config
+from tracing import tracer
+
+# 연결이 끊긴 것으로 보고 재연결할 예외
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError, OSError)
+
+
+def is_retryable(error: Exception) -> bool:
+    """일시적인 오류인지 (4xx 응답, 연결 끊김) - 나중에 다시 보내면 성공할 수 있음"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, RECONNECT_ERRORS)
+
+
+def extract_subject(content: str, default: str = "Bes2 제안") -> str:
+    """초안 본문에서 "제목:" / "Subject:" 줄을 찾아 메일 제목으로 사용"""
+    for line in content.split('\n'):
+        if "제목:" in line or "Subject:" in line:
+            return line.replace("제목:", "").replace("Subject:", "").strip()
+    return default
+
+
+def is_junk_content(content: Optional[str]) -> bool:
+    """AI 생성 오류로 남은 초안인지 (빈 본문, 에러 메시지)"""
+    content = content or ""
+    return (
+        content.strip() == "" or
+        content.startswith("[AI 에러]") or
+        content.startswith("[오류]") or
+        "404 models/" in content
+    )
+
+
+class SMTPPool:
+    """
+    로그인된 SMTP 연결 풀
+    - 발송이 끝난 연결은 닫지 않고 보관했다가 다음 발송에 재사용 (TLS 핸드셰이크 + 로그인 생략)
+    - idle_timeout보다 오래 쉬었거나 max_messages를 넘긴 연결은 새로 연결
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        size: int = 2,
+        idle_timeout: float = 240,
+        max_messages: int = 100,
+        security: str = "ssl"
+    ):
+        self.host = host
+        self.port = port
+        self.security = security
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self._idle: list[dict] = []  # {"server", "credentials", "last_used", "sent"}
+        self._lock = threading.Lock()
+
+    def _connect(self, sender_email: str, sender_password: str) -> dict:
+        with tracer.span("smtp.connect", host=self.host, security=self.security):
+            if self.security == "ssl":
+                server = smtplib.SMTP_SSL(self.host, self.port, timeout=config.SMTP_TIMEOUT)
+            else:
+                server = smtplib.SMTP(self.host, self.port, timeout=config.SMTP_TIMEOUT)
+                if self.security == "starttls":
+                    server.starttls()
+            server.login(sender_email, sender_password)
+        return {"server": server, "credentials": (sender_email, sender_password), "last_used": time.monotonic(), "sent": 0}
+
+    @staticmethod
+    def _close(conn: dict) -> None:
+        try:
+            conn["server"].quit()
+        except Exception:
+            pass
+
+    def acquire(self, sender_email: str, sender_password: str) -> dict:
+        """재사용 가능한 연결을 꺼내거나 새로 연결"""
+        credentials = (sender_email, sender_password)
+        stale = []
+        conn = None
+        with self._lock:
+            while self._idle:
+                candidate = self._idle.pop()
+                if (
+                    candidate["credentials"] == credentials
+                    and time.monotonic() - candidate["last_used"] < self.idle_timeout
+                    and candidate["sent"] < self.max_messages
+                ):
+                    conn = candidate
+                    break
+                stale.append(candidate)
+        for candidate in stale:
+            self._close(candidate)
+        return conn or self._connect(sender_email, sender_password)
+
+    def release(self, conn: dict) -> None:
+        """연결 반납 (풀이 가득 찼으면 닫음)"""
+        conn["last_used"] = time.monotonic()
+        with self._lock:
+            if len(self._idle) < self.size and conn["sent"] < self.max_messages:
+                self._idle.append(conn)
+                return
+        self._close(conn)
+
+    def reconnect(self, conn: dict) -> dict:
+        """끊긴 연결을 버리고 같은 계정으로 새로 연결"""
+        self._close(conn)
+        return self._connect(*conn["credentials"])
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn)
+
 
 class EmailSender:
-    """Gmail SMTP를 이용한 이메일 발송 클래스"""
-    
-    def __init__(self):
-        self.smtp_server = "smtp.gmail.com"
-        self.smtp_port = 465  # SSL 포트
-    def __init__(self):
-        self.smtp_server = "smtp.gmail.com"
-        self.smtp_port = 465  # SSL 포트
+    """SMTP(기본 Gmail)를 이용한 이메일 발송 클래스"""
 
-    def send_email(self, to_email: str, subject: str, body: str) -> bool:
-        """
-        이메일 발송 함수
-        """
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        security: Optional[str] = None,
+        pool_size: Optional[int] = None
+    ):
+        self.smtp_server = host or config.SMTP_HOST
+        self.smtp_port = port or config.SMTP_PORT
+        self.pool = SMTPPool(
+            self.smtp_server,
+            self.smtp_port,
+            size=config.SMTP_POOL_SIZE if pool_size is None else pool_size,
+            idle_timeout=config.SMTP_IDLE_TIMEOUT,
+            max_messages=config.SMTP_MAX_MESSAGES_PER_CONNECTION,
+            security=security or config.SMTP_SECURITY
+        )
+
+    def _credentials(self) -> tuple[Optional[str], Optional[str]]:
         # 설정값 동적 로드 (Secrets 변경 시 즉시 반영을 위해)
         sender_email = config.SENDER_EMAIL
         sender_password = config.SENDER_PASSWORD.replace(" ", "") if config.SENDER_PASSWORD else None
-        
-        # 디버깅: 이메일 설정 확인
-        print(f"📧 Attempting to send email from: {sender_email if sender_email else 'None'}")
-        
-        if not sender_email or not sender_password:
-            print("❌ 이메일 설정(SENDER_EMAIL, SENDER_PASSWORD)이 누락되었습니다.")
-            return False
-            
-        # 테스트 모드 확인
+        return sender_email, sender_password
+
+    def _build_message(self, sender_email: str, to_email: str, subject: str, body: str) -> MIMEMultipart:
+        """메시지 구성 (테스트 모드면 수신자를 TEST_EMAIL로 변경)"""
         final_to_email = to_email
         final_subject = subject
-        
+
         if config.TEST_MODE:
             print(f"🧪 Test Mode Active: Redirecting email to {config.TEST_EMAIL}")
             final_to_email = config.TEST_EMAIL
             final_subject = f"[TEST MODE] {subject} (Original To: {to_email})"
-            
+
+        msg = MIMEMultipart()
+        msg['From'] = sender_email
+        msg['To'] = final_to_email
+        msg['Subject'] = final_subject
+        msg.attach(MIMEText(body, 'plain'))
+        return msg
+
+    def is_configured(self) -> bool:
+        sender_email, sender_password = self._credentials()
+        return bool(sender_email and sender_password)
+
+    def send_email(self, to_email: str, subject: str, body: str) -> bool:
+        """
+        이메일 발송 함수
+        """
+        result = self.send_many([{"to": to_email, "subject": subject, "body": body}])[0]
+        return result["ok"]
+
+    def send_many(self, messages: list[dict]) -> list[dict]:
+        """
+        여러 이메일을 하나의 SMTP 세션으로 연속 발송
+        messages: [{"to", "subject", "body"}, ...]
+        반환: 메시지 순서대로 [{"to", "ok", "error", "retryable"}, ...]
+        - 연결이 끊기면 재연결 후 해당 메시지를 한 번 더 시도
+        - 수신 거부 등 메시지 단위 오류는 기록만 하고 다음 메시지 계속 발송
+        """
+        sender_email, sender_password = self._credentials()
+
+        # 디버깅: 이메일 설정 확인
+        print(f"📧 Attempting to send {len(messages)} email(s) from: {sender_email if sender_email else 'None'}")
+
+        if not sender_email or not sender_password:
+            print("❌ 이메일 설정(SENDER_EMAIL, SENDER_PASSWORD)이 누락되었습니다.")
+            return [{"to": m["to"], "ok": False, "error": "missing credentials", "retryable": False} for m in messages]
+
+        results = []
+        try:
+            conn = self.pool.acquire(sender_email, sender_password)
+        except Exception as e:
+            print(f"❌ Failed to connect SMTP: {e}")
+            return [{"to": m["to"], "ok": False, "error": str(e), "retryable": is_retryable(e)} for m in messages]
+
         try:
-            # 메시지 구성
-            msg = MIMEMultipart()
-            msg['From'] = sender_email
-            msg['To'] = final_to_email
-            msg['Subject'] = final_subject
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # SMTP 서버 연결 및 발송
-            with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port) as server:
-                server.login(sender_email, sender_password)
-                server.send_message(msg)
-                
-            print(f"✅ Email sent successfully to {final_to_email}")
-            return True
-            
+            for m in messages:
+                msg = self._build_message(sender_email, m["to"], m["subject"], m["body"])
+                for attempt in range(2):
+                    try:
+                        if conn["sent"] >= self.pool.max_messages:
+                            conn = self.pool.reconnect(conn)
+                        with tracer.span("smtp.send_message", attempt=attempt + 1):
+                            conn["server"].send_message(msg)
+                        conn["sent"] += 1
+                        print(f"✅ Email sent successfully to {msg['To']}")
+                        results.append({"to": m["to"], "ok": True, "error": None, "retryable": False})
+                        break
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+                        # 메시지 단위 거부 (연결은 정상)
+                        print(f"❌ Failed to send email: {e}")
+                        results.append({"to": m["to"], "ok": False, "error": str(e), "retryable": is_retryable(e)})
+                        break
+                    except RECONNECT_ERRORS as e:
+                        if attempt == 0:
+                            print(f"🔄 SMTP connection lost ({e}), reconnecting...")
+                            conn = self.pool.reconnect(conn)
+                            continue
+                        print(f"❌ Failed to send email: {e}")
+                        results.append({"to": m["to"], "ok": False, "error": str(e), "retryable": is_retryable(e)})
+                    except Exception as e:
+                        print(f"❌ Failed to send email: {e}")
+                        results.append({"to": m["to"], "ok": False, "error": str(e), "retryable": is_retryable(e)})
+                        break
         except Exception as e:
+            # 재연결 자체가 실패한 경우 남은 메시지는 모두 실패 처리
             print(f"❌ Failed to send email: {e}")
-            return False
+            results += [
+                {"to": m["to"], "ok": False, "error": str(e), "retryable": is_retryable(e)}
+                for m in messages[len(results):]
+            ]
+            return results
+
+        self.pool.release(conn)
+        return results
+
+    def send_concurrent(
+        self,
+        messages: list[dict],
+        workers: Optional[int] = None,
+        on_result: Optional[Callable[[int, dict], None]] = None
+    ) -> list[dict]:
+        """
+        여러 이메일을 workers개 스레드로 동시에 발송 (각 스레드는 풀의 연결을 재사용)
+        on_result(index, result): 메시지마다 완료되는 순서대로 호출 (호출한 스레드에서 실행)
+        반환: 메시지 순서대로 [{"to", "ok", "error", "retryable"}, ...]
+        """
+        workers = max(1, min(workers or self.pool.size, len(messages) or 1))
+        results: list[Optional[dict]] = [None] * len(messages)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smtp-send") as executor:
+            # 발송 스레드에서도 같은 실행(tracing)의 구간으로 기록되도록 컨텍스트를 복사해서 실행
+            futures = {
+                executor.submit(contextvars.copy_context().run, self.send_many, [m]): index
+                for index, m in enumerate(messages)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()[0]
+                except Exception as e:
+                    results[index] = {"to": messages[index]["to"], "ok": False, "error": str(e), "retryable": is_retryable(e)}
+                if on_result:
+                    on_result(index, results[index])
+        return results
 
 # 싱글톤 인스턴스
 emailer = EmailSender()
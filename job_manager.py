@@ -0,0 +1,289 @@
+"""
+Bes2 Marketer - Job Manager
+검색 / DB 동기화 / AI 분석을 Streamlit 스크립트 실행과 분리된 백그라운드 스레드에서 실행
+
+- 작업 상태/진행률/결과는 jobs 테이블에 저장 -> 화면을 새로고침하거나 다른 버튼을 눌러도
+  작업은 계속 진행되고, UI는 get()/active()로 폴링해서 다시 연결합니다.
+- 같은 종류의 작업은 한 번에 하나씩 실행 (YouTube API 클라이언트(httplib2)가 스레드 안전하지 않음)
+- 서버가 재시작되어 멈춘 작업은 JOB_STALE_SECONDS 동안 갱신이 없으면 failed로 정리
+
+작업 종류
+- search   : 키워드 검색 + DB 동기화  params {"keywords", "max_results", "published_after_days", "min_view_count", "require_email"}
+- sync     : 검색 작업 결과를 다시 DB에 동기화 (동기화만 실패했을 때)  params {"search_job_id"}
+- analysis : 선택 영상 일괄 분석  params {"videos": [검색 결과 영상...], "concurrency"(선택)}
+"""
+
+import os
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from config import config
+from database import Database, db
+from pipeline import Pipeline
+from tracing import tracer
+
+
+ACTIVE_STATUSES = ["queued", "running"]
+FINISHED_STATUSES = ["succeeded", "failed", "cancelled"]
+
+# 진행률은 최대 이 간격으로만 DB에 기록 (마지막 단계는 항상 기록)
+PROGRESS_WRITE_SECONDS = 0.5
+
+
+def _iso(dt: datetime) -> str:
+    # SQLite 백엔드의 기본 시각 형식(밀리초)과 문자열 비교가 가능하도록 맞춤
+    return dt.astimezone(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def _now() -> str:
+    return _iso(datetime.now(timezone.utc))
+
+
+class JobCancelled(Exception):
+    """작업 취소 요청 (JobContext.progress에서 발생)"""
+
+
+class JobContext:
+    """실행 중인 작업 하나의 진행률 기록 / 취소 확인"""
+
+    def __init__(self, manager: "JobManager", job_id: str, cancel_event: threading.Event):
+        self.manager = manager
+        self.job_id = job_id
+        self._cancel = cancel_event
+        self._last_write = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def progress(self, done: int, total: int, message: str = "") -> None:
+        """진행률 기록 (취소 요청이 있으면 JobCancelled)"""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        now = time.monotonic()
+        if done < total and now - self._last_write < PROGRESS_WRITE_SECONDS:
+            return
+        self._last_write = now
+        self.manager.db.update_job(self.job_id, progress=done, total=total, message=(message or "")[:500])
+
+
+class JobManager:
+    """백그라운드 작업 실행기 (프로세스당 하나, Streamlit에서는 st.cache_resource로 보관)"""
+
+    def __init__(
+        self,
+        database: Optional[Database] = None,
+        pipeline: Optional[Pipeline] = None,
+        max_workers: Optional[int] = None,
+        worker_id: Optional[str] = None
+    ):
+        self.db = database or db
+        self.pipeline = pipeline or Pipeline(self.db)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or config.JOB_WORKERS,
+            thread_name_prefix="bes2-job"
+        )
+        # 작업 종류 -> handler(ctx, params) -> 결과 dict
+        self.handlers: dict[str, Callable[[JobContext, dict], dict]] = {
+            "search": self._run_search,
+            "sync": self._run_sync,
+            "analysis": self._run_analysis,
+        }
+        self._kind_locks: dict[str, threading.Lock] = {}
+        self._cancel_events: dict[str, threading.Event] = {}
+        self._futures: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        try:
+            self.recover_stale()
+        except Exception as e:
+            print(f"Error recovering stale jobs: {e}")
+
+    def register(self, kind: str, handler: Callable[[JobContext, dict], dict]) -> None:
+        """작업 종류 추가 (handler(ctx, params) -> 결과 dict)"""
+        self.handlers[kind] = handler
+
+    # =========================================
+    # 작업 제출 / 취소
+    # =========================================
+
+    def submit(self, kind: str, params: Optional[dict] = None) -> str:
+        """작업을 jobs 테이블에 만들고 백그라운드에서 실행, 작업 ID 반환"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = self.db.create_job(kind, params or {}, worker=self.worker_id)
+        if not job:
+            raise RuntimeError("Failed to create job")
+
+        cancel_event = threading.Event()
+        with self._lock:
+            self._cancel_events[job["id"]] = cancel_event
+            self._futures[job["id"]] = self.executor.submit(self._execute, job["id"], kind, params or {}, cancel_event)
+        return job["id"]
+
+    def cancel(self, job_id: str) -> bool:
+        """취소 요청 (실행 전이면 바로 취소, 실행 중이면 다음 진행률 기록 시점에 중단)"""
+        with self._lock:
+            cancel_event = self._cancel_events.get(job_id)
+            future = self._futures.get(job_id)
+        if cancel_event is None:
+            return False  # 이 프로세스에서 실행 중인 작업이 아님
+        cancel_event.set()
+        if future and future.cancel():
+            self._finish(job_id, "cancelled", message="취소됨")
+        return True
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[dict]:
+        """작업이 끝날 때까지 기다린 뒤 최종 행 반환 (CLI/스크립트용)"""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
+        return self.db.get_job(job_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            events = list(self._cancel_events.values())
+        if not wait:
+            for event in events:
+                event.set()
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    # =========================================
+    # 조회 (UI 폴링)
+    # =========================================
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """작업 전체 (params/result 포함)"""
+        return self.db.get_job(job_id)
+
+    def statuses(self, job_ids: list[str]) -> dict[str, dict]:
+        """여러 작업의 상태/진행률 (결과 제외, job_id -> 행)"""
+        if not job_ids:
+            return {}
+        return {job["id"]: job for job in self.db.get_jobs(ids=job_ids, limit=len(job_ids))}
+
+    def active(self, kinds: Optional[list[str]] = None) -> list[dict]:
+        """실행 대기/중인 작업 (새로고침 후 다시 연결할 대상)"""
+        return self.db.get_jobs(statuses=ACTIVE_STATUSES, kinds=kinds)
+
+    def recent(self, limit: int = 10) -> list[dict]:
+        return self.db.get_jobs(limit=limit)
+
+    def latest_result(self, kind: str) -> Optional[dict]:
+        """해당 종류의 마지막 성공 작업 (결과 포함)"""
+        jobs = self.db.get_jobs(statuses=["succeeded"], kinds=[kind], limit=1, with_result=True)
+        return jobs[0] if jobs else None
+
+    def recover_stale(self) -> int:
+        """JOB_STALE_SECONDS 동안 갱신이 없는 queued/running 작업을 failed로 (재시작 전에 돌던 작업)"""
+        before = _iso(datetime.now(timezone.utc) - timedelta(seconds=config.JOB_STALE_SECONDS))
+        return self.db.fail_stale_jobs(before, _now())
+
+    # =========================================
+    # 실행
+    # =========================================
+
+    def _kind_lock(self, kind: str) -> threading.Lock:
+        with self._lock:
+            return self._kind_locks.setdefault(kind, threading.Lock())
+
+    def _wait_turn(self, job_id: str, kind: str, cancel_event: threading.Event) -> threading.Lock:
+        """같은 종류 작업이 끝날 때까지 대기 (대기 중에도 updated_at을 갱신해 멈춘 작업으로 오인되지 않게)"""
+        lock = self._kind_lock(kind)
+        heartbeat = max(config.JOB_STALE_SECONDS / 3, 1)
+        last_beat = time.monotonic()
+        while not lock.acquire(timeout=1):
+            if cancel_event.is_set():
+                raise JobCancelled()
+            if time.monotonic() - last_beat >= heartbeat:
+                last_beat = time.monotonic()
+                self.db.update_job(job_id, message="대기 중 (같은 종류 작업 실행 중)")
+        return lock
+
+    def _finish(self, job_id: str, status: str, **fields) -> None:
+        self.db.update_job(job_id, status=status, finished_at=_now(), **fields)
+        with self._lock:
+            self._cancel_events.pop(job_id, None)
+            self._futures.pop(job_id, None)
+
+    def _execute(self, job_id: str, kind: str, params: dict, cancel_event: threading.Event) -> None:
+        lock = None
+        try:
+            lock = self._wait_turn(job_id, kind, cancel_event)
+            if cancel_event.is_set():
+                raise JobCancelled()
+            self.db.update_job(job_id, status="running", started_at=_now(), message="시작")
+            # 작업 하나 = 실행 추적 하나 (탭 4 워터폴)
+            with tracer.run(f"job.{kind}", job_id=job_id, worker=self.worker_id):
+                result = self.handlers[kind](JobContext(self, job_id, cancel_event), params)
+            self._finish(job_id, "succeeded", result=result, message=self._summarize(kind, result))
+        except JobCancelled:
+            self._finish(job_id, "cancelled", message="취소됨")
+        except Exception as e:
+            print(f"Job {kind} {job_id} failed: {e}")
+            try:
+                self._finish(job_id, "failed", error=str(e)[:1000])
+            except Exception as record_error:
+                print(f"Error recording job failure {job_id}: {record_error}")
+        finally:
+            if lock:
+                lock.release()
+
+    @staticmethod
+    def _summarize(kind: str, result: dict) -> str:
+        """완료 메시지 (작업 목록에 표시)"""
+        if kind == "search":
+            text = f"✅ {len(result.get('videos', []))}개 영상 수집"
+            if result.get("sync"):
+                text += " | 신규 영상 {inserted} / 갱신 {updated} / 변경 없음 {skipped}".format(**result["sync"]["videos"])
+            if result.get("sync_error"):
+                text += " | ⚠️ DB 동기화 실패"
+            return text
+        if kind == "sync":
+            return "✅ 신규 영상 {inserted} / 갱신 {updated} / 변경 없음 {skipped}".format(**result["videos"])
+        if kind == "analysis":
+            return (
+                f"✅ {len(result.get('drafts', {}))}개 영상 분석 완료 "
+                f"(DB {result.get('cached', 0)} / AI {result.get('analyzed', 0)}, "
+                f"건너뜀 {len(result.get('skipped', []))}, 오류 {len(result.get('errors', []))})"
+            )
+        return "✅ 완료"
+
+    # =========================================
+    # 작업 종류별 실행
+    # =========================================
+
+    def _run_search(self, ctx: JobContext, params: dict) -> dict:
+        result = self.pipeline.search(on_progress=ctx.progress, **params)
+        result["sync"], result["sync_error"] = None, None
+        if result["videos"]:
+            # 검색 결과 즉시 DB 저장 (실패해도 검색 결과는 남기고, sync 작업으로 다시 시도)
+            ctx.progress(0, 1, "💾 검색된 모든 영상을 DB에 동기화 중...")
+            try:
+                result["sync"] = self.pipeline.sync(result["videos"])
+            except Exception as e:
+                print(f"Error syncing search results: {e}")
+                result["sync_error"] = str(e)
+        return result
+
+    def _run_sync(self, ctx: JobContext, params: dict) -> dict:
+        search_job = self.db.get_job(params["search_job_id"])
+        videos = ((search_job or {}).get("result") or {}).get("videos") or []
+        ctx.progress(0, 1, f"💾 {len(videos)}개 영상 DB 동기화 중...")
+        return self.pipeline.sync(videos)
+
+    def _run_analysis(self, ctx: JobContext, params: dict) -> dict:
+        return self.pipeline.analyze(
+            params.get("videos") or [],
+            on_progress=ctx.progress,
+            concurrency=params.get("concurrency") or config.ANALYZE_CONCURRENCY
+        )
@@ -5,50 +5,86 @@ YouTube Hunter + AI Copywriter
 
 from typing import Optional
 from datetime import datetime, timedelta
-
-from googleapiclient.discovery import build
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api._errors import (
-    TranscriptsDisabled,
-    NoTranscriptFound,
-    VideoUnavailable
-)
 import re
-import google.generativeai as genai
 
 from config import config
 from database import db
+from tracing import tracer
+
+# 무거운 라이브러리(googleapiclient, google.generativeai, youtube_transcript_api)는
+# import 시점이 아니라 실제로 쓰는 코드 안에서 불러옵니다. (앱/CLI 시작 시간 단축)
+# 클라이언트도 처음 사용할 때 생성합니다.
 
 
 # =============================================
 # YouTube Hunter - 영상 검색 및 자막 추출
 # =============================================
 
+# YouTube Data API 호출당 할당량 (그 외 list 호출은 1)
+YOUTUBE_QUOTA_COST = {"search.list": 100}
+
 class YouTubeHunter:
     """YouTube 영상 검색 및 자막 추출 클래스"""
     
-    def __init__(self):
-        try:
-            self.youtube = build(
-                "youtube", "v3",
-                developerKey=config.YOUTUBE_API_KEY
-            )
-        except Exception as e:
-            print(f"Warning: Failed to initialize YouTube API: {e}")
-            self.youtube = None
+    def __init__(self, youtube=None, transcript_api=None, database=None, page_delay: tuple[float, float] = (1, 3)):
+        """
+        youtube / transcript_api / database를 넘기면 그대로 사용 (벤치마크의 녹화 재생용),
+        없으면 처음 사용할 때 생성 (database는 기본 싱글톤)
+        page_delay: 검색 결과 페이지 사이 랜덤 대기 (초, 최소/최대)
+        """
+        self._youtube = youtube
+        self._youtube_ready = youtube is not None
+        self._transcript_api = transcript_api
+        self._db = database
+        self.page_delay = page_delay
+    
+    @property
+    def db(self):
+        return self._db or db
+    
+    @property
+    def transcript_api(self):
+        """youtube_transcript_api.YouTubeTranscriptApi (첫 사용 시 import)"""
+        if self._transcript_api is None:
+            from youtube_transcript_api import YouTubeTranscriptApi
+            self._transcript_api = YouTubeTranscriptApi
+        return self._transcript_api
+    
+    @property
+    def youtube(self):
+        """YouTube API 클라이언트 (첫 사용 시 생성, 패키지에 포함된 정적 discovery 문서 사용)"""
+        if not self._youtube_ready:
+            self._youtube_ready = True
+            try:
+                from googleapiclient.discovery import build
+                self._youtube = build(
+                    "youtube", "v3",
+                    developerKey=config.YOUTUBE_API_KEY,
+                    static_discovery=True,
+                    cache_discovery=False
+                )
+            except Exception as e:
+                print(f"Warning: Failed to initialize YouTube API: {e}")
+                self._youtube = None
+        return self._youtube
+    
+    def _execute(self, endpoint: str, request, **attributes) -> dict:
+        """YouTube API 요청 실행 (실행 추적에 youtube 구간으로 기록)"""
+        with tracer.span(f"youtube.{endpoint}", quota=YOUTUBE_QUOTA_COST.get(endpoint, 1), **attributes) as span:
+            response = request.execute()
+            span.set(items=len(response.get("items", [])))
+            return response
     
     def search_videos(self, keyword: str, max_results: int = 10, published_after_days: int = 30, min_view_count: int = 0, require_email: bool = False) -> tuple[list[dict], int]:
         """
         유튜브 영상 검색 (Deep Search 적용)
         - require_email=True 시 이메일 없는 영상은 결과에서 제외
         """
-        from database import db
-        
         # 1. 날짜 및 초기값 설정
         published_after = (datetime.utcnow() - timedelta(days=published_after_days)).isoformat("T") + "Z"
         print(f"Searching for '{keyword}' after {published_after}...")
         
-        known_ids = db.get_known_video_ids()
+        known_ids = self.db.get_known_video_ids()
         collected_items = []
         next_page_token = None
         total_results_approx = 0
@@ -56,10 +92,10 @@ class YouTubeHunter:
         # 2. 1차 검색 (최대 10페이지 = 500개 후보군 탐색)
         for page_num in range(10):
             try:
-                search_response = self.youtube.search().list(
+                search_response = self._execute("search.list", self.youtube.search().list(
                     q=keyword, part="id,snippet", maxResults=50,
                     order="date", publishedAfter=published_after, type="video", pageToken=next_page_token
-                ).execute()
+                ), page=page_num)
                 
                 if page_num == 0:
                     total_results_approx = search_response.get("pageInfo", {}).get("totalResults", 0)
@@ -103,7 +139,7 @@ class YouTubeHunter:
                 
                 # [Safety] 랜덤 딜레이
                 import time, random
-                time.sleep(random.uniform(1, 3))
+                time.sleep(random.uniform(*self.page_delay))
                 
                 print(f"Page {page_num+1} done. Collected candidates: {len(collected_items)}")
 
@@ -124,7 +160,7 @@ class YouTubeHunter:
                     video_ids = [v["video_id"] for v in chunk]
                     
                     # (1) 영상 통계 (조회수)
-                    stats_resp = self.youtube.videos().list(part="statistics", id=",".join(video_ids)).execute()
+                    stats_resp = self._execute("videos.list", self.youtube.videos().list(part="statistics", id=",".join(video_ids)))
                     stats_map = {item["id"]: item["statistics"] for item in stats_resp.get("items", [])}
                     
                     # (2) 채널 정보 (설명글에서 이메일 찾기용 2순위)
@@ -132,7 +168,7 @@ class YouTubeHunter:
                     channel_map = {}
                     for k in range(0, len(channel_ids), 50):
                         c_chunk = channel_ids[k:k+50]
-                        chan_resp = self.youtube.channels().list(part="statistics,snippet", id=",".join(c_chunk)).execute()
+                        chan_resp = self._execute("channels.list", self.youtube.channels().list(part="statistics,snippet", id=",".join(c_chunk)))
                         for c_item in chan_resp.get("items", []):
                             channel_map[c_item["id"]] = {
                                 "subscriber_count": int(c_item["statistics"].get("subscriberCount", 0)),
@@ -164,7 +200,7 @@ class YouTubeHunter:
                         
                         # [NEW] 3. DB 조회 (과거 수집 기록)
                         if not email:
-                            existing_lead = db.get_lead_by_channel_id(cid)
+                            existing_lead = self.db.get_lead_by_channel_id(cid)
                             if existing_lead and existing_lead.get("email"):
                                 email = existing_lead["email"]
 
@@ -199,10 +235,10 @@ class YouTubeHunter:
     def _get_channel_details(self, channel_id: str) -> dict:
         """채널 상세 정보(설명, 구독자 수) 가져오기"""
         try:
-            response = self.youtube.channels().list(
+            response = self._execute("channels.list", self.youtube.channels().list(
                 part="snippet,statistics",
                 id=channel_id
-            ).execute()
+            ))
             
             if response["items"]:
                 item = response["items"][0]
@@ -217,10 +253,10 @@ class YouTubeHunter:
     def _get_video_details(self, video_id: str) -> dict:
         """영상 상세 통계 정보 가져오기"""
         try:
-            response = self.youtube.videos().list(
+            response = self._execute("videos.list", self.youtube.videos().list(
                 part="statistics",
                 id=video_id
-            ).execute()
+            ))
             
             if response["items"]:
                 stats = response["items"][0]["statistics"]
@@ -237,10 +273,10 @@ class YouTubeHunter:
     def get_channel_info(self, channel_id: str) -> Optional[dict]:
         """채널 정보 가져오기"""
         try:
-            response = self.youtube.channels().list(
+            response = self._execute("channels.list", self.youtube.channels().list(
                 part="snippet,statistics",
                 id=channel_id
-            ).execute()
+            ))
             
             if response["items"]:
                 item = response["items"][0]
@@ -272,6 +308,14 @@ class YouTubeHunter:
         """
         영상 자막 추출 (최대한 강력하게 - Raw 모드)
         """
+        with tracer.span("transcript.fetch", video_id=video_id) as span:
+            text = self._fetch_transcript(video_id, languages)
+            span.set(found=bool(text), chars=len(text or ""))
+            return text
+    
+    def _fetch_transcript(self, video_id: str, languages: list[str]) -> Optional[str]:
+        from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
+        
         try:
             print(f"[Transcript] Fetching for {video_id}...")
             
@@ -282,9 +326,9 @@ class YouTubeHunter:
             
             if os.path.exists(cookies_path):
                 print(f"   🍪 Using cookies from {cookies_path}")
-                transcript_list = YouTubeTranscriptApi.list_transcripts(video_id, cookies=cookies_path)
+                transcript_list = self.transcript_api.list_transcripts(video_id, cookies=cookies_path)
             else:
-                transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+                transcript_list = self.transcript_api.list_transcripts(video_id)
 
             # 2. 우선적으로 수동 생성 자막 찾기
             try:
@@ -322,14 +366,33 @@ class YouTubeHunter:
 class AICopywriter:
     """Gemini AI를 이용한 영상 분석 및 마케팅 카피 작성"""
     
-    def __init__(self):
-        try:
-            genai.configure(api_key=config.GEMINI_API_KEY)
-            # 12/27 Update: Gemini 1.5 Flash (가성비 + 속도)
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
-        except Exception as e:
-            print(f"Warning: Failed to initialize Gemini API: {e}")
-            self.model = None
+    def __init__(self, model=None):
+        """model을 넘기면 그대로 사용 (벤치마크의 녹화 재생용), 없으면 첫 사용 시 Gemini 모델 생성"""
+        self._model = model
+        self._model_ready = model is not None
+    
+    @property
+    def model(self):
+        """Gemini 모델 (첫 사용 시 생성)"""
+        if not self._model_ready:
+            self._model_ready = True
+            try:
+                import google.generativeai as genai
+                genai.configure(api_key=config.GEMINI_API_KEY)
+                # 12/27 Update: Gemini 1.5 Flash (가성비 + 속도)
+                self._model = genai.GenerativeModel('gemini-1.5-flash')
+            except Exception as e:
+                print(f"Warning: Failed to initialize Gemini API: {e}")
+                self._model = None
+        return self._model
+
+    def _generate(self, purpose: str, prompt: str) -> str:
+        """Gemini 호출 (실행 추적에 gemini 구간으로 기록, 오류는 호출한 쪽에서 처리)"""
+        with tracer.span("gemini.generate_content", purpose=purpose, prompt_chars=len(prompt)) as span:
+            response = self.model.generate_content(prompt)
+            text = response.text.strip()
+            span.set(response_chars=len(text))
+            return text
 
     def analyze_video(self, video_data: dict, transcript: str) -> dict:
         """영상 내용 분석 (Legacy support)"""
@@ -352,8 +415,7 @@ class AICopywriter:
         3. ...
         '''
         try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            return self._generate("summary", prompt)
         except Exception:
             return "요약 실패"
 
@@ -387,8 +449,7 @@ class AICopywriter:
         '''
         
         try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            return self._generate("email", prompt)
         except Exception as e:
             return f"[AI 에러] 이메일 생성 실패: {str(e)}"
 
@@ -414,8 +475,7 @@ class AICopywriter:
         '''
         
         try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            return self._generate("comment", prompt)
         except Exception as e:
             return f"[AI 에러] 댓글 생성 실패: {str(e)}"
 
@@ -3,13 +3,11 @@ Bes2 Marketer - Streamlit UI
 AI 기반 유튜브 마케팅 자동화 대시보드
 """
 
-# Force Update: Fix KeyError Cache
 import streamlit as st
 import pandas as pd
 import time
 
 
-# [Critical Fix] 캐시 강제 삭제 (업데이트 미반영 해결용)
 # 주의: set_page_config가 항상 먼저여야 함
 st.set_page_config(
     page_title="Bes2 Marketer Pro",
@@ -18,16 +16,123 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-st.cache_data.clear()
-st.cache_resource.clear()
-
 from datetime import datetime
+from pathlib import Path
+import hashlib
 import time
 import pandas as pd
 
 from config import config
-from database import db, test_connection
-from logic import hunter, copywriter, AICopywriter
+from pending_queue import PendingDraftQueue
+from video_table import VideoTable
+from edit_buffer import EmailEditBuffer
+from outbox_worker import OutboxWorker
+from email_service import is_junk_content
+from tracing import load_traces, summarize, tracer, waterfall_rows
+
+# =============================================
+# 캐시 (클라이언트 / 조회 결과)
+# =============================================
+# 클라이언트는 프로세스당 하나(cache_resource), 조회 결과는 TTL 캐시(cache_data)로 보관하고
+# 쓰기 직후에는 invalidate_data()로 비웁니다.
+# 캐시 키에 CODE_VERSION이 들어가므로 코드가 배포(수정)되면 자동으로 새로 만들어집니다.
+# 단, 스레드를 가진 리소스(작업 실행기, 변경 피드)는 버전과 무관하게 프로세스당 하나만 유지합니다.
+# (버전마다 새로 만들면 이전 인스턴스의 스레드가 남고, 같은 종류 작업이 두 실행기에서 동시에 돌 수 있음)
+
+def _code_version() -> str:
+    """배포 버전 키 (APP_VERSION이 없으면 소스 파일의 수정 시각/크기로 계산)"""
+    if config.APP_VERSION:
+        return config.APP_VERSION
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(Path(__file__).resolve().parent.glob("*.py")):
+        stat = path.stat()
+        digest.update(f"{path.name}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    return digest.hexdigest()
+
+CODE_VERSION = _code_version()
+
+
+@st.cache_resource(show_spinner=False)
+def get_clients(code_version: str):
+    """DB / YouTube / Gemini 클라이언트 (첫 실행 때 한 번만 생성)"""
+    from database import db
+    from logic import hunter, copywriter
+    return db, hunter, copywriter
+
+db, hunter, copywriter = get_clients(CODE_VERSION)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_connection_ok(code_version: str) -> bool:
+    from database import test_connection
+    return test_connection()
+
+
+@st.cache_data(ttl=config.CACHE_TTL_SECONDS, show_spinner=False)
+def cached_db_stats(code_version: str) -> dict:
+    """사이드바/시스템 관리 탭의 DB 현황"""
+    return {
+        "leads": db.get_lead_stats(),
+        "drafts": db.get_draft_stats(),
+        "videos": db.get_video_count(),
+    }
+
+
+@st.cache_data(ttl=config.CACHE_TTL_SECONDS, show_spinner=False)
+def cached_db_videos(code_version: str, limit: int = 50) -> list[dict]:
+    """DB 저장 영상 목록 + 채널 정보 (리드는 한 번에 조회)"""
+    videos = db.get_all_videos(limit=limit)
+    leads = db.get_leads_by_ids([v.get("lead_id") for v in videos])
+    return [{**v, "lead": leads.get(v.get("lead_id"))} for v in videos]
+
+
+@st.cache_data(ttl=config.CACHE_TTL_SECONDS, show_spinner=False)
+def cached_comment_drafts(code_version: str, limit: int = 20) -> list[dict]:
+    """댓글 초안 + 영상/리드 정보 (영상/리드는 각각 한 번에 조회)"""
+    drafts = db.get_all_drafts(draft_type="comment", limit=limit)
+    leads = db.get_leads_by_ids([d.get("lead_id") for d in drafts])
+    videos = db.get_videos_by_ids([d.get("video_id") for d in drafts])
+    return [
+        {"draft": d, "video": videos.get(d.get("video_id")), "lead": leads.get(d.get("lead_id"))}
+        for d in drafts
+    ]
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def cached_outbox(code_version: str) -> dict:
+    """발송 대기열 현황 (워커가 백그라운드에서 바꾸므로 TTL을 짧게)"""
+    stats = db.get_outbox_stats()
+    return {
+        "stats": stats,
+        "queued": db.get_outbox_items(status="queued") if stats.get("queued") else [],
+        "failed": db.get_outbox_items(status="failed") if stats.get("failed") else [],
+        "remaining_capacity": OutboxWorker(db).remaining_capacity(),
+    }
+
+
+def invalidate_data() -> None:
+    """DB에 쓴 직후 조회 캐시 비우기 (클라이언트 캐시는 유지)"""
+    cached_db_stats.clear()
+    cached_db_videos.clear()
+    cached_comment_drafts.clear()
+    cached_outbox.clear()
+
+
+@st.cache_resource(show_spinner=False)
+def get_job_manager():
+    """백그라운드 작업 실행기 (프로세스당 하나, 모든 세션/새로고침이 같은 작업을 봄)"""
+    from job_manager import JobManager
+    from pipeline import Pipeline
+    return JobManager(db, Pipeline(db, hunter, copywriter))
+
+jobs = get_job_manager()
+
+
+@st.cache_resource(show_spinner=False)
+def get_draft_feed():
+    """탭 2 대기 목록 변경 피드 (프로세스당 하나의 Realtime 구독/폴링을 모든 세션이 공유)"""
+    from pending_queue import create_feed
+    return create_feed(db)
 
 # =============================================
 # 커스텀 CSS
@@ -188,7 +293,8 @@ def save_keywords(keywords: str):
 # =============================================
 
 if "search_results" not in st.session_state:
-    st.session_state.search_results = []
+    # 검색 결과 (표시/분석에 필요한 컬럼만 보관하는 VideoTable)
+    st.session_state.search_results = VideoTable()
 if "saved_keywords" not in st.session_state:
     st.session_state.saved_keywords = load_saved_keywords()
 if "selected_video" not in st.session_state:
@@ -197,6 +303,132 @@ if "generated_drafts" not in st.session_state:
     st.session_state.generated_drafts = {}
 if "comment_versions" not in st.session_state:
     st.session_state.comment_versions = {}
+if "pending_queue" not in st.session_state:
+    # 이메일 발송 대기 목록 (현재 페이지 + 선택한 초안 본문, 변경 피드로 갱신)
+    st.session_state.pending_queue = PendingDraftQueue(db, feed=get_draft_feed())
+if "email_edits" not in st.session_state:
+    # 탭 1 이메일 수정 모음 (채널별로 합쳐서 일괄 저장)
+    st.session_state.email_edits = EmailEditBuffer(db)
+if "tracked_jobs" not in st.session_state:
+    # 이 화면이 결과를 기다리는 백그라운드 작업 (job_id -> 종류)
+    # 새로고침 후에도 실행 중인 작업에 다시 연결하고, 마지막 검색 결과를 복원
+    st.session_state.tracked_jobs = {}
+    st.session_state.job_notice = None
+    try:
+        for job in jobs.active():
+            st.session_state.tracked_jobs[job["id"]] = job["kind"]
+        if st.session_state.search_results.empty:
+            last_search = jobs.latest_result("search")
+            if last_search:
+                st.session_state.search_results = VideoTable.from_records((last_search.get("result") or {}).get("videos") or [])
+    except Exception as e:
+        print(f"Error reattaching jobs: {e}")
+
+# =============================================
+# 백그라운드 작업 (검색 / DB 동기화 / AI 분석)
+# =============================================
+
+JOB_LABELS = {"search": "🔍 영상 검색", "sync": "💾 DB 동기화", "analysis": "🤖 일괄 분석"}
+JOB_STATUS_ICONS = {"queued": "⏳", "running": "🔄", "succeeded": "✅", "failed": "❌", "cancelled": "⛔"}
+
+
+def submit_job(kind: str, params: dict) -> str:
+    """작업 제출 후 이 화면에서 추적"""
+    job_id = jobs.submit(kind, params)
+    st.session_state.tracked_jobs[job_id] = kind
+    return job_id
+
+
+def apply_job_result(job: dict) -> None:
+    """끝난 작업의 결과를 세션에 반영 (검색 결과 / 생성된 초안)"""
+    kind, result = job["kind"], job.get("result") or {}
+    notice = {"kind": kind, "status": job["status"], "message": job.get("message") or "", "error": job.get("error"), "details": []}
+
+    if job["status"] == "succeeded":
+        if kind == "search":
+            st.session_state.search_results = VideoTable.from_records(result.get("videos") or [])
+            notice["details"] = [f"📊 '{k}' YouTube 검색 결과: 약 {n:,}개" for k, n in (result.get("found") or {}).items() if n]
+            if result.get("sync_error"):
+                notice["details"].append(f"⚠️ DB 동기화 실패: {result['sync_error']}")
+                notice["retry_sync"] = job["id"]
+        elif kind == "analysis":
+            st.session_state.generated_drafts.update(result.get("drafts") or {})
+            notice["details"] = (
+                [f"⏭️ 자막 없음 (품질 저하 방지) - 건너뜀: {s['title']}" for s in result.get("skipped", [])]
+                + [f"❌ 오류: {e['title']} - {e['error']}" for e in result.get("errors", [])]
+            )
+            notice["drafts"] = len(result.get("drafts") or {})
+        invalidate_data()
+
+    st.session_state.job_notice = notice
+
+
+def render_job_notice() -> None:
+    """마지막으로 끝난 작업 결과 안내"""
+    notice = st.session_state.job_notice
+    if not notice:
+        return
+    label = JOB_LABELS.get(notice["kind"], notice["kind"])
+    if notice["status"] == "succeeded":
+        st.success(f"{label}: {notice['message']}")
+        if notice["kind"] == "analysis":
+            if notice.get("drafts"):
+                st.info("👉 **'✉️ 이메일 발송 관리'** 탭으로 이동하여 초안을 확인하세요.")
+            else:
+                st.warning("⚠️ 분석된 영상이 없습니다.")
+    elif notice["status"] == "cancelled":
+        st.warning(f"{label}: 취소됨")
+    else:
+        st.error(f"{label} 실패: {notice.get('error') or notice['message']}")
+    if notice["details"]:
+        with st.expander(f"상세 ({len(notice['details'])})"):
+            for line in notice["details"]:
+                st.caption(line)
+    col_retry, col_close = st.columns(2)
+    if notice.get("retry_sync") and col_retry.button("🔄 DB 동기화 재시도", key="retry_sync"):
+        submit_job("sync", {"search_job_id": notice["retry_sync"]})
+        st.session_state.job_notice = None
+        st.rerun()
+    if col_close.button("닫기", key="close_job_notice"):
+        st.session_state.job_notice = None
+        st.rerun()
+
+
+def job_panel() -> None:
+    """추적 중인 작업의 진행률 (JOB_POLL_SECONDS마다 이 영역만 다시 그림)"""
+    tracked = st.session_state.tracked_jobs
+    if not tracked:
+        return
+    try:
+        current = jobs.statuses(list(tracked))
+    except Exception as e:
+        st.caption(f"작업 상태 조회 실패: {e}")
+        return
+
+    finished = False
+    for job_id, kind in list(tracked.items()):
+        job = current.get(job_id)
+        if job is None or job["status"] in ("succeeded", "failed", "cancelled"):
+            # 끝난 작업: 결과를 세션에 반영하고 전체 화면을 다시 그림
+            del tracked[job_id]
+            full = jobs.get(job_id) if job else None
+            if full:
+                apply_job_result(full)
+            finished = True
+            continue
+
+        label = JOB_LABELS.get(kind, kind)
+        total = job.get("total") or 0
+        fraction = min(job.get("progress", 0) / total, 1.0) if total else 0.0
+        st.caption(f"{JOB_STATUS_ICONS.get(job['status'], '')} {label}")
+        st.progress(fraction, text=job.get("message") or "대기 중")
+        if st.button("⛔ 취소", key=f"cancel_{job_id}"):
+            if not jobs.cancel(job_id):
+                st.caption("다른 프로세스에서 실행 중인 작업은 여기서 취소할 수 없습니다.")
+
+    if finished:
+        st.rerun()
+
 
 # =============================================
 # 헤더
@@ -213,7 +445,31 @@ st.markdown("""
 # 사이드바
 # =============================================
 
-with st.sidebar:
+def flush_email_edits() -> None:
+    """탭 1에서 모아 둔 이메일 수정을 한 번에 저장"""
+    summary = st.session_state.email_edits.flush()
+    if summary["error"]:
+        st.toast(f"⚠️ 이메일 저장 실패 (잠시 후 다시 시도): {summary['error']}")
+        return
+    if summary["saved"]:
+        invalidate_data()
+        names = st.session_state.email_edits.channel_names
+        st.toast(f"✅ 저장됨: {', '.join(names.get(cid, cid) for cid in summary['saved'][:3])}"
+                 + (f" 외 {len(summary['saved']) - 3}건" if len(summary["saved"]) > 3 else ""), icon="💾")
+    if summary["missing"]:
+        st.toast(f"⚠️ DB에 없는 채널 {len(summary['missing'])}곳의 이메일은 저장하지 못했습니다.")
+
+
+@st.fragment(run_every=config.EDIT_FLUSH_SECONDS)
+def edit_flush_panel() -> None:
+    """마지막 이메일 수정 후 EDIT_FLUSH_SECONDS가 지나면 자동 저장 (탭 1을 다시 조작하지 않아도)"""
+    if st.session_state.email_edits.due():
+        flush_email_edits()
+
+
+@st.fragment
+def search_panel() -> None:
+    """검색 설정 + 검색 버튼 (설정을 바꿔도 사이드바의 이 영역만 다시 실행)"""
     st.markdown("## ⚙️ 검색 설정")
     
     # 키워드 입력 (저장된 값 불러오기)
@@ -236,7 +492,7 @@ with st.sidebar:
             default_kw = "사진 정리, 갤러리 정리, 용량 부족, 구글포토 백업"
             save_keywords(default_kw)
             st.session_state.saved_keywords = default_kw
-            st.rerun()
+            st.rerun(scope="fragment")
     
     st.markdown("---")
     
@@ -270,7 +526,6 @@ with st.sidebar:
     
     # 변수 매핑 (로직 연결용)
     published_after = current_strategy["days"]
-    min_relevance = current_strategy["min_rel"]
     
     with st.expander("📊 수집 양 설정 (일일 목표)", expanded=True):
         max_results = st.slider(
@@ -294,11 +549,13 @@ with st.sidebar:
 
     st.markdown("---")
     
-    # 검색 버튼
+    # 검색 버튼 (검색 + DB 동기화는 백그라운드 작업으로 실행 - 다른 화면을 조작해도 계속 진행)
+    search_running = "search" in st.session_state.tracked_jobs.values()
     search_clicked = st.button(
         "🚀 작전 개시 (영상 검색)",
         type="primary",
-        use_container_width=True
+        use_container_width=True,
+        disabled=search_running
     )
     
     if search_clicked:
@@ -309,65 +566,33 @@ with st.sidebar:
             st.info("`.env` 파일을 확인해주세요.")
         else:
             keywords = [k.strip() for k in keywords_input.split(",") if k.strip()]
-            
-            with st.spinner(f"🔍 '{selected_strategy_name.split()[0]}' 작전 수행 중..."):
-                try:
-                    all_videos = []
-                    progress_bar = st.progress(0)
-                    
-                    for i, keyword in enumerate(keywords):
-                        st.text(f"Scanning: {keyword}")
-                        videos, total_count = hunter.search_videos(
-                            keyword=keyword,
-                            max_results=max_results,
-                            published_after_days=published_after,
-                            min_view_count=min_view_count,
-                            require_email=require_email
-                        )
-                        
-                        if total_count > 0:
-                            st.caption(f"📊 YouTube 검색 결과: 약 {total_count:,}개의 영상이 발견되었습니다.")
+            try:
+                submit_job("search", {
+                    "keywords": keywords,
+                    "max_results": max_results,
+                    "published_after_days": published_after,
+                    "min_view_count": min_view_count,
+                    "require_email": require_email
+                })
+                st.toast(f"🔍 '{selected_strategy_name.split()[0]}' 작전 시작! (백그라운드 실행)")
+            except Exception as e:
+                import traceback
+                st.error(f"❌ 오류 발생: {str(e)}")
+                st.expander("상세 에러 로그 보기").code(traceback.format_exc())
+            else:
+                # 사이드바 작업 진행률이 바로 보이도록 전체 화면 다시 실행
+                st.rerun()
 
-                        
-                        for video in videos:
-                            # 검색 단계에서는 메타데이터만 수집 (자막은 분석 단계에서)
-                            # 자막 추출이 느리고 실패할 수 있어서 검색 속도 향상을 위해 제거
-                            video["transcript_text"] = ""  # 빈 값으로 초기화
-                            video["content_source"] = "not_fetched"
-                            
-                            # 채널 정보
-                            channel_info = hunter.get_channel_info(video["channel_id"])
-                            if channel_info:
-                                video["channel_info"] = channel_info
-                            
-                            all_videos.append(video)
-                        
-                        progress_bar.progress((i + 1) / len(keywords))
-                    
-                    # 🔍 60개 검색 결과 즉시 DB 저장 (Deep Search 완성)
-                    if all_videos:
-                        with st.spinner("💾 검색된 모든 영상을 DB에 동기화 중..."):
-                            saved_count = db.upsert_scanned_videos(all_videos)
-                            st.text(f"Synced {saved_count} videos to DB.")
-                    
-                    st.session_state.search_results = all_videos
-                    st.success(f"✅ {len(all_videos)}개 영상 수집 완료! (DB 동기화 완료)")
-                    
-                except Exception as e:
-                    import traceback
-                    st.error(f"❌ 오류 발생: {str(e)}")
-                    st.expander("상세 에러 로그 보기").code(traceback.format_exc())
-    
-    st.markdown("---")
-    
-    # DB 통계
-    st.markdown("### 📊 DB 현황")
-    
+
+@st.fragment(run_every=config.STATS_REFRESH_SECONDS)
+def stats_panel() -> None:
+    """DB 현황 (클릭할 때마다가 아니라 STATS_REFRESH_SECONDS마다 다시 그림)"""
     try:
-        if test_connection():
-            lead_stats = db.get_lead_stats()
-            draft_stats = db.get_draft_stats()
-            video_count = db.get_video_count()
+        if cached_connection_ok(CODE_VERSION):
+            db_stats = cached_db_stats(CODE_VERSION)
+            lead_stats = db_stats["leads"]
+            draft_stats = db_stats["drafts"]
+            video_count = db_stats["videos"]
             
             col1, col2 = st.columns(2)
             with col1:
@@ -381,6 +606,23 @@ with st.sidebar:
     except:
         st.info("DB 설정 필요")
 
+
+with st.sidebar:
+    search_panel()
+    
+    # 진행 중인 작업 / 마지막 작업 결과
+    if st.session_state.tracked_jobs:
+        st.markdown("### ⏳ 진행 중인 작업")
+    st.fragment(job_panel, run_every=config.JOB_POLL_SECONDS if st.session_state.tracked_jobs else None)()
+    render_job_notice()
+    
+    st.markdown("---")
+    
+    # DB 통계
+    st.markdown("### 📊 DB 현황")
+    stats_panel()
+    edit_flush_panel()
+
 # =============================================
 # 메인 탭
 # =============================================
@@ -396,7 +638,9 @@ tab1, tab2, tab3, tab4 = st.tabs([
 # 탭 1: 영상 리스트 & 분석
 # =============================================
 
-with tab1:
+@st.fragment
+def video_tab() -> None:
+    """탭 1: 영상 목록 / 일괄 분석 (이 탭 안의 조작은 이 영역만 다시 실행)"""
     st.markdown("### 📹 수집된 영상 목록")
     
     # 데이터 소스 선택
@@ -406,18 +650,17 @@ with tab1:
         horizontal=True
     )
     
-    videos_to_show = []
+    videos_to_show = VideoTable()
     
     if data_source == "🔍 검색 결과":
         videos_to_show = st.session_state.search_results
     else:
         try:
-            db_videos = db.get_all_videos(limit=50)
+            db_videos = cached_db_videos(CODE_VERSION)
+            db_records = []
             for v in db_videos:
-                lead = None
-                if v.get("lead_id"):
-                    lead = db.get_lead_by_id(v["lead_id"])
-                videos_to_show.append({
+                lead = v.get("lead")
+                db_records.append({
                     "video_id": v["video_id"],
                     "title": v["title"],
                     "channel_name": lead["channel_name"] if lead else "Unknown",
@@ -426,8 +669,6 @@ with tab1:
                     "published_at": v.get("upload_date", ""), # [FIX] UI 호환용 이름표 추가
                     "video_url": v.get("video_url", f"https://youtube.com/watch?v={v['video_id']}"),
                     "view_count": v.get("view_count", 0),
-                    "transcript_text": v.get("transcript_text", ""),
-                    "summary": v.get("summary", ""),
                     "relevance_score": v.get("relevance_score", 0),
                     "db_id": v["id"],
                     "channel_info": {
@@ -435,48 +676,22 @@ with tab1:
                         "email": lead.get("email") if lead else None
                     }
                 })
+            videos_to_show = VideoTable.from_records(db_records)
         except Exception as e:
             st.info("DB에 저장된 영상이 없습니다.")
     
     # 검색 결과 또는 DB 데이터가 있을 경우 (DataFrame View)
     st.markdown("### 📹 영상 목록")
     
-    if videos_to_show:
+    if not videos_to_show.empty:
         results = videos_to_show
         
-        # 1. DataFrame 변환 for 일괄 선택
-        video_data = []
-        for v in results:
-            # view_count 안전하게 처리
-            view_count = v.get('view_count', 0)
-            if isinstance(view_count, str):
-                view_count = int(view_count.replace(',', '')) if view_count.replace(',', '').isdigit() else 0
-            
-            # 이메일 추출 (직접 수정 가능하도록 텍스트로 표시)
-            ch_info = v.get("channel_info") or {}
-            email_addr = ch_info.get("email") or ""
-            
-            publisher = v.get("published_at", "")
-            pub_date = publisher[:10] if publisher else ""
-
-            video_data.append({
-                "선택": False,
-                "썸네일": v.get("thumbnail_url", ""),
-                "제목": v.get("title", "No Title"),
-                "이메일": email_addr, # [NEW] 직접 편집 가능
-                "채널명": v.get("channel_name", "Unknown"),
-                "게시일": pub_date,
-                "조회수": f"{view_count:,}",
-                "링크": v.get("video_url", ""),
-                "video_id": v.get("video_id", ""),
-                "raw_data": v # 전체 데이터 보존 (참조용)
-            })
-            
-        df_videos = pd.DataFrame(video_data)
+        # 1. DataFrame 변환 for 일괄 선택 (컬럼 단위 변환, 인덱스: video_id)
+        df_videos = results.editor_frame()
         
         # 2. 선택 가능한 테이블 표시
         st.caption(f"총 {len(results)}개의 영상을 찾았습니다.")
-        st.info("💡 **Tip**: '이메일' 칸을 클릭하여 바로 수정할 수 있습니다. 자동으로 저장됩니다.")
+        st.info("💡 **Tip**: '이메일' 칸을 클릭하여 바로 수정할 수 있습니다. 채널별로 모아서 잠시 후 자동으로 저장됩니다.")
         
         edited_videos = st.data_editor(
             df_videos,
@@ -488,8 +703,6 @@ with tab1:
                 "조회수": st.column_config.TextColumn("조회수", width="small"),
                 "게시일": st.column_config.TextColumn("게시일", width="small"),
                 "링크": st.column_config.LinkColumn("링크", display_text="보기", width="small"),
-                "video_id": None, # 숨김
-                "raw_data": None  # 숨김
             },
             hide_index=True,
             use_container_width=True,
@@ -497,36 +710,28 @@ with tab1:
             key="video_editor"
         )
         
-        # 3. 데이터 변경 감지 및 자동 저장 (Auto-Save)
-        if st.session_state.video_editor.get("edited_rows"):
-            changes = st.session_state.video_editor["edited_rows"]
-            
-            # 변경된 행 처리
-            for idx_str, updated_cols in changes.items():
-                if "이메일" in updated_cols:
-                    new_email = updated_cols["이메일"]
-                    try:
-                        idx = int(idx_str)
-                        # 원본 데이터 매칭
-                        target_v = video_data[idx]["raw_data"]
-                        channel_id = target_v["channel_id"]
-                        
-                        # DB 업데이트
-                        lead = db.get_lead_by_channel_id(channel_id)
-                        if lead:
-                            db.update_lead(lead["id"], email=new_email)
-                            
-                            # 세션 상태(메모리)도 동기화하여 UI 즉시 반영
-                            # (주의: search_results 내의 모든 해당 채널 영상 업데이트)
-                            for vid in st.session_state.search_results:
-                                if vid["channel_id"] == channel_id:
-                                    if "channel_info" not in vid: vid["channel_info"] = {}
-                                    vid["channel_info"]["email"] = new_email
-                            
-                            st.toast(f"✅ 저장됨: {target_v['channel_name']}", icon="💾")
-                            
-                    except Exception as e:
-                        print(f"Update error: {e}")
+        # 3. 이메일 수정 -> 채널별 수정 모음에 추가 (DB 저장은 모아서 한 번에, 사이드바 타이머가 자동 저장)
+        # edited_rows는 다시 실행될 때마다 같은 내용이 들어오므로 이미 반영한 수정은 stage()에서 무시
+        email_edits = st.session_state.email_edits
+        for idx_str, updated_cols in (st.session_state.video_editor.get("edited_rows") or {}).items():
+            if "이메일" not in updated_cols:
+                continue
+            video = results.row(df_videos.index[int(idx_str)])
+            if not video or not video["channel_id"]:
+                continue
+            if email_edits.stage(video["channel_id"], updated_cols["이메일"], video["channel_name"]):
+                # 세션 상태(메모리)도 동기화하여 UI 즉시 반영 (같은 채널의 모든 영상, channel_id 인덱스)
+                results.set_channel_email(video["channel_id"], updated_cols["이메일"])
+                if results is not st.session_state.search_results:
+                    st.session_state.search_results.set_channel_email(video["channel_id"], updated_cols["이메일"])
+        
+        if len(email_edits):
+            col_edit_msg, col_edit_save = st.columns([3, 1])
+            with col_edit_msg:
+                st.caption(f"✏️ 저장 대기 중인 이메일 수정 {len(email_edits)}건 (잠시 후 자동 저장)")
+            with col_edit_save:
+                if st.button("💾 지금 저장", key="flush_email_edits", use_container_width=True) or email_edits.due():
+                    flush_email_edits()
                         
         # 4. 일괄 분석 버튼
         selected_rows = edited_videos[edited_videos["선택"]]
@@ -536,218 +741,240 @@ with tab1:
             col_action, col_msg = st.columns([1, 2])
             
             with col_action:
-                if st.button(f"🚀 선택한 {len(selected_rows)}개 영상 일괄 분석", type="primary", use_container_width=True):
-                    
-                    pass
-                    
-                    progress_bar = st.progress(0)
-                    status_area = st.empty()
-                    
-                    success_count = 0
-                    
-                    for idx, row in enumerate(selected_rows.itertuples()):
-                        vid = row.video_id
-                        # 원본 데이터에서 조회 (DataFrame 데이터 무결성 보장)
-                        video = next((v for v in results if v["video_id"] == vid), None)
-                        
-                        if not video:
-                            status_area.error(f"❌ 데이터 매칭 실패: ID {vid}")
-                            time.sleep(1)
-                            continue
-                            
-                        v_title = video["title"]
-                        
-                        # 진행률 업데이트
-                        progress = (idx + 1) / len(selected_rows)
-                        progress_bar.progress(progress)
-                        
-                        try:
-                            # -----------------------------------------------
-                            # [스마트 로직] DB 중복 확인 (비용 절약)
-                            # -----------------------------------------------
-                            if db.video_exists(vid):
-                                # A. 이미 분석된 경우 -> DB에서 로드 (비용 0원)
-                                status_area.info(f"💾 [DB 로드] '{v_title}' (비용 0원)")
-                                time.sleep(0.5) # UI 반영을 위한 짧은 대기
-                                
-                                # DB에서 데이터 가져오기
-                                db_video = db.get_video_by_video_id(vid)
-                                db_drafts = db.get_drafts_by_video(db_video["id"])
-                                
-                                email_content = ""
-                                comment_content = ""
-                                
-                                for d in db_drafts:
-                                    if d["draft_type"] == "email":
-                                        email_content = d["content"]
-                                    elif d["draft_type"] == "comment":
-                                        comment_content = d["content"]
-                                
-                                # 세션에 로드
-                                st.session_state.generated_drafts[vid] = {
-                                    "video": video,
-                                    "email": email_content,
-                                    "comment": comment_content,
-                                    "summary": db_video.get("summary", ""),
-                                    "relevance": {"score": db_video.get("relevance_score", 0)},
-                                    "db_id": next((d["id"] for d in db_drafts if d["draft_type"] == "email"), "") 
-                                }
-                                success_count += 1
-                                
-                            else:
-                                # B. 새로운 영상 -> AI 분석 (비용 발생)
-                                status_area.warning(f"🤖 [AI 분석] '{v_title}' 분석 중...")
-                                
-                                # 1. 자막 추출 (자막 없으면 스킵 - 사용자 요청: 설명글 대체 금지)
-                                transcript = hunter.get_transcript(vid)
-                                
-                                if not transcript:
-                                    st.toast(f"⏭️ 자막 없음 (품질 저하 방지) - 건너뜀: {v_title}", icon="⚠️")
-                                    continue
-                                
-                                content = transcript[:15000]  # 길이 제한
-                                
-                                # 2. 적합성 분석 (생략 - 무조건 통과)
-                                relevance = {"score": 100, "reason": "Keyword Search Match"}
-                                
-                                # 2. 적합성 분석 (생략 - 무조건 통과)
-                                relevance = {"score": 100, "reason": "Keyword Search Match"}
-                                
-                                # 3. 이메일 & 댓글 생성
-                                email = copywriter.generate_email(
-                                    channel_name=video["channel_name"],
-                                    video_title=video["title"],
-                                    video_content=content,
-                                    subscriber_count=(video.get("channel_info") or {}).get("subscriber_count", 0)
-                                )
-                                comment = copywriter.generate_comment(
-                                    channel_name=video["channel_name"],
-                                    video_title=video["title"],
-                                    video_content=content
-                                )
-                                summary = copywriter.summarize_video(content)
-                                
-                                # 4. DB 저장
-                                # (1) 리드 저장
-                                existing_lead = db.get_lead_by_channel_id(video["channel_id"])
-                                if existing_lead:
-                                    lead_id = existing_lead["id"]
-                                else:
-                                    lead = db.create_lead(
-                                        channel_name=video["channel_name"],
-                                        channel_id=video["channel_id"],
-                                        subscriber_count=(video.get("channel_info") or {}).get("subscriber_count", 0),
-                                        email=(video.get("channel_info") or {}).get("email"),
-                                        keywords=[video.get("search_keyword", "")],
-                                    )
-                                    lead_id = lead["id"]
-                                
-                                # (2) 영상 저장
-                                saved_video = db.create_video(
-                                    video_id=vid,
-                                    title=v_title,
-                                    lead_id=lead_id,
-                                    view_count=int(str(video["view_count"]).replace(",", "")), # 콤마 제거
-                                    video_url=video["video_url"],
-                                    thumbnail_url=video["thumbnail_url"],
-                                    transcript_text=content,
-                                    summary=summary,
-                                    relevance_score=relevance["score"],
-                                    search_keyword=video.get("search_keyword", "")
-                                )
-                                video_db_id = saved_video["id"]
-                                
-                                # (3) 초안 저장
-                                email_draft = db.create_draft(
-                                    draft_type="email",
-                                    content=email,
-                                    video_id=video_db_id,
-                                    lead_id=lead_id
-                                )
-                                db.create_draft(
-                                    draft_type="comment",
-                                    content=comment,
-                                    video_id=video_db_id,
-                                    lead_id=lead_id
-                                )
-                                
-                                # 세션 업데이트
-                                st.session_state.generated_drafts[vid] = {
-                                    "video": video,
-                                    "email": email,
-                                    "comment": comment,
-                                    "summary": summary,
-                                    "relevance": relevance,
-                                    "db_id": email_draft["id"]
-                                }
-                                success_count += 1
-                                
-                        except Exception as e:
-                            print(f"Error processing {vid}: {e}")
-                            st.error(f"❌ 오류 상세: {e}")
-                            
-                    status_area.empty()
-                    if success_count > 0:
-                        st.success(f"✅ 총 {success_count}개 영상 분석 완료! \n\n👉 **'✉️ 이메일 발송 관리'** 탭으로 이동하여 초안을 확인하세요.")
-                        st.balloons()
-                    else:
-                        st.warning("⚠️ 분석된 영상이 없습니다.")
+                analysis_running = "analysis" in st.session_state.tracked_jobs.values()
+                if st.button(
+                    f"🚀 선택한 {len(selected_rows)}개 영상 일괄 분석",
+                    type="primary",
+                    use_container_width=True,
+                    disabled=analysis_running
+                ):
+                    # 분석은 백그라운드 작업으로 실행 (진행률은 사이드바, 완료되면 초안이 세션에 반영됨)
+                    # 이미 분석된 영상은 작업 안에서 DB의 초안을 그대로 사용 (비용 0원)
+                    targets = results.records(list(selected_rows.index))
+                    if targets:
+                        submit_job("analysis", {"videos": targets})
+                        # 사이드바 작업 진행률이 보이도록 전체 화면 다시 실행
+                        st.rerun()
+            
+            with col_msg:
+                if analysis_running:
+                    st.info("🤖 일괄 분석이 진행 중입니다. 다른 작업을 계속해도 됩니다. (진행률: 사이드바)")
 
     else:
         st.info("👈 왼쪽 사이드바에서 키워드를 입력하고 검색을 시작하세요.")
     
     st.markdown("---")
 
+
+with tab1:
+    video_tab()
+
 # =============================================
 # 탭 2: 이메일 발송 관리
 # =============================================
 
-with tab2:
+# 탭 2 대기 목록 필터 (선택지 -> PendingDraftQueue.set_filters 값)
+PENDING_EMAIL_FILTERS = {"전체": None, "있음": True, "없음": False}
+PENDING_JUNK_FILTERS = {"전체": None, "정상만": False, "오류만": True}
+PENDING_AGE_FILTERS = {  # (newer_than_days, older_than_days)
+    "전체": (None, None),
+    "24시간 이내": (1, None),
+    "7일 이내": (7, None),
+    f"{config.RETENTION_PENDING_DRAFT_DAYS}일 이상 지남": (None, config.RETENTION_PENDING_DRAFT_DAYS),
+}
+
+
+@st.fragment
+def email_tab() -> None:
+    """탭 2: 발송 대기열 / 대기 초안 (이 탭 안의 조작은 이 영역만 다시 실행)"""
     st.markdown("### ✉️ 이메일 발송 관리")
     
-    # 1. 대기 중인 초안 로드
-    pending_drafts = db.get_pending_email_drafts_detailed()
+    # 0. 발송 대기열 (outbox) 현황 - 실제 발송은 outbox_worker가 백그라운드에서 처리
+    outbox_worker = OutboxWorker(db)
+    outbox = cached_outbox(CODE_VERSION)
+    outbox_stats = outbox["stats"]
+    sent_capacity = outbox["remaining_capacity"]
     
-    if not pending_drafts:
-        st.info("🎉 전송 대기 중인 이메일이 없습니다!")
+    ob1, ob2, ob3, ob4 = st.columns(4)
+    ob1.metric("📤 발송 대기", outbox_stats.get("queued", 0) + outbox_stats.get("sending", 0))
+    ob2.metric("❌ 발송 실패", outbox_stats.get("failed", 0))
+    ob3.metric("📨 24시간 발송", f"{config.EMAIL_DAILY_CAP - sent_capacity} / {config.EMAIL_DAILY_CAP}")
+    with ob4:
+        if st.button("📤 대기열 지금 발송", use_container_width=True, disabled=sent_capacity <= 0):
+            outbox_progress = st.progress(0, text="발송 준비 중...")
+            
+            def _on_outbox_progress(done, total, summary):
+                outbox_progress.progress(done / total, text=f"발송 중... ({done}/{total})")
+            
+            summary = outbox_worker.run_once(on_progress=_on_outbox_progress)
+            outbox_progress.empty()
+            invalidate_data()
+            if summary["error"]:
+                st.warning(f"⚠️ {summary['error']}")
+            else:
+                st.toast(f"✅ 발송 {summary['sent']}건, 재시도 대기 {summary['retry']}건, 실패 {summary['failed']}건")
+    
+    queued_items = outbox["queued"]
+    if queued_items:
+        scheduler = outbox_worker.scheduler
+        with st.expander(f"🗓️ 발송 일정 ({len(queued_items)})"):
+            if scheduler.enabled:
+                st.caption(f"발송 시간대 {config.SEND_WINDOWS} ({config.SEND_TIMEZONE}) · 하루 최대 {config.SEND_DAILY_QUOTA}건 · 같은 도메인 {int(config.SEND_DOMAIN_SPACING_SECONDS)}초 간격")
+                if st.button("🔁 현재 설정으로 일정 다시 배정", key="outbox_reschedule"):
+                    rescheduled = scheduler.reschedule_all()
+                    invalidate_data()
+                    st.toast(f"🗓️ {rescheduled}건의 발송 일정을 다시 배정했습니다.")
+                    st.rerun(scope="fragment")
+            for item in queued_items:
+                slot = datetime.fromisoformat(item["next_attempt_at"].replace("Z", "+00:00")).astimezone(scheduler.tz)
+                st.caption(f"{slot.strftime('%m/%d %H:%M')} · {item['to_email']} · {item.get('subject', '')}")
+    
+    failed_items = outbox["failed"]
+    if failed_items:
+        with st.expander(f"❌ 발송 실패 목록 ({len(failed_items)})"):
+            for item in failed_items:
+                st.caption(f"{item['to_email']} · {item.get('subject', '')} · 시도 {item.get('attempts', 0)}회 · {item.get('last_error', '')}")
+    
+    # 1. 대기 중인 초안 목록 (필터/페이지 단위 서버 조회, 본문은 선택한 초안만 로드)
+    pending_queue = st.session_state.pending_queue
+    pending_queue.sync()
+    
+    f1, f2, f3, f4 = st.columns([2, 1, 1, 1])
+    with f1:
+        pending_channel = st.text_input("채널명 필터", key="pending_channel", placeholder="비우면 전체")
+    with f2:
+        pending_email = st.selectbox("이메일", list(PENDING_EMAIL_FILTERS), key="pending_email")
+    with f3:
+        pending_junk = st.selectbox("오류 초안", list(PENDING_JUNK_FILTERS), key="pending_junk")
+    with f4:
+        pending_age = st.selectbox("작성일", list(PENDING_AGE_FILTERS), key="pending_age")
+    
+    newer_days, older_days = PENDING_AGE_FILTERS[pending_age]
+    pending_queue.set_filters(
+        channel=pending_channel.strip(),
+        has_email=PENDING_EMAIL_FILTERS[pending_email],
+        junk=PENDING_JUNK_FILTERS[pending_junk],
+        newer_than_days=newer_days,
+        older_than_days=older_days
+    )
+    pending_items = pending_queue.page()
+    
+    # 2. 일괄 발송 (필터된 대기 초안 전체, 채널당 1통 / 오류 초안 제외)
+    if pending_items:
+        with st.expander("📦 일괄 발송"):
+            # 필터에 맞는 초안 전체 조회는 버튼을 눌렀을 때만 (화면을 다시 그릴 때마다 내려받지 않음)
+            bulk_targets = pending_queue.send_targets()
+            if bulk_targets is None:
+                st.caption(f"필터에 맞는 대기 초안 {pending_queue.total}건에서 채널당 1통씩 발송 대상을 계산합니다.")
+                if st.button("🧮 발송 대상 계산", key="bulk_preview"):
+                    pending_queue.calculate_send_targets()
+                    st.rerun(scope="fragment")
+            elif pending_queue.targets_stale:
+                st.caption("⚠️ 계산한 뒤 대기 목록이 바뀌었습니다. 발송할 때 상태를 다시 확인하며, 최신 대상은 다시 계산하세요.")
+                if st.button("🔄 발송 대상 다시 계산", key="bulk_recalc"):
+                    pending_queue.calculate_send_targets()
+                    st.rerun(scope="fragment")
+            
+            # 미리보기: 목록은 최신순이므로 채널/주소별로 가장 최근 초안만 남음
+            bulk_ids, bulk_seen = [], set()
+            bulk_junk = bulk_no_email = bulk_dup = 0
+            for d in bulk_targets or []:
+                to_addr = (d.get("leads") or {}).get("email")
+                if d.get("is_junk"):
+                    bulk_junk += 1
+                elif not to_addr:
+                    bulk_no_email += 1
+                elif to_addr in bulk_seen or (d.get("lead_id") and d["lead_id"] in bulk_seen):
+                    bulk_dup += 1
+                else:
+                    bulk_seen.update(key for key in (to_addr, d.get("lead_id")) if key)
+                    bulk_ids.append(d["id"])
+            if bulk_targets is not None:
+                st.caption(f"발송 대상 {len(bulk_ids)}건 · 오류 초안 {bulk_junk}건 · 이메일 없음 {bulk_no_email}건 · 같은 채널 중복 {bulk_dup}건 제외")
+            
+            send_now = st.checkbox("발송 일정 무시하고 지금 발송", key="bulk_send_now", help="체크하지 않으면 발송 일정(시간대/일일 쿼터)에 맞춰 순차 발송됩니다.")
+            if st.button(f"🚀 {len(bulk_ids)}건 일괄 발송", type="primary", disabled=not bulk_ids, key="bulk_send"):
+                result = outbox_worker.enqueue_drafts(bulk_ids, schedule=not send_now)
+                invalidate_data()
+                for draft_id in result["queued"]:
+                    pending_queue.remove(draft_id)
+                pending_queue.clear_send_targets()
+                
+                if send_now and result["queued"]:
+                    bulk_progress = st.progress(0, text="발송 준비 중...")
+                    bulk_status = st.empty()
+                    totals = {"sent": 0, "retry": 0, "failed": 0}
+                    
+                    def _on_bulk_progress(done, total, summary):
+                        bulk_progress.progress(done / total, text=f"발송 중... ({done}/{total})")
+                        bulk_status.caption(f"✅ {totals['sent'] + summary['sent']} · 🔁 {totals['retry'] + summary['retry']} · ❌ {totals['failed'] + summary['failed']}")
+                    
+                    # 대기열이 빌 때까지 배치 반복 (SMTP 연결 풀 크기만큼 동시 발송)
+                    while True:
+                        summary = outbox_worker.run_once(on_progress=_on_bulk_progress, concurrency=config.SMTP_POOL_SIZE)
+                        for key in totals:
+                            totals[key] += summary[key]
+                        if summary["error"] or not summary["claimed"]:
+                            break
+                    bulk_progress.empty()
+                    invalidate_data()
+                    if summary["error"]:
+                        st.warning(f"⚠️ {summary['error']}")
+                    st.success(f"✅ 발송 {totals['sent']}건, 재시도 대기 {totals['retry']}건, 실패 {totals['failed']}건 (건너뜀 {len(result['skipped'])}건)")
+                else:
+                    st.success(f"📤 {len(result['queued'])}건을 발송 대기열에 추가했습니다. (건너뜀 {len(result['skipped'])}건)")
+    
+    if not pending_items:
+        if pending_queue.filters:
+            st.info("🔍 필터에 맞는 대기 중인 이메일이 없습니다.")
+        else:
+            st.info("🎉 전송 대기 중인 이메일이 없습니다!")
     else:
         # Layout: Left (List) vs Right (Detail)
         col_list, col_detail = st.columns([1, 2])
         
         with col_list:
-            st.markdown(f"**📌 대기 목록 ({len(pending_drafts)})**")
+            col_title, col_refresh = st.columns([3, 1])
+            with col_title:
+                st.markdown(f"**📌 대기 목록 ({pending_queue.total})**")
+            with col_refresh:
+                if st.button("🔄", key="pending_refresh", help="대기 목록 전체 다시 불러오기"):
+                    pending_queue.load()
+                    st.rerun(scope="fragment")
             
-            # 리스트 아이템 생성
-            options = {}
-            for d in pending_drafts:
-                lead = d.get("leads", {}) or {}
-                ch_name = lead.get("channel_name", "Unknown")
-                
-                # 라벨링 (실제 에러 메시지만 감지)
-                content = d.get("content") or ""
-                is_error = (
-                    content.strip() == "" or 
-                    content.startswith("[AI 에러]") or 
-                    content.startswith("[오류]") or
-                    "404 models/" in content
-                )
-                label_icon = "⚠️" if is_error else "📄"
-                
-                # 유니크한 키 생성을 위해 ID 일부 포함
-                label = f"{label_icon} {ch_name}"
-                options[label] = d
+            # 현재 페이지만 라벨링 (오류 여부는 DB의 is_junk, 본문은 읽지 않음)
+            labels = {}
+            for d in pending_items:
+                ch_name = (d.get("leads") or {}).get("channel_name", "Unknown")
+                labels[d["id"]] = f"{'⚠️' if d.get('is_junk') else '📄'} {ch_name}"
             
-            selected_label = st.radio(
+            selected_id = st.radio(
                 "보낼 채널 선택",
-                options=list(options.keys()),
+                options=list(labels.keys()),
+                format_func=labels.get,
                 label_visibility="collapsed",
                 key="draft_selector"
             )
             
-            selected_draft = options[selected_label]
-
+            if pending_queue.page_count > 1:
+                p1, p2, p3 = st.columns([1, 2, 1])
+                with p1:
+                    if st.button("◀", key="pending_prev", disabled=pending_queue.page_index == 0):
+                        pending_queue.set_page(pending_queue.page_index - 1)
+                        st.rerun(scope="fragment")
+                with p2:
+                    st.caption(f"{pending_queue.page_index + 1} / {pending_queue.page_count} 페이지")
+                with p3:
+                    if st.button("▶", key="pending_next", disabled=pending_queue.page_index + 1 >= pending_queue.page_count):
+                        pending_queue.set_page(pending_queue.page_index + 1)
+                        st.rerun(scope="fragment")
+        
         with col_detail:
-            if selected_draft:
+            # 선택한 초안만 본문 로드 (다른 곳에서 발송/삭제되었으면 None)
+            selected_draft = pending_queue.get(selected_id) if selected_id else None
+            if not selected_draft:
+                st.info("선택한 초안이 더 이상 대기 중이 아닙니다. 🔄 버튼으로 목록을 새로고침하세요.")
+            else:
                 d = selected_draft
                 lead = d.get("leads", {}) or {}
                 to_email = lead.get('email')
@@ -762,12 +989,7 @@ with tab2:
                 content = d.get("content") or ""
                 
                 # 오류 데이터 시각적 경고 (실제 에러 메시지만 감지)
-                is_junk = (
-                    content.strip() == "" or 
-                    content.startswith("[AI 에러]") or 
-                    content.startswith("[오류]") or
-                    "404 models/" in content
-                )
+                is_junk = is_junk_content(content)
                 if is_junk:
                     st.error("🚨 AI 생성 중 오류가 발생한 데이터입니다. 삭제해주세요.")
                 
@@ -783,53 +1005,52 @@ with tab2:
                 c1, c2, c3 = st.columns([2, 1, 1])
                 
                 with c1:
-                    from email_service import emailer
-                    
-                    # 제목 추출 로직
-                    lines = edited_content.split('\n')
-                    subject = "Bes2 제안"
-                    body = edited_content
-                    for line in lines:
-                        if "제목:" in line or "Subject:" in line:
-                            subject = line.replace("제목:", "").replace("Subject:", "").strip()
-                            break
-                            
-                    btn_label = "🚀 이메일 전송"
+                    btn_label = "🚀 발송 대기열에 추가"
                     if config.TEST_MODE:
                         btn_label += " (테스트 모드)"
                         
                     if st.button(btn_label, type="primary", use_container_width=True, key=f"snd_{d['id']}", disabled=not to_email or is_junk):
-                        if config.TEST_MODE:
-                            st.toast(f"🧪 테스트 발송: {config.TEST_EMAIL}")
+                        if edited_content != content:
+                            db.update_draft_content(d['id'], edited_content)
                         
-                        if emailer.send_email(to_email, subject, edited_content):
-                            db.update_draft_status(d['id'], "sent")
-                            st.success("✅ 전송 완료!")
-                            st.balloons()
-                            time.sleep(1)
-                            st.rerun()
+                        # 초안 approved + outbox queued, 실제 발송/상태 변경은 워커가 처리
+                        result = outbox_worker.enqueue_drafts([d['id']])
+                        invalidate_data()
+                        if result["queued"]:
+                            pending_queue.remove(d['id'])
+                            if outbox_worker.scheduler.enabled:
+                                st.toast("📤 발송 대기열에 추가되었습니다. (발송 일정에 맞춰 발송)", icon="✅")
+                            else:
+                                st.toast("📤 발송 대기열에 추가되었습니다.", icon="✅")
+                            st.rerun(scope="fragment")
                         else:
-                            st.error("전송 실패. 설정을 확인하세요.")
+                            st.error(f"대기열 추가 실패: {result['skipped'].get(d['id'], '알 수 없는 오류')}")
 
                 with c2:
                     if st.button("💾 저장", use_container_width=True, key=f"sav_{d['id']}"):
                          db.update_draft_content(d['id'], edited_content)
+                         pending_queue.update_content(d['id'], edited_content)
                          st.toast("✅ 내용이 저장되었습니다.")
-                         time.sleep(0.5)
-                         st.rerun()
                          
                 with c3:
                     if st.button("🗑️ 삭제", type="secondary", use_container_width=True, key=f"del_{d['id']}"):
                         db.delete_draft(d['id'])
+                        invalidate_data()
+                        pending_queue.remove(d['id'])
                         st.toast("🗑️ 삭제되었습니다.")
-                        time.sleep(0.5)
-                        st.rerun()
+                        st.rerun(scope="fragment")
+
+
+with tab2:
+    email_tab()
 
 # =============================================
 # 탭 3: 댓글/커뮤니티 마케팅
 # =============================================
 
-with tab3:
+@st.fragment
+def comment_tab() -> None:
+    """탭 3: 댓글 / 커뮤니티 글 생성 (이 탭 안의 조작은 이 영역만 다시 실행)"""
     st.markdown("### 💬 댓글 & 커뮤니티 마케팅")
     
     drafts = st.session_state.generated_drafts
@@ -837,11 +1058,10 @@ with tab3:
     if not drafts:
         # DB에서 댓글 초안 가져오기
         try:
-            db_drafts = db.get_all_drafts(draft_type="comment", limit=20)
+            db_drafts = cached_comment_drafts(CODE_VERSION)
             if db_drafts:
-                for draft in db_drafts:
-                    video = db.get_video_by_id(draft["video_id"]) if draft.get("video_id") else None
-                    lead = db.get_lead_by_id(draft["lead_id"]) if draft.get("lead_id") else None
+                for item in db_drafts:
+                    draft, video, lead = item["draft"], item["video"], item["lead"]
                     
                     if video and lead:
                         vid = video["video_id"]
@@ -851,7 +1071,7 @@ with tab3:
                                     "title": video["title"],
                                     "channel_name": lead["channel_name"],
                                     "video_id": vid,
-                                    "transcript_text": video.get("transcript_text", "")
+                                    "db_id": video["id"]  # 자막은 댓글 생성 시에만 로드
                                 },
                                 "comment": draft["content"]
                             }
@@ -884,6 +1104,8 @@ with tab3:
                 if st.button("🎨 3가지 버전 댓글 생성", type="primary", use_container_width=True):
                     with st.spinner("AI가 다양한 버전의 댓글을 생성 중..."):
                         content = video_info.get("transcript_text", "")
+                        if not content and video_info.get("db_id"):
+                            content = db.get_video_content(video_info["db_id"])["transcript_text"]
                         
                         versions = {}
                         
@@ -1064,24 +1286,28 @@ with tab3:
                         st.code(community_text, language=None)
                         st.success("👆 위 내용을 드래그해서 복사하세요!")
 
+
+with tab3:
+    comment_tab()
+
 # =============================================
 # 탭 4: 시스템 진단 (Debug)
 # =============================================
 
-with tab4:
+@st.fragment
+def system_tab() -> None:
+    """탭 4: 시스템 관리 (이 탭 안의 조작은 이 영역만 다시 실행)"""
     st.markdown("### ⚙️ 데이터베이스 & 시스템 관리")
     
     # 1. 시스템 현황 대시보드
     col1, col2, col3 = st.columns(3)
     
     try:
-        stats_lead = db.get_lead_stats()
+        db_stats = cached_db_stats(CODE_VERSION)
+        stats_lead = db_stats["leads"]
+        stats_draft = db_stats["drafts"]
     except Exception:
         stats_lead = {"total": "-", "new": "-"}
-        
-    try:
-        stats_draft = db.get_draft_stats()
-    except Exception:
         stats_draft = {"email": {"pending": 0, "sent": 0}}
     
     with col1:
@@ -1106,23 +1332,51 @@ with tab4:
     
     # 3. DB 데이터 정리 (Cleanup)
     st.markdown("#### 🗑️ 데이터 정리")
-    st.caption("오래된 임시 데이터(대기 중인 초안)를 삭제하여 DB 용량을 확보합니다. (발송 완료된 데이터는 보존됩니다)")
+    st.caption("오래된 데이터를 청크 단위로 삭제/보관하여 DB 용량을 확보합니다. (발송 완료된 데이터는 보존됩니다)")
+    
+    from retention import RetentionRunner, default_policies
     
-    if st.button("🧹 7일 이상 지난 대기 데이터 삭제", type="secondary"):
+    policies = default_policies()
+    with st.expander("📋 보존 정책 보기"):
+        for p in policies:
+            action = "보관 후 삭제" if p["action"] == "archive" else "삭제"
+            st.markdown(f"- **{p['label']}** (`{p['table']}`): {p['days']}일 경과 시 {action}")
+        st.caption(f"보관 파일: `{config.RETENTION_ARCHIVE_DIR}/` (gzip JSONL) · 예약 실행: `python retention.py`")
+    
+    col_pending, col_all = st.columns(2)
+    run_names = None
+    with col_pending:
+        if st.button(f"🧹 {config.RETENTION_PENDING_DRAFT_DAYS}일 이상 지난 대기 데이터 삭제", type="secondary", use_container_width=True):
+            run_names = ["pending_drafts"]
+    with col_all:
+        if st.button("📦 전체 보존 정책 실행", use_container_width=True):
+            run_names = [p["name"] for p in policies]
+    
+    if run_names:
+        progress_bar = st.progress(0)
+        progress_text = st.empty()
+        
+        def show_progress(policy, processed, total):
+            progress_bar.progress(processed / total if total else 1.0)
+            progress_text.caption(f"{policy['label']}: {processed}/{total}")
+        
         try:
-            # 7일 전 날짜 계산
-            cutoff_date = (datetime.utcnow() - timedelta(days=7)).isoformat()
-            
-            # 삭제 쿼리 (status='pending' AND created_at < 7 days ago)
-            response = db.client.table("drafts").delete().eq("status", "pending").lt("created_at", cutoff_date).execute()
+            results = RetentionRunner().run(names=run_names, on_progress=show_progress)
+            invalidate_data()
+            progress_bar.empty()
+            progress_text.empty()
             
-            deleted_count = len(response.data) if response.data else 0
+            deleted_count = sum(r.get("deleted", 0) for r in results.values())
+            errors = {name: r["error"] for name, r in results.items() if "error" in r}
             
+            for name, error in errors.items():
+                st.error(f"데이터 정리 중 오류 발생 ({name}): {error}")
             if deleted_count > 0:
-                st.success(f"✅ 총 {deleted_count}개의 오래된 임시 데이터를 삭제했습니다.")
-                time.sleep(1)
-                st.rerun()
-            else:
+                st.success(f"✅ 총 {deleted_count}개의 오래된 데이터를 정리했습니다.")
+                for name, r in results.items():
+                    if r.get("archive_file"):
+                        st.caption(f"📦 {name}: {r['archived']}건 보관 → `{r['archive_file']}`")
+            elif not errors:
                 st.info("깨끗합니다! 삭제할 오래된 데이터가 없습니다.")
                 
         except Exception as e:
@@ -1130,7 +1384,47 @@ with tab4:
     
     st.markdown("---")
     
-    # 4. Gemini 모델 작동 테스트
+    # 4. 리드/영상 통합 검색
+    st.markdown("#### 🔎 리드/영상 검색")
+    st.caption("채널명, 영상 제목, AI 요약, 자막 내용에서 과거 수집 데이터를 찾습니다.")
+    
+    search_col, kind_col, page_col = st.columns([4, 1, 1])
+    with search_col:
+        db_query = st.text_input(
+            "검색어",
+            placeholder="예: 갤러리 정리",
+            key="db_search_query",
+            label_visibility="collapsed"
+        )
+    with kind_col:
+        kind_label = st.selectbox("대상", ["전체", "채널", "영상"], key="db_search_kind", label_visibility="collapsed")
+    with page_col:
+        search_page = st.number_input("페이지", min_value=1, value=1, step=1, key="db_search_page", label_visibility="collapsed")
+    
+    if db_query:
+        page_size = 20
+        search_kinds = {"전체": None, "채널": ["lead"], "영상": ["video"]}[kind_label]
+        hits, total_hits = db.search(
+            db_query,
+            kinds=search_kinds,
+            limit=page_size,
+            offset=(search_page - 1) * page_size
+        )
+        
+        if not hits:
+            st.info("검색 결과가 없습니다.")
+        else:
+            st.caption(f"총 {total_hits}건 중 {(search_page - 1) * page_size + 1}~{(search_page - 1) * page_size + len(hits)}번째")
+            for hit in hits:
+                icon = "📺" if hit["kind"] == "lead" else "🎬"
+                link = f" · [보기](https://www.youtube.com/watch?v={hit['video_id']})" if hit.get("video_id") else ""
+                st.markdown(f"{icon} **{hit['title']}**{link}")
+                if hit.get("snippet"):
+                    st.caption(hit["snippet"][:200])
+    
+    st.markdown("---")
+    
+    # 5. Gemini 모델 작동 테스트
     st.markdown("#### 🤖 AI 모델 테스트")
     st.caption("현재 사용 가능한 Gemini 모델을 확인합니다.")
     
@@ -1189,7 +1483,77 @@ with tab4:
                 st.info(f"🎉 **추천 모델: `{working_model}`**\n\n이 모델명을 `logic.py` 496번째 줄에 고정하세요.")
             else:
                 st.warning("⚠️ 모든 모델 실패. API 키 할당량을 확인하세요: https://aistudio.google.com/app/apikey")
+    
+    st.markdown("---")
+    
+    # 6. 실행 추적 (구간별 소요 시간)
+    st.markdown("#### 🧭 실행 추적 (워터폴)")
+    st.caption("백그라운드 작업 / 발송 배치마다 YouTube · 자막 · Gemini · DB · SMTP 호출에 걸린 시간입니다.")
+    
+    # 파일(다른 프로세스의 daemon/발송 워커 실행 포함) + 이 프로세스 메모리, 같은 실행은 한 번만
+    recent_traces = {}
+    if "file" in config.TRACE_EXPORTERS.lower():
+        recent_traces = {t["trace_id"]: t for t in load_traces(limit=config.TRACE_KEEP)}
+    for t in tracer.recent():
+        recent_traces.setdefault(t["trace_id"], t)
+    recent_traces = sorted(recent_traces.values(), key=lambda t: t["start_ns"], reverse=True)[:config.TRACE_KEEP]
+    
+    if not recent_traces:
+        st.info("아직 기록된 실행이 없습니다. 검색/분석/발송을 실행하면 여기에 표시됩니다.")
+        return
+    
+    def trace_label(t: dict) -> str:
+        started = datetime.fromtimestamp(t["start_ns"] / 1e9).strftime("%m-%d %H:%M:%S")
+        return f"{started} · {t['name']} · {t['duration_ms'] / 1000:.1f}초" + (" ❌" if t["status"] == "error" else "")
+    
+    trace = st.selectbox("실행 선택", recent_traces, format_func=trace_label, key="trace_pick")
+    
+    # 호출 종류별 합계 (동시에 실행된 호출은 합계가 전체 시간보다 클 수 있음)
+    call_summary = summarize(trace)
+    if call_summary:
+        st.dataframe(
+            pd.DataFrame([{
+                "종류": item["kind"],
+                "호출 수": item["count"],
+                "합계(ms)": round(item["total_ms"], 1),
+                "최대(ms)": round(item["max_ms"], 1),
+                "오류": item["errors"],
+                "비율": item["share"],
+            } for item in call_summary]),
+            column_config={"비율": st.column_config.ProgressColumn("전체 대비", format="%.2f", min_value=0, max_value=max(1.0, max(i["share"] for i in call_summary)))},
+            hide_index=True,
+            use_container_width=True
+        )
+    if trace.get("dropped"):
+        st.caption(f"⚠️ 구간이 너무 많아 {trace['dropped']}개는 기록하지 않았습니다. (TRACE_MAX_SPANS)")
+    
+    import altair as alt
+    
+    rows = waterfall_rows(trace)[:config.TRACE_WATERFALL_ROWS]
+    df_spans = pd.DataFrame([{
+        # 같은 이름의 구간이 여러 번 나오므로 순번을 붙여서 행을 구분
+        "구간": f"{i:>4} {'  ' * row['depth']}{row['name']}",
+        "종류": row["kind"],
+        "시작(ms)": row["offset_ms"],
+        "끝(ms)": row["offset_ms"] + row["duration_ms"],
+        "소요(ms)": round(row["duration_ms"], 1),
+        "속성": ", ".join(f"{k}={v}" for k, v in row["attributes"].items()),
+        "오류": row["error"] or "",
+    } for i, row in enumerate(rows)])
+    chart = alt.Chart(df_spans).mark_bar().encode(
+        x=alt.X("시작(ms):Q", title="실행 시작 후 (ms)"),
+        x2="끝(ms):Q",
+        y=alt.Y("구간:N", sort=None, title=None, axis=alt.Axis(labelLimit=320)),
+        color=alt.Color("종류:N"),
+        tooltip=["구간", "소요(ms)", "속성", "오류"]
+    ).properties(height=max(120, 18 * len(df_spans)))
+    st.altair_chart(chart, use_container_width=True)
+    if len(trace["spans"]) > len(rows):
+        st.caption(f"처음 {len(rows)}개 구간만 표시 (전체 {len(trace['spans'])}개)")
+
 
+with tab4:
+    system_tab()
 
 # =============================================
 # 푸터
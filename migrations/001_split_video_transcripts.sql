@@ -0,0 +1,32 @@
+-- =============================================
+-- Migration 001: videos.transcript_text / summary -> video_transcripts
+-- =============================================
+-- 기존 Supabase DB에서 한 번만 실행하세요. (새로 설치하는 경우 schema.sql만 실행하면 됩니다)
+-- 실행 순서: 이 파일 -> schema.sql (인덱스, 트리거, search_content 함수 갱신)
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS video_transcripts (
+    video_id UUID PRIMARY KEY REFERENCES videos(id) ON DELETE CASCADE,
+    transcript_text TEXT,
+    summary TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- 기존 자막/요약 복사
+INSERT INTO video_transcripts (video_id, transcript_text, summary)
+SELECT id, transcript_text, summary
+FROM videos
+WHERE transcript_text IS NOT NULL OR summary IS NOT NULL
+ON CONFLICT (video_id) DO NOTHING;
+
+-- videos 컬럼에 걸려 있던 검색 인덱스/함수 제거 후 컬럼 삭제
+DROP INDEX IF EXISTS idx_videos_search_vector;
+DROP FUNCTION IF EXISTS video_search_vector(TEXT, TEXT, TEXT);
+
+ALTER TABLE videos
+    DROP COLUMN IF EXISTS transcript_text,
+    DROP COLUMN IF EXISTS summary;
+
+COMMIT;
@@ -0,0 +1,52 @@
+-- =============================================
+-- Migration 002: 실제 조회 패턴에 맞춘 복합/부분 인덱스
+-- =============================================
+-- 단일 컬럼 인덱스만으로는 "필터 + 정렬" 조합 쿼리가 정렬 단계(Sort)를 따로 거칩니다.
+-- 아래 인덱스는 Database 모듈의 주요 쿼리를 인덱스 순서 그대로 읽도록 맞춘 것입니다.
+-- (benchmarks/bench_query_plans.py --compare 로 전/후 EXPLAIN ANALYZE 비교 가능)
+--
+-- ⚠️ 대용량 테이블에서는 SQL Editor 대신 psql에서 CREATE INDEX CONCURRENTLY로
+--    하나씩 실행하면 쓰기 잠금 없이 생성할 수 있습니다.
+
+-- drafts: get_all_drafts(draft_type, status) / get_draft_stats
+--   WHERE draft_type = ? AND status = ? ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_drafts_type_status_created
+    ON drafts(draft_type, status, created_at DESC);
+
+-- drafts: get_pending_email_drafts_detailed (이메일 발송 대기열, 가장 자주 호출)
+--   WHERE draft_type = 'email' AND status = 'pending' ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_drafts_pending_email
+    ON drafts(created_at DESC)
+    WHERE draft_type = 'email' AND status = 'pending';
+
+-- drafts: get_drafts_by_video / get_drafts_by_lead (ORDER BY created_at DESC)
+CREATE INDEX IF NOT EXISTS idx_drafts_video_created
+    ON drafts(video_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_drafts_lead_created
+    ON drafts(lead_id, created_at DESC);
+
+-- videos: get_all_videos(search_keyword) ORDER BY relevance_score DESC
+CREATE INDEX IF NOT EXISTS idx_videos_keyword_relevance
+    ON videos(search_keyword, relevance_score DESC);
+
+-- videos: get_videos_by_lead ORDER BY upload_date DESC
+CREATE INDEX IF NOT EXISTS idx_videos_lead_upload
+    ON videos(lead_id, upload_date DESC);
+
+-- leads: get_all_leads(status) ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_leads_status_created
+    ON leads(status, created_at DESC);
+
+-- 위 복합 인덱스의 선두 컬럼과 겹치거나 UNIQUE 제약 인덱스와 중복되는 단일 인덱스 제거
+-- (쓰기마다 갱신되는 인덱스 수를 줄임)
+DROP INDEX IF EXISTS idx_leads_channel_id;    -- leads_channel_id_key(UNIQUE)와 중복
+DROP INDEX IF EXISTS idx_leads_status;        -- idx_leads_status_created
+DROP INDEX IF EXISTS idx_videos_video_id;     -- videos_video_id_key(UNIQUE)와 중복
+DROP INDEX IF EXISTS idx_videos_lead_id;      -- idx_videos_lead_upload
+DROP INDEX IF EXISTS idx_drafts_video_id;     -- idx_drafts_video_created
+DROP INDEX IF EXISTS idx_drafts_lead_id;      -- idx_drafts_lead_created
+DROP INDEX IF EXISTS idx_drafts_type;         -- idx_drafts_type_status_created
+
+ANALYZE leads;
+ANALYZE videos;
+ANALYZE drafts;
@@ -0,0 +1,16 @@
+-- =============================================
+-- Migration 003: 초안 발송 시각 (drafts.sent_at)
+-- =============================================
+-- mark_drafts_sent RPC가 기록하는 컬럼입니다.
+-- 실행 후 schema.sql을 다시 실행하면 mark_drafts_sent 함수가 생성됩니다.
+
+ALTER TABLE drafts ADD COLUMN IF NOT EXISTS sent_at TIMESTAMP WITH TIME ZONE;
+
+-- 이미 발송된 초안은 마지막 수정 시각을 발송 시각으로 간주
+UPDATE drafts SET sent_at = updated_at WHERE status = 'sent' AND sent_at IS NULL;
+
+-- 발송된 초안이 있는데 아직 new 상태인 리드를 contacted로 정리
+UPDATE leads l
+SET status = 'contacted'
+WHERE l.status = 'new'
+  AND EXISTS (SELECT 1 FROM drafts d WHERE d.lead_id = l.id AND d.status = 'sent');
@@ -0,0 +1,9 @@
+-- =============================================
+-- Migration 004: 재스캔 변경 감지용 content_hash
+-- =============================================
+-- Database.upsert_scanned_videos()가 스캔 필드의 해시를 저장해 두고,
+-- 다음 스캔에서 해시가 같은 리드/영상은 쓰기를 건너뜁니다.
+-- 기존 행은 값이 NULL이라 첫 재스캔에서 한 번 갱신되며 채워집니다.
+
+ALTER TABLE leads ADD COLUMN IF NOT EXISTS content_hash VARCHAR(16);
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS content_hash VARCHAR(16);
@@ -0,0 +1,10 @@
+-- =============================================
+-- Migration 005: 발송 일정 (email_outbox.scheduled_at)
+-- =============================================
+-- send_scheduler.py가 발송 시간대/도메인 간격/일일 쿼터에 맞춰 배정한 발송 시각입니다.
+-- 워커는 계속 next_attempt_at 기준으로 가져가며, 배정 시 두 컬럼을 같은 값으로 씁니다.
+-- 기존 queued 행은 NULL(즉시 발송 대상)이며, 다음 워커 실행 때 일정이 배정됩니다.
+
+ALTER TABLE email_outbox ADD COLUMN IF NOT EXISTS scheduled_at TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS idx_outbox_scheduled_at ON email_outbox(scheduled_at) WHERE status = 'queued';
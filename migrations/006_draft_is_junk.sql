@@ -0,0 +1,14 @@
+-- =============================================
+-- Migration 006: 오류 초안 표시 (drafts.is_junk)
+-- =============================================
+-- email_service.is_junk_content()와 같은 규칙(빈 본문, AI 에러 메시지)을 생성 컬럼으로 저장합니다.
+-- 탭 2 대기 목록이 본문을 읽지 않고 목록/필터/일괄 발송 집계를 서버에서 처리할 수 있습니다.
+-- STORED 생성 컬럼이므로 기존 행도 이 마이그레이션에서 바로 계산되고, 본문 수정 시 자동 갱신됩니다.
+-- (규칙을 바꾸면 is_junk_content()와 schema.sql / schema_sqlite.sql도 함께 수정)
+
+ALTER TABLE drafts ADD COLUMN IF NOT EXISTS is_junk BOOLEAN GENERATED ALWAYS AS (
+    btrim(content, E' \t\r\n') = '' OR
+    content LIKE '[AI 에러]%' OR
+    content LIKE '[오류]%' OR
+    content LIKE '%404 models/%'
+) STORED;
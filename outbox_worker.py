@@ -0,0 +1,272 @@
+"""
+Bes2 Marketer - Outbox Worker
+email_outbox 발송 대기열을 처리하는 백그라운드 워커
+
+흐름
+1. 승인(approved)된 이메일 초안 -> email_outbox에 queued로 추가
+2. claim_outbox RPC로 발송할 차례인 행을 잠그고 가져감 (여러 워커 동시 실행 가능)
+3. EmailSender(SMTP 연결 풀)로 발송, 메일 사이에는 EMAIL_MIN_INTERVAL_SECONDS 간격
+4. 성공: complete_outbox RPC (outbox sent + 초안 sent + 리드 contacted)
+   일시 오류: 지수 백오프 후 재시도 / 영구 오류나 최대 시도 초과: failed
+- 최근 24시간 발송 수가 EMAIL_DAILY_CAP에 도달하면 더 가져가지 않음
+- SEND_WINDOWS가 설정되어 있으면 send_scheduler가 대기열에 넣을 때 발송 시각을 배정
+
+헤드리스 실행:
+    python outbox_worker.py            # 계속 실행 (OUTBOX_POLL_SECONDS 간격)
+    python outbox_worker.py --once     # 한 번만 처리하고 종료 (cron용)
+"""
+
+import argparse
+import os
+import random
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from config import config
+from database import Database, db
+from email_service import EmailSender, emailer, extract_subject, is_junk_content
+from send_scheduler import SendScheduler
+from tracing import tracer
+
+
+def _iso(dt: datetime) -> str:
+    # SQLite 백엔드의 기본 시각 형식(밀리초)과 문자열 비교가 가능하도록 맞춤
+    return dt.astimezone(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def backoff_delay(attempts: int) -> float:
+    """재시도 대기 시간 (초): base * 2^(시도-1), 최대 6시간, ±20% 지터"""
+    delay = min(config.OUTBOX_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0)), 6 * 3600)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class OutboxWorker:
+    """email_outbox 발송 워커"""
+
+    def __init__(
+        self,
+        database: Optional[Database] = None,
+        sender: Optional[EmailSender] = None,
+        worker_id: Optional[str] = None,
+        scheduler: Optional[SendScheduler] = None
+    ):
+        self.db = database or db
+        self.sender = sender or emailer
+        self.scheduler = scheduler or SendScheduler(self.db)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._last_send = 0.0
+
+    # =========================================
+    # 대기열 추가
+    # =========================================
+
+    def enqueue_drafts(self, draft_ids: list[str], schedule: bool = True) -> dict:
+        """
+        이메일 초안을 발송 대기열에 추가하고 초안 상태를 approved로 변경
+        - pending/approved 초안만 추가 (rejected 등 운영자가 제외한 초안은 건너뜀)
+        - 한 채널(리드/수신 주소)에는 한 통만: 같은 요청 안의 중복과 이미 발송 대기 중인 주소는 건너뜀
+          (draft_ids 순서상 앞의 초안을 남김, 화면 목록은 최신순)
+        - schedule=False면 발송 일정을 배정하지 않고 바로 발송 대상으로 (일괄 즉시 발송)
+        반환: {"queued": [draft_id...], "skipped": {draft_id: 사유}}
+        """
+        order = {draft_id: index for index, draft_id in enumerate(draft_ids)}
+        drafts = sorted(self.db.get_drafts_for_outbox(draft_ids), key=lambda d: order.get(d["id"], 0))
+        outbox_status = self.db.get_outbox_status_by_drafts([d["id"] for d in drafts])
+        active_emails = self.db.get_active_outbox_emails(
+            [(d.get("leads") or {}).get("email") for d in drafts if (d.get("leads") or {}).get("email")]
+        )
+
+        rows, skipped = [], {}
+        seen_leads, seen_emails = set(), set()
+        now = _iso(datetime.now(timezone.utc))
+        for d in drafts:
+            to_email = (d.get("leads") or {}).get("email")
+            content = d.get("content") or ""
+            if d.get("draft_type") != "email":
+                skipped[d["id"]] = "not an email draft"
+            elif d.get("status") == "sent" or outbox_status.get(d["id"]) == "sent":
+                skipped[d["id"]] = "already sent"
+            elif d.get("status") not in ("pending", "approved"):
+                skipped[d["id"]] = f"draft {d.get('status')}"
+            elif outbox_status.get(d["id"]) in ("queued", "sending"):
+                skipped[d["id"]] = "already queued"
+            elif not to_email:
+                skipped[d["id"]] = "no recipient email"
+            elif is_junk_content(content):
+                skipped[d["id"]] = "junk content"
+            elif to_email in active_emails or to_email in seen_emails or (d.get("lead_id") and d["lead_id"] in seen_leads):
+                skipped[d["id"]] = "duplicate recipient"
+            else:
+                seen_emails.add(to_email)
+                if d.get("lead_id"):
+                    seen_leads.add(d["lead_id"])
+                rows.append({
+                    "draft_id": d["id"],
+                    "lead_id": d.get("lead_id"),
+                    "to_email": to_email,
+                    "subject": extract_subject(content),
+                    "body": content,
+                    "status": "queued",
+                    "attempts": 0,
+                    "scheduled_at": now,
+                    "next_attempt_at": now,
+                    "last_error": None
+                })
+
+        if rows:
+            # 발송 시간대/도메인 간격/일일 쿼터에 맞춰 발송 시각 배정 (아니면 지금 시각으로 즉시)
+            if schedule:
+                self.scheduler.assign(rows)
+            self.db.enqueue_emails(rows)
+            self.db.approve_drafts([r["draft_id"] for r in rows])
+        return {"queued": [r["draft_id"] for r in rows], "skipped": skipped}
+
+    def enqueue_approved(self) -> int:
+        """approved 상태인데 대기열에 없는 초안을 추가 (다른 화면/스크립트에서 승인한 초안)"""
+        draft_ids = self.db.get_unqueued_approved_drafts()
+        if not draft_ids:
+            return 0
+        result = self.enqueue_drafts(draft_ids)
+        # 이메일 없음/오류 초안/중복 수신자로 건너뛴 초안은 pending으로 되돌림
+        # (approved로 남겨 두면 매번 맨 앞에서 다시 조회되어 새 초안이 대기열에 들어가지 못함)
+        if result["skipped"]:
+            self.db.unapprove_drafts(list(result["skipped"]))
+        return len(result["queued"])
+
+    # =========================================
+    # 발송
+    # =========================================
+
+    def remaining_capacity(self) -> int:
+        """최근 24시간 기준 남은 발송 가능 건수"""
+        since = _iso(datetime.now(timezone.utc) - timedelta(hours=24))
+        return max(config.EMAIL_DAILY_CAP - self.db.count_outbox_sent_since(since), 0)
+
+    def _throttle(self) -> None:
+        wait = config.EMAIL_MIN_INTERVAL_SECONDS - (time.monotonic() - self._last_send)
+        if wait > 0:
+            time.sleep(wait)
+        self._last_send = time.monotonic()
+
+    def _record(self, job: dict, result: dict) -> str:
+        """발송 결과 기록, "sent" | "retry" | "failed" 반환"""
+        if result["ok"]:
+            self.db.complete_outbox([job["id"]])
+            return "sent"
+
+        if result["retryable"] and job.get("attempts", 1) < config.OUTBOX_MAX_ATTEMPTS:
+            retry_at = datetime.now(timezone.utc) + timedelta(seconds=backoff_delay(job.get("attempts", 1)))
+            self.db.fail_outbox(job["id"], result["error"] or "unknown error", retry_at=_iso(retry_at))
+            return "retry"
+
+        self.db.fail_outbox(job["id"], result["error"] or "unknown error")
+        return "failed"
+
+    @staticmethod
+    def _message(job: dict) -> dict:
+        return {"to": job["to_email"], "subject": job["subject"], "body": job["body"]}
+
+    def _deliver(self, job: dict) -> str:
+        """한 건 발송 후 결과 기록"""
+        self._throttle()
+        return self._record(job, self.sender.send_many([self._message(job)])[0])
+
+    def run_once(
+        self,
+        on_progress: Optional[Callable[[int, int, dict], None]] = None,
+        concurrency: int = 1
+    ) -> dict:
+        """
+        대기열 한 배치 처리
+        on_progress(done, total, summary): 메일마다 호출 (UI 진행률 표시용)
+        concurrency: 2 이상이면 SMTP 연결 여러 개로 동시에 발송 (일괄 즉시 발송용, 간격 제한 없음)
+        반환: {"enqueued", "claimed", "sent", "retry", "failed", "remaining_capacity", "error"}
+        """
+        # 배치 하나 = 실행 추적 하나 (보낼 것이 없었던 폴링은 기록하지 않음)
+        with tracer.run("outbox.run_once", worker=self.worker_id, concurrency=concurrency) as run:
+            summary = self._run_batch(on_progress, concurrency)
+            run.set(**{k: v for k, v in summary.items() if k != "error" or v})
+            if not summary["claimed"]:
+                run.discard()
+        return summary
+
+    def _run_batch(self, on_progress: Optional[Callable[[int, int, dict], None]], concurrency: int) -> dict:
+        summary = {"enqueued": 0, "claimed": 0, "sent": 0, "retry": 0, "failed": 0, "remaining_capacity": 0, "error": None}
+
+        summary["enqueued"] = self.enqueue_approved()
+        self.scheduler.schedule_unscheduled()
+        capacity = self.remaining_capacity()
+        summary["remaining_capacity"] = capacity
+        if capacity <= 0:
+            summary["error"] = "daily cap reached"
+            return summary
+        if not self.sender.is_configured():
+            summary["error"] = "SENDER_EMAIL / SENDER_PASSWORD not configured"
+            return summary
+
+        jobs = self.db.claim_outbox(
+            min(config.OUTBOX_BATCH_SIZE, capacity),
+            self.worker_id,
+            config.OUTBOX_LOCK_TIMEOUT_SECONDS
+        )
+        summary["claimed"] = len(jobs)
+        done = 0
+
+        def record(job: dict, deliver: Callable[[], str]) -> None:
+            nonlocal done
+            try:
+                outcome = deliver()
+            except Exception as e:
+                # 기록 실패 등: 잠금 시간이 지나면 다른 워커가 다시 가져감
+                print(f"Error delivering outbox {job['id']}: {e}")
+                outcome = "retry"
+            summary[outcome] += 1
+            done += 1
+            if on_progress:
+                on_progress(done, len(jobs), summary)
+
+        if concurrency > 1 and len(jobs) > 1:
+            self.sender.send_concurrent(
+                [self._message(job) for job in jobs],
+                workers=concurrency,
+                on_result=lambda index, result: record(jobs[index], lambda: self._record(jobs[index], result))
+            )
+        else:
+            for job in jobs:
+                record(job, lambda: self._deliver(job))
+
+        summary["remaining_capacity"] = max(capacity - summary["sent"], 0)
+        return summary
+
+    def run_forever(self, poll_seconds: Optional[float] = None) -> None:
+        """대기열을 계속 처리 (보낼 것이 없거나 한도에 도달하면 poll_seconds 대기)"""
+        poll_seconds = poll_seconds or config.OUTBOX_POLL_SECONDS
+        print(f"📤 Outbox worker {self.worker_id} started")
+        while True:
+            try:
+                summary = self.run_once()
+                if summary["claimed"] or summary["enqueued"]:
+                    print(f"📤 {summary}")
+                if summary["claimed"] and not summary["error"]:
+                    continue  # 바로 다음 배치
+            except Exception as e:
+                print(f"Outbox worker error: {e}")
+            time.sleep(poll_seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bes2 Marketer 이메일 발송 대기열 워커")
+    parser.add_argument("--once", action="store_true", help="한 배치만 처리하고 종료")
+    args = parser.parse_args()
+
+    worker = OutboxWorker()
+    if args.once:
+        print(worker.run_once())
+    else:
+        worker.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""
+Bes2 Marketer - Pending Draft Queue
+탭 2 이메일 발송 대기 목록(pending 이메일 초안)의 화면 상태를 변경 피드로 갱신
+
+목록은 필터/페이지 단위로 서버에서 조회하고(본문 제외), 본문은 선택한 초안만 읽습니다.
+drafts 테이블의 변경 이벤트가 오면 현재 페이지만 다시 조회합니다.
+일괄 발송 대상(필터에 맞는 초안 전체)은 미리보기를 요청할 때만 조회합니다.
+
+변경 피드 (프로세스당 하나를 모든 세션이 공유, 세션마다 읽은 위치만 따로 보관)
+- RealtimeDraftFeed: Supabase Realtime (postgres_changes) 구독, 백그라운드 스레드에서 수신
+- PollingDraftFeed : (id, updated_at) 목록만 주기적으로 비교하는 대체 구현
+                     (SQLite 백엔드, Realtime 미설정/구독 실패 환경, 테스트용)
+
+⚠️ Realtime을 쓰려면 drafts 테이블이 supabase_realtime publication에 포함되어야 합니다. (schema.sql)
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from config import config
+from database import Database, db
+
+
+# 본문을 보관할 최대 초안 수 (오래 연 것부터 버림)
+BODY_CACHE_SIZE = 20
+
+# 공유 피드가 보관할 최근 이벤트 수 (이보다 많이 밀린 세션은 목록 전체를 다시 조회)
+FEED_LOG_SIZE = 1000
+
+def _iso(dt: datetime) -> str:
+    # SQLite 백엔드의 기본 시각 형식(밀리초)과 문자열 비교가 가능하도록 맞춤
+    return dt.astimezone(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def _is_comment(record: dict) -> bool:
+    # Realtime 이벤트는 전체 행을 담고 있어 댓글 초안 변경은 걸러낼 수 있음 (폴링 이벤트는 id만 있음)
+    return record.get("draft_type") == "comment"
+
+
+def _normalize_payload(payload: dict) -> Optional[dict]:
+    """Realtime 콜백 payload -> {"type", "record", "old_record"} (realtime-py 버전별 형식 모두 처리)"""
+    data = payload.get("data", payload)
+    event_type = data.get("type") or data.get("eventType")
+    if not event_type:
+        return None
+    return {
+        "type": str(event_type).upper(),
+        "record": data.get("record") or data.get("new") or {},
+        "old_record": data.get("old_record") or data.get("old") or {},
+    }
+
+
+# =========================================
+# 변경 피드
+# =========================================
+
+class DraftFeed:
+    """
+    변경 피드 공통 부분 - 프로세스에서 피드 하나를 모든 세션이 공유 (main.py의 st.cache_resource)
+    이벤트는 순번과 함께 최근 FEED_LOG_SIZE개만 보관하고, 세션(PendingDraftQueue)마다 자기 커서 이후를 읽음
+    """
+
+    def __init__(self):
+        self._log: deque[tuple[int, dict]] = deque(maxlen=FEED_LOG_SIZE)
+        self._seq = 0
+        self._log_lock = threading.Lock()
+
+    def _publish(self, events: list[dict]) -> None:
+        with self._log_lock:
+            for event in events:
+                self._seq += 1
+                self._log.append((self._seq, event))
+
+    def _poll(self) -> None:
+        """읽기 전에 새 이벤트 확인 (폴링 피드만 사용)"""
+
+    def cursor(self) -> int:
+        """현재 마지막 이벤트 순번 (이 시점 이후 이벤트부터 읽을 때)"""
+        with self._log_lock:
+            return self._seq
+
+    def events_since(self, cursor: int) -> tuple[list[dict], int]:
+        """
+        cursor 이후 이벤트와 새 커서
+        보관 범위를 넘을 만큼 밀렸으면 RESET 이벤트 하나 (목록/본문 전체 다시 조회)
+        """
+        self._poll()
+        with self._log_lock:
+            if cursor >= self._seq:
+                return [], self._seq
+            if not self._log or self._log[0][0] > cursor + 1:
+                return [{"type": "RESET", "record": {}, "old_record": {}}], self._seq
+            return [event for seq, event in self._log if seq > cursor], self._seq
+
+    def stop(self) -> None:
+        pass
+
+
+class PollingDraftFeed(DraftFeed):
+    """
+    폴링 기반 변경 피드
+    대기 초안의 (id, updated_at)만 가져와 직전 상태와 비교해서 INSERT/UPDATE/DELETE 이벤트 생성
+    (여러 세션이 읽어도 interval마다 한 번만 조회)
+    """
+
+    def __init__(self, database: Optional[Database] = None, interval: Optional[float] = None):
+        super().__init__()
+        self.db = database or db
+        self.interval = config.PENDING_POLL_SECONDS if interval is None else interval
+        self._versions: Optional[dict[str, str]] = None
+        self._last_poll = 0.0
+        self._poll_lock = threading.Lock()
+
+    def start(self) -> None:
+        self._versions = self.db.get_pending_email_draft_versions()
+        self._last_poll = time.monotonic()
+
+    def _poll(self) -> None:
+        """interval이 지났으면 한 번 폴링해서 변경 이벤트 기록"""
+        # 다른 세션이 조회 중이면 기다리지 않고 지금까지의 이벤트만 읽음
+        if not self._poll_lock.acquire(blocking=False):
+            return
+        try:
+            if self._versions is None:
+                self.start()
+                return
+            if time.monotonic() - self._last_poll < self.interval:
+                return
+            self._last_poll = time.monotonic()
+
+            current = self.db.get_pending_email_draft_versions()
+            events = []
+            for draft_id, updated_at in current.items():
+                if draft_id not in self._versions:
+                    events.append({"type": "INSERT", "record": {"id": draft_id}, "old_record": {}})
+                elif self._versions[draft_id] != updated_at:
+                    events.append({"type": "UPDATE", "record": {"id": draft_id}, "old_record": {}})
+            for draft_id in self._versions.keys() - current.keys():
+                # 발송/삭제/상태 변경으로 대기열에서 빠진 초안
+                events.append({"type": "DELETE", "record": {}, "old_record": {"id": draft_id}})
+            self._versions = current
+            self._publish(events)
+        finally:
+            self._poll_lock.release()
+
+
+class RealtimeDraftFeed(DraftFeed):
+    """Supabase Realtime 변경 피드 (백그라운드 스레드의 이벤트 루프에서 구독)"""
+
+    def __init__(self, timeout: float = 10):
+        super().__init__()
+        self.timeout = timeout
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._stopped = False
+        self.error: Optional[Exception] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="pending-drafts-realtime", daemon=True)
+        self._thread.start()
+        # 구독 완료(또는 실패)까지 대기, 시간 안에 끝나지 않으면 구독을 접고 실패로 처리
+        if not self._ready.wait(timeout=self.timeout):
+            self.stop()
+            raise TimeoutError(f"Realtime subscription did not complete within {self.timeout:g}s")
+        if self.error:
+            raise self.error
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._subscribe())
+        except Exception as e:
+            self.error = e
+            print(f"Realtime subscription error: {e}")
+        finally:
+            self._ready.set()
+            self._loop.close()
+
+    async def _subscribe(self) -> None:
+        from supabase import acreate_client
+
+        self._stop_event = asyncio.Event()
+        client = await acreate_client(config.SUPABASE_URL, config.SUPABASE_KEY)
+        channel = client.channel("pending-email-drafts")
+        channel.on_postgres_changes("*", schema="public", table="drafts", callback=self._on_change)
+        try:
+            await channel.subscribe()
+            if self._stopped:
+                # 시간 초과로 이미 폴링으로 넘어간 뒤에 구독이 끝난 경우
+                return
+            self._ready.set()
+            await self._stop_event.wait()
+        finally:
+            await client.remove_channel(channel)
+
+    def _on_change(self, payload: dict) -> None:
+        event = _normalize_payload(payload)
+        if event:
+            self._publish([event])
+
+    def stop(self) -> None:
+        self._stopped = True
+        if self._loop and self._stop_event and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+
+
+def create_feed(database: Optional[Database] = None) -> DraftFeed:
+    """설정에 맞는 변경 피드 생성 (Realtime 구독 실패/시간 초과 시 폴링으로 대체)"""
+    if config.DB_BACKEND == "supabase" and config.PENDING_REALTIME:
+        feed = RealtimeDraftFeed()
+        try:
+            feed.start()
+            return feed
+        except Exception as e:
+            print(f"Realtime unavailable, falling back to polling: {e}")
+    feed = PollingDraftFeed(database)
+    feed.start()
+    return feed
+
+
+# =========================================
+# 대기열
+# =========================================
+
+class PendingDraftQueue:
+    """
+    대기 중인 이메일 초안 목록의 현재 페이지 + 열어 본 초안 본문 캐시
+    - filters: channel, has_email, junk, newer_than_days, older_than_days
+               (작성일 조건은 조회할 때 시각으로 바꿈 -> 화면을 다시 그려도 필터가 바뀌지 않음)
+    - 피드 이벤트가 오면 페이지는 다시 조회, 바뀐 초안의 본문은 버림
+    - 일괄 발송 대상(필터에 맞는 초안 전체)은 calculate_send_targets()를 부를 때만 조회
+      (이후 변경이 오면 targets_stale만 표시, 발송 시 enqueue_drafts가 상태를 다시 확인)
+    """
+
+    def __init__(self, database: Optional[Database] = None, feed: Optional[DraftFeed] = None, page_size: Optional[int] = None):
+        self.db = database or db
+        self.feed = feed
+        self.page_size = page_size or config.PENDING_PAGE_SIZE
+        self.filters: dict = {}
+        self.page_index = 0
+        self._page: Optional[tuple[list[dict], int]] = None
+        self._targets: Optional[list[dict]] = None
+        self.targets_stale = False
+        self._bodies: dict[str, dict] = {}
+        self._started = False
+        self._cursor = 0
+
+    def load(self) -> None:
+        """전체 다시 읽기 (수동 새로고침)"""
+        self._page = None
+        self.clear_send_targets()
+        self._bodies.clear()
+
+    def sync(self) -> int:
+        """피드에 쌓인 변경 반영, 반영한 이벤트 수 반환"""
+        if not self._started:
+            if self.feed is None:
+                self.feed = create_feed(self.db)
+            self._started = True
+            # 첫 페이지는 page()에서 조회하므로 지금까지의 이벤트는 건너뜀
+            self._cursor = self.feed.cursor()
+            return 0
+        events, self._cursor = self.feed.events_since(self._cursor)
+        if events:
+            self.apply(events)
+        return len(events)
+
+    def apply(self, events: list[dict]) -> None:
+        """변경 이벤트 반영 (추가/삭제/수정 모두 페이지 순서와 건수를 바꿀 수 있으므로 목록은 다시 조회)"""
+        changed = False
+        for event in events:
+            if event["type"] == "RESET":
+                self.load()
+                return
+            record = event.get("record") or {}
+            if _is_comment(record):
+                continue
+            draft_id = record.get("id") or (event.get("old_record") or {}).get("id")
+            if draft_id:
+                self._bodies.pop(draft_id, None)
+            changed = True
+        if changed:
+            self._page = None
+            self._mark_targets_stale()
+
+    # =========================================
+    # 목록 (서버 페이지네이션)
+    # =========================================
+
+    def set_filters(self, **filters) -> None:
+        """필터 변경 (바뀌었을 때만 첫 페이지부터 다시 조회)"""
+        filters = {k: v for k, v in filters.items() if v is not None and v != ""}
+        if filters != self.filters:
+            self.filters = filters
+            self.page_index = 0
+            self._page = None
+            self.clear_send_targets()
+
+    def set_page(self, page_index: int) -> None:
+        page_index = max(page_index, 0)
+        if page_index != self.page_index:
+            self.page_index = page_index
+            self._page = None
+
+    def _query_filters(self) -> dict:
+        """filters -> get_pending_email_draft_page() 인자"""
+        filters = dict(self.filters)
+        now = datetime.now(timezone.utc)
+        newer_than_days = filters.pop("newer_than_days", None)
+        older_than_days = filters.pop("older_than_days", None)
+        if newer_than_days:
+            filters["created_after"] = _iso(now - timedelta(days=newer_than_days))
+        if older_than_days:
+            filters["created_before"] = _iso(now - timedelta(days=older_than_days))
+        return filters
+
+    def page(self) -> list[dict]:
+        """현재 페이지 목록 (최신순, 본문 제외)"""
+        if self._page is None:
+            items, total = self.db.get_pending_email_draft_page(
+                offset=self.page_index * self.page_size, limit=self.page_size, **self._query_filters()
+            )
+            if not items and total and self.page_index > 0:
+                # 발송/삭제로 마지막 페이지가 비었으면 남아 있는 마지막 페이지로
+                self.page_index = (total - 1) // self.page_size
+                items, total = self.db.get_pending_email_draft_page(
+                    offset=self.page_index * self.page_size, limit=self.page_size, **self._query_filters()
+                )
+            self._page = (items, total)
+        return self._page[0]
+
+    @property
+    def total(self) -> int:
+        """필터에 맞는 대기 초안 전체 건수"""
+        self.page()
+        return self._page[1]
+
+    @property
+    def page_count(self) -> int:
+        return max((self.total + self.page_size - 1) // self.page_size, 1)
+
+    def __len__(self) -> int:
+        return self.total
+
+    # =========================================
+    # 일괄 발송 대상 (요청할 때만 조회)
+    # =========================================
+
+    def send_targets(self) -> Optional[list[dict]]:
+        """계산해 둔 일괄 발송 대상 (calculate_send_targets() 전이거나 필터가 바뀌었으면 None)"""
+        return self._targets
+
+    def calculate_send_targets(self) -> list[dict]:
+        """필터에 맞는 대기 초안 전체의 발송 판단용 컬럼 조회 (본문 제외)"""
+        self._targets = self.db.get_pending_email_send_targets(**self._query_filters())
+        self.targets_stale = False
+        return self._targets
+
+    def clear_send_targets(self) -> None:
+        self._targets = None
+        self.targets_stale = False
+
+    def _mark_targets_stale(self) -> None:
+        if self._targets is not None:
+            self.targets_stale = True
+
+    # =========================================
+    # 본문 (선택한 초안만)
+    # =========================================
+
+    def get(self, draft_id: str) -> Optional[dict]:
+        """초안 상세 (본문 + 영상/리드 정보), 대기열에서 빠졌으면 None"""
+        if draft_id not in self._bodies:
+            fetched = self.db.get_pending_email_drafts_detailed(draft_ids=[draft_id])
+            if not fetched:
+                return None
+            if len(self._bodies) >= BODY_CACHE_SIZE:
+                self._bodies.pop(next(iter(self._bodies)))
+            self._bodies[draft_id] = fetched[0]
+        return self._bodies[draft_id]
+
+    # 로컬 변경 (DB 쓰기 직후 바로 반영, 피드로 같은 이벤트가 와도 결과는 동일)
+
+    def remove(self, draft_id: str) -> None:
+        self._bodies.pop(draft_id, None)
+        self._page = None
+        self._mark_targets_stale()
+
+    def update_content(self, draft_id: str, content: str) -> None:
+        # is_junk는 DB 생성 컬럼이라 본문이 바뀌면 목록 표시도 다시 조회
+        if draft_id in self._bodies:
+            self._bodies[draft_id]["content"] = content
+        self._page = None
+        self._mark_targets_stale()
@@ -0,0 +1,300 @@
+"""
+Bes2 Marketer - Pipeline Module
+검색 -> DB 동기화 -> AI 분석 단계 (Streamlit 없이 실행 가능)
+
+main.py의 버튼 핸들러에 있던 로직을 옮긴 것으로, 백그라운드 작업(job_manager.py)에서 실행됩니다.
+각 단계는 on_progress(done, total, message)로 진행 상황을 알리며,
+on_progress에서 예외를 던지면(작업 취소) 그 자리에서 중단됩니다.
+"""
+
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional
+
+from database import Database, db
+from tracing import tracer
+
+# on_progress(done, total, message)
+ProgressCallback = Callable[[int, int, str], None]
+
+# AI에 넘길 자막 최대 길이
+MAX_CONTENT_CHARS = 15000
+
+
+def _noop(done: int, total: int, message: str) -> None:
+    pass
+
+
+def _parse_view_count(value) -> int:
+    return int(str(value).replace(",", "")) if str(value).replace(",", "").isdigit() else 0
+
+
+class Pipeline:
+    """YouTubeHunter / AICopywriter / Database를 묶은 마케팅 파이프라인"""
+
+    def __init__(self, database: Optional[Database] = None, hunter=None, copywriter=None):
+        self.db = database or db
+        self._hunter = hunter
+        self._copywriter = copywriter
+        self._save_lock = threading.Lock()
+
+    @property
+    def hunter(self):
+        if self._hunter is None:
+            from logic import hunter
+            self._hunter = hunter
+        return self._hunter
+
+    @property
+    def copywriter(self):
+        if self._copywriter is None:
+            from logic import copywriter
+            self._copywriter = copywriter
+        return self._copywriter
+
+    # =========================================
+    # 1. 검색
+    # =========================================
+
+    def search(
+        self,
+        keywords: list[str],
+        max_results: int = 100,
+        published_after_days: int = 30,
+        min_view_count: int = 0,
+        require_email: bool = False,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> dict:
+        """
+        키워드별 영상 검색 + 채널 정보 (자막은 분석 단계에서)
+        반환: {"videos": [...], "found": {키워드: YouTube 검색 결과 수}}
+        """
+        on_progress = on_progress or _noop
+        videos, found = [], {}
+
+        for i, keyword in enumerate(keywords):
+            on_progress(i, len(keywords), f"Scanning: {keyword}")
+            with tracer.span("pipeline.search_keyword", keyword=keyword) as span:
+                keyword_videos, total_count = self.hunter.search_videos(
+                    keyword=keyword,
+                    max_results=max_results,
+                    published_after_days=published_after_days,
+                    min_view_count=min_view_count,
+                    require_email=require_email
+                )
+                found[keyword] = total_count
+                span.set(videos=len(keyword_videos))
+
+                for video in keyword_videos:
+                    # 검색 단계에서는 메타데이터만 수집 (자막 추출은 느리고 실패할 수 있음)
+                    video["transcript_text"] = ""
+                    video["content_source"] = "not_fetched"
+                    # 설명글은 이메일 추출에만 쓰이고 결과는 jobs.result에 저장되므로 버림
+                    video.pop("description", None)
+
+                    channel_info = self.hunter.get_channel_info(video["channel_id"])
+                    if channel_info:
+                        channel_info.pop("description", None)
+                        video["channel_info"] = channel_info
+
+                    videos.append(video)
+
+        on_progress(len(keywords), len(keywords), f"{len(videos)}개 영상 수집")
+        return {"videos": videos, "found": found}
+
+    # =========================================
+    # 2. DB 동기화
+    # =========================================
+
+    def sync(self, videos: list[dict]) -> dict:
+        """검색된 영상/채널을 DB에 Upsert (upsert_scanned_videos 결과 그대로 반환)"""
+        with tracer.span("pipeline.sync", videos=len(videos)):
+            return self.db.upsert_scanned_videos(videos)
+
+    # =========================================
+    # 3. AI 분석
+    # =========================================
+
+    def _save_analysis(
+        self,
+        video: dict,
+        content: str,
+        email: str,
+        comment: str,
+        summary: str,
+        relevance: dict,
+        existing_video: Optional[dict] = None
+    ) -> dict:
+        """
+        리드 / 영상 / 초안(이메일, 댓글) 저장, 이메일 초안 반환
+        existing_video: 검색 때 동기화만 된 영상 행 (새로 만들지 않고 자막/요약/점수만 채움)
+        """
+        channel_info = video.get("channel_info") or {}
+        existing_lead = self.db.get_lead_by_channel_id(video["channel_id"])
+        if existing_lead:
+            lead_id = existing_lead["id"]
+        else:
+            lead = self.db.create_lead(
+                channel_name=video["channel_name"],
+                channel_id=video["channel_id"],
+                subscriber_count=channel_info.get("subscriber_count", 0),
+                email=channel_info.get("email"),
+                keywords=[video.get("search_keyword", "")],
+            )
+            lead_id = lead["id"]
+
+        if existing_video:
+            saved_video = self.db.update_video(existing_video["id"], relevance_score=relevance["score"]) or existing_video
+            self.db.update_video_transcript(existing_video["id"], content, summary)
+        else:
+            saved_video = self.db.create_video(
+                video_id=video["video_id"],
+                title=video["title"],
+                lead_id=lead_id,
+                view_count=_parse_view_count(video.get("view_count", 0)),
+                video_url=video["video_url"],
+                thumbnail_url=video["thumbnail_url"],
+                transcript_text=content,
+                summary=summary,
+                relevance_score=relevance["score"],
+                search_keyword=video.get("search_keyword", "")
+            )
+
+        email_draft = self.db.create_draft(
+            draft_type="email",
+            content=email,
+            video_id=saved_video["id"],
+            lead_id=lead_id
+        )
+        self.db.create_draft(
+            draft_type="comment",
+            content=comment,
+            video_id=saved_video["id"],
+            lead_id=lead_id
+        )
+        return email_draft
+
+    def _analyze_video(self, video: dict, existing_video: Optional[dict] = None) -> Optional[dict]:
+        """영상 하나 분석 + 저장, 화면용 초안 반환 (자막이 없으면 None)"""
+        with tracer.span("pipeline.analyze_video", video_id=video["video_id"]) as span:
+            outcome = self._analyze_and_save(video, existing_video)
+            span.set(skipped=outcome is None)
+            return outcome
+
+    def _analyze_and_save(self, video: dict, existing_video: Optional[dict] = None) -> Optional[dict]:
+        # 자막이 없으면 스킵 (설명글로 대체하지 않음 - 품질 저하 방지)
+        transcript = self.hunter.get_transcript(video["video_id"])
+        if not transcript:
+            return None
+
+        content = transcript[:MAX_CONTENT_CHARS]
+        # 적합성 분석 생략 (키워드 검색 결과는 무조건 통과)
+        relevance = {"score": 100, "reason": "Keyword Search Match"}
+
+        email = self.copywriter.generate_email(
+            channel_name=video["channel_name"],
+            video_title=video["title"],
+            video_content=content,
+            subscriber_count=(video.get("channel_info") or {}).get("subscriber_count", 0)
+        )
+        comment = self.copywriter.generate_comment(
+            channel_name=video["channel_name"],
+            video_title=video["title"],
+            video_content=content
+        )
+        summary = self.copywriter.summarize_video(content)
+
+        # 같은 채널 영상이 동시에 끝나도 리드가 한 번만 만들어지도록 저장은 순서대로
+        with self._save_lock, tracer.span("pipeline.save", video_id=video["video_id"]):
+            email_draft = self._save_analysis(video, content, email, comment, summary, relevance, existing_video)
+        return {
+            "video": video,
+            "email": email,
+            "comment": comment,
+            "summary": summary,
+            "relevance": relevance,
+            "db_id": email_draft["id"]
+        }
+
+    def analyze(
+        self,
+        videos: list[dict],
+        on_progress: Optional[ProgressCallback] = None,
+        concurrency: int = 1
+    ) -> dict:
+        """
+        선택한 영상 일괄 분석
+        - 이미 분석된 영상: DB의 초안/요약을 그대로 사용 (비용 0원)
+        - 새 영상: 자막 -> 이메일/댓글/요약 생성 -> DB 저장 (자막이 없으면 건너뜀)
+        concurrency: 동시에 분석할 영상 수 (자막/Gemini 호출은 대부분 네트워크 대기)
+        반환: {"drafts": {video_id: 화면용 초안}, "cached", "analyzed", "skipped": [...], "errors": [...]}
+        """
+        on_progress = on_progress or _noop
+        videos_by_id = {v["video_id"]: v for v in videos}
+        video_ids = list(videos_by_id)
+        result = {"drafts": {}, "cached": 0, "analyzed": 0, "skipped": [], "errors": []}
+
+        # 선택 영상 전체의 DB 행 + 초안 + 요약을 한 번에 가져와서 "DB 캐시" / "AI 분석 필요"로 분리
+        # (검색 때 동기화만 되고 초안이 없는 영상은 분석 필요)
+        db_videos = self.db.get_videos_by_video_ids(video_ids, with_drafts=True)
+        cached_videos = {vid: v for vid, v in db_videos.items() if v.get("drafts")}
+        cached_summaries = self.db.get_video_summaries([v["id"] for v in cached_videos.values()])
+        new_ids = [vid for vid in video_ids if vid not in cached_videos]
+
+        # A. 이미 분석된 영상 -> DB에서 일괄 로드
+        for vid in video_ids:
+            if vid not in cached_videos:
+                continue
+            db_video = cached_videos[vid]
+            db_drafts = db_video.get("drafts") or []
+            email_draft = next((d for d in db_drafts if d["draft_type"] == "email"), None)
+            comment_draft = next((d for d in db_drafts if d["draft_type"] == "comment"), None)
+            result["drafts"][vid] = {
+                "video": videos_by_id[vid],
+                "email": email_draft["content"] if email_draft else "",
+                "comment": comment_draft["content"] if comment_draft else "",
+                "summary": cached_summaries.get(db_video["id"], ""),
+                "relevance": {"score": db_video.get("relevance_score", 0)},
+                "db_id": email_draft["id"] if email_draft else ""
+            }
+            result["cached"] += 1
+
+        # B. 새로운 영상 -> AI 분석 (concurrency > 1이면 여러 영상을 동시에)
+        def record(vid: str, outcome: Optional[dict], error: Optional[Exception]) -> None:
+            video = videos_by_id[vid]
+            if error is not None:
+                print(f"Error processing {vid}: {error}")
+                result["errors"].append({"video_id": vid, "title": video["title"], "error": str(error)})
+            elif outcome is None:
+                result["skipped"].append({"video_id": vid, "title": video["title"], "reason": "no transcript"})
+            else:
+                result["drafts"][vid] = outcome
+                result["analyzed"] += 1
+
+        if concurrency > 1 and len(new_ids) > 1:
+            executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bes2-analyze")
+            try:
+                # 분석 스레드에서도 같은 실행(tracing)의 구간으로 기록되도록 영상마다 컨텍스트를 복사해서 실행
+                futures = {
+                    executor.submit(contextvars.copy_context().run, self._analyze_video, videos_by_id[vid], db_videos.get(vid)): vid
+                    for vid in new_ids
+                }
+                for done, future in enumerate(as_completed(futures), start=1):
+                    vid = futures[future]
+                    error = future.exception()
+                    record(vid, None if error else future.result(), error)
+                    on_progress(done, len(new_ids), f"🤖 [AI 분석] '{videos_by_id[vid]['title']}' 완료")
+            finally:
+                # 취소(on_progress 예외) 시 아직 시작하지 않은 영상은 버림
+                executor.shutdown(wait=True, cancel_futures=True)
+        else:
+            for idx, vid in enumerate(new_ids):
+                on_progress(idx, len(new_ids), f"🤖 [AI 분석] '{videos_by_id[vid]['title']}' 분석 중...")
+                try:
+                    record(vid, self._analyze_video(videos_by_id[vid], db_videos.get(vid)), None)
+                except Exception as e:
+                    record(vid, None, e)
+
+        on_progress(len(new_ids), len(new_ids), f"✅ {len(result['drafts'])}개 영상 분석 완료")
+        return result
@@ -0,0 +1,268 @@
+"""
+Bes2 Marketer - Retention Module
+오래된 데이터 정리 (청크 단위 삭제 + gzip JSONL 보관)
+
+한 번에 RETENTION_CHUNK_SIZE 행씩 조회 -> (보관) -> 삭제를 반복하므로
+각 DELETE는 짧은 트랜잭션으로 끝나고, 청크 사이에는 잠깐 쉬어 다른 쓰기에 양보합니다.
+
+헤드리스 실행 (cron / 작업 스케줄러):
+    python retention.py                     # 모든 정책 실행
+    python retention.py --dry-run           # 대상 건수만 확인
+    python retention.py --policy pending_drafts
+    python retention.py --every 24          # 24시간마다 반복 실행
+"""
+
+import argparse
+import gzip
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+from config import config
+from database import IN_FILTER_CHUNK, db
+
+
+# =========================================
+# 보존 정책
+# =========================================
+# name          : 정책 이름 (UI/CLI에서 선택)
+# table, key    : 대상 테이블과 기본 키 (청크 페이지네이션 기준)
+# age_column    : 기준 시각 컬럼, days일 이전 행이 대상
+# filters       : 추가 eq 조건
+# action        : "delete" (그냥 삭제) | "archive" (gzip JSONL로 보관 후 삭제)
+# keep_if       : (테이블, 컬럼) - 이 테이블에서 참조 중인 행은 남김
+#
+# ⚠️ videos 삭제 시 video_transcripts가 함께 삭제(CASCADE)되므로
+#    transcripts 정책이 더 짧은 기간으로 먼저 보관하도록 순서를 유지하세요.
+
+def default_policies() -> list[dict]:
+    """config 값으로 기본 보존 정책 목록 생성"""
+    return [
+        {
+            "name": "pending_drafts",
+            "label": "대기 중인 초안",
+            "table": "drafts",
+            "key": "id",
+            "age_column": "created_at",
+            "days": config.RETENTION_PENDING_DRAFT_DAYS,
+            "filters": {"status": "pending"},
+            "action": "delete",
+        },
+        {
+            "name": "rejected_drafts",
+            "label": "거절된 초안",
+            "table": "drafts",
+            "key": "id",
+            "age_column": "updated_at",
+            "days": config.RETENTION_REJECTED_DRAFT_DAYS,
+            "filters": {"status": "rejected"},
+            "action": "archive",
+        },
+        {
+            "name": "transcripts",
+            "label": "영상 자막/요약",
+            "table": "video_transcripts",
+            "key": "video_id",
+            "age_column": "updated_at",
+            "days": config.RETENTION_TRANSCRIPT_DAYS,
+            "filters": {},
+            "action": "archive",
+        },
+        {
+            "name": "stale_videos",
+            "label": "초안 없는 오래된 영상",
+            "table": "videos",
+            "key": "id",
+            "age_column": "created_at",
+            "days": config.RETENTION_VIDEO_DAYS,
+            "filters": {},
+            "action": "archive",
+            "keep_if": ("drafts", "video_id"),
+        },
+        {
+            "name": "finished_jobs",
+            "label": "끝난 백그라운드 작업",
+            "table": "jobs",
+            "key": "id",
+            "age_column": "finished_at",
+            "days": config.RETENTION_JOB_DAYS,
+            "filters": {},
+            "action": "delete",
+        },
+    ]
+
+
+# =========================================
+# 실행
+# =========================================
+
+def _iso(dt: datetime) -> str:
+    # SQLite 백엔드의 기본 시각 형식(밀리초)과 문자열 비교가 가능하도록 맞춤
+    return dt.astimezone(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def policy_cutoff(policy: dict, now: Optional[datetime] = None) -> str:
+    """정책 기준 시각 (age_column이 이 시각보다 이전인 행이 대상)"""
+    return _iso((now or datetime.now(timezone.utc)) - timedelta(days=policy["days"]))
+
+
+class RetentionRunner:
+    """보존 정책을 청크 단위로 실행"""
+
+    def __init__(
+        self,
+        client=None,
+        chunk_size: Optional[int] = None,
+        pause_seconds: Optional[float] = None,
+        archive_dir: Optional[str] = None
+    ):
+        self.client = client or db.client
+        self.chunk_size = chunk_size or config.RETENTION_CHUNK_SIZE
+        self.pause_seconds = config.RETENTION_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+        self.archive_dir = Path(archive_dir or config.RETENTION_ARCHIVE_DIR)
+
+    def _base_query(self, policy: dict, columns: str, cutoff: str, count: Optional[str] = None):
+        query = self.client.table(policy["table"]).select(columns, count=count)
+        for column, value in policy.get("filters", {}).items():
+            query = query.eq(column, value)
+        return query.lt(policy["age_column"], cutoff)
+
+    def count(self, policy: dict, cutoff: str) -> int:
+        """정책 대상 행 수 (keep_if로 남는 행 포함)"""
+        response = self._base_query(policy, policy["key"], cutoff, count="exact").limit(1).execute()
+        return response.count or 0
+
+    def _referenced(self, policy: dict, ids: list) -> set:
+        """keep_if 테이블에서 참조 중인 ID"""
+        ref_table, ref_column = policy["keep_if"]
+        referenced = set()
+        for i in range(0, len(ids), IN_FILTER_CHUNK):
+            response = self.client.table(ref_table).select(ref_column).in_(ref_column, ids[i:i + IN_FILTER_CHUNK]).execute()
+            referenced.update(row[ref_column] for row in response.data or [])
+        return referenced
+
+    def _delete(self, policy: dict, ids: list) -> int:
+        """ID 목록 삭제, 삭제된 행 수 반환 (in_ 필터가 URL 길이를 넘지 않도록 IN_FILTER_CHUNK씩)"""
+        deleted = 0
+        for i in range(0, len(ids), IN_FILTER_CHUNK):
+            response = self.client.table(policy["table"]).delete().in_(policy["key"], ids[i:i + IN_FILTER_CHUNK]).execute()
+            deleted += len(response.data or [])
+        return deleted
+
+    def run_policy(
+        self,
+        policy: dict,
+        dry_run: bool = False,
+        on_progress: Optional[Callable[[dict, int, int], None]] = None,
+        now: Optional[datetime] = None
+    ) -> dict:
+        """
+        정책 하나 실행
+        on_progress(policy, processed, total): 청크마다 호출 (UI 진행률 표시용)
+        반환: {"matched", "deleted", "archived", "kept", "archive_file"}
+        """
+        cutoff = policy_cutoff(policy, now)
+        key = policy["key"]
+        total = self.count(policy, cutoff)
+        result = {"matched": total, "deleted": 0, "archived": 0, "kept": 0, "archive_file": None}
+        if dry_run or total == 0:
+            return result
+
+        archive = None
+        if policy["action"] == "archive":
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            path = self.archive_dir / policy["table"] / f"{policy['name']}-{stamp}.jsonl.gz"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            archive = gzip.open(path, "at", encoding="utf-8")
+            result["archive_file"] = str(path)
+
+        columns = "*" if archive else key
+        last_key = None
+        processed = 0
+        try:
+            while True:
+                # 키 순서 페이지네이션 (남겨둔 행을 다시 읽지 않음)
+                query = self._base_query(policy, columns, cutoff).order(key).limit(self.chunk_size)
+                if last_key is not None:
+                    query = query.gt(key, last_key)
+                rows = query.execute().data or []
+                if not rows:
+                    break
+                last_key = rows[-1][key]
+                processed += len(rows)
+
+                if policy.get("keep_if"):
+                    referenced = self._referenced(policy, [r[key] for r in rows])
+                    result["kept"] += sum(1 for r in rows if r[key] in referenced)
+                    rows = [r for r in rows if r[key] not in referenced]
+
+                if rows:
+                    if archive:
+                        for row in rows:
+                            archive.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+                        archive.flush()
+                        result["archived"] += len(rows)
+
+                    result["deleted"] += self._delete(policy, [r[key] for r in rows])
+
+                if on_progress:
+                    on_progress(policy, min(processed, total), total)
+
+                # 다른 쓰기 작업에 잠금 양보
+                if self.pause_seconds:
+                    time.sleep(self.pause_seconds)
+        finally:
+            if archive:
+                archive.close()
+
+        return result
+
+    def run(
+        self,
+        names: Optional[list[str]] = None,
+        dry_run: bool = False,
+        on_progress: Optional[Callable[[dict, int, int], None]] = None
+    ) -> dict:
+        """정책 여러 개를 순서대로 실행 (names가 없으면 전체), 정책 이름 -> 결과"""
+        results = {}
+        for policy in default_policies():
+            if names and policy["name"] not in names:
+                continue
+            try:
+                results[policy["name"]] = self.run_policy(policy, dry_run=dry_run, on_progress=on_progress)
+            except Exception as e:
+                print(f"Error running retention policy {policy['name']}: {e}")
+                results[policy["name"]] = {"error": str(e)}
+        return results
+
+
+# =========================================
+# CLI (헤드리스 실행)
+# =========================================
+
+def _print_progress(policy: dict, processed: int, total: int) -> None:
+    print(f"  [{policy['name']}] {processed}/{total}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bes2 Marketer 데이터 보존 정책 실행")
+    parser.add_argument("--policy", action="append", help="실행할 정책 이름 (여러 번 지정 가능, 기본: 전체)")
+    parser.add_argument("--dry-run", action="store_true", help="삭제하지 않고 대상 건수만 출력")
+    parser.add_argument("--every", type=float, help="N시간마다 반복 실행")
+    args = parser.parse_args()
+
+    runner = RetentionRunner()
+    while True:
+        print(f"🧹 Retention run at {datetime.now().isoformat(timespec='seconds')}")
+        results = runner.run(names=args.policy, dry_run=args.dry_run, on_progress=_print_progress)
+        for name, result in results.items():
+            print(f"  {name}: {result}")
+        if not args.every:
+            break
+        time.sleep(args.every * 3600)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ CREATE TABLE IF NOT EXISTS leads (
     thumbnail_url TEXT,
     description TEXT,
     status VARCHAR(20) DEFAULT 'new' CHECK (status IN ('new', 'contacted', 'responded', 'converted', 'rejected')),
+    content_hash VARCHAR(16), -- 채널명/구독자/이메일 해시 (재스캔 시 변경 감지)
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -31,10 +32,20 @@ CREATE TABLE IF NOT EXISTS videos (
     comment_count INTEGER DEFAULT 0,
     video_url TEXT,
     thumbnail_url TEXT,
-    transcript_text TEXT, -- 자막 전체 텍스트
-    summary TEXT, -- AI 요약 내용
     relevance_score FLOAT DEFAULT 0, -- 관련성 점수 (0~1)
     search_keyword VARCHAR(100), -- 검색에 사용된 키워드
+    content_hash VARCHAR(16), -- 스캔 필드 해시 (재스캔 시 변경 감지)
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- 2-1. video_transcripts 테이블: 영상 자막/요약 (무거운 텍스트 분리)
+-- 목록 조회 시 videos 행에 최대 15KB의 자막이 딸려오지 않도록 별도 테이블로 분리합니다.
+-- (필요할 때만 Database.get_video_content()로 로드)
+CREATE TABLE IF NOT EXISTS video_transcripts (
+    video_id UUID PRIMARY KEY REFERENCES videos(id) ON DELETE CASCADE,
+    transcript_text TEXT, -- 자막 전체 텍스트
+    summary TEXT, -- AI 요약 내용
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -49,30 +60,310 @@ CREATE TABLE IF NOT EXISTS drafts (
     status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'approved', 'sent', 'rejected')),
     tone VARCHAR(50), -- 톤앤매너 (friendly, professional, casual 등)
     language VARCHAR(10) DEFAULT 'ko', -- 언어 코드
+    sent_at TIMESTAMP WITH TIME ZONE, -- 발송 시각 (mark_drafts_sent에서 기록)
+    -- AI 생성 오류 초안 (email_service.is_junk_content()와 같은 규칙, 탭 2 목록/일괄 발송 필터용)
+    is_junk BOOLEAN GENERATED ALWAYS AS (
+        btrim(content, E' \t\r\n') = '' OR
+        content LIKE '[AI 에러]%' OR
+        content LIKE '[오류]%' OR
+        content LIKE '%404 models/%'
+    ) STORED,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- 4. email_outbox 테이블: 이메일 발송 대기열 (outbox_worker.py가 처리)
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    draft_id UUID UNIQUE REFERENCES drafts(id) ON DELETE CASCADE,
+    lead_id UUID REFERENCES leads(id) ON DELETE SET NULL,
+    to_email VARCHAR(255) NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status VARCHAR(20) DEFAULT 'queued' CHECK (status IN ('queued', 'sending', 'sent', 'failed', 'cancelled')),
+    attempts INTEGER DEFAULT 0, -- 발송 시도 횟수 (claim 시 증가)
+    next_attempt_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(), -- 이 시각 이후에 발송 (재시도 백오프)
+    scheduled_at TIMESTAMP WITH TIME ZONE, -- send_scheduler가 배정한 발송 시각 (NULL이면 즉시)
+    last_error TEXT,
+    locked_by VARCHAR(100), -- 처리 중인 워커
+    locked_at TIMESTAMP WITH TIME ZONE,
+    sent_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- 5. jobs 테이블: 백그라운드 작업 (job_manager.py가 실행, 화면을 새로고침해도 진행 상황 유지)
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    kind VARCHAR(30) NOT NULL, -- 작업 종류 (search/sync/analysis)
+    status VARCHAR(20) DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled')),
+    params JSONB, -- 작업 입력
+    progress INTEGER DEFAULT 0,
+    total INTEGER DEFAULT 0,
+    message TEXT, -- 현재 단계 / 완료 요약
+    result JSONB, -- 작업 결과 (검색된 영상, 생성된 초안 등)
+    error TEXT,
+    worker VARCHAR(100), -- 실행 중인 프로세스 (호스트:PID)
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() -- 진행률을 쓸 때마다 갱신 (멈춘 작업 판별)
+);
+
 -- =============================================
 -- 인덱스 생성 (검색 성능 최적화)
 -- =============================================
 
+-- 조회 패턴(필터 + 정렬)에 맞춘 복합/부분 인덱스 (migrations/002_composite_indexes.sql)
+-- channel_id, video_id는 UNIQUE 제약의 인덱스를 그대로 사용합니다.
+
 -- leads 테이블 인덱스
-CREATE INDEX IF NOT EXISTS idx_leads_channel_id ON leads(channel_id);
-CREATE INDEX IF NOT EXISTS idx_leads_status ON leads(status);
 CREATE INDEX IF NOT EXISTS idx_leads_created_at ON leads(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_leads_status_created ON leads(status, created_at DESC);
 
 -- videos 테이블 인덱스
-CREATE INDEX IF NOT EXISTS idx_videos_video_id ON videos(video_id);
-CREATE INDEX IF NOT EXISTS idx_videos_lead_id ON videos(lead_id);
 CREATE INDEX IF NOT EXISTS idx_videos_upload_date ON videos(upload_date DESC);
 CREATE INDEX IF NOT EXISTS idx_videos_relevance ON videos(relevance_score DESC);
+CREATE INDEX IF NOT EXISTS idx_videos_keyword_relevance ON videos(search_keyword, relevance_score DESC);
+CREATE INDEX IF NOT EXISTS idx_videos_lead_upload ON videos(lead_id, upload_date DESC);
 
 -- drafts 테이블 인덱스
-CREATE INDEX IF NOT EXISTS idx_drafts_video_id ON drafts(video_id);
-CREATE INDEX IF NOT EXISTS idx_drafts_lead_id ON drafts(lead_id);
 CREATE INDEX IF NOT EXISTS idx_drafts_status ON drafts(status);
-CREATE INDEX IF NOT EXISTS idx_drafts_type ON drafts(draft_type);
+CREATE INDEX IF NOT EXISTS idx_drafts_type_status_created ON drafts(draft_type, status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_drafts_video_created ON drafts(video_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_drafts_lead_created ON drafts(lead_id, created_at DESC);
+
+-- 이메일 발송 대기열 전용 부분 인덱스 (pending 이메일만 색인)
+CREATE INDEX IF NOT EXISTS idx_drafts_pending_email
+    ON drafts(created_at DESC)
+    WHERE draft_type = 'email' AND status = 'pending';
+
+-- email_outbox: 워커가 발송할 차례인 행 / 최근 24시간 발송 수 (일일 한도)
+CREATE INDEX IF NOT EXISTS idx_outbox_status_next ON email_outbox(status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_outbox_sent_at ON email_outbox(sent_at) WHERE status = 'sent';
+-- 발송 일정: 이미 배정된 시각 (일일 쿼터/도메인 간격 계산)
+CREATE INDEX IF NOT EXISTS idx_outbox_scheduled_at ON email_outbox(scheduled_at) WHERE status = 'queued';
+
+-- jobs: 상태별 최근 작업 (진행 중인 작업 다시 연결 / 최근 작업 목록)
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_kind_created ON jobs(kind, created_at DESC);
+
+-- =============================================
+-- 검색 (Full-text + Trigram)
+-- =============================================
+-- ILIKE '%키워드%'는 B-tree 인덱스를 쓰지 못하므로 pg_trgm GIN 인덱스로 가속합니다.
+-- 제목/요약/자막은 'simple' 설정의 tsvector로 색인합니다.
+-- (한국어 형태소 분석기가 없으므로 검색어는 접두 일치(사진:* -> 사진을, 사진정리)로 매칭)
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_leads_channel_name_trgm ON leads USING gin (channel_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_videos_title_trgm ON videos USING gin (title gin_trgm_ops);
+
+-- 영상 검색 문서: 제목(A) / 요약(B) + 자막(C) 가중치
+CREATE OR REPLACE FUNCTION video_title_vector(title TEXT)
+RETURNS tsvector
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+$$;
+
+CREATE OR REPLACE FUNCTION transcript_search_vector(summary TEXT, transcript_text TEXT)
+RETURNS tsvector
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(summary, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(transcript_text, '')), 'C')
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_videos_title_vector
+    ON videos USING gin (video_title_vector(title::text));
+CREATE INDEX IF NOT EXISTS idx_video_transcripts_search_vector
+    ON video_transcripts USING gin (transcript_search_vector(summary, transcript_text));
+
+-- 검색어 -> 접두 일치 tsquery ("사진 정리" -> '사진':* & '정리':*)
+CREATE OR REPLACE FUNCTION prefix_tsquery(search_query TEXT)
+RETURNS tsquery
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT to_tsquery('simple', string_agg(term || ':*', ' & '))
+    FROM regexp_split_to_table(
+        btrim(regexp_replace(search_query, '[^[:alnum:][:space:]]', ' ', 'g')), '\s+'
+    ) AS term
+    WHERE term <> ''
+$$;
+
+-- 통합 검색 RPC: 채널명(리드) + 영상 제목/요약/자막, 랭킹 + 페이지네이션
+-- snippet(ts_headline)은 페이지에 포함된 행만 계산합니다.
+CREATE OR REPLACE FUNCTION search_content(
+    search_query TEXT,
+    search_kinds TEXT[] DEFAULT ARRAY['lead', 'video'],
+    result_limit INTEGER DEFAULT 20,
+    result_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+    kind TEXT,
+    id UUID,
+    lead_id UUID,
+    video_id VARCHAR,
+    title TEXT,
+    snippet TEXT,
+    rank REAL,
+    total_count BIGINT
+)
+LANGUAGE sql STABLE AS $$
+    WITH q AS (
+        SELECT prefix_tsquery(search_query) AS tsq,
+               '%' || btrim(search_query) || '%' AS pattern
+    ),
+    -- 제목 매칭과 자막 매칭을 각각 인덱스로 찾은 뒤 합침
+    video_matches AS (
+        SELECT v.id
+        FROM videos v, q
+        WHERE 'video' = ANY(search_kinds)
+          AND (v.title ILIKE q.pattern OR video_title_vector(v.title::text) @@ q.tsq)
+        UNION
+        SELECT t.video_id
+        FROM video_transcripts t, q
+        WHERE 'video' = ANY(search_kinds)
+          AND transcript_search_vector(t.summary, t.transcript_text) @@ q.tsq
+    ),
+    hits AS (
+        SELECT 'lead'::TEXT AS kind, l.id, l.id AS lead_id, NULL::VARCHAR AS video_id,
+               l.channel_name::TEXT AS title,
+               word_similarity(search_query, l.channel_name)::REAL AS rank
+        FROM leads l, q
+        WHERE 'lead' = ANY(search_kinds)
+          AND l.channel_name ILIKE q.pattern
+        UNION ALL
+        SELECT 'video'::TEXT, v.id, v.lead_id, v.video_id,
+               v.title::TEXT,
+               (ts_rank(video_title_vector(v.title::text), q.tsq)
+                   + coalesce(ts_rank(transcript_search_vector(t.summary, t.transcript_text), q.tsq), 0)
+                   + word_similarity(search_query, v.title))::REAL
+        FROM video_matches m
+        JOIN videos v ON v.id = m.id
+        LEFT JOIN video_transcripts t ON t.video_id = v.id
+        CROSS JOIN q
+    ),
+    page AS (
+        SELECT h.*, COUNT(*) OVER () AS total_count
+        FROM hits h
+        ORDER BY h.rank DESC, h.title
+        LIMIT result_limit OFFSET result_offset
+    )
+    SELECT p.kind, p.id, p.lead_id, p.video_id, p.title,
+           CASE WHEN p.kind = 'video' THEN
+               ts_headline('simple', coalesce(t.summary, t.transcript_text, ''), q.tsq,
+                           'MaxWords=20, MinWords=5, StartSel="", StopSel=""')
+           ELSE l.description END AS snippet,
+           p.rank, p.total_count
+    FROM page p
+    CROSS JOIN q
+    LEFT JOIN video_transcripts t ON p.kind = 'video' AND t.video_id = p.id
+    LEFT JOIN leads l ON p.kind = 'lead' AND l.id = p.id
+    ORDER BY p.rank DESC, p.title
+$$;
+
+-- =============================================
+-- 발송 처리 (초안 + 리드 상태를 한 트랜잭션으로)
+-- =============================================
+
+-- 초안들을 'sent'로 바꾸고 발송 시각을 기록한 뒤, 연결된 리드를 new -> contacted로 진행
+-- (이미 sent인 초안은 건너뛰고, responded/converted 등 이후 단계의 리드는 그대로 둠)
+CREATE OR REPLACE FUNCTION mark_drafts_sent(
+    draft_ids UUID[],
+    sent_time TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+)
+RETURNS TABLE (
+    id UUID,
+    lead_id UUID,
+    sent_at TIMESTAMP WITH TIME ZONE
+)
+LANGUAGE sql VOLATILE AS $$
+    WITH sent AS (
+        UPDATE drafts d
+        SET status = 'sent', sent_at = sent_time
+        WHERE d.id = ANY(draft_ids)
+          AND d.status <> 'sent'
+        RETURNING d.id, d.lead_id, d.sent_at
+    ),
+    contacted AS (
+        UPDATE leads l
+        SET status = 'contacted'
+        WHERE l.id IN (SELECT s.lead_id FROM sent s)
+          AND l.status = 'new'
+    )
+    SELECT s.id, s.lead_id, s.sent_at FROM sent s
+$$;
+
+-- =============================================
+-- 이메일 발송 대기열 (email_outbox)
+-- =============================================
+
+-- 발송할 행을 batch_size개 가져가면서 'sending'으로 잠금
+-- (SKIP LOCKED로 여러 워커가 같은 행을 가져가지 않음, lock_timeout이 지난 'sending' 행은 다시 가져감)
+CREATE OR REPLACE FUNCTION claim_outbox(
+    batch_size INTEGER DEFAULT 20,
+    worker TEXT DEFAULT NULL,
+    lock_timeout_seconds INTEGER DEFAULT 600
+)
+RETURNS SETOF email_outbox
+LANGUAGE sql VOLATILE AS $$
+    WITH picked AS (
+        SELECT o.id
+        FROM email_outbox o
+        WHERE (o.status = 'queued' AND o.next_attempt_at <= NOW())
+           OR (o.status = 'sending' AND o.locked_at < NOW() - make_interval(secs => lock_timeout_seconds))
+        ORDER BY o.next_attempt_at
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE email_outbox o
+    SET status = 'sending', locked_by = worker, locked_at = NOW(), attempts = o.attempts + 1
+    FROM picked
+    WHERE o.id = picked.id
+    RETURNING o.*
+$$;
+
+-- 발송 완료 처리: outbox 'sent' + 초안/리드 상태(mark_drafts_sent)를 한 트랜잭션으로
+CREATE OR REPLACE FUNCTION complete_outbox(outbox_ids UUID[])
+RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    done_drafts UUID[];
+    done_count INTEGER;
+BEGIN
+    WITH done AS (
+        UPDATE email_outbox
+        SET status = 'sent', sent_at = NOW(), locked_by = NULL, locked_at = NULL, last_error = NULL
+        WHERE id = ANY(outbox_ids) AND status <> 'sent'
+        RETURNING draft_id
+    )
+    SELECT array_agg(draft_id) FILTER (WHERE draft_id IS NOT NULL), count(*)
+    INTO done_drafts, done_count
+    FROM done;
+
+    IF done_drafts IS NOT NULL THEN
+        PERFORM mark_drafts_sent(done_drafts);
+    END IF;
+    RETURN done_count;
+END;
+$$;
+
+-- 발송 일정 일괄 저장: outbox_ids[i]의 scheduled_at/next_attempt_at을 slots[i]로 (queued 행만, 갱신 건수 반환)
+CREATE OR REPLACE FUNCTION schedule_outbox(
+    outbox_ids UUID[],
+    slots TIMESTAMP WITH TIME ZONE[]
+)
+RETURNS INTEGER
+LANGUAGE sql VOLATILE AS $$
+    WITH updated AS (
+        UPDATE email_outbox o
+        SET scheduled_at = a.slot, next_attempt_at = a.slot
+        FROM unnest(outbox_ids, slots) AS a(id, slot)
+        WHERE o.id = a.id AND o.status = 'queued'
+        RETURNING o.id
+    )
+    SELECT count(*)::INTEGER FROM updated
+$$;
 
 -- =============================================
 -- updated_at 자동 업데이트 트리거
@@ -100,12 +391,46 @@ CREATE TRIGGER update_videos_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+DROP TRIGGER IF EXISTS update_video_transcripts_updated_at ON video_transcripts;
+CREATE TRIGGER update_video_transcripts_updated_at
+    BEFORE UPDATE ON video_transcripts
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
 DROP TRIGGER IF EXISTS update_drafts_updated_at ON drafts;
 CREATE TRIGGER update_drafts_updated_at
     BEFORE UPDATE ON drafts
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+DROP TRIGGER IF EXISTS update_email_outbox_updated_at ON email_outbox;
+CREATE TRIGGER update_email_outbox_updated_at
+    BEFORE UPDATE ON email_outbox
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_jobs_updated_at ON jobs;
+CREATE TRIGGER update_jobs_updated_at
+    BEFORE UPDATE ON jobs
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- =============================================
+-- Realtime (이메일 발송 대기열 구독)
+-- =============================================
+-- pending_queue.py가 drafts 변경 이벤트를 구독합니다. (publication이 없는 환경은 건너뜀)
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_publication WHERE pubname = 'supabase_realtime')
+       AND NOT EXISTS (
+           SELECT 1 FROM pg_publication_tables
+           WHERE pubname = 'supabase_realtime' AND tablename = 'drafts'
+       ) THEN
+        ALTER PUBLICATION supabase_realtime ADD TABLE drafts;
+    END IF;
+END $$;
+
 -- =============================================
 -- Row Level Security (RLS) 설정 (선택사항)
 -- =============================================
@@ -113,7 +438,10 @@ CREATE TRIGGER update_drafts_updated_at
 
 -- ALTER TABLE leads ENABLE ROW LEVEL SECURITY;
 -- ALTER TABLE videos ENABLE ROW LEVEL SECURITY;
+-- ALTER TABLE video_transcripts ENABLE ROW LEVEL SECURITY;
 -- ALTER TABLE drafts ENABLE ROW LEVEL SECURITY;
+-- ALTER TABLE email_outbox ENABLE ROW LEVEL SECURITY;
+-- ALTER TABLE jobs ENABLE ROW LEVEL SECURITY;
 
 -- =============================================
 -- 초기 데이터 확인용 뷰 (선택사항)
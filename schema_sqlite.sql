@@ -0,0 +1,266 @@
+-- =============================================
+-- Bes2 Marketer - SQLite (로컬 백엔드) Schema
+-- =============================================
+-- schema.sql(Supabase)과 동일한 구조를 SQLite 문법으로 옮긴 버전입니다.
+-- DB_BACKEND=sqlite 일 때 sqlite_backend.py가 연결 시 자동으로 실행합니다.
+--
+-- 스키마가 바뀌면 sqlite_backend.SCHEMA_VERSION을 올리고, 추가한 컬럼은 sqlite_backend.MIGRATIONS에 기록합니다.
+-- (이전 버전으로 만든 로컬 DB 파일은 연결 시 PRAGMA user_version을 보고 빠진 컬럼을 추가합니다)
+--
+-- 타입 매핑
+--   UUID        -> TEXT (애플리케이션/기본값에서 UUID 문자열 생성)
+--   TEXT[]      -> JSON (JSON 배열 문자열)
+--   TIMESTAMPTZ -> TEXT (ISO 8601, UTC)
+
+-- 1. leads 테이블: 유튜버 정보
+CREATE TABLE IF NOT EXISTS leads (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(6)))),
+    channel_name VARCHAR(255) NOT NULL,
+    channel_id VARCHAR(50) UNIQUE NOT NULL,
+    subscriber_count INTEGER DEFAULT 0,
+    email VARCHAR(255),
+    keywords JSON, -- 주요 키워드 배열
+    channel_url TEXT,
+    thumbnail_url TEXT,
+    description TEXT,
+    status VARCHAR(20) DEFAULT 'new' CHECK (status IN ('new', 'contacted', 'responded', 'converted', 'rejected')),
+    content_hash VARCHAR(16), -- 채널명/구독자/이메일 해시 (재스캔 시 변경 감지)
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+-- 2. videos 테이블: 수집된 영상 정보
+CREATE TABLE IF NOT EXISTS videos (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(6)))),
+    lead_id TEXT REFERENCES leads(id) ON DELETE CASCADE,
+    video_id VARCHAR(50) UNIQUE NOT NULL,
+    title VARCHAR(500) NOT NULL,
+    upload_date TEXT,
+    view_count INTEGER DEFAULT 0,
+    like_count INTEGER DEFAULT 0,
+    comment_count INTEGER DEFAULT 0,
+    video_url TEXT,
+    thumbnail_url TEXT,
+    relevance_score FLOAT DEFAULT 0, -- 관련성 점수 (0~1)
+    search_keyword VARCHAR(100), -- 검색에 사용된 키워드
+    content_hash VARCHAR(16), -- 스캔 필드 해시 (재스캔 시 변경 감지)
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+-- 2-1. video_transcripts 테이블: 영상 자막/요약 (무거운 텍스트 분리)
+CREATE TABLE IF NOT EXISTS video_transcripts (
+    video_id TEXT PRIMARY KEY REFERENCES videos(id) ON DELETE CASCADE,
+    transcript_text TEXT, -- 자막 전체 텍스트
+    summary TEXT, -- AI 요약 내용
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+-- 3. drafts 테이블: AI 생성 마케팅 초안
+CREATE TABLE IF NOT EXISTS drafts (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(6)))),
+    video_id TEXT REFERENCES videos(id) ON DELETE CASCADE,
+    lead_id TEXT REFERENCES leads(id) ON DELETE CASCADE,
+    draft_type VARCHAR(20) NOT NULL CHECK (draft_type IN ('email', 'comment')),
+    content TEXT NOT NULL,
+    status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'approved', 'sent', 'rejected')),
+    tone VARCHAR(50), -- 톤앤매너 (friendly, professional, casual 등)
+    language VARCHAR(10) DEFAULT 'ko', -- 언어 코드
+    sent_at TEXT, -- 발송 시각 (mark_drafts_sent에서 기록)
+    -- AI 생성 오류 초안 (email_service.is_junk_content()와 같은 규칙, LIKE는 대소문자를 무시하므로 instr 사용)
+    is_junk BOOLEAN GENERATED ALWAYS AS (
+        trim(content, ' ' || char(9, 10, 13)) = '' OR
+        instr(content, '[AI 에러]') = 1 OR
+        instr(content, '[오류]') = 1 OR
+        instr(content, '404 models/') > 0
+    ) STORED,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+-- 4. email_outbox 테이블: 이메일 발송 대기열 (outbox_worker.py가 처리)
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(6)))),
+    draft_id TEXT UNIQUE REFERENCES drafts(id) ON DELETE CASCADE,
+    lead_id TEXT REFERENCES leads(id) ON DELETE SET NULL,
+    to_email VARCHAR(255) NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status VARCHAR(20) DEFAULT 'queued' CHECK (status IN ('queued', 'sending', 'sent', 'failed', 'cancelled')),
+    attempts INTEGER DEFAULT 0, -- 발송 시도 횟수 (claim 시 증가)
+    next_attempt_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')), -- 이 시각 이후에 발송 (재시도 백오프)
+    scheduled_at TEXT, -- send_scheduler가 배정한 발송 시각 (NULL이면 즉시)
+    last_error TEXT,
+    locked_by VARCHAR(100), -- 처리 중인 워커
+    locked_at TEXT,
+    sent_at TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+-- 5. jobs 테이블: 백그라운드 작업 (job_manager.py가 실행, 화면을 새로고침해도 진행 상황 유지)
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(6)))),
+    kind VARCHAR(30) NOT NULL, -- 작업 종류 (search/sync/analysis)
+    status VARCHAR(20) DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled')),
+    params JSON, -- 작업 입력
+    progress INTEGER DEFAULT 0,
+    total INTEGER DEFAULT 0,
+    message TEXT, -- 현재 단계 / 완료 요약
+    result JSON, -- 작업 결과 (검색된 영상, 생성된 초안 등)
+    error TEXT,
+    worker VARCHAR(100), -- 실행 중인 프로세스 (호스트:PID)
+    started_at TEXT,
+    finished_at TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')) -- 진행률을 쓸 때마다 갱신 (멈춘 작업 판별)
+);
+
+-- =============================================
+-- 인덱스 생성 (검색 성능 최적화)
+-- =============================================
+
+-- 조회 패턴(필터 + 정렬)에 맞춘 복합/부분 인덱스 (schema.sql과 동일)
+
+-- leads 테이블 인덱스
+CREATE INDEX IF NOT EXISTS idx_leads_created_at ON leads(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_leads_status_created ON leads(status, created_at DESC);
+
+-- videos 테이블 인덱스
+CREATE INDEX IF NOT EXISTS idx_videos_upload_date ON videos(upload_date DESC);
+CREATE INDEX IF NOT EXISTS idx_videos_relevance ON videos(relevance_score DESC);
+CREATE INDEX IF NOT EXISTS idx_videos_keyword_relevance ON videos(search_keyword, relevance_score DESC);
+CREATE INDEX IF NOT EXISTS idx_videos_lead_upload ON videos(lead_id, upload_date DESC);
+
+-- drafts 테이블 인덱스
+CREATE INDEX IF NOT EXISTS idx_drafts_status ON drafts(status);
+CREATE INDEX IF NOT EXISTS idx_drafts_type_status_created ON drafts(draft_type, status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_drafts_video_created ON drafts(video_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_drafts_lead_created ON drafts(lead_id, created_at DESC);
+
+-- 이메일 발송 대기열 전용 부분 인덱스
+CREATE INDEX IF NOT EXISTS idx_drafts_pending_email
+    ON drafts(created_at DESC)
+    WHERE draft_type = 'email' AND status = 'pending';
+
+-- email_outbox: 워커가 발송할 차례인 행 / 최근 24시간 발송 수 (일일 한도)
+CREATE INDEX IF NOT EXISTS idx_outbox_status_next ON email_outbox(status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_outbox_sent_at ON email_outbox(sent_at) WHERE status = 'sent';
+-- 발송 일정: 이미 배정된 시각 (일일 쿼터/도메인 간격 계산)
+CREATE INDEX IF NOT EXISTS idx_outbox_scheduled_at ON email_outbox(scheduled_at) WHERE status = 'queued';
+
+-- jobs: 상태별 최근 작업 (진행 중인 작업 다시 연결 / 최근 작업 목록)
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_kind_created ON jobs(kind, created_at DESC);
+
+-- =============================================
+-- 검색 (FTS5)
+-- =============================================
+-- Postgres의 tsvector/pg_trgm 대신 FTS5 외부 콘텐츠 테이블을 사용합니다.
+-- (search_content RPC는 sqlite_backend.py에서 Python으로 구현)
+-- ⚠️ rowid로 연결되므로 VACUUM 후에는 각 FTS 테이블에 'rebuild' 명령 필요
+--    예: INSERT INTO videos_fts(videos_fts) VALUES('rebuild')
+
+CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(
+    title, content='videos', content_rowid='rowid', tokenize='unicode61'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS video_transcripts_fts USING fts5(
+    summary, transcript_text,
+    content='video_transcripts', content_rowid='rowid', tokenize='unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS videos_fts_insert AFTER INSERT ON videos BEGIN
+    INSERT INTO videos_fts(rowid, title) VALUES (NEW.rowid, NEW.title);
+END;
+
+CREATE TRIGGER IF NOT EXISTS videos_fts_delete AFTER DELETE ON videos BEGIN
+    INSERT INTO videos_fts(videos_fts, rowid, title) VALUES ('delete', OLD.rowid, OLD.title);
+END;
+
+CREATE TRIGGER IF NOT EXISTS videos_fts_update AFTER UPDATE OF title ON videos BEGIN
+    INSERT INTO videos_fts(videos_fts, rowid, title) VALUES ('delete', OLD.rowid, OLD.title);
+    INSERT INTO videos_fts(rowid, title) VALUES (NEW.rowid, NEW.title);
+END;
+
+CREATE TRIGGER IF NOT EXISTS video_transcripts_fts_insert AFTER INSERT ON video_transcripts BEGIN
+    INSERT INTO video_transcripts_fts(rowid, summary, transcript_text)
+    VALUES (NEW.rowid, NEW.summary, NEW.transcript_text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS video_transcripts_fts_delete AFTER DELETE ON video_transcripts BEGIN
+    INSERT INTO video_transcripts_fts(video_transcripts_fts, rowid, summary, transcript_text)
+    VALUES ('delete', OLD.rowid, OLD.summary, OLD.transcript_text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS video_transcripts_fts_update AFTER UPDATE OF summary, transcript_text ON video_transcripts BEGIN
+    INSERT INTO video_transcripts_fts(video_transcripts_fts, rowid, summary, transcript_text)
+    VALUES ('delete', OLD.rowid, OLD.summary, OLD.transcript_text);
+    INSERT INTO video_transcripts_fts(rowid, summary, transcript_text)
+    VALUES (NEW.rowid, NEW.summary, NEW.transcript_text);
+END;
+
+-- =============================================
+-- updated_at 자동 업데이트 트리거
+-- =============================================
+-- (updated_at을 직접 지정한 UPDATE는 건드리지 않음)
+
+CREATE TRIGGER IF NOT EXISTS update_leads_updated_at
+    AFTER UPDATE ON leads
+    FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE leads SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_videos_updated_at
+    AFTER UPDATE ON videos
+    FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE videos SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_video_transcripts_updated_at
+    AFTER UPDATE ON video_transcripts
+    FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE video_transcripts SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') WHERE video_id = NEW.video_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_drafts_updated_at
+    AFTER UPDATE ON drafts
+    FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE drafts SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_email_outbox_updated_at
+    AFTER UPDATE ON email_outbox
+    FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE email_outbox SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_jobs_updated_at
+    AFTER UPDATE ON jobs
+    FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE jobs SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') WHERE id = NEW.id;
+END;
+
+-- =============================================
+-- 초기 데이터 확인용 뷰
+-- =============================================
+
+CREATE VIEW IF NOT EXISTS lead_summary AS
+SELECT
+    l.id,
+    l.channel_name,
+    l.subscriber_count,
+    l.status,
+    COUNT(DISTINCT v.id) as video_count,
+    COUNT(DISTINCT d.id) as draft_count
+FROM leads l
+LEFT JOIN videos v ON l.id = v.lead_id
+LEFT JOIN drafts d ON l.id = d.lead_id
+GROUP BY l.id, l.channel_name, l.subscriber_count, l.status;
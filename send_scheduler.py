@@ -0,0 +1,223 @@
+"""
+Bes2 Marketer - Send Scheduler
+발송 대기열(email_outbox)의 메일에 발송 시각을 배정해 하루에 고르게 분산
+
+배정 규칙 (SEND_TIMEZONE 기준)
+- SEND_WINDOWS 시간대 + SEND_WEEKDAYS 요일에만 배정 (수신자가 메일을 읽기 좋은 시간)
+- 배정된 시각끼리는 SEND_SLOT_SECONDS 이상 간격
+- 같은 수신 도메인(gmail.com, naver.com 등)끼리는 SEND_DOMAIN_SPACING_SECONDS 이상 간격
+- 하루 SEND_DAILY_QUOTA건(이미 발송된 건 포함)을 넘으면 다음 발송일로
+
+배정 결과는 scheduled_at(= next_attempt_at)으로 저장되고,
+outbox_worker는 next_attempt_at이 지난 행만 가져가므로 그 시각에 발송됩니다.
+SEND_WINDOWS=off 이면 스케줄러를 쓰지 않습니다. (대기열에 넣는 즉시 발송)
+.env/Secrets의 빈 값은 설정하지 않은 것으로 보고 기본 시간대를 쓰므로, 끌 때는 비우지 말고 off로 지정하세요.
+"""
+
+import bisect
+from datetime import datetime, time as dtime, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from config import config
+from database import Database, db
+
+
+# 빈 시간대가 없을 때 무한히 찾지 않도록 하는 상한
+MAX_SCHEDULE_DAYS = 60
+
+
+def _iso(dt: datetime) -> str:
+    # outbox_worker와 같은 형식 (SQLite 백엔드에서 문자열 비교 가능)
+    return dt.astimezone(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def parse_windows(spec: str) -> list[tuple[dtime, dtime]]:
+    """
+    "10:00-12:00,14:00-18:00" -> [(10:00, 12:00), (14:00, 18:00)] (시작 시각순)
+    "off" / "none" / 빈 문자열 -> [] (스케줄러 사용 안 함)
+    """
+    windows = []
+    if (spec or "").strip().lower() in ("off", "none"):
+        return windows
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, end = (dtime.fromisoformat(t.strip()) for t in part.split("-"))
+        if end <= start:
+            raise ValueError(f"Invalid send window (end must be after start): {part}")
+        windows.append((start, end))
+    return sorted(windows)
+
+
+def parse_weekdays(spec: str) -> set[int]:
+    """"0,1,2,3,4" -> {0, 1, 2, 3, 4} (비어 있으면 모든 요일)"""
+    days = {int(d) for d in (spec or "").split(",") if d.strip()}
+    return days or set(range(7))
+
+
+def email_domain(email: str) -> str:
+    return email.rsplit("@", 1)[-1].strip().lower() if email else ""
+
+
+class SendScheduler:
+    """발송 시간대/도메인 간격/일일 쿼터에 맞춰 발송 시각 배정"""
+
+    def __init__(
+        self,
+        database: Optional[Database] = None,
+        windows: Optional[str] = None,
+        weekdays: Optional[str] = None,
+        tz: Optional[str] = None,
+        daily_quota: Optional[int] = None,
+        slot_seconds: Optional[float] = None,
+        domain_spacing_seconds: Optional[float] = None
+    ):
+        self.db = database or db
+        self.windows = parse_windows(config.SEND_WINDOWS if windows is None else windows)
+        self.weekdays = parse_weekdays(config.SEND_WEEKDAYS if weekdays is None else weekdays)
+        self.tz = ZoneInfo(tz or config.SEND_TIMEZONE)
+        self.daily_quota = config.SEND_DAILY_QUOTA if daily_quota is None else daily_quota
+        self.slot = timedelta(seconds=config.SEND_SLOT_SECONDS if slot_seconds is None else slot_seconds)
+        self.domain_spacing = timedelta(
+            seconds=config.SEND_DOMAIN_SPACING_SECONDS if domain_spacing_seconds is None else domain_spacing_seconds
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.windows) and self.daily_quota > 0
+
+    # =========================================
+    # 시각 계산
+    # =========================================
+
+    def _fit_window(self, t: datetime) -> datetime:
+        """t 이후 가장 이른 발송 가능 시각 (시간대/요일 안으로 이동)"""
+        local = t.astimezone(self.tz)
+        for _ in range(MAX_SCHEDULE_DAYS + 1):
+            if local.weekday() in self.weekdays:
+                for start, end in self.windows:
+                    window_start = datetime.combine(local.date(), start, tzinfo=self.tz)
+                    window_end = datetime.combine(local.date(), end, tzinfo=self.tz)
+                    if local < window_end:
+                        return max(local, window_start)
+            local = datetime.combine(local.date() + timedelta(days=1), dtime(0), tzinfo=self.tz)
+        raise ValueError(f"No send window within {MAX_SCHEDULE_DAYS} days")
+
+    def _next_day(self, t: datetime) -> datetime:
+        local = t.astimezone(self.tz)
+        return datetime.combine(local.date() + timedelta(days=1), dtime(0), tzinfo=self.tz)
+
+    def plan(
+        self,
+        items: list[dict],
+        scheduled: Optional[list[dict]] = None,
+        sent_today: int = 0,
+        now: Optional[datetime] = None
+    ) -> dict[str, str]:
+        """
+        발송 시각 배정 (DB 접근 없음)
+        items: 배정할 행 [{"id", "to_email"}, ...] - 이 순서대로 가장 이른 빈 시각에 배정
+        scheduled: 이미 배정된 행 [{"to_email", "scheduled_at"}, ...] (피해서 배정)
+        sent_today: 오늘 이미 발송한 건수 (오늘 쿼터에서 차감)
+        반환: {id: ISO 시각}
+        """
+        now = now or datetime.now(timezone.utc)
+        today = now.astimezone(self.tz).date()
+
+        taken: list[datetime] = []
+        per_day: dict = {today: sent_today}
+        domain_slots: dict[str, list[datetime]] = {}
+
+        def occupy(t: datetime, domain: str) -> None:
+            bisect.insort(taken, t)
+            day = t.astimezone(self.tz).date()
+            per_day[day] = per_day.get(day, 0) + 1
+            bisect.insort(domain_slots.setdefault(domain, []), t)
+
+        def conflict(slots: list[datetime], t: datetime, gap: timedelta) -> Optional[datetime]:
+            """t와 gap 이내로 붙어 있는 배정 시각 (없으면 None)"""
+            i = bisect.bisect_right(slots, t - gap)
+            if i < len(slots) and slots[i] < t + gap:
+                return slots[i]
+            return None
+
+        for row in scheduled or []:
+            occupy(_parse_time(row["scheduled_at"]), email_domain(row.get("to_email")))
+
+        assignments = {}
+        for item in items:
+            domain = email_domain(item.get("to_email"))
+            t = now
+            while True:
+                t = self._fit_window(t)
+                if (t - now).days > MAX_SCHEDULE_DAYS:
+                    raise ValueError(f"No free send slot within {MAX_SCHEDULE_DAYS} days")
+                if per_day.get(t.astimezone(self.tz).date(), 0) >= self.daily_quota:
+                    t = self._next_day(t)
+                    continue
+                hit = conflict(taken, t, self.slot)
+                if hit is not None:
+                    t = hit + self.slot
+                    continue
+                if domain:
+                    hit = conflict(domain_slots.get(domain, []), t, self.domain_spacing)
+                    if hit is not None:
+                        t = hit + self.domain_spacing
+                        continue
+                break
+            occupy(t, domain)
+            assignments[item["id"]] = _iso(t)
+        return assignments
+
+    # =========================================
+    # 배정 + 저장
+    # =========================================
+
+    def _load_state(self, now: datetime, keep_existing: bool = True) -> tuple[list[dict], int]:
+        """오늘(SEND_TIMEZONE) 0시 이후 배정된 행 + 오늘 발송 건수"""
+        local_midnight = _iso(datetime.combine(now.astimezone(self.tz).date(), dtime(0), tzinfo=self.tz))
+        scheduled = self.db.get_outbox_schedule(local_midnight) if keep_existing else []
+        return scheduled, self.db.count_outbox_sent_since(local_midnight)
+
+    def assign(self, rows: list[dict]) -> list[dict]:
+        """
+        대기열에 넣기 전의 행에 scheduled_at / next_attempt_at 채우기 (rows를 직접 수정해서 반환)
+        rows: enqueue_emails()에 넘길 행 ({"draft_id", "to_email", ...})
+        """
+        if not self.enabled or not rows:
+            return rows
+        now = datetime.now(timezone.utc)
+        scheduled, sent_today = self._load_state(now)
+        items = [{"id": index, "to_email": row["to_email"]} for index, row in enumerate(rows)]
+        for index, slot in self.plan(items, scheduled, sent_today, now).items():
+            rows[index]["scheduled_at"] = slot
+            rows[index]["next_attempt_at"] = slot
+        return rows
+
+    def schedule_unscheduled(self) -> int:
+        """일정이 없는 queued 행(스케줄러 도입 전 / 설정 변경 전에 들어온 행)에 일정 배정"""
+        if not self.enabled:
+            return 0
+        items = self.db.get_queued_outbox(unscheduled_only=True)
+        if not items:
+            return 0
+        now = datetime.now(timezone.utc)
+        scheduled, sent_today = self._load_state(now)
+        return self.db.schedule_outbox(self.plan(items, scheduled, sent_today, now))
+
+    def reschedule_all(self) -> int:
+        """queued 행 전체의 일정을 현재 설정으로 다시 배정 (시간대/쿼터 변경 후)"""
+        if not self.enabled:
+            return 0
+        items = self.db.get_queued_outbox(unscheduled_only=False)
+        if not items:
+            return 0
+        now = datetime.now(timezone.utc)
+        _, sent_today = self._load_state(now, keep_existing=False)
+        return self.db.schedule_outbox(self.plan(items, [], sent_today, now))
@@ -0,0 +1,202 @@
+"""
+Bes2 Marketer - Local SMTP Sink
+실제 메일을 보내지 않고 받기만 하는 로컬 SMTP 서버 (개발/테스트/벤치마크용)
+
+EmailSender가 접속하는 흐름(EHLO -> AUTH -> MAIL/RCPT/DATA -> QUIT)을 그대로 받아주므로
+Gmail 계정 없이 발송 기능을 끝까지 확인할 수 있습니다. (TLS 미지원: SMTP_SECURITY=none)
+
+사용법:
+    python smtp_sink.py                        # localhost:8025에서 대기
+    python smtp_sink.py --save-dir sink_mail   # 받은 메일을 .eml 파일로 저장
+    python smtp_sink.py --latency 0.05         # 응답마다 50ms 지연 (네트워크 왕복 흉내)
+
+    # .env
+    SMTP_HOST=localhost
+    SMTP_PORT=8025
+    SMTP_SECURITY=none
+
+표준 라이브러리만 사용합니다. (smtpd 모듈은 Python 3.12에서 제거되었고 aiosmtpd는 추가 의존성)
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """연결 하나의 SMTP 대화 처리 (명령마다 250 응답, DATA는 '.'까지 읽어서 보관)"""
+
+    def _reply(self, line: str) -> None:
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.wfile.write((line + "\r\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def _readline(self) -> Optional[str]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        return line.decode("utf-8", errors="replace").rstrip("\r\n")
+
+    def handle(self) -> None:
+        self._reply("220 localhost Bes2 SMTP sink ready")
+        mail_from, rcpt_to = None, []
+        while True:
+            line = self._readline()
+            if line is None:
+                return
+            command = line[:4].upper()
+
+            if command == "EHLO":
+                self._reply("250-localhost")
+                self._reply("250-AUTH PLAIN LOGIN")
+                self._reply("250-8BITMIME")
+                self._reply("250 SMTPUTF8")
+            elif command == "HELO":
+                self._reply("250 localhost")
+            elif command == "AUTH":
+                parts = line.split()
+                mechanism = parts[1].upper() if len(parts) > 1 else ""
+                if mechanism == "PLAIN" and len(parts) < 3:
+                    self._reply("334 ")
+                    self._readline()
+                elif mechanism == "LOGIN":
+                    # 사용자명(초기 응답으로 왔을 수도 있음) / 비밀번호
+                    if len(parts) < 3:
+                        self._reply("334 VXNlcm5hbWU6")
+                        self._readline()
+                    self._reply("334 UGFzc3dvcmQ6")
+                    self._readline()
+                self._reply("235 2.7.0 Authentication successful")
+            elif command == "MAIL":
+                mail_from, rcpt_to = line[10:].strip(), []
+                self._reply("250 OK")
+            elif command == "RCPT":
+                rcpt_to.append(line[8:].strip())
+                self._reply("250 OK")
+            elif command == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data_line = self._readline()
+                    if data_line is None:
+                        return
+                    if data_line == ".":
+                        break
+                    # dot-stuffing 복원
+                    lines.append(data_line[1:] if data_line.startswith("..") else data_line)
+                self.server.store(mail_from, rcpt_to, "\r\n".join(lines))
+                mail_from, rcpt_to = None, []
+                self._reply("250 OK queued")
+            elif command in ("RSET", "NOOP"):
+                self._reply("250 OK")
+            elif command == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class _SinkServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, latency: float, save_dir: Optional[Path], keep_messages: bool):
+        super().__init__(address, _SMTPHandler)
+        self.latency = latency
+        self.save_dir = save_dir
+        self.keep_messages = keep_messages
+        self.messages: list[dict] = []
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def store(self, mail_from: str, rcpt_to: list[str], data: str) -> None:
+        with self._lock:
+            self.count += 1
+            number = self.count
+            if self.keep_messages:
+                self.messages.append({"from": mail_from, "to": rcpt_to, "data": data})
+        if self.save_dir:
+            (self.save_dir / f"{int(time.time() * 1000)}-{number:06d}.eml").write_text(data, encoding="utf-8")
+
+
+class SMTPSink:
+    """
+    백그라운드 스레드에서 도는 로컬 SMTP 서버
+    port=0이면 빈 포트를 자동으로 골라 self.port에 기록
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 8025,
+        latency: float = 0.0,
+        save_dir: Optional[str] = None,
+        keep_messages: bool = True
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.save_dir = Path(save_dir) if save_dir else None
+        self.keep_messages = keep_messages
+        self._server: Optional[_SinkServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SMTPSink":
+        if self.save_dir:
+            self.save_dir.mkdir(parents=True, exist_ok=True)
+        self._server = _SinkServer((self.host, self.port), self.latency, self.save_dir, self.keep_messages)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="smtp-sink", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def count(self) -> int:
+        return self._server.count if self._server else 0
+
+    @property
+    def messages(self) -> list[dict]:
+        return self._server.messages if self._server else []
+
+    def __enter__(self) -> "SMTPSink":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bes2 Marketer 로컬 SMTP 싱크 (받기만 하고 보내지 않음)")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답마다 추가할 지연 (초)")
+    parser.add_argument("--save-dir", help="받은 메일을 .eml로 저장할 폴더")
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.host, args.port, args.latency, args.save_dir, keep_messages=False).start()
+    print(f"📭 SMTP sink listening on {sink.host}:{sink.port} (Ctrl+C to stop)")
+    try:
+        last = 0
+        while True:
+            time.sleep(1)
+            if sink.count != last:
+                last = sink.count
+                print(f"  📨 {last} message(s) received")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.stop()
+
+
+if __name__ == "__main__":
+    main()
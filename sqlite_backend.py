@@ -0,0 +1,724 @@
+"""
+Bes2 Marketer - SQLite Backend
+Supabase(PostgREST) 쿼리 빌더와 같은 인터페이스를 가진 로컬 SQLite 클라이언트
+
+database.Database는 self.client.table(...).select(...).eq(...).execute() 형태로만
+DB에 접근하므로, 이 클라이언트를 끼워 넣으면 같은 코드가 로컬 파일 DB 위에서 동작합니다.
+(오프라인 개발, 로컬 캐시/엣지 저장소, 테스트/벤치마크용)
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+
+SCHEMA_PATH = Path(__file__).with_name("schema_sqlite.sql")
+
+# schema_sqlite.sql 버전 (PRAGMA user_version에 기록)
+SCHEMA_VERSION = 6
+
+# 이전 버전 로컬 DB에 추가할 컬럼: 버전 -> [(테이블, 컬럼, 컬럼 정의)]
+# 새 테이블/인덱스/트리거는 schema_sqlite.sql의 IF NOT EXISTS로 만들어지므로 컬럼 추가만 기록
+# (테이블이 없으면 건너뜀 - 스키마 스크립트가 최신 구조로 생성)
+MIGRATIONS = {
+    3: [("drafts", "sent_at", "TEXT")],
+    4: [("leads", "content_hash", "VARCHAR(16)"), ("videos", "content_hash", "VARCHAR(16)")],
+    5: [("email_outbox", "scheduled_at", "TEXT")],
+    # ALTER TABLE은 STORED 생성 컬럼을 추가할 수 없어 VIRTUAL로 추가 (값과 필터 결과는 같음)
+    6: [("drafts", "is_junk", """BOOLEAN GENERATED ALWAYS AS (
+        trim(content, ' ' || char(9, 10, 13)) = '' OR
+        instr(content, '[AI 에러]') = 1 OR
+        instr(content, '[오류]') = 1 OR
+        instr(content, '404 models/') > 0
+    ) VIRTUAL""")],
+}
+
+# 이보다 오래된 DB(v1: videos에 자막이 있던 구조)는 컬럼 추가로 옮길 수 없음
+MIN_MIGRATABLE_VERSION = 2
+
+# 연결 시 적용할 PRAGMA (WAL + 적당한 동기화 수준)
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",  # 약 16MB
+]
+
+_EMBED_PATTERN = re.compile(r"^(?:(\w+):)?(\w+)(!inner)?\((.*)\)$", re.DOTALL)
+
+
+class APIResponse:
+    """postgrest.APIResponse와 같은 모양의 응답 객체"""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def _split_top_level(text: str) -> list[str]:
+    """괄호 밖의 쉼표를 기준으로 select 문자열 분리"""
+    parts, depth, current = [], 0, []
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def _parse_select(columns: str) -> tuple[list[str], list[dict]]:
+    """select 문자열을 (일반 컬럼 목록, 임베드 목록)으로 변환"""
+    plain, embeds = [], []
+    for item in _split_top_level(columns or "*"):
+        match = _EMBED_PATTERN.match(item)
+        if match:
+            alias, relation, inner, inner_cols = match.groups()
+            embeds.append({
+                "alias": alias or relation,
+                "table": relation,
+                "inner": bool(inner),
+                "columns": inner_cols.strip() or "*",
+            })
+        else:
+            plain.append(item)
+    return plain, embeds
+
+
+def _encode(value: Any) -> Any:
+    """Python 값을 SQLite 저장용 값으로 변환"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class QueryBuilder:
+    """PostgREST 요청 빌더의 SQLite 구현 (Database 모듈에서 쓰는 범위만 지원)"""
+
+    def __init__(self, client: "SQLiteClient", table: str):
+        self._client = client
+        self._table = table
+        self._method = "select"
+        self._columns = "*"
+        self._count: Optional[str] = None
+        self._payload: Any = None
+        self._on_conflict: Optional[str] = None
+        self._filters: list[tuple[str, str, Any, bool]] = []
+        self._order: list[tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._offset: Optional[int] = None
+        self._negate_next = False
+
+    # ---------- 요청 종류 ----------
+
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "QueryBuilder":
+        self._method = "select"
+        self._columns = columns
+        self._count = count
+        return self
+
+    def insert(self, data: Any) -> "QueryBuilder":
+        self._method = "insert"
+        self._payload = data
+        return self
+
+    def upsert(self, data: Any, on_conflict: Optional[str] = None) -> "QueryBuilder":
+        self._method = "upsert"
+        self._payload = data
+        self._on_conflict = on_conflict
+        return self
+
+    def update(self, data: dict) -> "QueryBuilder":
+        self._method = "update"
+        self._payload = data
+        return self
+
+    def delete(self) -> "QueryBuilder":
+        self._method = "delete"
+        return self
+
+    # ---------- 필터 ----------
+
+    def _add_filter(self, column: str, op: str, value: Any) -> "QueryBuilder":
+        self._filters.append((column, op, value, self._negate_next))
+        self._negate_next = False
+        return self
+
+    @property
+    def not_(self) -> "QueryBuilder":
+        self._negate_next = True
+        return self
+
+    def eq(self, column: str, value: Any) -> "QueryBuilder":
+        return self._add_filter(column, "=", value)
+
+    def neq(self, column: str, value: Any) -> "QueryBuilder":
+        return self._add_filter(column, "!=", value)
+
+    def gt(self, column: str, value: Any) -> "QueryBuilder":
+        return self._add_filter(column, ">", value)
+
+    def gte(self, column: str, value: Any) -> "QueryBuilder":
+        return self._add_filter(column, ">=", value)
+
+    def lt(self, column: str, value: Any) -> "QueryBuilder":
+        return self._add_filter(column, "<", value)
+
+    def lte(self, column: str, value: Any) -> "QueryBuilder":
+        return self._add_filter(column, "<=", value)
+
+    def ilike(self, column: str, pattern: str) -> "QueryBuilder":
+        # SQLite LIKE는 기본적으로 대소문자를 구분하지 않음 (ASCII)
+        return self._add_filter(column, "LIKE", pattern.replace("*", "%"))
+
+    def in_(self, column: str, values: list) -> "QueryBuilder":
+        return self._add_filter(column, "IN", list(values))
+
+    def is_(self, column: str, value: Any) -> "QueryBuilder":
+        return self._add_filter(column, "IS", value)
+
+    # ---------- 정렬 / 페이지네이션 ----------
+
+    def order(self, column: str, desc: bool = False) -> "QueryBuilder":
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int) -> "QueryBuilder":
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int) -> "QueryBuilder":
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    # ---------- 실행 ----------
+
+    def execute(self) -> APIResponse:
+        if self._method == "select":
+            return self._client._select(self)
+        if self._method in ("insert", "upsert"):
+            return self._client._write(self)
+        if self._method == "update":
+            return self._client._update(self)
+        return self._client._delete(self)
+
+
+class RPCBuilder:
+    """client.rpc(name, params).execute() 호환 객체"""
+
+    def __init__(self, client: "SQLiteClient", name: str, params: dict):
+        self._client = client
+        self._name = name
+        self._params = params or {}
+
+    def execute(self) -> APIResponse:
+        func = self._client.functions.get(self._name)
+        if func is None:
+            raise NotImplementedError(f"RPC '{self._name}' is not available on the SQLite backend")
+        return APIResponse(func(self._client, **self._params))
+
+
+class SQLiteClient:
+    """Supabase Client 대신 사용할 수 있는 로컬 SQLite 클라이언트"""
+
+    def __init__(self, path: str = "bes2_local.db", schema_path: Path = SCHEMA_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        # RPC 이름 -> fn(client, **params) (schema.sql의 Postgres 함수에 대응)
+        self.functions: dict[str, Callable[..., Any]] = dict(BUILTIN_FUNCTIONS)
+        self._table_info: dict[str, dict[str, str]] = {}
+        self._pk_info: dict[str, str] = {}
+        self._fk_info: dict[str, list[tuple[str, str, str]]] = {}
+
+        with self._lock:
+            for pragma in PRAGMAS:
+                self.conn.execute(pragma)
+            existing_version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            has_tables = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'leads'"
+            ).fetchone()
+            if has_tables and existing_version < SCHEMA_VERSION:
+                self._migrate(existing_version)
+            self.conn.executescript(Path(schema_path).read_text(encoding="utf-8"))
+            if not has_tables or existing_version < SCHEMA_VERSION:
+                self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _migrate(self, from_version: int) -> None:
+        """이전 버전 로컬 DB에 빠진 컬럼 추가 (MIGRATIONS, 한 트랜잭션)"""
+        if from_version < MIN_MIGRATABLE_VERSION:
+            raise RuntimeError(
+                f"Local DB '{self.path}' was created with schema v{from_version} "
+                f"(current v{SCHEMA_VERSION}) and cannot be migrated. Delete the file to recreate it."
+            )
+        with self.conn:
+            for version in range(from_version + 1, SCHEMA_VERSION + 1):
+                for table, column, definition in MIGRATIONS.get(version, []):
+                    columns = {r["name"] for r in self.conn.execute(f"PRAGMA table_xinfo({table})").fetchall()}
+                    if columns and column not in columns:
+                        self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        print(f"Migrated local DB '{self.path}' from schema v{from_version} to v{SCHEMA_VERSION}")
+
+    def table(self, name: str) -> QueryBuilder:
+        return QueryBuilder(self, name)
+
+    def rpc(self, name: str, params: Optional[dict] = None) -> RPCBuilder:
+        return RPCBuilder(self, name, params or {})
+
+    def register_function(self, name: str, func: Callable[..., Any]) -> None:
+        """RPC 함수 등록 (schema.sql의 Postgres 함수를 Python으로 구현한 것)"""
+        self.functions[name] = func
+
+    @contextmanager
+    def transaction(self):
+        """여러 쿼리를 하나의 트랜잭션으로 묶기 (RPC 구현용)"""
+        with self._lock:
+            with self.conn:
+                yield self.conn
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    # =========================================
+    # 스키마 메타데이터
+    # =========================================
+
+    def _columns_of(self, table: str) -> dict[str, str]:
+        """컬럼명 -> 선언 타입 (대문자, 생성 컬럼 포함)"""
+        if table not in self._table_info:
+            # table_info는 생성 컬럼(drafts.is_junk)을 숨기므로 table_xinfo 사용 (hidden=1은 가상 테이블 숨김 컬럼)
+            rows = self.conn.execute(f"PRAGMA table_xinfo({table})").fetchall()
+            self._table_info[table] = {r["name"]: (r["type"] or "").upper() for r in rows if r["hidden"] != 1}
+        return self._table_info[table]
+
+    def _primary_key(self, table: str) -> str:
+        """기본 키 컬럼 (대부분 id, video_transcripts는 video_id)"""
+        if table not in self._pk_info:
+            rows = self.conn.execute(f"PRAGMA table_info({table})").fetchall()
+            self._pk_info[table] = next((r["name"] for r in rows if r["pk"] == 1), "id")
+        return self._pk_info[table]
+
+    def _foreign_keys(self, table: str) -> list[tuple[str, str, str]]:
+        """(참조 테이블, 로컬 컬럼, 참조 컬럼) 목록"""
+        if table not in self._fk_info:
+            rows = self.conn.execute(f"PRAGMA foreign_key_list({table})").fetchall()
+            self._fk_info[table] = [(r["table"], r["from"], r["to"]) for r in rows]
+        return self._fk_info[table]
+
+    def _relation(self, table: str, other: str) -> tuple[str, str, str]:
+        """
+        두 테이블의 관계 찾기 (PostgREST 임베드 규칙과 동일하게 FK 기준)
+        반환: (종류, table 쪽 컬럼, other 쪽 컬럼) - 종류는 'one'(N:1) 또는 'many'(1:N)
+        """
+        for ref_table, local_col, ref_col in self._foreign_keys(table):
+            if ref_table == other:
+                return "one", local_col, ref_col
+        for ref_table, local_col, ref_col in self._foreign_keys(other):
+            if ref_table == table:
+                return "many", ref_col, local_col
+        raise ValueError(f"No relationship between '{table}' and '{other}'")
+
+    def _decode_row(self, table: str, row: sqlite3.Row) -> dict:
+        types = self._columns_of(table)
+        result = {}
+        for key in row.keys():
+            value = row[key]
+            col_type = types.get(key, "")
+            if value is not None and col_type == "JSON":
+                value = json.loads(value)
+            elif value is not None and col_type == "BOOLEAN":
+                value = bool(value)
+            result[key] = value
+        return result
+
+    # =========================================
+    # WHERE / ORDER 절 생성
+    # =========================================
+
+    def _condition(self, table: str, column: str, op: str, value: Any, params: list) -> str:
+        if "." in column:
+            # 임베드 테이블 컬럼 필터 -> EXISTS 서브쿼리
+            other, other_col = column.split(".", 1)
+            kind, local_col, remote_col = self._relation(table, other)
+            inner = self._condition(other, other_col, op, value, params)
+            return (
+                f"EXISTS (SELECT 1 FROM {other} WHERE {other}.{remote_col} = {table}.{local_col} "
+                f"AND {inner})"
+            )
+
+        qualified = f"{table}.{column}"
+        if op == "IN":
+            if not value:
+                return "0"
+            params.extend(_encode(v) for v in value)
+            return f"{qualified} IN ({', '.join('?' for _ in value)})"
+        if op == "IS":
+            if value is None or str(value).lower() == "null":
+                return f"{qualified} IS NULL"
+            params.append(1 if str(value).lower() == "true" or value is True else 0)
+            return f"{qualified} IS ?"
+        params.append(_encode(value))
+        return f"{qualified} {op} ?"
+
+    def _where(self, builder: QueryBuilder, params: list, extra: Optional[list[str]] = None) -> str:
+        clauses = list(extra or [])
+        for column, op, value, negate in builder._filters:
+            clause = self._condition(builder._table, column, op, value, params)
+            clauses.append(f"NOT ({clause})" if negate else clause)
+        return f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    def _order_limit(self, builder: QueryBuilder, params: list) -> str:
+        sql = ""
+        if builder._order:
+            terms = [f"{builder._table}.{col} {'DESC' if desc else 'ASC'}" for col, desc in builder._order]
+            sql += " ORDER BY " + ", ".join(terms)
+        if builder._limit is not None:
+            sql += " LIMIT ?"
+            params.append(builder._limit)
+            if builder._offset:
+                sql += " OFFSET ?"
+                params.append(builder._offset)
+        return sql
+
+    # =========================================
+    # SELECT (+ 임베드)
+    # =========================================
+
+    def _select(self, builder: QueryBuilder) -> APIResponse:
+        table = builder._table
+        plain, embeds = _parse_select(builder._columns)
+        with self._lock:
+            rows = self._fetch(table, plain, embeds, builder)
+            count = None
+            if builder._count:
+                params: list = []
+                where = self._where(builder, params, self._inner_conditions(table, embeds))
+                count = self.conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+        return APIResponse(rows, count)
+
+    def _inner_conditions(self, table: str, embeds: list[dict]) -> list[str]:
+        conditions = []
+        for embed in embeds:
+            if embed["inner"]:
+                _, local_col, remote_col = self._relation(table, embed["table"])
+                other = embed["table"]
+                conditions.append(
+                    f"EXISTS (SELECT 1 FROM {other} WHERE {other}.{remote_col} = {table}.{local_col})"
+                )
+        return conditions
+
+    def _fetch(self, table: str, plain: list[str], embeds: list[dict], builder: QueryBuilder) -> list[dict]:
+        all_columns = self._columns_of(table)
+        wanted = list(all_columns) if "*" in plain or not plain else plain
+
+        # 임베드 연결에 필요한 컬럼은 조회 후 제거
+        join_cols = {self._relation(table, e["table"])[1] for e in embeds}
+        hidden = [c for c in join_cols if c not in wanted]
+
+        params: list = []
+        select_cols = ", ".join(f"{table}.{c}" for c in wanted + hidden)
+        sql = f"SELECT {select_cols} FROM {table}"
+        sql += self._where(builder, params, self._inner_conditions(table, embeds))
+        sql += self._order_limit(builder, params)
+        rows = [self._decode_row(table, r) for r in self.conn.execute(sql, params).fetchall()]
+
+        for embed in embeds:
+            self._attach_embed(table, rows, embed)
+
+        for row in rows:
+            for col in hidden:
+                row.pop(col, None)
+        return rows
+
+    def _attach_embed(self, table: str, rows: list[dict], embed: dict) -> None:
+        other = embed["table"]
+        kind, local_col, remote_col = self._relation(table, other)
+        keys = list({r[local_col] for r in rows if r.get(local_col) is not None})
+
+        related: list[dict] = []
+        if keys:
+            inner_plain, inner_embeds = _parse_select(embed["columns"])
+            sub = QueryBuilder(self, other).in_(remote_col, keys)
+            need_key = "*" not in inner_plain and remote_col not in inner_plain
+            if need_key:
+                inner_plain = inner_plain + [remote_col]
+            related = self._fetch(other, inner_plain, inner_embeds, sub)
+        else:
+            need_key = False
+
+        if kind == "one":
+            index = {r[remote_col]: r for r in related}
+            for row in rows:
+                row[embed["alias"]] = index.get(row.get(local_col))
+        else:
+            groups: dict[Any, list[dict]] = {}
+            for r in related:
+                groups.setdefault(r[remote_col], []).append(r)
+            for row in rows:
+                row[embed["alias"]] = groups.get(row.get(local_col), [])
+
+        if need_key:
+            for r in related:
+                r.pop(remote_col, None)
+
+    # =========================================
+    # INSERT / UPSERT / UPDATE / DELETE
+    # =========================================
+
+    def _write(self, builder: QueryBuilder) -> APIResponse:
+        table = builder._table
+        payload = builder._payload
+        records = [dict(r) for r in (payload if isinstance(payload, list) else [payload])]
+        if not records:
+            return APIResponse([])
+
+        columns_info = self._columns_of(table)
+        primary_key = self._primary_key(table)
+        conflict_col = builder._on_conflict or primary_key
+        if "id" in columns_info:
+            for record in records:
+                record.setdefault("id", str(uuid.uuid4()))
+
+        # 키 구성이 같은 레코드끼리 묶어서 executemany
+        groups: dict[tuple, list[dict]] = {}
+        for record in records:
+            groups.setdefault(tuple(record.keys()), []).append(record)
+
+        with self.transaction() as conn:
+            for cols, group in groups.items():
+                placeholders = ", ".join("?" for _ in cols)
+                sql = f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({placeholders})"
+                if builder._method == "upsert":
+                    updates = [c for c in cols if c not in (conflict_col, primary_key)]
+                    if updates:
+                        assignments = ", ".join(f"{c} = excluded.{c}" for c in updates)
+                        sql += f" ON CONFLICT({conflict_col}) DO UPDATE SET {assignments}"
+                    else:
+                        sql += f" ON CONFLICT({conflict_col}) DO NOTHING"
+                conn.executemany(sql, [tuple(_encode(r[c]) for c in cols) for r in group])
+
+            # 저장된 행 다시 조회 (PostgREST return=representation과 동일)
+            key_col = conflict_col if builder._method == "upsert" else primary_key
+            keys = [r[key_col] for r in records if key_col in r]
+            rows = self._fetch(table, ["*"], [], QueryBuilder(self, table).in_(key_col, keys))
+        order = {k: i for i, k in enumerate(keys)}
+        rows.sort(key=lambda r: order.get(r.get(key_col), 0))
+        return APIResponse(rows)
+
+    def _update(self, builder: QueryBuilder) -> APIResponse:
+        table = builder._table
+        data = builder._payload or {}
+        if not data:
+            return APIResponse([])
+        primary_key = self._primary_key(table)
+        params = [_encode(v) for v in data.values()]
+        assignments = ", ".join(f"{c} = ?" for c in data)
+        sql = f"UPDATE {table} SET {assignments}{self._where(builder, params)} RETURNING {primary_key}"
+        with self.transaction() as conn:
+            keys = [r[0] for r in conn.execute(sql, params).fetchall()]
+            rows = self._fetch(table, ["*"], [], QueryBuilder(self, table).in_(primary_key, keys))
+        return APIResponse(rows)
+
+    def _delete(self, builder: QueryBuilder) -> APIResponse:
+        table = builder._table
+        params: list = []
+        sql = f"DELETE FROM {table}{self._where(builder, params)} RETURNING *"
+        with self.transaction() as conn:
+            rows = [self._decode_row(table, r) for r in conn.execute(sql, params).fetchall()]
+        return APIResponse(rows)
+
+
+
+# =========================================
+# RPC 구현 (schema.sql의 Postgres 함수 대응)
+# =========================================
+
+def _fts_prefix_query(search_query: str) -> str:
+    """검색어 -> FTS5 접두 일치 쿼리 ("사진 정리" -> "사진"* "정리"*)"""
+    terms = re.sub(r"[^\w\s]", " ", search_query).split()
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_content(
+    client: SQLiteClient,
+    search_query: str,
+    search_kinds: Optional[list[str]] = None,
+    result_limit: int = 20,
+    result_offset: int = 0
+) -> list[dict]:
+    """search_content RPC: 채널명 LIKE + 영상 FTS5(bm25) 통합 검색"""
+    kinds = search_kinds or ["lead", "video"]
+    fts_query = _fts_prefix_query(search_query)
+    pattern = f"%{search_query.strip()}%"
+    if not search_query.strip():
+        return []
+
+    parts, params = [], []
+    if "lead" in kinds:
+        parts.append("""
+            SELECT 'lead' AS kind, l.id, l.id AS lead_id, NULL AS video_id, l.channel_name AS title,
+                   l.description AS snippet,
+                   CAST(length(?) AS REAL) / max(length(l.channel_name), 1) AS rank
+            FROM leads l
+            WHERE l.channel_name LIKE ?
+        """)
+        params += [search_query.strip(), pattern]
+    if "video" in kinds and fts_query:
+        # 제목 매칭과 자막/요약 매칭을 각각 FTS로 찾은 뒤 영상별로 합산
+        parts.append("""
+            SELECT 'video' AS kind, v.id, v.lead_id, v.video_id, v.title,
+                   max(m.snippet) AS snippet,
+                   sum(m.rank) AS rank
+            FROM (
+                SELECT v2.id AS vid, NULL AS snippet, -bm25(videos_fts) * 2 AS rank
+                FROM videos_fts JOIN videos v2 ON v2.rowid = videos_fts.rowid
+                WHERE videos_fts MATCH ?
+                UNION ALL
+                SELECT t.video_id, snippet(video_transcripts_fts, -1, '', '', '…', 16),
+                       -bm25(video_transcripts_fts, 2.0, 1.0)
+                FROM video_transcripts_fts JOIN video_transcripts t ON t.rowid = video_transcripts_fts.rowid
+                WHERE video_transcripts_fts MATCH ?
+            ) m
+            JOIN videos v ON v.id = m.vid
+            GROUP BY v.id
+        """)
+        params += [fts_query, fts_query]
+    if not parts:
+        return []
+
+    sql = f"""
+        SELECT *, COUNT(*) OVER () AS total_count
+        FROM ({' UNION ALL '.join(parts)})
+        ORDER BY rank DESC, title
+        LIMIT ? OFFSET ?
+    """
+    params += [result_limit, result_offset]
+    with client._lock:
+        return [dict(r) for r in client.conn.execute(sql, params).fetchall()]
+
+
+def _mark_drafts_sent(conn: sqlite3.Connection, draft_ids: list[str], sent_time: Optional[str] = None) -> list[dict]:
+    ids = list(dict.fromkeys(draft_ids or []))
+    if not ids:
+        return []
+    placeholders = ", ".join("?" for _ in ids)
+    rows = conn.execute(
+        f"""
+        UPDATE drafts
+        SET status = 'sent', sent_at = COALESCE(?, strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+        WHERE id IN ({placeholders}) AND status <> 'sent'
+        RETURNING id, lead_id, sent_at
+        """,
+        [sent_time, *ids],
+    ).fetchall()
+    lead_ids = list({r["lead_id"] for r in rows if r["lead_id"]})
+    if lead_ids:
+        conn.execute(
+            f"UPDATE leads SET status = 'contacted' "
+            f"WHERE id IN ({', '.join('?' for _ in lead_ids)}) AND status = 'new'",
+            lead_ids,
+        )
+    return [dict(r) for r in rows]
+
+
+def mark_drafts_sent(
+    client: SQLiteClient,
+    draft_ids: list[str],
+    sent_time: Optional[str] = None
+) -> list[dict]:
+    """mark_drafts_sent RPC: 초안 발송 처리 + 리드 new -> contacted (한 트랜잭션)"""
+    if not draft_ids:
+        return []
+    with client.transaction() as conn:
+        return _mark_drafts_sent(conn, draft_ids, sent_time)
+
+
+def claim_outbox(
+    client: SQLiteClient,
+    batch_size: int = 20,
+    worker: Optional[str] = None,
+    lock_timeout_seconds: int = 600
+) -> list[dict]:
+    """claim_outbox RPC: 발송할 차례인 행을 'sending'으로 잠그고 반환 (SQLite는 쓰기가 직렬이라 SKIP LOCKED 불필요)"""
+    with client.transaction() as conn:
+        rows = conn.execute(
+            """
+            UPDATE email_outbox
+            SET status = 'sending', locked_by = ?, attempts = attempts + 1,
+                locked_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')
+            WHERE id IN (
+                SELECT id FROM email_outbox
+                WHERE (status = 'queued' AND next_attempt_at <= strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+                   OR (status = 'sending' AND locked_at < strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now', ?))
+                ORDER BY next_attempt_at
+                LIMIT ?
+            )
+            RETURNING *
+            """,
+            [worker, f"-{int(lock_timeout_seconds)} seconds", batch_size],
+        ).fetchall()
+        rows = [client._decode_row("email_outbox", r) for r in rows]
+    return sorted(rows, key=lambda r: r["next_attempt_at"] or "")
+
+
+def complete_outbox(client: SQLiteClient, outbox_ids: list[str]) -> int:
+    """complete_outbox RPC: outbox 'sent' + 초안/리드 상태를 한 트랜잭션으로"""
+    ids = list(dict.fromkeys(outbox_ids or []))
+    if not ids:
+        return 0
+    placeholders = ", ".join("?" for _ in ids)
+    with client.transaction() as conn:
+        rows = conn.execute(
+            f"""
+            UPDATE email_outbox
+            SET status = 'sent', sent_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'),
+                locked_by = NULL, locked_at = NULL, last_error = NULL
+            WHERE id IN ({placeholders}) AND status <> 'sent'
+            RETURNING draft_id
+            """,
+            ids,
+        ).fetchall()
+        _mark_drafts_sent(conn, [r["draft_id"] for r in rows if r["draft_id"]])
+    return len(rows)
+
+
+def schedule_outbox(client: SQLiteClient, outbox_ids: list[str], slots: list[str]) -> int:
+    """schedule_outbox RPC: outbox_ids[i]의 발송 일정을 slots[i]로 (queued 행만, 한 트랜잭션)"""
+    if not outbox_ids:
+        return 0
+    with client.transaction() as conn:
+        cursor = conn.executemany(
+            "UPDATE email_outbox SET scheduled_at = ?, next_attempt_at = ? WHERE id = ? AND status = 'queued'",
+            [(slot, slot, outbox_id) for outbox_id, slot in zip(outbox_ids, slots)],
+        )
+        return cursor.rowcount
+
+
+BUILTIN_FUNCTIONS: dict[str, Callable[..., Any]] = {
+    "search_content": search_content,
+    "mark_drafts_sent": mark_drafts_sent,
+    "claim_outbox": claim_outbox,
+    "complete_outbox": complete_outbox,
+    "schedule_outbox": schedule_outbox,
+}
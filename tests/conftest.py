@@ -0,0 +1,67 @@
+"""
+Bes2 Marketer - 테스트 공통 설정
+외부 서비스 없이 SQLite 메모리 DB(sqlite_backend.py)로 Database를 만들어 사용
+
+실행:
+    python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from database import Database  # noqa: E402
+from sqlite_backend import SQLiteClient  # noqa: E402
+
+
+@pytest.fixture
+def database():
+    client = SQLiteClient(":memory:")
+    yield Database(client)
+    client.close()
+
+
+@pytest.fixture
+def make_lead(database):
+    """리드 생성 (channel_id는 호출마다 새로)"""
+    counter = iter(range(1, 1_000_000))
+
+    def make(email=None, **fields):
+        n = next(counter)
+        row = {"channel_name": f"채널 {n}", "channel_id": f"UC{n:06d}", "email": email, **fields}
+        return database.client.table("leads").insert(row).execute().data[0]
+    return make
+
+
+@pytest.fixture
+def make_draft(database):
+    """초안 생성 (기본: pending 이메일 초안)"""
+    def make(lead=None, content="제목: 협업 제안\n\n안녕하세요", draft_type="email", status="pending", **fields):
+        row = {
+            "lead_id": lead["id"] if lead else None,
+            "draft_type": draft_type,
+            "content": content,
+            "status": status,
+            **fields
+        }
+        return database.client.table("drafts").insert(row).execute().data[0]
+    return make
+
+
+@pytest.fixture
+def in_filter_sizes(monkeypatch):
+    """in_ 필터마다 (테이블, 컬럼, 값 개수) 기록 (IN_FILTER_CHUNK 분할 확인용)"""
+    from sqlite_backend import QueryBuilder
+
+    sizes = []
+    original = QueryBuilder.in_
+
+    def in_(self, column, values):
+        sizes.append((self._table, column, len(values)))
+        return original(self, column, values)
+    monkeypatch.setattr(QueryBuilder, "in_", in_)
+    return sizes
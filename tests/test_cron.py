@@ -0,0 +1,60 @@
+"""CronSchedule.next_after - daemon 실행 시각 계산"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from bes2.cron import CronSchedule
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_daily_midnight():
+    assert CronSchedule("0 0 * * *").next_after(utc(2026, 1, 5, 13, 27)) == utc(2026, 1, 6)
+
+
+def test_strictly_after_current_minute():
+    schedule = CronSchedule("0 0 * * *")
+    assert schedule.next_after(utc(2026, 1, 5, 0, 0, 0)) == utc(2026, 1, 6)
+    assert schedule.next_after(utc(2026, 1, 4, 23, 59, 30)) == utc(2026, 1, 5)
+
+
+def test_steps_and_ranges_skip_weekend():
+    schedule = CronSchedule("*/15 9-17 * * 1-5")
+    # 2026-01-09 금요일 17:50 -> 월요일 09:00
+    assert schedule.next_after(utc(2026, 1, 9, 17, 50)) == utc(2026, 1, 12, 9, 0)
+    assert schedule.next_after(utc(2026, 1, 12, 9, 7)) == utc(2026, 1, 12, 9, 15)
+
+
+def test_day_or_weekday_when_both_given():
+    schedule = CronSchedule("0 9 13 * 5")
+    # 2026-01-05(월) 이후: 9일(금)이 13일보다 먼저
+    assert schedule.next_after(utc(2026, 1, 5)) == utc(2026, 1, 9, 9, 0)
+    # 2026-01-10(토) 이후: 13일(화)이 16일(금)보다 먼저
+    assert schedule.next_after(utc(2026, 1, 10)) == utc(2026, 1, 13, 9, 0)
+
+
+def test_weekday_seven_is_sunday():
+    # 2026-01-11 일요일
+    assert CronSchedule("30 6 * * 7").next_after(utc(2026, 1, 5)) == utc(2026, 1, 11, 6, 30)
+
+
+def test_timezone():
+    schedule = CronSchedule("0 9 * * *", "Asia/Seoul")
+    # 01:00 UTC = 10:00 KST -> 다음 날 09:00 KST = 00:00 UTC
+    result = schedule.next_after(utc(2026, 1, 5, 1, 0))
+    assert result == utc(2026, 1, 6, 0, 0)
+    assert result.utcoffset().total_seconds() == 9 * 3600
+
+
+@pytest.mark.parametrize("expression", ["0 0 * *", "61 * * * *", "0 0 * * 8", "*/0 * * * *", "5-1 * * * *"])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_never_matching_date():
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 30 2 *").next_after(utc(2026, 1, 1))
@@ -0,0 +1,124 @@
+"""AsyncDatabase - 청크 단위 in_ 조회, 동시 Upsert, db 구간 기록 (SQLite 백엔드를 스레드에서 실행)"""
+
+import asyncio
+
+import pytest
+
+import tracing
+from database_async import AsyncDatabase
+from sqlite_backend import SQLiteClient
+from tracing import TracedClient, tracer
+
+
+@pytest.fixture
+def async_db():
+    client = SQLiteClient(":memory:")
+    yield AsyncDatabase(client, max_concurrency=2)
+    client.close()
+
+
+@pytest.fixture(autouse=True)
+def no_exporters(monkeypatch):
+    monkeypatch.setattr(tracer, "exporters", [])
+
+
+def scanned(n: int) -> list[dict]:
+    return [{
+        "video_id": f"v{i}",
+        "channel_id": f"UC{i}",
+        "channel_name": f"채널 {i}",
+        "title": f"영상 {i}",
+        "published_at": "2026-01-05T10:00:00Z",
+        "view_count": "100",
+        "video_url": f"https://www.youtube.com/watch?v=v{i}",
+        "thumbnail_url": "https://i.ytimg.com/vi/x/hq.jpg",
+        "channel_info": {"subscriber_count": 10, "email": f"c{i}@example.com"},
+    } for i in range(n)]
+
+
+def test_upsert_scanned_videos_skips_unchanged_rows(async_db, monkeypatch):
+    monkeypatch.setattr("database_async.IN_FILTER_CHUNK", 2)
+    monkeypatch.setattr("database_async.UPSERT_CHUNK", 2)
+
+    async def scan_twice():
+        return [await async_db.upsert_scanned_videos(scanned(5)) for _ in range(2)]
+
+    first, second = asyncio.run(scan_twice())
+
+    assert first == {"leads": {"inserted": 5, "updated": 0, "skipped": 0},
+                     "videos": {"inserted": 5, "updated": 0, "skipped": 0}}
+    assert second == {"leads": {"inserted": 0, "updated": 0, "skipped": 5},
+                      "videos": {"inserted": 0, "updated": 0, "skipped": 5}}
+
+
+def test_in_filters_are_split_by_chunk(async_db, monkeypatch):
+    monkeypatch.setattr("database_async.IN_FILTER_CHUNK", 2)
+    sizes = []
+    table = SQLiteClient.table
+
+    def spy(self, name):
+        builder = table(self, name)
+        original = builder.in_
+
+        def record(column, values):
+            sizes.append(len(values))
+            return original(column, values)
+        builder.in_ = record
+        return builder
+
+    async def lookup():
+        await async_db.upsert_scanned_videos(scanned(5))
+        monkeypatch.setattr(SQLiteClient, "table", spy)
+        return (
+            await async_db.get_leads_by_channel_ids([f"UC{i}" for i in range(5)] + ["UC0"]),
+            await async_db.get_videos_by_video_ids([f"v{i}" for i in range(5)]),
+        )
+
+    leads, videos = asyncio.run(lookup())
+
+    assert len(leads) == 5 and len(videos) == 5
+    assert sizes == [2, 2, 1, 2, 2, 1]
+
+
+def test_create_drafts_in_chunks(async_db, monkeypatch):
+    monkeypatch.setattr("database_async.UPSERT_CHUNK", 2)
+    drafts = asyncio.run(async_db.create_drafts(
+        [{"draft_type": "email", "content": f"초안 {i}"} for i in range(5)]
+    ))
+    assert sorted(d["content"] for d in drafts) == [f"초안 {i}" for i in range(5)]
+    assert {d["status"] for d in drafts} == {"pending"}
+
+
+def test_queries_are_recorded_as_db_spans(async_db):
+    async def scan():
+        with tracer.run("scan"):
+            await async_db.upsert_scanned_videos(scanned(3))
+
+    asyncio.run(scan())
+
+    names = [s["name"] for s in tracer.recent(1)[0]["spans"]]
+    assert "db.select leads" in names
+    assert "db.upsert videos" in names
+
+
+def test_async_builder_span_covers_await(monkeypatch):
+    class SlowBuilder:
+        async def execute(self):
+            await asyncio.sleep(0.02)
+            return type("Response", (), {"data": [{"id": 1}, {"id": 2}]})()
+
+    class AsyncClient:
+        def table(self, name):
+            return SlowBuilder()
+
+    async def run():
+        with tracer.run("async"):
+            return await TracedClient(AsyncClient(), system="supabase").table("leads").execute()
+
+    response = asyncio.run(run())
+
+    assert len(response.data) == 2
+    [span] = [s for s in tracer.recent(1)[0]["spans"] if s["name"] == "db.select leads"]
+    assert span["attributes"]["rows"] == 2
+    assert (span["end_ns"] - span["start_ns"]) / 1e6 >= 15
+    assert tracing.span_kind(span["name"]) == "db"
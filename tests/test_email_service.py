@@ -0,0 +1,198 @@
+"""SMTPPool / EmailSender - 로컬 SMTP 싱크(smtp_sink.py)로 연결 재사용, 재연결, 회전 확인"""
+
+import smtplib
+import time
+
+import pytest
+
+from email_service import EmailSender, SMTPPool
+from smtp_sink import SMTPSink
+from tracing import tracer
+
+
+@pytest.fixture(autouse=True)
+def no_exporters(monkeypatch):
+    monkeypatch.setattr(tracer, "exporters", [])
+
+
+@pytest.fixture(autouse=True)
+def credentials(monkeypatch):
+    monkeypatch.setattr("email_service.config.SENDER_EMAIL", "sender@example.com")
+    monkeypatch.setattr("email_service.config.SENDER_PASSWORD", "app password")
+    monkeypatch.setattr("email_service.config.TEST_MODE", False)
+    monkeypatch.setattr("email_service.config.SMTP_TIMEOUT", 5)
+
+
+@pytest.fixture
+def sink():
+    with SMTPSink(port=0) as s:
+        yield s
+
+
+@pytest.fixture
+def connects(monkeypatch):
+    """새로 연결된 SMTP 세션 목록 (_connect 호출 기록)"""
+    opened = []
+    connect = SMTPPool._connect
+
+    def record(self, sender_email, sender_password):
+        conn = connect(self, sender_email, sender_password)
+        opened.append(conn)
+        return conn
+    monkeypatch.setattr(SMTPPool, "_connect", record)
+    return opened
+
+
+def make_sender(sink, **pool) -> EmailSender:
+    sender = EmailSender(host=sink.host, port=sink.port, security="none", pool_size=2)
+    for name, value in pool.items():
+        setattr(sender.pool, name, value)
+    return sender
+
+
+def messages(n: int) -> list[dict]:
+    return [{"to": f"lead{i}@example.com", "subject": f"제목 {i}", "body": f"본문 {i}"} for i in range(n)]
+
+
+def is_open(conn: dict) -> bool:
+    return conn["server"].sock is not None
+
+
+# =========================================
+# 연결 재사용 / 유휴 시간 초과
+# =========================================
+
+def test_connection_is_reused_between_sends(sink, connects):
+    sender = make_sender(sink)
+
+    assert all(r["ok"] for r in sender.send_many(messages(2)))
+    assert all(r["ok"] for r in sender.send_many(messages(2)))
+
+    assert sink.count == 4
+    assert len(connects) == 1
+    sender.pool.close_all()
+
+
+def test_reconnects_after_idle_timeout(sink, connects):
+    sender = make_sender(sink, idle_timeout=0.05)
+
+    assert sender.send_email("a@example.com", "제목", "본문")
+    time.sleep(0.1)
+    assert sender.send_email("b@example.com", "제목", "본문")
+
+    assert sink.count == 2
+    assert len(connects) == 2
+    # 오래 쉰 연결은 꺼낼 때 닫힘
+    assert not is_open(connects[0])
+    assert [m["to"] for m in sink.messages] == [["<a@example.com>"], ["<b@example.com>"]]
+    sender.pool.close_all()
+
+
+def test_idle_connection_for_other_account_is_not_reused(sink, connects, monkeypatch):
+    sender = make_sender(sink)
+    assert sender.send_email("a@example.com", "제목", "본문")
+
+    monkeypatch.setattr("email_service.config.SENDER_EMAIL", "other@example.com")
+    assert sender.send_email("b@example.com", "제목", "본문")
+
+    assert len(connects) == 2
+    assert connects[1]["credentials"][0] == "other@example.com"
+    sender.pool.close_all()
+
+
+# =========================================
+# max_messages 회전
+# =========================================
+
+def test_rotates_connection_after_max_messages(sink, connects):
+    sender = make_sender(sink, max_messages=2)
+
+    results = sender.send_many(messages(5))
+
+    assert all(r["ok"] for r in results)
+    assert sink.count == 5
+    # 2통마다 새 연결: [0, 1] [2, 3] [4]
+    assert len(connects) == 3
+    assert [c["sent"] for c in connects] == [2, 2, 1]
+    assert not is_open(connects[0]) and not is_open(connects[1])
+    # 한도가 남은 마지막 연결만 풀에 반납
+    assert sender.pool._idle == [connects[2]]
+    sender.pool.close_all()
+
+
+def test_full_connection_is_not_returned_to_pool(sink, connects):
+    sender = make_sender(sink, max_messages=2)
+
+    sender.send_many(messages(2))
+
+    assert sender.pool._idle == []
+    assert not is_open(connects[0])
+
+
+# =========================================
+# send_many 재연결 재시도
+# =========================================
+
+def test_send_many_retries_once_after_disconnect(sink, connects):
+    sender = make_sender(sink)
+    assert sender.send_email("a@example.com", "제목", "본문")
+
+    # 풀에 보관된 연결이 서버 쪽에서 끊긴 상황
+    connects[0]["server"].close()
+    results = sender.send_many(messages(2))
+
+    assert [r["ok"] for r in results] == [True, True]
+    assert sink.count == 3
+    assert len(connects) == 2
+    sender.pool.close_all()
+
+
+def test_send_many_gives_up_after_one_retry(sink, connects, monkeypatch):
+    attempts = []
+
+    def disconnected(self, msg, *args, **kwargs):
+        attempts.append(msg["To"])
+        raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+    monkeypatch.setattr(smtplib.SMTP, "send_message", disconnected)
+    sender = make_sender(sink)
+
+    [result] = sender.send_many(messages(1))
+
+    assert result["ok"] is False
+    assert result["retryable"] is True
+    assert "unexpectedly closed" in result["error"]
+    assert attempts == ["lead0@example.com", "lead0@example.com"]
+    assert len(connects) == 2
+    assert sink.count == 0
+    sender.pool.close_all()
+
+
+def test_message_refusal_is_not_retried(sink, connects, monkeypatch):
+    attempts = []
+
+    def refused(self, msg, *args, **kwargs):
+        attempts.append(msg["To"])
+        raise smtplib.SMTPRecipientsRefused({msg["To"]: (550, b"No such user")})
+    monkeypatch.setattr(smtplib.SMTP, "send_message", refused)
+    sender = make_sender(sink)
+
+    results = sender.send_many(messages(2))
+
+    assert [r["ok"] for r in results] == [False, False]
+    assert [r["retryable"] for r in results] == [False, False]
+    assert attempts == ["lead0@example.com", "lead1@example.com"]
+    assert len(connects) == 1
+    sender.pool.close_all()
+
+
+def test_failed_reconnect_fails_remaining_messages(sink, connects):
+    sender = make_sender(sink)
+    assert sender.send_email("a@example.com", "제목", "본문")
+
+    connects[0]["server"].close()
+    sink.stop()
+    results = sender.send_many(messages(3))
+
+    assert [r["ok"] for r in results] == [False, False, False]
+    assert all(r["retryable"] for r in results)
+    assert [r["to"] for r in results] == [m["to"] for m in messages(3)]
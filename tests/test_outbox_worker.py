@@ -0,0 +1,166 @@
+"""OutboxWorker - 재시도 백오프, 대기열 추가 시 중복/건너뛰기 규칙"""
+
+import pytest
+
+import outbox_worker
+from outbox_worker import OutboxWorker, backoff_delay
+from send_scheduler import SendScheduler
+
+
+@pytest.fixture
+def worker(database):
+    # 발송 시간대 배정 없이 바로 발송 대상으로
+    return OutboxWorker(database, worker_id="test", scheduler=SendScheduler(database, windows="off"))
+
+
+def outbox_rows(database) -> list[dict]:
+    return database.client.table("email_outbox").select("*").order("created_at").execute().data
+
+
+def draft_status(database, draft_id: str) -> str:
+    return database.get_draft_by_id(draft_id)["status"]
+
+
+# =========================================
+# 백오프
+# =========================================
+
+@pytest.mark.parametrize("attempts, base", [(0, 60), (1, 60), (2, 120), (3, 240)])
+def test_backoff_doubles_with_jitter(monkeypatch, attempts, base):
+    monkeypatch.setattr(outbox_worker.config, "OUTBOX_BACKOFF_SECONDS", 60)
+    for _ in range(50):
+        assert base * 0.8 <= backoff_delay(attempts) <= base * 1.2
+
+
+def test_backoff_is_capped_at_six_hours(monkeypatch):
+    monkeypatch.setattr(outbox_worker.config, "OUTBOX_BACKOFF_SECONDS", 60)
+    for _ in range(50):
+        assert 6 * 3600 * 0.8 <= backoff_delay(30) <= 6 * 3600 * 1.2
+
+
+# =========================================
+# 대기열 추가
+# =========================================
+
+def test_enqueue_queues_and_approves(database, worker, make_lead, make_draft):
+    draft = make_draft(make_lead("creator@example.com"))
+    result = worker.enqueue_drafts([draft["id"]], schedule=False)
+
+    assert result == {"queued": [draft["id"]], "skipped": {}}
+    [row] = outbox_rows(database)
+    assert row["to_email"] == "creator@example.com"
+    assert row["subject"] == "협업 제안"
+    assert row["status"] == "queued"
+    assert draft_status(database, draft["id"]) == "approved"
+
+
+def test_enqueue_skip_reasons(database, worker, make_lead, make_draft):
+    lead = make_lead("creator@example.com")
+    comment = make_draft(lead, draft_type="comment")
+    no_email = make_draft(make_lead())
+    junk = make_draft(make_lead("junk@example.com"), content="[AI 에러] 404 models/gemini")
+    sent = make_draft(make_lead("sent@example.com"), status="sent")
+    rejected = make_draft(make_lead("rejected@example.com"), status="rejected")
+
+    result = worker.enqueue_drafts([comment["id"], no_email["id"], junk["id"], sent["id"], rejected["id"]], schedule=False)
+
+    assert result["queued"] == []
+    assert result["skipped"] == {
+        comment["id"]: "not an email draft",
+        no_email["id"]: "no recipient email",
+        junk["id"]: "junk content",
+        sent["id"]: "already sent",
+        rejected["id"]: "draft rejected",
+    }
+    assert outbox_rows(database) == []
+    # 건너뛴 pending 초안은 그대로
+    assert draft_status(database, no_email["id"]) == "pending"
+    assert draft_status(database, rejected["id"]) == "rejected"
+
+
+def test_one_mail_per_channel_keeps_first_in_request_order(database, worker, make_lead, make_draft):
+    lead = make_lead("creator@example.com")
+    older = make_draft(lead)
+    newer = make_draft(lead)
+
+    result = worker.enqueue_drafts([newer["id"], older["id"]], schedule=False)
+
+    assert result["queued"] == [newer["id"]]
+    assert result["skipped"] == {older["id"]: "duplicate recipient"}
+
+
+def test_same_address_on_different_leads_is_deduplicated(database, worker, make_lead, make_draft):
+    first = make_draft(make_lead("shared@example.com"))
+    second = make_draft(make_lead("shared@example.com"))
+
+    result = worker.enqueue_drafts([first["id"], second["id"]], schedule=False)
+
+    assert result["queued"] == [first["id"]]
+    assert result["skipped"] == {second["id"]: "duplicate recipient"}
+
+
+def test_address_already_waiting_in_outbox_is_skipped(database, worker, make_lead, make_draft):
+    first = make_draft(make_lead("creator@example.com"))
+    worker.enqueue_drafts([first["id"]], schedule=False)
+    second = make_draft(make_lead("creator@example.com"))
+
+    result = worker.enqueue_drafts([first["id"], second["id"]], schedule=False)
+
+    assert result["queued"] == []
+    assert result["skipped"] == {first["id"]: "already queued", second["id"]: "duplicate recipient"}
+    assert len(outbox_rows(database)) == 1
+
+
+def test_failed_row_can_be_queued_again(database, worker, make_lead, make_draft):
+    draft = make_draft(make_lead("creator@example.com"))
+    worker.enqueue_drafts([draft["id"]], schedule=False)
+    [row] = outbox_rows(database)
+    database.fail_outbox(row["id"], "550 mailbox unavailable")
+    database.update_draft_status(draft["id"], "pending")
+
+    result = worker.enqueue_drafts([draft["id"]], schedule=False)
+
+    assert result["queued"] == [draft["id"]]
+    [row] = outbox_rows(database)
+    assert row["status"] == "queued"
+    assert row["last_error"] is None
+
+
+def test_enqueue_approved_returns_unsendable_drafts_to_pending(database, worker, make_lead, make_draft, monkeypatch):
+    # 이메일 없는 approved 초안이 조회 한도(3)보다 많아도 다음 폴링에서 새 초안이 대기열에 들어가야 함
+    no_email_lead = make_lead()
+    stuck = [make_draft(no_email_lead, status="approved", created_at=f"2020-01-01T00:00:{i:02d}.000+00:00") for i in range(5)]
+    fresh = make_draft(make_lead("creator@example.com"), status="approved")
+    original = database.get_unqueued_approved_drafts
+    monkeypatch.setattr(database, "get_unqueued_approved_drafts", lambda: original(limit=3))
+
+    assert worker.enqueue_approved() == 0
+    assert worker.enqueue_approved() == 1
+    assert [r["draft_id"] for r in outbox_rows(database)] == [fresh["id"]]
+    assert {draft_status(database, d["id"]) for d in stuck} == {"pending"}
+
+
+def test_unqueued_approved_pages_past_drafts_with_outbox_rows(database, make_lead, make_draft, monkeypatch):
+    monkeypatch.setattr("database.IN_FILTER_CHUNK", 2)
+    # 취소된 대기열 행이 있는 approved 초안 4개 (한 페이지 2개) 뒤의 새 초안
+    for i in range(4):
+        draft = make_draft(make_lead(f"c{i}@example.com"), status="approved", created_at=f"2020-01-01T00:00:{i:02d}.000+00:00")
+        database.enqueue_emails([{"draft_id": draft["id"], "to_email": f"c{i}@example.com", "subject": "s", "body": "b", "status": "cancelled"}])
+    fresh = make_draft(make_lead("creator@example.com"), status="approved")
+
+    assert database.get_unqueued_approved_drafts(limit=1) == [fresh["id"]]
+
+
+def test_enqueue_splits_id_filters_by_chunk(database, worker, make_lead, make_draft, monkeypatch):
+    monkeypatch.setattr("database.IN_FILTER_CHUNK", 2)
+    monkeypatch.setattr("database.UPSERT_CHUNK", 2)
+    drafts = [make_draft(make_lead(f"c{i}@example.com")) for i in range(5)]
+    ids = [d["id"] for d in drafts]
+
+    result = worker.enqueue_drafts(ids, schedule=False)
+
+    assert result == {"queued": ids, "skipped": {}}
+    assert {draft_status(database, i) for i in ids} == {"approved"}
+    assert set(database.get_outbox_status_by_drafts(ids).values()) == {"queued"}
+    assert database.get_active_outbox_emails([f"c{i}@example.com" for i in range(5)]) == {f"c{i}@example.com" for i in range(5)}
+    assert database.cancel_outbox([r["id"] for r in outbox_rows(database)]) == 5
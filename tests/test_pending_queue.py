@@ -0,0 +1,297 @@
+"""PendingDraftQueue / 변경 피드 - 이벤트 로그와 세션별 커서, 폴링 비교, Realtime 구독 실패 시 폴링 대체"""
+
+import asyncio
+import sys
+import threading
+import types
+
+import pytest
+
+import pending_queue
+from pending_queue import DraftFeed, PendingDraftQueue, PollingDraftFeed, RealtimeDraftFeed, create_feed
+
+
+@pytest.fixture
+def feed(database):
+    feed = PollingDraftFeed(database, interval=0)
+    feed.start()
+    return feed
+
+
+@pytest.fixture
+def queue(database, feed):
+    return PendingDraftQueue(database, feed=feed, page_size=2)
+
+
+def count_target_queries(database, monkeypatch) -> list:
+    calls = []
+    original = database.get_pending_email_send_targets
+
+    def spy(**filters):
+        calls.append(filters)
+        return original(**filters)
+    monkeypatch.setattr(database, "get_pending_email_send_targets", spy)
+    return calls
+
+
+def test_send_targets_are_loaded_only_on_request(database, queue, make_lead, make_draft, monkeypatch):
+    calls = count_target_queries(database, monkeypatch)
+    for i in range(3):
+        make_draft(make_lead(f"c{i}@example.com"))
+
+    queue.sync()
+    queue.page()
+    assert queue.send_targets() is None
+    assert calls == []
+
+    targets = queue.calculate_send_targets()
+    assert len(targets) == 3
+    queue.sync()
+    queue.page()
+    assert queue.send_targets() is targets
+    assert len(calls) == 1
+
+
+def test_changes_mark_targets_stale_instead_of_reloading(database, queue, make_lead, make_draft, monkeypatch):
+    calls = count_target_queries(database, monkeypatch)
+    make_draft(make_lead("a@example.com"))
+    queue.sync()
+    queue.calculate_send_targets()
+
+    make_draft(make_lead("b@example.com"))
+    queue.sync()
+
+    assert queue.targets_stale
+    assert len(queue.send_targets()) == 1
+    assert len(calls) == 1
+
+    assert len(queue.calculate_send_targets()) == 2
+    assert not queue.targets_stale
+
+
+def test_filter_change_drops_targets(database, queue, make_lead, make_draft):
+    make_draft(make_lead("a@example.com"))
+    queue.calculate_send_targets()
+
+    queue.set_filters(has_email=True)
+
+    assert queue.send_targets() is None
+    assert not queue.targets_stale
+
+
+# =========================================
+# 이벤트 로그 / 커서
+# =========================================
+
+def event(draft_id: str, kind: str = "UPDATE") -> dict:
+    return {"type": kind, "record": {"id": draft_id}, "old_record": {}}
+
+
+def test_each_cursor_reads_only_newer_events():
+    feed = DraftFeed()
+    first = feed.cursor()
+    feed._publish([event("a"), event("b")])
+    second = feed.cursor()
+    feed._publish([event("c")])
+
+    events, cursor = feed.events_since(first)
+    assert [e["record"]["id"] for e in events] == ["a", "b", "c"]
+    assert [e["record"]["id"] for e in feed.events_since(second)[0]] == ["c"]
+    assert feed.events_since(cursor) == ([], cursor)
+
+
+def test_cursor_behind_log_gets_reset(monkeypatch):
+    monkeypatch.setattr(pending_queue, "FEED_LOG_SIZE", 3)
+    feed = DraftFeed()
+    cursor = feed.cursor()
+    feed._publish([event(str(i)) for i in range(5)])
+
+    events, new_cursor = feed.events_since(cursor)
+    assert [e["type"] for e in events] == ["RESET"]
+    assert new_cursor == 5
+    # 보관 범위 안의 커서는 그대로 읽음
+    assert [e["record"]["id"] for e in feed.events_since(2)[0]] == ["2", "3", "4"]
+
+
+# =========================================
+# 폴링 피드
+# =========================================
+
+def test_polling_feed_diffs_versions(database, feed, make_lead, make_draft):
+    lead = make_lead("a@example.com")
+    # updated_at은 밀리초 단위라 같은 밀리초 안의 수정은 구분되지 않음 -> 과거 시각으로 생성
+    kept = make_draft(lead, updated_at="2020-01-01T00:00:00.000+00:00")
+    removed = make_draft(lead)
+    feed._poll()  # 시작 이후 추가된 두 초안
+    cursor = feed.cursor()
+
+    added = make_draft(lead)
+    database.update_draft_content(kept["id"], "제목: 수정\n\n본문")
+    database.update_draft_status(removed["id"], "rejected")
+    make_draft(lead, draft_type="comment")
+
+    events, _ = feed.events_since(cursor)
+    assert {(e["type"], (e["record"] or e["old_record"])["id"]) for e in events} == {
+        ("INSERT", added["id"]), ("UPDATE", kept["id"]), ("DELETE", removed["id"])
+    }
+
+
+def test_polling_feed_waits_for_interval(database, make_lead, make_draft):
+    feed = PollingDraftFeed(database, interval=3600)
+    feed.start()
+    make_draft(make_lead("a@example.com"))
+    assert feed.events_since(0) == ([], 0)
+
+
+def test_polling_feed_skips_when_another_session_is_polling(database, feed, make_draft, make_lead):
+    make_draft(make_lead("a@example.com"))
+    with feed._poll_lock:
+        assert feed.events_since(0) == ([], 0)
+    assert len(feed.events_since(0)[0]) == 1
+
+
+def test_sessions_sharing_a_feed_keep_their_own_cursor(database, feed, make_lead, make_draft):
+    first = PendingDraftQueue(database, feed=feed)
+    second = PendingDraftQueue(database, feed=feed)
+    first.sync()
+    second.sync()
+
+    make_draft(make_lead("a@example.com"))
+    assert first.sync() == 1
+    make_draft(make_lead("b@example.com"))
+    assert first.sync() == 1
+    assert second.sync() == 2
+
+
+# =========================================
+# 목록 / 본문 캐시
+# =========================================
+
+def test_page_total_and_last_page_fallback(database, queue, make_lead, make_draft):
+    drafts = [make_draft(make_lead(f"c{i}@example.com"), created_at=f"2026-01-0{i + 1}T00:00:00.000+00:00") for i in range(5)]
+
+    assert [d["id"] for d in queue.page()] == [drafts[4]["id"], drafts[3]["id"]]
+    assert (queue.total, queue.page_count, len(queue)) == (5, 3, 5)
+
+    queue.set_page(2)
+    assert [d["id"] for d in queue.page()] == [drafts[0]["id"]]
+
+    # 마지막 페이지의 초안이 빠지면 남은 마지막 페이지로
+    database.update_draft_status(drafts[0]["id"], "rejected")
+    queue.remove(drafts[0]["id"])
+    assert [d["id"] for d in queue.page()] == [drafts[2]["id"], drafts[1]["id"]]
+    assert queue.page_index == 1
+
+
+def test_apply_refetches_page_and_drops_changed_bodies(database, queue, make_lead, make_draft):
+    draft = make_draft(make_lead("a@example.com"))
+    other = make_draft(make_lead("b@example.com"))
+    queue.page()
+    assert queue.get(draft["id"])["content"].startswith("제목: 협업 제안")
+    queue.get(other["id"])
+
+    database.update_draft_content(draft["id"], "제목: 새 제목\n\n본문")
+    new = make_draft(make_lead("c@example.com"))
+    queue.apply([event(draft["id"]), event(new["id"], "INSERT")])
+
+    assert queue.total == 3
+    assert queue.get(draft["id"])["content"].startswith("제목: 새 제목")
+    assert other["id"] in queue._bodies
+
+
+def test_apply_ignores_comment_events_and_reset_reloads(database, queue, make_lead, make_draft):
+    draft = make_draft(make_lead("a@example.com"))
+    queue.page()
+    queue.get(draft["id"])
+    page = queue._page
+
+    queue.apply([{"type": "INSERT", "record": {"id": "x", "draft_type": "comment"}, "old_record": {}}])
+    assert queue._page is page
+
+    queue.calculate_send_targets()
+    queue.apply([{"type": "RESET", "record": {}, "old_record": {}}])
+    assert queue._page is None and queue._bodies == {} and queue.send_targets() is None
+
+
+def test_remove_drops_body_and_get_returns_none_when_not_pending(database, queue, make_lead, make_draft):
+    draft = make_draft(make_lead("a@example.com"))
+    queue.get(draft["id"])
+    database.mark_drafts_sent(draft["id"])
+    queue.remove(draft["id"])
+
+    assert queue.get(draft["id"]) is None
+    assert queue.page() == [] and queue.total == 0
+
+
+# =========================================
+# Realtime -> 폴링 대체
+# =========================================
+
+def fake_supabase(monkeypatch, subscribe_delay: float) -> dict:
+    """acreate_client만 있는 supabase 모듈 (subscribe가 subscribe_delay초 걸림)"""
+    state = {"callback": None, "removed": threading.Event()}
+
+    class Channel:
+        def on_postgres_changes(self, event, schema, table, callback):
+            state["callback"] = callback
+
+        async def subscribe(self):
+            await asyncio.sleep(subscribe_delay)
+
+    class Client:
+        def channel(self, name):
+            return Channel()
+
+        async def remove_channel(self, channel):
+            state["removed"].set()
+
+    async def acreate_client(url, key):
+        return Client()
+
+    monkeypatch.setitem(sys.modules, "supabase", types.SimpleNamespace(acreate_client=acreate_client))
+    return state
+
+
+def test_realtime_feed_publishes_changes(monkeypatch):
+    state = fake_supabase(monkeypatch, subscribe_delay=0)
+    feed = RealtimeDraftFeed(timeout=5)
+    feed.start()
+    cursor = feed.cursor()
+
+    state["callback"]({"data": {"type": "UPDATE", "record": {"id": "d1", "draft_type": "email"}, "old_record": {}}})
+    state["callback"]({"eventType": "DELETE", "new": {}, "old": {"id": "d2"}})
+
+    events, _ = feed.events_since(cursor)
+    assert [(e["type"], (e["record"] or e["old_record"])["id"]) for e in events] == [("UPDATE", "d1"), ("DELETE", "d2")]
+    feed.stop()
+    assert state["removed"].wait(5)
+
+
+def test_realtime_subscribe_timeout_raises_and_abandons_subscription(monkeypatch):
+    state = fake_supabase(monkeypatch, subscribe_delay=0.2)
+    feed = RealtimeDraftFeed(timeout=0.02)
+
+    with pytest.raises(TimeoutError):
+        feed.start()
+
+    # 늦게 끝난 구독은 바로 해제되고 스레드도 종료
+    assert state["removed"].wait(5)
+    feed._thread.join(5)
+    assert not feed._thread.is_alive()
+
+
+def test_create_feed_falls_back_to_polling(database, monkeypatch):
+    fake_supabase(monkeypatch, subscribe_delay=0.2)
+    monkeypatch.setattr(pending_queue.config, "DB_BACKEND", "supabase")
+    monkeypatch.setattr(pending_queue.config, "PENDING_REALTIME", True)
+    monkeypatch.setattr(pending_queue, "RealtimeDraftFeed", lambda: RealtimeDraftFeed(timeout=0.02))
+
+    feed = create_feed(database)
+
+    assert isinstance(feed, PollingDraftFeed)
+    assert feed._versions == {}
+
+
+def test_create_feed_uses_polling_on_sqlite(database, monkeypatch):
+    monkeypatch.setattr(pending_queue.config, "DB_BACKEND", "sqlite")
+    assert isinstance(create_feed(database), PollingDraftFeed)
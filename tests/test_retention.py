@@ -0,0 +1,155 @@
+"""RetentionRunner - 정책별 기준 시각, keep_if, dry-run, 청크 삭제/보관"""
+
+import gzip
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import retention
+from retention import RetentionRunner, default_policies, policy_cutoff
+
+NOW = datetime(2026, 6, 30, 0, 0, tzinfo=timezone.utc)
+POLICIES = {p["name"]: p for p in default_policies()}
+
+
+def ts(dt: datetime) -> str:
+    return dt.isoformat(timespec="milliseconds")
+
+
+@pytest.fixture
+def runner(database, tmp_path):
+    return RetentionRunner(database.client, chunk_size=5, pause_seconds=0, archive_dir=str(tmp_path))
+
+
+@pytest.fixture
+def insert(database):
+    """정책 대상 테이블에 age_column 시각을 지정해서 행 추가, 정책 key 값 반환"""
+    counter = iter(range(1_000_000))
+
+    def table(name, row):
+        return database.client.table(name).insert(row).execute().data[0]
+
+    def make(policy_name: str, at: datetime, **fields) -> str:
+        n = next(counter)
+        at = ts(at)
+        if policy_name == "pending_drafts":
+            return table("drafts", {"draft_type": "email", "content": "x", "status": "pending", "created_at": at, **fields})["id"]
+        if policy_name == "rejected_drafts":
+            return table("drafts", {"draft_type": "email", "content": "x", "status": "rejected", "updated_at": at, **fields})["id"]
+        if policy_name == "transcripts":
+            video = table("videos", {"video_id": f"t{n}", "title": "자막 영상"})
+            row = {"video_id": video["id"], "transcript_text": "자막", "updated_at": at}
+            return database.client.table("video_transcripts").upsert(row, on_conflict="video_id").execute().data[0]["video_id"]
+        if policy_name == "stale_videos":
+            return table("videos", {"video_id": f"v{n}", "title": "영상", "created_at": at, **fields})["id"]
+        return table("jobs", {"kind": "scan", "status": "succeeded", "finished_at": at, **fields})["id"]
+    return make
+
+
+def remaining(database, policy: dict) -> set:
+    rows = database.client.table(policy["table"]).select(policy["key"]).execute().data
+    return {r[policy["key"]] for r in rows}
+
+
+# =========================================
+# 기준 시각
+# =========================================
+
+def test_cutoff_uses_millisecond_iso_format():
+    policy = POLICIES["pending_drafts"]
+    assert policy_cutoff(policy, NOW) == ts(NOW - timedelta(days=policy["days"]))
+    assert policy_cutoff(policy, NOW.replace(microsecond=123456)).endswith(".123+00:00")
+    # 마이크로초가 0이어도 소수점 자리를 남겨서 SQLite 기본 형식과 같은 길이
+    assert len(policy_cutoff(policy, NOW)) == len("2026-06-23T00:00:00.000+00:00")
+
+
+@pytest.mark.parametrize("name", list(POLICIES))
+def test_policy_deletes_only_rows_older_than_cutoff(database, runner, insert, name):
+    policy = POLICIES[name]
+    cutoff = NOW - timedelta(days=policy["days"])
+    old = insert(name, cutoff - timedelta(milliseconds=1))
+    at_cutoff = insert(name, cutoff)
+    recent = insert(name, NOW)
+
+    result = runner.run_policy(policy, now=NOW)
+
+    assert result["matched"] == 1
+    assert result["deleted"] == 1
+    assert result["archived"] == (1 if policy["action"] == "archive" else 0)
+    left = remaining(database, policy)
+    assert old not in left
+    assert {at_cutoff, recent} <= left
+
+
+def test_filters_limit_drafts_by_status(database, runner, insert, make_draft):
+    old = NOW - timedelta(days=365)
+    approved = make_draft(status="approved", created_at=ts(old))
+    insert("pending_drafts", old)
+
+    result = runner.run_policy(POLICIES["pending_drafts"], now=NOW)
+
+    assert result["deleted"] == 1
+    assert database.get_draft_by_id(approved["id"]) is not None
+
+
+def test_stale_videos_keep_videos_with_drafts(database, runner, insert, make_draft):
+    old = NOW - timedelta(days=365)
+    referenced = insert("stale_videos", old)
+    unreferenced = insert("stale_videos", old)
+    make_draft(video_id=referenced)
+
+    result = runner.run_policy(POLICIES["stale_videos"], now=NOW)
+
+    assert result == {**result, "matched": 2, "kept": 1, "deleted": 1, "archived": 1}
+    left = remaining(database, POLICIES["stale_videos"])
+    assert referenced in left and unreferenced not in left
+
+
+def test_archive_file_holds_deleted_rows(runner, insert):
+    old = NOW - timedelta(days=365)
+    ids = {insert("rejected_drafts", old) for _ in range(3)}
+
+    result = runner.run_policy(POLICIES["rejected_drafts"], now=NOW)
+
+    with gzip.open(result["archive_file"], "rt", encoding="utf-8") as f:
+        archived = [json.loads(line) for line in f]
+    assert {row["id"] for row in archived} == ids
+    assert {row["status"] for row in archived} == {"rejected"}
+
+
+def test_dry_run_only_counts(database, runner, insert):
+    old = NOW - timedelta(days=365)
+    for name in POLICIES:
+        insert(name, old)
+
+    results = runner.run(dry_run=True)
+
+    assert {name: r["matched"] for name, r in results.items()} == {name: 1 for name in POLICIES}
+    assert all(r["deleted"] == 0 and r["archive_file"] is None for r in results.values())
+    assert all(remaining(database, p) for p in POLICIES.values())
+
+
+def test_cli_dry_run_deletes_nothing(database, insert, monkeypatch, capsys):
+    insert("pending_drafts", NOW - timedelta(days=365))
+    monkeypatch.setattr(retention, "db", database)
+    monkeypatch.setattr(sys, "argv", ["retention.py", "--dry-run", "--policy", "pending_drafts"])
+
+    retention.main()
+
+    assert "'matched': 1" in capsys.readouterr().out
+    assert remaining(database, POLICIES["pending_drafts"])
+
+
+def test_deletes_are_split_by_in_filter_chunk(database, runner, insert, make_draft, in_filter_sizes, monkeypatch):
+    monkeypatch.setattr(retention, "IN_FILTER_CHUNK", 2)
+    old = NOW - timedelta(days=365)
+    videos = [insert("stale_videos", old) for _ in range(7)]
+    make_draft(video_id=videos[0])
+
+    result = runner.run_policy(POLICIES["stale_videos"], now=NOW)
+
+    assert (result["kept"], result["deleted"]) == (1, 6)
+    assert remaining(database, POLICIES["stale_videos"]) == {videos[0]}
+    assert in_filter_sizes and max(size for _, _, size in in_filter_sizes) <= 2
@@ -0,0 +1,117 @@
+"""plan_lead_writes / plan_video_writes - 재스캔 시 바뀐 리드/영상만 쓰기"""
+
+from database import LEAD_HASH_FIELDS, VIDEO_HASH_FIELDS, content_hash, plan_lead_writes, plan_video_writes
+
+
+def video(video_id="v1", channel_id="UC1", **fields):
+    row = {
+        "video_id": video_id,
+        "channel_id": channel_id,
+        "channel_name": "사진 정리 채널",
+        "title": "갤러리 정리 꿀팁",
+        "published_at": "2026-01-05T10:00:00Z",
+        "view_count": "1,234",
+        "video_url": f"https://www.youtube.com/watch?v={video_id}",
+        "thumbnail_url": "https://i.ytimg.com/vi/x/hq.jpg",
+        "search_keyword": "갤러리 정리",
+        "channel_info": {"subscriber_count": 1000, "email": "creator@example.com"},
+    }
+    row.update(fields)
+    return row
+
+
+def stored_lead(**fields):
+    """plan_lead_writes가 만든 행과 같은 값으로 저장된 리드"""
+    row = {"id": "lead-1", "channel_id": "UC1", "channel_name": "사진 정리 채널",
+           "subscriber_count": 1000, "email": "creator@example.com"}
+    row.update(fields)
+    row.setdefault("content_hash", content_hash(row, LEAD_HASH_FIELDS))
+    return row
+
+
+# =========================================
+# 리드
+# =========================================
+
+def test_new_channel_is_inserted_once():
+    inserts, updates, skipped = plan_lead_writes([video("v1"), video("v2")], {})
+    assert updates == [] and skipped == 0
+    assert len(inserts) == 1
+    lead = inserts[0]
+    assert lead["channel_id"] == "UC1"
+    assert lead["email"] == "creator@example.com"
+    assert lead["status"] == "new"
+    assert lead["content_hash"] == content_hash(lead, LEAD_HASH_FIELDS)
+
+
+def test_unchanged_lead_is_skipped():
+    inserts, updates, skipped = plan_lead_writes([video()], {"UC1": stored_lead()})
+    assert (inserts, updates, skipped) == ([], [], 1)
+
+
+def test_lead_without_hash_is_updated_once():
+    inserts, updates, skipped = plan_lead_writes([video()], {"UC1": stored_lead(content_hash=None)})
+    assert inserts == [] and skipped == 0
+    assert len(updates) == 1
+
+
+def test_existing_email_is_not_overwritten():
+    lead = stored_lead(email="manual@example.com")
+    _, updates, skipped = plan_lead_writes([video()], {"UC1": lead})
+    assert skipped == 1 and updates == []
+
+
+def test_missing_email_and_new_subscriber_count_update_lead():
+    lead = stored_lead(email=None, subscriber_count=10)
+    _, updates, _ = plan_lead_writes([video()], {"UC1": lead})
+    assert updates[0]["email"] == "creator@example.com"
+    assert updates[0]["subscriber_count"] == 1000
+
+
+def test_empty_subscriber_count_keeps_stored_value():
+    lead = stored_lead()
+    _, updates, skipped = plan_lead_writes(
+        [video(channel_info={"subscriber_count": 0, "email": None})], {"UC1": lead}
+    )
+    assert skipped == 1 and updates == []
+
+
+# =========================================
+# 영상
+# =========================================
+
+LEADS = {"UC1": {"id": "lead-1"}}
+
+
+def test_new_video_row():
+    inserts, updates, skipped = plan_video_writes([video()], LEADS, {})
+    assert updates == [] and skipped == 0
+    row = inserts[0]
+    assert row["lead_id"] == "lead-1"
+    assert row["upload_date"] == "2026-01-05"
+    assert row["view_count"] == 1234
+    assert row["content_hash"] == content_hash(row, VIDEO_HASH_FIELDS)
+
+
+def test_video_without_lead_is_dropped():
+    assert plan_video_writes([video(channel_id="UC2")], LEADS, {}) == ([], [], 0)
+
+
+def test_duplicate_video_ids_are_planned_once():
+    inserts, _, _ = plan_video_writes([video("v1"), video("v1", title="다른 제목")], LEADS, {})
+    assert [r["title"] for r in inserts] == ["갤러리 정리 꿀팁"]
+
+
+def test_unchanged_video_is_skipped_and_changed_is_updated():
+    row = plan_video_writes([video()], LEADS, {})[0][0]
+    existing = {"v1": {"content_hash": row["content_hash"]}}
+    assert plan_video_writes([video()], LEADS, existing) == ([], [], 1)
+
+    _, updates, skipped = plan_video_writes([video(view_count="2,000")], LEADS, existing)
+    assert skipped == 0
+    assert updates[0]["view_count"] == 2000
+
+
+def test_non_numeric_view_count_is_zero():
+    inserts, _, _ = plan_video_writes([video(view_count="N/A")], LEADS, {})
+    assert inserts[0]["view_count"] == 0
@@ -0,0 +1,102 @@
+"""SendScheduler.plan - 발송 시간대/간격/도메인/일일 쿼터 배정 규칙"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from send_scheduler import SendScheduler, parse_windows
+
+# 2026-01-05는 월요일
+MONDAY_8AM = datetime(2026, 1, 5, 8, 0, tzinfo=timezone.utc)
+
+
+def scheduler(database, **overrides) -> SendScheduler:
+    options = {
+        "windows": "10:00-12:00",
+        "weekdays": "",
+        "tz": "UTC",
+        "daily_quota": 100,
+        "slot_seconds": 60,
+        "domain_spacing_seconds": 0,
+    }
+    options.update(overrides)
+    return SendScheduler(database, **options)
+
+
+def items(*emails):
+    return [{"id": f"o{i}", "to_email": email} for i, email in enumerate(emails)]
+
+
+def test_moves_to_window_start_and_spaces_slots(database):
+    plan = scheduler(database).plan(items("a@x.com", "b@y.com", "c@z.com"), now=MONDAY_8AM)
+    assert plan == {
+        "o0": "2026-01-05T10:00:00.000+00:00",
+        "o1": "2026-01-05T10:01:00.000+00:00",
+        "o2": "2026-01-05T10:02:00.000+00:00",
+    }
+
+
+def test_inside_window_starts_now(database):
+    now = datetime(2026, 1, 5, 10, 30, tzinfo=timezone.utc)
+    assert scheduler(database).plan(items("a@x.com"), now=now) == {"o0": "2026-01-05T10:30:00.000+00:00"}
+
+
+def test_same_domain_keeps_domain_spacing(database):
+    plan = scheduler(database, domain_spacing_seconds=600).plan(
+        items("a@gmail.com", "b@naver.com", "c@GMAIL.com"), now=MONDAY_8AM
+    )
+    assert plan["o0"] == "2026-01-05T10:00:00.000+00:00"
+    assert plan["o1"] == "2026-01-05T10:01:00.000+00:00"
+    assert plan["o2"] == "2026-01-05T10:10:00.000+00:00"
+
+
+def test_daily_quota_counts_sent_today(database):
+    plan = scheduler(database, daily_quota=2).plan(items("a@x.com", "b@y.com"), sent_today=1, now=MONDAY_8AM)
+    assert plan["o0"] == "2026-01-05T10:00:00.000+00:00"
+    assert plan["o1"] == "2026-01-06T10:00:00.000+00:00"
+
+
+def test_window_overflow_moves_to_next_window(database):
+    plan = scheduler(database, windows="10:00-10:02,14:00-15:00").plan(
+        items("a@x.com", "b@y.com", "c@z.com"), now=MONDAY_8AM
+    )
+    assert plan["o2"] == "2026-01-05T14:00:00.000+00:00"
+
+
+def test_skips_excluded_weekdays(database):
+    saturday = datetime(2026, 1, 3, 9, 0, tzinfo=timezone.utc)
+    plan = scheduler(database, weekdays="0,1,2,3,4").plan(items("a@x.com"), now=saturday)
+    assert plan == {"o0": "2026-01-05T10:00:00.000+00:00"}
+
+
+def test_avoids_already_scheduled_rows(database):
+    scheduled = [
+        {"to_email": "old@gmail.com", "scheduled_at": "2026-01-05T10:00:00.000+00:00"},
+        {"to_email": "old@naver.com", "scheduled_at": "2026-01-05T10:01:00.000+00:00"},
+    ]
+    plan = scheduler(database, domain_spacing_seconds=600).plan(
+        items("new@gmail.com", "new@daum.net"), scheduled=scheduled, now=MONDAY_8AM
+    )
+    assert plan["o0"] == "2026-01-05T10:10:00.000+00:00"
+    assert plan["o1"] == "2026-01-05T10:02:00.000+00:00"
+
+
+def test_window_is_in_send_timezone(database):
+    plan = scheduler(database, tz="Asia/Seoul").plan(items("a@x.com"), now=datetime(2026, 1, 4, 20, 0, tzinfo=timezone.utc))
+    # 10:00 KST = 01:00 UTC
+    assert plan == {"o0": "2026-01-05T01:00:00.000+00:00"}
+
+
+@pytest.mark.parametrize("spec", ["off", "OFF", " none ", ""])
+def test_off_disables_scheduler(database, spec):
+    assert parse_windows(spec) == []
+    assert not scheduler(database, windows=spec).enabled
+
+
+def test_zero_quota_disables_scheduler(database):
+    assert not scheduler(database, daily_quota=0).enabled
+
+
+def test_parse_windows_rejects_reversed_range():
+    with pytest.raises(ValueError):
+        parse_windows("12:00-10:00")
@@ -0,0 +1,314 @@
+"""SQLiteClient - PostgREST 쿼리 빌더 에뮬레이션, 쓰기, 마이그레이션, RPC (다른 테스트가 모두 이 구현 위에서 동작)"""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from database import Database
+from sqlite_backend import SCHEMA_VERSION, SQLiteClient
+
+V2_SCHEMA = Path(__file__).with_name("fixtures") / "schema_sqlite_v2.sql"
+
+
+@pytest.fixture
+def client(database):
+    return database.client
+
+
+@pytest.fixture
+def leads(client):
+    rows = [
+        {"channel_id": "UC1", "channel_name": "사진 정리 채널", "subscriber_count": 100, "email": "a@example.com", "keywords": ["사진", "정리"]},
+        {"channel_id": "UC2", "channel_name": "Gallery Tips", "subscriber_count": 200, "email": None, "status": "contacted"},
+        {"channel_id": "UC3", "channel_name": "요리 채널", "subscriber_count": 300, "email": "c@example.com"},
+    ]
+    return client.table("leads").insert(rows).execute().data
+
+
+def ids(rows) -> list[str]:
+    return [r["channel_id"] for r in rows]
+
+
+def channels(client):
+    return client.table("leads").select("channel_id").order("channel_id")
+
+
+# =========================================
+# SELECT 필터 / 정렬 / 페이지
+# =========================================
+
+def test_comparison_filters(client, leads):
+    assert ids(channels(client).eq("subscriber_count", 200).execute().data) == ["UC2"]
+    assert ids(channels(client).neq("channel_id", "UC2").execute().data) == ["UC1", "UC3"]
+    assert ids(channels(client).gt("subscriber_count", 100).execute().data) == ["UC2", "UC3"]
+    assert ids(channels(client).gte("subscriber_count", 200).lte("subscriber_count", 200).execute().data) == ["UC2"]
+    assert ids(channels(client).lt("subscriber_count", 200).execute().data) == ["UC1"]
+
+
+def test_in_is_ilike_and_not(client, leads):
+    assert ids(channels(client).in_("channel_id", ["UC3", "UC1", "UC9"]).execute().data) == ["UC1", "UC3"]
+    assert channels(client).in_("channel_id", []).execute().data == []
+    assert ids(channels(client).is_("email", "null").execute().data) == ["UC2"]
+    assert ids(channels(client).not_.is_("email", "null").execute().data) == ["UC1", "UC3"]
+    assert ids(channels(client).ilike("channel_name", "%gallery%").execute().data) == ["UC2"]
+    assert ids(channels(client).ilike("channel_name", "*채널").execute().data) == ["UC1", "UC3"]
+
+
+def test_order_range_and_count(client, leads):
+    response = client.table("leads").select("channel_id", count="exact").order("subscriber_count", desc=True).range(1, 2).execute()
+    assert ids(response.data) == ["UC2", "UC1"]
+    assert response.count == 3
+
+    response = client.table("leads").select("id", count="exact").eq("status", "new").limit(1).execute()
+    assert len(response.data) == 1 and response.count == 2
+
+
+def test_json_and_boolean_columns_are_decoded(client, leads, make_draft):
+    lead = client.table("leads").select("keywords").eq("channel_id", "UC1").execute().data[0]
+    assert lead["keywords"] == ["사진", "정리"]
+
+    junk = make_draft(leads[0], content="[AI 에러] 404 models/gemini")
+    ok = make_draft(leads[0])
+    rows = {r["id"]: r["is_junk"] for r in client.table("drafts").select("id, is_junk").execute().data}
+    assert rows == {junk["id"]: True, ok["id"]: False}
+
+
+# =========================================
+# 임베드
+# =========================================
+
+def test_many_to_one_embed_and_embedded_filter(client, leads, make_draft):
+    make_draft(leads[0])
+    make_draft(leads[1])
+
+    rows = client.table("drafts").select("id, leads(channel_name, email)").order("created_at").execute().data
+    assert [r["leads"] for r in rows] == [
+        {"channel_name": "사진 정리 채널", "email": "a@example.com"},
+        {"channel_name": "Gallery Tips", "email": None},
+    ]
+    # 연결에 쓴 lead_id는 요청한 컬럼이 아니므로 응답에 없음
+    assert set(rows[0]) == {"id", "leads"}
+
+    filtered = client.table("drafts").select("id, leads!inner(email)").not_.is_("leads.email", "null").execute().data
+    assert [r["leads"]["email"] for r in filtered] == ["a@example.com"]
+
+
+def test_one_to_many_embed_with_alias(client, leads, make_draft):
+    make_draft(leads[0])
+    make_draft(leads[0], draft_type="comment")
+
+    rows = client.table("leads").select("channel_id, items:drafts(draft_type)").order("channel_id").execute().data
+    assert sorted(d["draft_type"] for d in rows[0]["items"]) == ["comment", "email"]
+    assert rows[1]["items"] == [] and rows[2]["items"] == []
+
+
+def test_inner_embed_drops_rows_without_match(client, leads, make_draft):
+    make_draft(leads[2])
+    rows = client.table("leads").select("channel_id, drafts!inner(id)").execute().data
+    assert ids(rows) == ["UC3"]
+
+
+# =========================================
+# INSERT / UPSERT / UPDATE / DELETE
+# =========================================
+
+def test_insert_generates_ids_and_returns_rows_in_order(client):
+    rows = client.table("leads").insert([
+        {"channel_id": "UCb", "channel_name": "B"},
+        {"channel_id": "UCa", "channel_name": "A"},
+    ]).execute().data
+    assert ids(rows) == ["UCb", "UCa"]
+    assert all(r["id"] and r["status"] == "new" and r["created_at"].endswith("+00:00") for r in rows)
+
+
+def test_upsert_on_conflict_updates_only_given_columns(client, leads):
+    rows = client.table("leads").upsert([
+        {"channel_id": "UC1", "channel_name": "사진 정리 채널", "email": "new@example.com"},
+        {"channel_id": "UC4", "channel_name": "새 채널"},
+    ], on_conflict="channel_id").execute().data
+
+    assert ids(rows) == ["UC1", "UC4"]
+    updated = rows[0]
+    assert updated["id"] == leads[0]["id"]  # 기존 행의 id 유지
+    assert updated["email"] == "new@example.com"
+    assert updated["subscriber_count"] == 100  # 넘기지 않은 컬럼은 그대로
+    assert client.table("leads").select("id", count="exact").limit(1).execute().count == 4
+
+
+def test_upsert_with_key_only_does_nothing_on_conflict(client, leads):
+    rows = client.table("leads").upsert({"channel_id": "UC1", "channel_name": "사진 정리 채널"}, on_conflict="channel_id").execute().data
+    assert rows[0]["id"] == leads[0]["id"]
+
+
+def test_upsert_groups_rows_with_different_keys(client, leads):
+    rows = client.table("leads").upsert([
+        {"channel_id": "UC1", "channel_name": "사진 정리 채널", "subscriber_count": 111},
+        {"channel_id": "UC2", "channel_name": "Gallery Tips", "email": "b@example.com"},
+    ], on_conflict="channel_id").execute().data
+    assert [(r["subscriber_count"], r["email"]) for r in rows] == [(111, "a@example.com"), (200, "b@example.com")]
+
+
+def test_writes_to_table_keyed_by_video_id(client):
+    video = client.table("videos").insert({"video_id": "v1", "title": "영상"}).execute().data[0]
+
+    inserted = client.table("video_transcripts").insert({"video_id": video["id"], "summary": "요약"}).execute().data
+    assert [r["summary"] for r in inserted] == ["요약"]
+
+    upserted = client.table("video_transcripts").upsert({"video_id": video["id"], "transcript_text": "자막"}, on_conflict="video_id").execute().data
+    assert (upserted[0]["summary"], upserted[0]["transcript_text"]) == ("요약", "자막")
+
+    updated = client.table("video_transcripts").update({"summary": "새 요약"}).eq("video_id", video["id"]).execute().data
+    assert updated[0]["summary"] == "새 요약"
+
+
+def test_update_returns_rows_and_touches_updated_at(client, leads):
+    before = leads[0]["updated_at"]
+    rows = client.table("leads").update({"status": "contacted"}).eq("status", "new").execute().data
+    assert sorted(ids(rows)) == ["UC1", "UC3"]
+    assert all(r["status"] == "contacted" for r in rows)
+    assert rows[0]["updated_at"] >= before
+
+    explicit = client.table("leads").update({"updated_at": "2020-01-01T00:00:00.000+00:00"}).eq("channel_id", "UC2").execute().data
+    assert explicit[0]["updated_at"] == "2020-01-01T00:00:00.000+00:00"
+
+
+def test_delete_returns_deleted_rows_and_cascades(client, leads, make_draft):
+    make_draft(leads[0])
+    deleted = client.table("leads").delete().eq("channel_id", "UC1").execute().data
+    assert ids(deleted) == ["UC1"]
+    assert client.table("drafts").select("id").execute().data == []
+
+
+# =========================================
+# 마이그레이션
+# =========================================
+
+def make_v2_db(path: Path) -> None:
+    conn = sqlite3.connect(path)
+    conn.executescript(V2_SCHEMA.read_text(encoding="utf-8"))
+    conn.execute("INSERT INTO leads (id, channel_id, channel_name) VALUES ('lead-1', 'UC1', '채널')")
+    conn.execute("INSERT INTO drafts (id, lead_id, draft_type, content) VALUES ('d1', 'lead-1', 'email', '[오류] 생성 실패')")
+    conn.execute("INSERT INTO drafts (id, lead_id, draft_type, content) VALUES ('d2', 'lead-1', 'email', '제목: 안녕하세요')")
+    conn.execute("PRAGMA user_version = 2")
+    conn.commit()
+    conn.close()
+
+
+def test_migrates_v2_database_to_current_schema(tmp_path):
+    path = tmp_path / "old.db"
+    make_v2_db(path)
+
+    client = SQLiteClient(str(path))
+    try:
+        assert client.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        columns = {t: {r["name"] for r in client.conn.execute(f"PRAGMA table_xinfo({t})")} for t in ("leads", "videos", "drafts")}
+        assert "content_hash" in columns["leads"] and "content_hash" in columns["videos"]
+        assert {"sent_at", "is_junk"} <= columns["drafts"]
+
+        # 기존 행도 생성 컬럼 값이 계산되고, 새 테이블(email_outbox/jobs)이 동작
+        database = Database(client)
+        junk = {r["id"]: r["is_junk"] for r in client.table("drafts").select("id, is_junk").execute().data}
+        assert junk == {"d1": True, "d2": False}
+        assert [d["id"] for d in database.mark_drafts_sent(["d2"])] == ["d2"]
+        assert database.get_outbox_stats() == {"queued": 0, "sending": 0, "failed": 0, "cancelled": 0}
+        assert database.create_job("scan")["status"] == "queued"
+    finally:
+        client.close()
+
+    # 다시 열어도 마이그레이션/데이터 변경 없음
+    reopened = SQLiteClient(str(path))
+    try:
+        assert reopened.table("drafts").select("id", count="exact").limit(1).execute().count == 2
+    finally:
+        reopened.close()
+
+
+def test_v1_database_is_rejected(tmp_path):
+    path = tmp_path / "v1.db"
+    make_v2_db(path)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    with pytest.raises(RuntimeError, match="cannot be migrated"):
+        SQLiteClient(str(path))
+
+
+# =========================================
+# RPC
+# =========================================
+
+@pytest.fixture
+def searchable(database, leads):
+    client = database.client
+    videos = client.table("videos").insert([
+        {"video_id": "v1", "title": "갤러리 정리 꿀팁", "lead_id": leads[0]["id"]},
+        {"video_id": "v2", "title": "요리 브이로그", "lead_id": leads[2]["id"]},
+    ]).execute().data
+    database.update_video_transcript(videos[1]["id"], "오늘은 사진 정리 앱을 써봤어요", "사진 정리 앱 리뷰")
+    return videos
+
+
+def test_search_content_ranks_leads_and_videos(database, searchable):
+    rows, total = database.search("정리")
+    assert total == len(rows) == 3
+    assert {(r["kind"], r["title"]) for r in rows} == {
+        ("lead", "사진 정리 채널"), ("video", "갤러리 정리 꿀팁"), ("video", "요리 브이로그")
+    }
+    # 제목 매칭(가중치 2배)이 자막 매칭보다 위
+    video_titles = [r["title"] for r in rows if r["kind"] == "video"]
+    assert video_titles == ["갤러리 정리 꿀팁", "요리 브이로그"]
+    transcript_hit = next(r for r in rows if r["title"] == "요리 브이로그")
+    assert "정리" in transcript_hit["snippet"]
+
+
+def test_search_content_prefix_kinds_and_paging(database, searchable):
+    rows, _ = database.search("갤러", kinds=["video"])
+    assert [r["video_id"] for r in rows] == ["v1"]
+
+    rows, total = database.search("정리", kinds=["lead", "video"], limit=1, offset=1)
+    assert len(rows) == 1 and total == 3
+
+    assert database.search("   ") == ([], 0)
+    assert database.search("없는검색어") == ([], 0)
+
+
+def test_mark_drafts_sent_updates_drafts_and_new_leads_only(database, leads, make_draft):
+    new_lead_draft = make_draft(leads[0])
+    contacted_draft = make_draft(leads[1])
+    client = database.client
+    client.table("leads").update({"status": "responded"}).eq("id", leads[1]["id"]).execute()
+
+    sent = database.mark_drafts_sent([new_lead_draft["id"], contacted_draft["id"], new_lead_draft["id"]])
+
+    assert sorted(d["id"] for d in sent) == sorted([new_lead_draft["id"], contacted_draft["id"]])
+    assert all(d["sent_at"] for d in sent)
+    assert database.get_draft_by_id(new_lead_draft["id"])["status"] == "sent"
+    assert database.get_lead_by_id(leads[0]["id"])["status"] == "contacted"
+    # new가 아닌 리드 상태는 바꾸지 않음
+    assert database.get_lead_by_id(leads[1]["id"])["status"] == "responded"
+    # 이미 sent인 초안은 다시 처리하지 않음 (sent_at 유지)
+    assert database.mark_drafts_sent(new_lead_draft["id"]) == []
+
+
+def test_complete_outbox_marks_outbox_draft_and_lead(database, leads, make_draft):
+    draft = make_draft(leads[0])
+    other = make_draft(leads[2])
+    database.enqueue_emails([
+        {"draft_id": d["id"], "lead_id": d["lead_id"], "to_email": "x@example.com", "subject": "s", "body": "b"}
+        for d in (draft, other)
+    ])
+    [claimed, _] = database.claim_outbox(batch_size=2, worker="test")
+
+    assert database.complete_outbox([claimed["id"], claimed["id"]]) == 1
+    assert database.complete_outbox([claimed["id"]]) == 0  # 이미 sent
+
+    row = database.client.table("email_outbox").select("status, sent_at, locked_by").eq("id", claimed["id"]).execute().data[0]
+    assert row["status"] == "sent" and row["sent_at"] and row["locked_by"] is None
+    completed = database.get_draft_by_id(claimed["draft_id"])
+    assert completed["status"] == "sent" and completed["sent_at"]
+    assert database.get_lead_by_id(completed["lead_id"])["status"] == "contacted"
+    # 다른 행은 그대로 sending
+    assert database.get_outbox_stats()["sending"] == 1
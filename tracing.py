@@ -0,0 +1,463 @@
+"""
+Bes2 Marketer - Tracing
+검색/분석/발송 실행 한 번(run)을 구간(span)별로 시간 측정
+
+print()만으로는 느린 분석이 자막 때문인지, Gemini 때문인지, DB 때문인지 알 수 없어서
+실행 단위로 구간을 기록합니다.
+
+- tracer.run(name): 실행(trace) 시작 (백그라운드 작업, 발송 배치)
+- tracer.span(name): 실행 안의 구간 (YouTube / 자막 / Gemini / DB / SMTP 호출, 파이프라인 단계)
+  실행 밖의 호출(화면을 그리면서 하는 DB 조회 등)은 기록하지 않음
+- 현재 구간은 contextvars로 추적 -> 스레드 풀에 넘길 때는 contextvars.copy_context().run으로 감싸야
+  같은 실행의 하위 구간으로 묶임
+- 끝난 실행은 메모리에 최근 TRACE_KEEP개 보관(탭 4 워터폴) + TRACE_EXPORTERS로 내보냄
+  - console: 실행이 끝날 때 워터폴을 출력
+  - file: TRACE_FILE에 OTLP JSON 한 줄씩 추가 (OpenTelemetry Collector의 otlpjsonfile receiver로 읽을 수 있음)
+"""
+
+import contextvars
+import inspect
+import json
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from config import config
+
+
+# 워터폴 요약에서 외부 호출로 묶어 보여줄 구간 종류 (구간 이름의 첫 부분)
+CALL_KINDS = ["youtube", "transcript", "gemini", "db", "smtp"]
+
+SERVICE_NAME = "bes2-marketer"
+
+
+class Span:
+    """구간 하나 (시각은 epoch 나노초)"""
+
+    def __init__(self, name: str, trace: "Trace", parent_id: Optional[str], attributes: dict):
+        self.name = name
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attributes) -> None:
+        """속성 추가 (결과 건수, 응답 길이 등)"""
+        self.attributes.update(attributes)
+
+    def discard(self) -> None:
+        """실행 시작 구간이면 이 실행을 기록하지 않음 (할 일이 없었던 폴링 등)"""
+        if self.parent_id is None:
+            self.trace.sampled = False
+
+    def to_dict(self) -> dict:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns or self.start_ns,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """실행 밖에서 연 구간 (아무것도 기록하지 않음)"""
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def discard(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """실행 하나에 속한 구간 모음"""
+
+    def __init__(self, name: str):
+        self.trace_id = secrets.token_hex(16)
+        self.name = name
+        self.spans: list[Span] = []
+        self.sampled = True  # False면 기록/내보내기 생략 (할 일이 없었던 폴링 등)
+        self.dropped = 0  # TRACE_MAX_SPANS를 넘어 버린 구간 수
+
+    def add(self, span: Span) -> bool:
+        if len(self.spans) >= config.TRACE_MAX_SPANS:
+            self.dropped += 1
+            return False
+        self.spans.append(span)  # list.append는 스레드 안전
+        return True
+
+    def to_dict(self) -> dict:
+        spans = sorted((s.to_dict() for s in self.spans), key=lambda s: s["start_ns"])
+        root = spans[0] if spans else {"start_ns": 0, "end_ns": 0, "attributes": {}, "error": None}
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "start_ns": root["start_ns"],
+            "duration_ms": (root["end_ns"] - root["start_ns"]) / 1e6,
+            "status": "error" if root["error"] else "ok",
+            "attributes": root["attributes"],
+            "dropped": self.dropped,
+            "spans": spans,
+        }
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("bes2_current_span", default=None)
+
+
+# =========================================
+# 내보내기 (Exporter)
+# =========================================
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _from_otlp_value(value: dict):
+    if "intValue" in value:
+        return int(value["intValue"])
+    for key in ("boolValue", "doubleValue", "stringValue"):
+        if key in value:
+            return value[key]
+    return None
+
+
+def to_otlp(trace: dict) -> dict:
+    """실행 -> OTLP/JSON ExportTraceServiceRequest"""
+    spans = []
+    for s in trace["spans"]:
+        span = {
+            "traceId": trace["trace_id"],
+            "spanId": s["span_id"],
+            "name": s["name"],
+            "kind": 1 if s["parent_id"] else 2,  # INTERNAL / SERVER(실행 시작)
+            "startTimeUnixNano": str(s["start_ns"]),
+            "endTimeUnixNano": str(s["end_ns"]),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s["attributes"].items()],
+            "status": {"code": 2, "message": s["error"]} if s["error"] else {"code": 1},
+        }
+        if s["parent_id"]:
+            span["parentSpanId"] = s["parent_id"]
+        spans.append(span)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "bes2.tracing"}, "spans": spans}],
+    }]}
+
+
+def from_otlp(payload: dict) -> Optional[dict]:
+    """to_otlp()로 쓴 한 줄 -> 실행 dict (다른 프로세스(daemon, 발송 워커)가 남긴 실행을 탭 4에서 보기 위함)"""
+    spans = [
+        span
+        for resource in payload.get("resourceSpans", [])
+        for scope in resource.get("scopeSpans", [])
+        for span in scope.get("spans", [])
+    ]
+    if not spans:
+        return None
+    trace = Trace(next((s["name"] for s in spans if not s.get("parentSpanId")), spans[0]["name"]))
+    trace.trace_id = spans[0]["traceId"]
+    for s in spans:
+        span = Span(s["name"], trace, s.get("parentSpanId"), {
+            a["key"]: _from_otlp_value(a["value"]) for a in s.get("attributes", [])
+        })
+        span.span_id = s["spanId"]
+        span.start_ns = int(s["startTimeUnixNano"])
+        span.end_ns = int(s["endTimeUnixNano"])
+        if (s.get("status") or {}).get("code") == 2:
+            span.error = s["status"].get("message") or "error"
+        trace.spans.append(span)
+    return trace.to_dict()
+
+
+class ConsoleExporter:
+    """실행이 끝나면 워터폴을 콘솔에 출력"""
+
+    def export(self, trace: dict) -> None:
+        print(format_waterfall(trace), flush=True)
+
+
+class OTLPFileExporter:
+    """실행 하나를 OTLP JSON 한 줄로 파일에 추가"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, trace: dict) -> None:
+        line = json.dumps(to_otlp(trace), ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def create_exporters(spec: str) -> list:
+    """"console,file" -> exporter 목록"""
+    exporters = []
+    for name in (part.strip().lower() for part in (spec or "").split(",")):
+        if name == "console":
+            exporters.append(ConsoleExporter())
+        elif name == "file" and config.TRACE_FILE:
+            exporters.append(OTLPFileExporter(config.TRACE_FILE))
+        elif name and name not in ("none", "off"):
+            print(f"Warning: Unknown trace exporter '{name}' (console | file)")
+    return exporters
+
+
+def load_traces(path: Optional[str] = None, limit: int = 20) -> list[dict]:
+    """OTLP 파일의 마지막 limit개 실행 (최신순)"""
+    path = path or config.TRACE_FILE
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = deque(f, maxlen=limit)
+    except FileNotFoundError:
+        return []
+    except OSError as e:
+        print(f"Error reading trace file: {e}")
+        return []
+    traces = []
+    for line in reversed(lines):
+        try:
+            trace = from_otlp(json.loads(line))
+        except (ValueError, KeyError, TypeError):
+            continue
+        if trace:
+            traces.append(trace)
+    return traces
+
+
+# =========================================
+# Tracer
+# =========================================
+
+class Tracer:
+    """실행/구간 기록기 (프로세스당 하나)"""
+
+    def __init__(self, exporters: Optional[list] = None, keep: Optional[int] = None):
+        self.exporters = create_exporters(config.TRACE_EXPORTERS) if exporters is None else exporters
+        self._recent: deque = deque(maxlen=config.TRACE_KEEP if keep is None else keep)
+
+    @contextmanager
+    def run(self, name: str, **attributes) -> Iterator[Span]:
+        """
+        실행 시작 (이미 실행 안이면 일반 구간으로 기록)
+        yield된 구간에서 discard()를 부르면 기록하지 않음
+        """
+        if _current_span.get() is not None:
+            with self.span(name, **attributes) as span:
+                yield span
+            return
+
+        trace = Trace(name)
+        try:
+            with self._open(Span(name, trace, None, attributes)) as root:
+                yield root
+        finally:
+            # 실패한 실행도 기록 (오류 구간 확인용)
+            if trace.sampled:
+                self._finish(trace)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """실행 안의 구간 (실행 밖이면 기록하지 않음)"""
+        parent = _current_span.get()
+        if parent is None:
+            yield NOOP_SPAN
+            return
+        with self._open(Span(name, parent.trace, parent.span_id, attributes)) as span:
+            yield span
+
+    @contextmanager
+    def _open(self, span: Span) -> Iterator[Span]:
+        recorded = span.trace.add(span)
+        token = _current_span.set(span) if recorded else None
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"[:500]
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            if token is not None:
+                _current_span.reset(token)
+
+    def _finish(self, trace: Trace) -> None:
+        data = trace.to_dict()
+        self._recent.append(data)
+        for exporter in self.exporters:
+            try:
+                exporter.export(data)
+            except Exception as e:
+                print(f"Error exporting trace: {e}")
+
+    def recent(self, limit: Optional[int] = None) -> list[dict]:
+        """이 프로세스에서 끝난 최근 실행 (최신순)"""
+        traces = list(reversed(self._recent))
+        return traces[:limit] if limit else traces
+
+
+# =========================================
+# DB 클라이언트 래퍼 (Supabase / SQLite 쿼리 빌더 공통)
+# =========================================
+
+DB_OPERATIONS = ("select", "insert", "upsert", "update", "delete")
+
+
+class _TracedQuery:
+    """쿼리 빌더 프록시 - 메서드 체인은 그대로 넘기고 execute()만 db 구간으로 기록"""
+
+    def __init__(self, builder, table: str, operation: str, system: str):
+        self._builder = builder
+        self._table = table
+        self._operation = operation
+        self._system = system
+
+    def _wrap(self, value, operation: str):
+        return _TracedQuery(value, self._table, operation, self._system)
+
+    def __getattr__(self, attr: str):
+        value = getattr(self._builder, attr)
+        if hasattr(value, "execute"):  # not_ 처럼 빌더를 돌려주는 속성
+            return self._wrap(value, self._operation)
+        if not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            result = value(*args, **kwargs)
+            if hasattr(result, "execute"):
+                return self._wrap(result, attr if attr in DB_OPERATIONS else self._operation)
+            return result
+        return call
+
+    def execute(self):
+        # 비동기 PostgREST 빌더(database_async.py)는 await하는 동안을 구간으로 기록
+        if inspect.iscoroutinefunction(self._builder.execute):
+            return self._execute_async()
+        with tracer.span(f"db.{self._operation} {self._table}", **{"db.system": self._system}) as span:
+            return self._record(span, self._builder.execute())
+
+    async def _execute_async(self):
+        with tracer.span(f"db.{self._operation} {self._table}", **{"db.system": self._system}) as span:
+            return self._record(span, await self._builder.execute())
+
+    @staticmethod
+    def _record(span, response):
+        data = getattr(response, "data", None)
+        if isinstance(data, list):
+            span.set(rows=len(data))
+        return response
+
+
+class TracedClient:
+    """Database.client 래퍼 - table()/rpc() 쿼리의 execute()를 구간으로 기록"""
+
+    def __init__(self, client, system: str = ""):
+        self._client = client
+        self._system = system or config.DB_BACKEND
+
+    def table(self, name: str) -> _TracedQuery:
+        return _TracedQuery(self._client.table(name), name, "select", self._system)
+
+    def rpc(self, fn: str, *args, **kwargs) -> _TracedQuery:
+        return _TracedQuery(self._client.rpc(fn, *args, **kwargs), fn, "rpc", self._system)
+
+    def __getattr__(self, attr: str):
+        return getattr(self._client, attr)
+
+
+# =========================================
+# 워터폴 / 요약
+# =========================================
+
+def span_kind(name: str) -> str:
+    """"gemini.generate_content" -> "gemini\""""
+    return name.split(".", 1)[0]
+
+
+def waterfall_rows(trace: dict) -> list[dict]:
+    """
+    구간을 부모 바로 아래에 오도록 (같은 부모 안에서는 시작 순서대로) 정렬,
+    들여쓰기 깊이와 실행 시작 기준 오프셋(ms)을 붙여서 반환
+    """
+    spans = trace["spans"]  # 시작 순서로 정렬되어 있음
+    by_id = {s["span_id"]: s for s in spans}
+    children: dict[Optional[str], list[dict]] = {}
+    for s in spans:
+        parent_id = s["parent_id"] if s["parent_id"] in by_id else None
+        children.setdefault(parent_id, []).append(s)
+
+    rows = []
+    stack = [(s, 0) for s in reversed(children.get(None, []))]
+    while stack:
+        s, depth = stack.pop()
+        rows.append({
+            "name": s["name"],
+            "kind": span_kind(s["name"]),
+            "depth": depth,
+            "offset_ms": (s["start_ns"] - trace["start_ns"]) / 1e6,
+            "duration_ms": (s["end_ns"] - s["start_ns"]) / 1e6,
+            "attributes": s["attributes"],
+            "error": s["error"],
+        })
+        stack.extend((child, depth + 1) for child in reversed(children.get(s["span_id"], [])))
+    return rows
+
+
+def summarize(trace: dict) -> list[dict]:
+    """
+    외부 호출 종류별 합계 [{"kind", "count", "total_ms", "max_ms", "errors", "share"}]
+    share: 실행 전체 시간 대비 비율 (동시 실행이면 1을 넘을 수 있음)
+    """
+    totals = {kind: {"kind": kind, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "errors": 0} for kind in CALL_KINDS}
+    for s in trace["spans"]:
+        item = totals.get(span_kind(s["name"]))
+        if item is None:
+            continue
+        duration = (s["end_ns"] - s["start_ns"]) / 1e6
+        item["count"] += 1
+        item["total_ms"] += duration
+        item["max_ms"] = max(item["max_ms"], duration)
+        item["errors"] += 1 if s["error"] else 0
+    for item in totals.values():
+        item["share"] = item["total_ms"] / trace["duration_ms"] if trace["duration_ms"] else 0.0
+    return [item for item in totals.values() if item["count"]]
+
+
+def format_waterfall(trace: dict, width: int = 40, max_rows: int = 200) -> str:
+    """텍스트 워터폴 (콘솔 exporter)"""
+    total = trace["duration_ms"] or 1.0
+    lines = [f"🧭 {trace['name']} {trace['duration_ms']:.0f}ms ({trace['status']}) trace={trace['trace_id']}"]
+    rows = waterfall_rows(trace)
+    for row in rows[:max_rows]:
+        start = int(row["offset_ms"] / total * width)
+        length = max(1, int(row["duration_ms"] / total * width))
+        bar = " " * start + "█" * min(length, width - start)
+        label = ("  " * row["depth"] + row["name"])[:40]
+        mark = " ❌" if row["error"] else ""
+        lines.append(f"  {label:<40} |{bar:<{width}}| {row['duration_ms']:>8.1f}ms{mark}")
+    if len(rows) > max_rows:
+        lines.append(f"  ... {len(rows) - max_rows} more span(s)")
+    for item in summarize(trace):
+        lines.append(f"  = {item['kind']:<10} {item['count']:>4}x {item['total_ms']:>9.1f}ms ({item['share']:.0%})")
+    return "\n".join(lines)
+
+
+# 싱글톤 인스턴스
+tracer = Tracer()
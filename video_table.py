@@ -0,0 +1,148 @@
+"""
+Bes2 Marketer - Video Table
+검색/DB 영상 목록을 세션에 보관하는 컬럼형 모델 (pandas, video_id 인덱스)
+
+검색 결과 dict 목록을 그대로 세션에 두면 영상/채널 설명 같은 긴 텍스트와
+UI 표시용 사본(raw_data)이 영상마다 중복으로 남습니다.
+VideoTable은 화면/분석에 필요한 컬럼만 타입을 지정해 보관하고,
+st.data_editor용 표는 행 단위 반복 없이 컬럼 연산으로 만듭니다.
+"""
+
+from typing import Optional
+
+import pandas as pd
+
+
+# 보관할 컬럼 -> dtype (그 외 필드(description 등)는 버림)
+COLUMNS = {
+    "video_id": "string",
+    "title": "string",
+    "channel_id": "string",
+    "channel_name": "string",
+    "thumbnail_url": "string",
+    "video_url": "string",
+    "published_at": "string",
+    "view_count": "Int64",
+    "subscriber_count": "Int64",
+    "email": "string",
+    "search_keyword": "string",
+    "relevance_score": "Int64",
+    "db_id": "string",
+}
+
+# 영상 dict의 channel_info 안에 있던 컬럼
+CHANNEL_INFO_COLUMNS = ["subscriber_count", "email"]
+
+# data_editor 표 컬럼명 (숨김 컬럼 없음, 인덱스가 video_id)
+EDITOR_COLUMNS = ["선택", "썸네일", "제목", "이메일", "채널명", "게시일", "조회수", "링크"]
+
+
+def _to_int(values: pd.Series) -> pd.Series:
+    """"1,234" / 1234 / None -> Int64 (숫자가 아니면 0)"""
+    text = values.astype("string").str.replace(",", "", regex=False)
+    return pd.to_numeric(text, errors="coerce").fillna(0).astype("Int64")
+
+
+class VideoTable:
+    """영상 목록 (video_id -> 한 행)"""
+
+    def __init__(self, frame: Optional[pd.DataFrame] = None):
+        if frame is None:
+            frame = pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in COLUMNS.items()}).set_index("video_id")
+        self.frame = frame
+        self._channel_rows: Optional[dict] = None
+
+    @classmethod
+    def from_records(cls, videos: list[dict]) -> "VideoTable":
+        """검색 결과 / DB 영상 dict 목록 -> VideoTable (같은 video_id는 처음 것만)"""
+        if not videos:
+            return cls()
+        frame = pd.DataFrame.from_records(videos)
+        channel = pd.DataFrame.from_records(
+            [v.get("channel_info") or {} for v in videos],
+            columns=CHANNEL_INFO_COLUMNS
+        )
+        frame[CHANNEL_INFO_COLUMNS] = channel[CHANNEL_INFO_COLUMNS].to_numpy()
+        frame = frame.reindex(columns=list(COLUMNS))
+
+        for col, dtype in COLUMNS.items():
+            if dtype == "Int64":
+                frame[col] = _to_int(frame[col])
+            else:
+                frame[col] = frame[col].astype(dtype)
+        frame["title"] = frame["title"].fillna("No Title")
+        frame["channel_name"] = frame["channel_name"].fillna("Unknown")
+        text_cols = ["thumbnail_url", "video_url", "published_at", "email", "search_keyword"]
+        frame[text_cols] = frame[text_cols].fillna("")
+
+        frame = frame.dropna(subset=["video_id"]).drop_duplicates("video_id").set_index("video_id")
+        return cls(frame)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def empty(self) -> bool:
+        return self.frame.empty
+
+    def __contains__(self, video_id: str) -> bool:
+        return video_id in self.frame.index
+
+    # =========================================
+    # 화면용 표
+    # =========================================
+
+    def editor_frame(self) -> pd.DataFrame:
+        """st.data_editor용 표 (인덱스: video_id)"""
+        f = self.frame
+        return pd.DataFrame({
+            "선택": False,
+            "썸네일": f["thumbnail_url"],
+            "제목": f["title"],
+            "이메일": f["email"],
+            "채널명": f["channel_name"],
+            "게시일": f["published_at"].str[:10],
+            "조회수": f["view_count"].map("{:,}".format).astype("string"),
+            "링크": f["video_url"],
+        }, index=f.index)[EDITOR_COLUMNS]
+
+    # =========================================
+    # 조회 / 변경
+    # =========================================
+
+    def records(self, video_ids: Optional[list[str]] = None) -> list[dict]:
+        """
+        영상 dict 목록 (검색 결과와 같은 모양, channel_info 포함) - 분석 작업에 넘길 때 사용
+        video_ids를 주면 그 순서대로 (없는 ID는 제외)
+        """
+        f = self.frame
+        if video_ids is not None:
+            f = f.reindex([vid for vid in dict.fromkeys(video_ids) if vid in f.index])
+        f = f.reset_index().astype(object)
+        rows = f.where(f.notna(), None).to_dict("records")
+        for row in rows:
+            row["channel_info"] = {
+                "subscriber_count": row.pop("subscriber_count") or 0,
+                "email": row.pop("email") or None
+            }
+        return rows
+
+    def row(self, video_id: str) -> Optional[dict]:
+        """영상 한 행 (video_id 인덱스 조회, 없으면 None)"""
+        if video_id not in self.frame.index:
+            return None
+        values = self.frame.loc[video_id]
+        return {k: (None if pd.isna(v) else v) for k, v in values.items()}
+
+    def _rows_of_channel(self, channel_id: str):
+        """channel_id -> 행 위치 (처음 한 번만 만들고, 행 구성은 바뀌지 않으므로 계속 사용)"""
+        if self._channel_rows is None:
+            self._channel_rows = self.frame.groupby("channel_id", sort=False).indices
+        return self._channel_rows.get(channel_id, [])
+
+    def set_channel_email(self, channel_id: str, email: Optional[str]) -> int:
+        """같은 채널 영상 전체의 이메일 변경, 바뀐 행 수 반환"""
+        rows = self._rows_of_channel(channel_id)
+        if len(rows):
+            self.frame.iloc[rows, self.frame.columns.get_loc("email")] = email or ""
+        return len(rows)